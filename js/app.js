@@ -21,6 +21,8 @@ import { SynapseRenderer } from './synapse.js';
 import { GeminiEngine } from './gemini.js';
 import { StratcomSystem } from './stratcom.js';
 import { registerCommands } from './terminal-commands.js';
+import { LedgerMemo } from './memo-cache.js';
+import { FrameScheduler } from './frame-scheduler.js';
 
 document.addEventListener('DOMContentLoaded', async () => {
     // Service Worker Registration
@@ -64,14 +66,17 @@ document.addEventListener('DOMContentLoaded', async () => {
     };
 
     const resonanceEngine = new ResonanceEngine();
-    const horizonEngine = new HorizonEngine();
+    // Shared cache of per-ledger engine outputs (keyed by length + head hash)
+    const ledgerMemo = new LedgerMemo({ maxEntries: 32 });
+    const horizonEngine = new HorizonEngine({ memo: ledgerMemo });
     const codex = new CodexEngine();
     const spectra = new SpectraEngine();
     const terminal = new TerminalSystem();
     const aegis = new AegisEngine(ui, horizonEngine);
-    const sentinel = new SentinelEngine(horizonEngine);
+    const sentinel = new SentinelEngine(horizonEngine, { memo: ledgerMemo });
     const chronos = new ChronosEngine(horizonEngine, SentinelEngine);
-    const cortex = new CortexEngine();
+    // Cap per-thread links so Synapse stays drawable on large ledgers (clusters are unaffected)
+    const cortex = new CortexEngine({ maxEdgesPerNode: 16, memo: ledgerMemo });
     // Valkyrie/Vanguard init deferred until ledger is ready
 
     // Panopticon initialization is deferred until renderers are ready,
@@ -117,7 +122,15 @@ document.addEventListener('DOMContentLoaded', async () => {
     const valkyrie = new ValkyrieEngine(terminal, ui, tapestryLedger, horizonEngine, vanguard);
     const valkyrieUI = new ValkyrieUI(valkyrie);
 
-    const stratcom = new StratcomSystem(tapestryLedger, horizonEngine, sentinel, vanguard, terminal, ui);
+    // One render loop for the tapestry views, units and widgets
+    const scheduler = new FrameScheduler();
+    scheduler.register('vanguard', tickVanguard, { priority: 2, budget: 4 });
+    scheduler.register('tapestry', drawTapestry, { priority: 1 });
+    scheduler.register('map', drawMap, { priority: 1 });
+
+    const stratcom = new StratcomSystem(tapestryLedger, horizonEngine, sentinel, vanguard, terminal, ui, {
+        scheduler
+    });
 
     // Parse Mode for Tactical Uplink
     const urlParams = new URLSearchParams(window.location.search);
@@ -126,9 +139,15 @@ document.addEventListener('DOMContentLoaded', async () => {
         document.body.classList.add(`mode-${mode}`);
     }
 
-    // Initialize Gemini Uplink
-    const gemini = new GeminiEngine(state, tapestryLedger, terminal, ui);
+    // Initialize Gemini Uplink. Relay origins other than this page's own go in
+    // relays (and in index.html's connect-src); linking one is still opt-in.
+    const gemini = new GeminiEngine(state, tapestryLedger, terminal, ui, { relays: [] });
     gemini.connect();
+    // Threads merged from a peer's ledger
+    gemini.addListener('LEDGER_SYNCED', () => {
+        renderTapestry();
+        updateAlchemyUI();
+    });
 
     if (!mode) {
         ui.renderUplinkControls();
@@ -136,7 +155,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // Ledger Sync Listener (Cross-Window)
     window.addEventListener('storage', async (e) => {
-        if (e.key === tapestryLedger.storageKey) {
+        if (e.key === tapestryLedger.syncKey) {
             await tapestryLedger.reload();
             renderTapestry();
             updateAlchemyUI();
@@ -147,9 +166,18 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     let mandalaRenderer = null;
     let mapRenderer = null;
+    const mapOptions = { requestRedraw: () => scheduler.request('map') };
     let synapseRenderer = null;
     let oracleEngine = null;
 
+    // Older ledger history pages in after first paint; redraw once it lands
+    tapestryLedger.hydrated().then(() => {
+        if (state.activeScreen === 'tapestry') {
+            renderTapestry();
+            updateAlchemyUI();
+        }
+    });
+
     const elements = {
         screens: {
             splash: document.getElementById('splash-screen'),
@@ -265,7 +293,7 @@ document.addEventListener('DOMContentLoaded', async () => {
             }
 
             if (!mapRenderer && elements.tapestry.mapCanvas) {
-                mapRenderer = new MapRenderer(elements.tapestry.mapCanvas);
+                mapRenderer = new MapRenderer(elements.tapestry.mapCanvas, mapOptions);
 
                 // Wire up Map Events
                 elements.tapestry.mapCanvas.addEventListener('vanguard-command', (e) => {
@@ -286,7 +314,8 @@ document.addEventListener('DOMContentLoaded', async () => {
                     oracleEngine = new OracleEngine(
                         horizonEngine,
                         mapRenderer,
-                        locations
+                        locations,
+                        { memo: ledgerMemo }
                     );
                 }
             }
@@ -303,21 +332,16 @@ document.addEventListener('DOMContentLoaded', async () => {
             updateAlchemyUI();
 
             // Sentinel Scan on screen entry
-            sentinel.assess(tapestryLedger.getThreads());
-
-            // Start animation loop if horizon is active
-            if (state.isHorizonActive) {
-                startHorizonLoop();
-            }
+            sentinel.assess(tapestryLedger.getView());
         } else {
+            // Tapestry tasks stop on their own once the screen is gone
             elements.screens.tapestry.classList.remove('tapestry-active');
-            stopHorizonLoop();
         }
     }
 
     function updateAlchemyUI() {
         const slots = [elements.tapestry.slot1, elements.tapestry.slot2];
-        const threads = tapestryLedger.getThreads();
+        const threads = tapestryLedger.getView();
 
         state.selectedThreads.forEach((threadIndex, i) => {
             slots[i].classList.add('filled');
@@ -754,7 +778,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                 title: state.activeLocation.title
             };
 
-            const report = chronos.simulate(tapestryLedger.getThreads(), proposed);
+            const report = chronos.simulate(tapestryLedger.getView(), proposed);
 
             ui.showSimulationResults(report, () => {
                 weaveThread();
@@ -791,18 +815,19 @@ document.addEventListener('DOMContentLoaded', async () => {
             region: state.region,
             title: state.activeLocation.title
         });
+        gemini.publishLedger();
 
         // Capture state for Panopticon (Time Travel)
         if (panopticon) panopticon.capture();
 
         // Trigger Aegis Tactical Analysis
-        aegis.analyze(tapestryLedger.getThreads());
+        aegis.analyze(tapestryLedger.getView());
 
         // Trigger Sentinel Threat Assessment
-        const threatReport = sentinel.assess(tapestryLedger.getThreads());
+        const threatReport = sentinel.assess(tapestryLedger.getView());
 
         // Trigger Valkyrie Response Matrix
-        valkyrie.evaluate(threatReport, tapestryLedger.getThreads());
+        valkyrie.evaluate(threatReport, tapestryLedger.getView());
 
         if (threatReport.status !== 'STANDBY') {
             ui.showNotification(
@@ -881,15 +906,24 @@ document.addEventListener('DOMContentLoaded', async () => {
             );
         });
 
-        elements.tapestry.exportBtn.addEventListener('click', () => {
-            const data = tapestryLedger.exportScroll();
-            const blob = new Blob([data], { type: 'application/json' });
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `marq_scroll_${Date.now()}.json`;
-            a.click();
-            URL.revokeObjectURL(url);
+        // Binary scroll by default; Shift+click exports the JSON interchange format
+        elements.tapestry.exportBtn.addEventListener('click', async (e) => {
+            try {
+                const asJson = e.shiftKey;
+                const blob = asJson
+                    ? new Blob([tapestryLedger.exportScroll()], { type: 'application/json' })
+                    : new Blob([await tapestryLedger.exportScrollBinary()], {
+                          type: 'application/octet-stream'
+                      });
+                const url = URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = url;
+                a.download = `marq_scroll_${Date.now()}.${asJson ? 'json' : 'mqs'}`;
+                a.click();
+                URL.revokeObjectURL(url);
+            } catch (err) {
+                ui.showNotification(`Export error: ${err.message}`, 'error');
+            }
         });
 
         elements.tapestry.importBtn.addEventListener('click', () => {
@@ -901,9 +935,13 @@ document.addEventListener('DOMContentLoaded', async () => {
             if (!file) return;
             try {
                 ui.showLoading('DECODING SCROLL...');
-                const text = await file.text();
-                await tapestryLedger.importScroll(text);
-                ui.showNotification('Scroll imported successfully.', 'success');
+                const count = await tapestryLedger.importScrollFile(file, {
+                    onProgress: ({ threads, bytes, totalBytes }) => {
+                        const pct = totalBytes ? Math.floor((bytes / totalBytes) * 100) : 0;
+                        ui.setLoadingText(`VERIFYING SCROLL... ${pct}% // ${threads} THREADS`);
+                    }
+                });
+                ui.showNotification(`Scroll imported successfully (${count} threads).`, 'success');
                 renderTapestry();
             } catch (err) {
                 ui.showNotification(`Import error: ${err.message}`, 'error');
@@ -916,7 +954,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         // --- CODEX INTEGRATION ---
         elements.tapestry.forgeShardBtn.addEventListener('click', async () => {
             try {
-                const threads = tapestryLedger.getThreads();
+                const threads = tapestryLedger.getView();
                 if (threads.length === 0)
                     throw new Error('Tapestry is empty. Nothing to forge.');
 
@@ -943,28 +981,43 @@ document.addEventListener('DOMContentLoaded', async () => {
             elements.tapestry.shardInput.click();
         });
 
+        // Several shards at once are scanned across the Codex worker pool; the
+        // longest decoded chain is integrated
         elements.tapestry.shardInput.addEventListener('change', async (e) => {
-            const file = e.target.files[0];
-            if (!file) return;
+            const files = [...e.target.files];
+            if (files.length === 0) return;
 
             try {
                 ui.showLoading('DECRYPTING SHARD...');
-                const data = await codex.scanShard(file);
+                let data = null;
+                let decoded = 0;
+                for await (const entry of codex.scanMany(files, {
+                    onProgress: ({ done, total, failed }) =>
+                        ui.setLoadingText(`DECRYPTING SHARDS... ${done}/${total}${failed ? ` // ${failed} FAILED` : ''}`)
+                })) {
+                    if (!entry.ok) {
+                        if (files.length === 1) throw new Error(entry.error);
+                        continue;
+                    }
+                    decoded++;
+                    if (!data || entry.data.length > data.length) data = entry.data;
+                }
+                if (!data) throw new Error('No shard could be decoded');
                 ui.hideLoading();
 
                 // Use existing import logic
-                const tempLedger = new TapestryLedger('temp');
-                tempLedger.threads = data;
-                const jsonString = JSON.stringify(data);
-                await tapestryLedger.importScroll(jsonString);
+                await tapestryLedger.importScroll(JSON.stringify(data));
 
                 ui.showNotification(
-                    'Shard decrypted and integrated.',
+                    files.length === 1
+                        ? 'Shard decrypted and integrated.'
+                        : `${decoded}/${files.length} shards decrypted. Integrated ${data.length} threads.`,
                     'success'
                 );
                 resonanceEngine.playInteractionSound('snap');
                 renderTapestry();
             } catch (e) {
+                ui.hideLoading();
                 document.body.style.cursor = 'default';
                 console.error(e);
                 ui.showNotification(`Scan failed: ${e.message}`, 'error');
@@ -979,12 +1032,12 @@ document.addEventListener('DOMContentLoaded', async () => {
                 if (state.activeScreen === 'tapestry') {
                     if (mandalaRenderer) {
                         mandalaRenderer.resize();
-                        mandalaRenderer.render(tapestryLedger.getThreads());
+                        mandalaRenderer.render(tapestryLedger.getView());
                     }
                     if (mapRenderer) {
                         mapRenderer.resize();
                         mapRenderer.render(
-                            tapestryLedger.getThreads(),
+                            tapestryLedger.getView(),
                             locations
                         );
                     }
@@ -994,7 +1047,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
         // Mandala Interaction (Click & Accessibility)
         const handleThreadInteraction = (index) => {
-            const threads = tapestryLedger.getThreads();
+            const threads = tapestryLedger.getView();
             if (index >= 0 && index < threads.length) {
                 // Toggle selection
                 const selectedIndex = state.selectedThreads.indexOf(index);
@@ -1046,17 +1099,16 @@ document.addEventListener('DOMContentLoaded', async () => {
                     // SynapseRenderer handleInput uses getBoundingClientRect internally.
                     // So we pass clientX/Y.
                     const type = evt === 'mousedown' ? 'down' : evt === 'mousemove' ? 'move' : 'up';
-                    synapseRenderer.handleInput(type, e.clientX, e.clientY);
+                    const changed = synapseRenderer.handleInput(type, e.clientX, e.clientY);
 
-                    if (synapseRenderer.isSimulating) {
-                         startHorizonLoop(); // Ensure loop is running for physics
-                    }
+                    // Physics keeps the loop running; a settled graph redraws once for hover
+                    if (changed || synapseRenderer.isSimulating) renderTapestry();
                 }
             });
         });
 
         elements.tapestry.fuseBtn.addEventListener('click', async () => {
-            const threads = tapestryLedger.getThreads();
+            const threads = tapestryLedger.getView();
             if (state.selectedThreads.length !== 2) return;
 
             const t1 = threads[state.selectedThreads[0]];
@@ -1088,13 +1140,8 @@ document.addEventListener('DOMContentLoaded', async () => {
                 state.isHorizonActive
             );
 
-            if (state.isHorizonActive) {
-                updateHorizonDashboard();
-                startHorizonLoop();
-            } else {
-                stopHorizonLoop();
-                renderTapestry(); // One last render to clear ghosts
-            }
+            if (state.isHorizonActive) updateHorizonDashboard();
+            renderTapestry(); // Animates while active; otherwise one last render clears ghosts
             resonanceEngine.playInteractionSound('click');
         });
 
@@ -1110,9 +1157,9 @@ document.addEventListener('DOMContentLoaded', async () => {
 
                 elements.tapestry.canvas.style.display = 'none';
                 elements.tapestry.mapCanvas.style.display = 'block';
-                if (!mapRenderer) mapRenderer = new MapRenderer(elements.tapestry.mapCanvas);
+                if (!mapRenderer) mapRenderer = new MapRenderer(elements.tapestry.mapCanvas, mapOptions);
                 mapRenderer.resize();
-                mapRenderer.render(tapestryLedger.getThreads(), locations);
+                renderTapestry();
             } else {
                 // Return to previous state or default?
                 // If map is off, we show mandala (or synapse if it was active? No, we turned it off).
@@ -1139,17 +1186,12 @@ document.addEventListener('DOMContentLoaded', async () => {
                 elements.tapestry.canvas.style.display = 'block';
 
                 // Initialize Graph
-                const threads = tapestryLedger.getThreads();
+                const threads = tapestryLedger.getView();
                 const graph = cortex.analyze(threads);
                 if (!synapseRenderer) synapseRenderer = new SynapseRenderer(elements.tapestry.canvas);
                 synapseRenderer.render(graph);
-
-                startHorizonLoop(); // Start physics loop
-            } else {
-                renderTapestry(); // Back to Mandala
-                stopHorizonLoop(); // Unless Horizon is active?
-                if (state.isHorizonActive) startHorizonLoop();
             }
+            renderTapestry(); // Physics loop, or back to Mandala
             resonanceEngine.playInteractionSound('click');
         });
 
@@ -1167,31 +1209,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 
     // --- Horizon Logic ---
-    let horizonAnimationFrame = null;
-
-    function startHorizonLoop() {
-        if (horizonAnimationFrame) return;
-
-        const loop = () => {
-            renderTapestry();
-            if (state.activeScreen === 'tapestry' && state.isHorizonActive) {
-                horizonAnimationFrame = requestAnimationFrame(loop);
-            } else {
-                horizonAnimationFrame = null;
-            }
-        };
-        loop();
-    }
-
-    function stopHorizonLoop() {
-        if (horizonAnimationFrame) {
-            cancelAnimationFrame(horizonAnimationFrame);
-            horizonAnimationFrame = null;
-        }
-    }
-
     function updateHorizonDashboard() {
-        const threads = tapestryLedger.getThreads();
+        const threads = tapestryLedger.getView();
         const analysis = horizonEngine.analyze(threads);
 
         elements.tapestry.horizonDominance.textContent =
@@ -1218,60 +1237,79 @@ document.addEventListener('DOMContentLoaded', async () => {
         return Object.entries(counts).sort((a, b) => a[1] - b[1])[0][0];
     }
 
+    // --- Render Loop ---
+
+    /**
+     * Requests a tapestry redraw on the next frame. Any number of calls within
+     * a frame cost one redraw.
+     */
     function renderTapestry() {
-        const threads = tapestryLedger.getThreads();
+        scheduler.request('vanguard');
+        scheduler.request('tapestry');
+    }
 
-        // Update Tactical Units
+    // Scheduler task: advances tactical units; runs every frame while they
+    // are on the map
+    function tickVanguard() {
         vanguard.tick();
+        return (
+            vanguard.getUnits().length > 0 && state.isMapActive && state.activeScreen === 'tapestry'
+        );
+    }
+
+    // Scheduler task: draws the active view; returns true while it animates
+    function drawTapestry() {
+        if (state.activeScreen !== 'tapestry') return false;
 
-        // 1. Map Mode
+        // 1. Map Mode (animates through the map task)
         if (state.isMapActive) {
-            if (oracleEngine && oracleEngine.activeMode) {
-                oracleEngine.render(threads);
-            } else if (mapRenderer) {
-                const threatReport = sentinel.getReport();
-                mapRenderer.render(
-                    threads,
-                    locations,
-                    [],
-                    threatReport.zones,
-                    vanguard.getUnits()
-                );
-            }
-            // Force animation loop if map is active and units are present,
-            // even if horizon loop isn't running.
-            if (vanguard.getUnits().length > 0) {
-                 requestAnimationFrame(renderTapestry);
-            }
-            return;
+            scheduler.request('map');
+            return false;
         }
 
-        // 2. Synapse Mode
+        // 2. Synapse Mode: render steps the physics until the graph settles
         if (state.isSynapseActive && synapseRenderer) {
-             // If simulating, render is called in loop
-             // We just ensure we call render which handles simulation step
-             // Note: analyze is expensive, so we only re-analyze if needed or rely on stored graph.
-             // But synapseRenderer keeps state. We just call render.
-             // If threads changed, we might need to update graph.
-             // For now, simple loop:
-             synapseRenderer.render();
-             return;
+            synapseRenderer.render();
+            return synapseRenderer.isSimulating;
         }
 
         // 3. Mandala Mode (Default)
-        if (!mandalaRenderer) return;
+        if (!mandalaRenderer) return false;
 
+        const threads = tapestryLedger.getView();
         let projections = [];
         if (state.isHorizonActive) {
             projections = horizonEngine.project(threads);
         }
 
         mandalaRenderer.render(threads, projections);
+        return state.isHorizonActive;
+    }
+
+    // Scheduler task: draws the map. The cartographer requests it again
+    // while anything on it is animated (units, ghosts, threat zones).
+    function drawMap() {
+        if (!mapRenderer || !state.isMapActive || state.activeScreen !== 'tapestry') return false;
+
+        if (panopticon && panopticon.isReplaying) {
+            mapRenderer.redraw(); // Keep the replayed state on screen
+        } else if (oracleEngine && oracleEngine.activeMode) {
+            oracleEngine.render(tapestryLedger.getView());
+        } else {
+            mapRenderer.render(
+                tapestryLedger.getView(),
+                locations,
+                [],
+                sentinel.getReport().zones,
+                vanguard.getUnits()
+            );
+        }
+        return false;
     }
 
     // --- Helper Functions ---
     const handleThreadInteraction = (index) => {
-        const threads = tapestryLedger.getThreads();
+        const threads = tapestryLedger.getView();
         if (index >= 0 && index < threads.length) {
             // Toggle selection
             const selectedIndex = state.selectedThreads.indexOf(index);
@@ -1340,6 +1378,7 @@ document.addEventListener('DOMContentLoaded', async () => {
             vanguard,
             gemini,
             stratcom,
+            scheduler,
             get panopticon() {
                 return panopticon;
             }
@@ -1540,6 +1579,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
     window.aegis = aegis;
     window.sentinel = sentinel;
+    window.horizon = horizonEngine;
+    window.chronos = chronos;
     window.terminal = terminal;
     window.spectra = spectra;
     window.panopticon = panopticon;
@@ -1,8 +1,16 @@
 import { PrometheusEngine } from './prometheus.js';
+import { LocationIndex } from './location-index.js';
 
 export class MapRenderer {
-    constructor(canvas) {
+    /**
+     * @param {HTMLCanvasElement} canvas
+     * @param {Object} options - { requestRedraw } asks for a redraw() next frame
+     *   while something is animating (default: an own animation frame)
+     */
+    constructor(canvas, options = {}) {
         this.canvas = canvas;
+        this.requestRedraw = options.requestRedraw || (() => this._requestOwnFrame());
+        this._ownFrame = null;
         this.ctx = canvas.getContext('2d');
         this.dpr = window.devicePixelRatio || 1;
         this.threads = [];
@@ -12,6 +20,22 @@ export class MapRenderer {
         // Initialize Prometheus Heatmap Engine
         this.prometheus = new PrometheusEngine();
 
+        // Offscreen layer cache, composited bottom to top after the heatmap.
+        // A layer is only redrawn when its key (size + inputs) changes.
+        this.layers = {
+            map: { canvas: null, ctx: null, key: null },
+            zones: { canvas: null, ctx: null, key: null },
+            zoneRings: { canvas: null, ctx: null, key: null },
+            units: { canvas: null, ctx: null, key: null },
+            threads: { canvas: null, ctx: null, key: null }
+        };
+        this.layerRedraws = {};
+
+        // Per-thread map coordinates, filled from the shared location index
+        this.coords = { x: new Float32Array(0), y: new Float32Array(0), count: 0, head: null };
+        this._locationIndex = LocationIndex.for(null);
+        this._indexedLocations = null;
+
         // Simplified Morocco Vector Path (0-100 coordinate space)
         // Tangier (50, 5), Oujda (85, 20), Figuig (90, 60), Zagora (60, 80), Dakhla (10, 95) - simplified
         // This is an abstract representation for strategic visualization
@@ -42,6 +66,19 @@ export class MapRenderer {
         this.ctx.scale(this.dpr, this.dpr);
         this.width = rect.width;
         this.height = rect.height;
+
+        // Offscreen layers are sized lazily and keyed on the new dimensions
+        this.invalidate();
+    }
+
+    /**
+     * Drops cached layers so the next render redraws them.
+     * @param {string} [name] - One of 'map', 'zones', 'units', 'threads'; all if omitted.
+     */
+    invalidate(name) {
+        Object.entries(this.layers).forEach(([key, layer]) => {
+            if (!name || key === name) layer.key = null;
+        });
     }
 
     render(threads, locations, ghosts = [], threatZones = [], vanguardUnits = []) {
@@ -51,7 +88,9 @@ export class MapRenderer {
         this.threatZones = threatZones;
         this.vanguardUnits = vanguardUnits;
 
-        // Update Prometheus Heatmap
+        this._updateCoords(threads, locations);
+
+        // Update Prometheus Heatmap (cached; only new threads are splatted)
         this.prometheus.update(threads, locations, this.width, this.height);
 
         this.ctx.clearRect(0, 0, this.width, this.height);
@@ -67,190 +106,71 @@ export class MapRenderer {
         this.ctx.drawImage(this.prometheus.canvas, 0, 0);
         this.ctx.restore();
 
-        // Draw Map Background (Vector Overlay)
-        this.ctx.save();
-        this.ctx.translate(padding, padding);
+        // Static Layers: each is redrawn offscreen only when its key changes
+        const size = `${this.width}x${this.height}`;
+        this._composite('map', size, (ctx) => this._drawMap(ctx, mapWidth, mapHeight));
 
-        this.ctx.beginPath();
-        this.mapPath.forEach((pt, i) => {
-            const x = (pt.x / 100) * mapWidth;
-            const y = (pt.y / 100) * mapHeight;
-            if (i === 0) this.ctx.moveTo(x, y);
-            else this.ctx.lineTo(x, y);
-        });
-        this.ctx.closePath();
-
-        // Map Styling: Tactical Grid
-        this.ctx.strokeStyle = '#334433';
-        this.ctx.lineWidth = 2;
-        this.ctx.stroke();
-
-        // Semi-transparent fill to reveal heatmap underneath
-        this.ctx.fillStyle = 'rgba(10, 26, 10, 0.4)';
-        this.ctx.fill();
+        if (threatZones && threatZones.length > 0) {
+            const zoneKey = `${size}|${threatZones.map((z) => `${z.x},${z.y},${z.r},${z.level}`).join(';')}`;
+            // Pulse
+            const pulse = Math.sin(Date.now() / 300) * 0.2 + 0.3; // 0.1 to 0.5 opacity
+            this._composite('zones', zoneKey, (ctx) => this._drawZoneFills(ctx, mapWidth, mapHeight), pulse);
+            this._composite('zoneRings', zoneKey, (ctx) => this._drawZoneRings(ctx, mapWidth, mapHeight));
+        }
 
-        // Draw Grid Lines
-        this.ctx.strokeStyle = '#1a2a1a';
-        this.ctx.lineWidth = 1;
-        for (let i = 10; i < 100; i += 10) {
-            // Vertical
-            const x = (i / 100) * mapWidth;
-            this.ctx.beginPath();
-            this.ctx.moveTo(x, 0);
-            this.ctx.lineTo(x, mapHeight);
-            this.ctx.stroke();
-            // Horizontal
-            const y = (i / 100) * mapHeight;
-            this.ctx.beginPath();
-            this.ctx.moveTo(0, y);
-            this.ctx.lineTo(mapWidth, y);
-            this.ctx.stroke();
+        // Plot Vanguard Units (Tactical Drones)
+        if (this.vanguardUnits && this.vanguardUnits.length > 0) {
+            const unitKey = `${size}|${this.activeUnitId}|${this.vanguardUnits
+                .map((u) => `${u.id},${u.x},${u.y},${u.heading},${u.status},${u.scanPulse}`)
+                .join(';')}`;
+            this._composite('units', unitKey, (ctx) => this._drawUnits(ctx, mapWidth, mapHeight));
         }
 
-        // Plot Threat Zones (Sentinel)
-        if (threatZones && threatZones.length > 0) {
-            threatZones.forEach((zone) => {
-                const x = (zone.x / 100) * mapWidth;
-                const y = (zone.y / 100) * mapHeight;
-                const r = zone.r || 15;
-
-                // Pulse
-                const pulse = Math.sin(Date.now() / 300) * 0.2 + 0.3; // 0.1 to 0.5 opacity
-                this.ctx.fillStyle =
-                    zone.level === 'HIGH' || zone.level === 'CRITICAL'
-                        ? `rgba(255, 0, 0, ${pulse})`
-                        : `rgba(255, 165, 0, ${pulse})`;
+        // Plot Threads and Ghosts
+        const hasContent = threads.length > 0 || ghosts.length > 0;
+        if (hasContent) {
+            const head = threads.length > 0 ? threads[threads.length - 1] : null;
+            const threadKey = `${size}|${threads.length}|${head ? head.hash || head.timestamp : ''}`;
+            this._composite('threads', threadKey, (ctx) => this._drawThreads(ctx, mapWidth, mapHeight));
+        }
 
-                this.ctx.beginPath();
-                this.ctx.arc(x, y, r * 1.5, 0, Math.PI * 2);
-                this.ctx.fill();
+        // Live overlays: animated or hover-dependent, drawn straight to the main canvas
+        this.ctx.save();
+        this.ctx.translate(padding, padding);
 
-                // Stroke
-                this.ctx.strokeStyle = '#ff3333';
-                this.ctx.lineWidth = 1;
-                this.ctx.setLineDash([2, 4]);
-                this.ctx.beginPath();
-                this.ctx.arc(x, y, r * 1.5, 0, Math.PI * 2);
-                this.ctx.stroke();
-                this.ctx.setLineDash([]);
-            });
-        }
+        if (hasContent) {
+            const coords = this.coords;
+            const last = threads.length - 1;
 
-        // Plot Vanguard Units (Tactical Drones)
-        if (this.vanguardUnits && this.vanguardUnits.length > 0) {
-            this.vanguardUnits.forEach((unit) => {
-                const x = (unit.x / 100) * mapWidth;
-                const y = (unit.y / 100) * mapHeight;
-
-                this.ctx.save();
-                this.ctx.translate(x, y);
-                this.ctx.rotate(unit.heading);
-
-                // Draw FOV Cone
-                this.ctx.fillStyle = unit.type === 'INTERCEPTOR'
-                    ? 'rgba(255, 165, 0, 0.1)'
-                    : 'rgba(0, 255, 255, 0.1)';
+            // Pulsing effect for last thread
+            if (last >= 0) {
+                const x = (coords.x[last] / 100) * mapWidth;
+                const y = (coords.y[last] / 100) * mapHeight;
+                const pulse = 10 + Math.sin(Date.now() / 200) * 5;
+                this.ctx.fillStyle = 'rgba(198, 118, 5, 0.2)';
                 this.ctx.beginPath();
-                this.ctx.moveTo(0, 0);
-                this.ctx.arc(0, 0, 40, -Math.PI / 4, Math.PI / 4);
+                this.ctx.arc(x, y, pulse, 0, Math.PI * 2);
                 this.ctx.fill();
+            }
 
-                // Draw Unit (Triangle)
-                this.ctx.fillStyle = unit.type === 'INTERCEPTOR' ? '#ffaa00' : '#00ffff';
+            // Label active node
+            const i = this.activeNodeIndex;
+            if (i >= 0 && i < threads.length) {
+                const t = threads[i];
+                const x = (coords.x[i] / 100) * mapWidth;
+                const y = (coords.y[i] / 100) * mapHeight;
+
+                this.ctx.fillStyle = '#ffffff';
                 this.ctx.beginPath();
-                this.ctx.moveTo(6, 0);
-                this.ctx.lineTo(-4, 4);
-                this.ctx.lineTo(-4, -4);
-                this.ctx.closePath();
+                this.ctx.arc(x, y, 6, 0, Math.PI * 2);
                 this.ctx.fill();
 
-                // Draw Scan Pulse if scanning
-                if (unit.status === 'SCANNING') {
-                    this.ctx.strokeStyle = unit.type === 'INTERCEPTOR' ? '#ffaa00' : '#00ffff';
-                    this.ctx.globalAlpha = Math.max(0, 1 - (unit.scanPulse % 1));
-                    this.ctx.beginPath();
-                    this.ctx.arc(0, 0, unit.scanPulse * 10, 0, Math.PI * 2);
-                    this.ctx.stroke();
-                }
-
-                this.ctx.restore();
-
-                // Draw Label
+                this.ctx.font = '12px Courier New';
                 this.ctx.fillStyle = '#ffffff';
-                this.ctx.font = '9px Courier New';
-                this.ctx.fillText(unit.id, x + 8, y);
-
-                // Draw Selection Ring
-                if (unit.id === this.activeUnitId) {
-                    this.ctx.strokeStyle = '#00ff00';
-                    this.ctx.lineWidth = 1;
-                    this.ctx.beginPath();
-                    this.ctx.arc(x, y, 15, 0, Math.PI * 2);
-                    this.ctx.stroke();
-                }
-            });
-        }
-
-        // Plot Threads and Ghosts
-        if (threads.length > 0 || ghosts.length > 0) {
-            // Draw Connections for Real Threads
-            this.ctx.strokeStyle = '#c67605'; // Gold
-            this.ctx.lineWidth = 2;
-            this.ctx.setLineDash([5, 5]);
-            this.ctx.beginPath();
-
-            let lastX = null;
-
-            threads.forEach((t) => {
-                const coords = this._getThreadCoords(t);
-                if (coords) {
-                    const x = (coords.x / 100) * mapWidth;
-                    const y = (coords.y / 100) * mapHeight;
-
-                    if (lastX !== null) {
-                        this.ctx.lineTo(x, y);
-                    } else {
-                        this.ctx.moveTo(x, y);
-                    }
-                    lastX = x;
-                }
-            });
-            this.ctx.stroke();
-            this.ctx.setLineDash([]);
-
-            // Draw Nodes for Real Threads
-            threads.forEach((t, i) => {
-                const coords = this._getThreadCoords(t);
-                if (coords) {
-                    const x = (coords.x / 100) * mapWidth;
-                    const y = (coords.y / 100) * mapHeight;
-
-                    const isHovered = i === this.activeNodeIndex;
-
-                    // Pulsing effect for last thread
-                    if (i === threads.length - 1) {
-                        const pulse = 10 + Math.sin(Date.now() / 200) * 5;
-                        this.ctx.fillStyle = 'rgba(198, 118, 5, 0.2)';
-                        this.ctx.beginPath();
-                        this.ctx.arc(x, y, pulse, 0, Math.PI * 2);
-                        this.ctx.fill();
-                    }
-
-                    this.ctx.fillStyle = isHovered ? '#ffffff' : '#c67605';
-                    this.ctx.beginPath();
-                    this.ctx.arc(x, y, isHovered ? 6 : 4, 0, Math.PI * 2);
-                    this.ctx.fill();
-
-                    // Label active node
-                    if (isHovered) {
-                        this.ctx.font = '12px Courier New';
-                        this.ctx.fillStyle = '#ffffff';
-                        this.ctx.fillText(t.title || 'Unknown', x + 10, y);
-                        this.ctx.fillStyle = '#aaaaaa';
-                        this.ctx.fillText(t.region, x + 10, y + 14);
-                    }
-                }
-            });
+                this.ctx.fillText(t.title || 'Unknown', x + 10, y);
+                this.ctx.fillStyle = '#aaaaaa';
+                this.ctx.fillText(t.region, x + 10, y + 14);
+            }
 
             // Draw Ghosts
             this.ghosts.forEach((g) => {
@@ -259,22 +179,18 @@ export class MapRenderer {
                     const y = (g.coordinates.y / 100) * mapHeight;
 
                     // Ghost Connection (if last thread exists)
-                    if (threads.length > 0) {
-                        const lastCoords = this._getThreadCoords(
-                            threads[threads.length - 1]
-                        );
-                        if (lastCoords) {
-                            const lx = (lastCoords.x / 100) * mapWidth;
-                            const ly = (lastCoords.y / 100) * mapHeight;
-                            this.ctx.strokeStyle =
-                                g.type === 'momentum' ? '#55aaff' : '#ffaa55';
-                            this.ctx.setLineDash([2, 4]);
-                            this.ctx.lineWidth = 1;
-                            this.ctx.beginPath();
-                            this.ctx.moveTo(lx, ly);
-                            this.ctx.lineTo(x, y);
-                            this.ctx.stroke();
-                        }
+                    if (last >= 0) {
+                        const lx = (coords.x[last] / 100) * mapWidth;
+                        const ly = (coords.y[last] / 100) * mapHeight;
+                        this.ctx.strokeStyle =
+                            g.type === 'momentum' ? '#55aaff' : '#ffaa55';
+                        this.ctx.setLineDash([2, 4]);
+                        this.ctx.lineWidth = 1;
+                        this.ctx.beginPath();
+                        this.ctx.moveTo(lx, ly);
+                        this.ctx.lineTo(x, y);
+                        this.ctx.stroke();
+                        this.ctx.setLineDash([]);
                     }
 
                     // Ghost Node
@@ -308,34 +224,267 @@ export class MapRenderer {
             (this.threatZones && this.threatZones.length > 0) ||
             (this.vanguardUnits && this.vanguardUnits.length > 0)
         ) {
-            requestAnimationFrame(() =>
-                this.render(
-                    this.threads,
-                    this.locations,
-                    this.ghosts,
-                    this.threatZones,
-                    this.vanguardUnits
-                )
-            );
+            this.requestRedraw();
         }
     }
 
-    _getThreadCoords(thread) {
-        // Find location in data
-        // Key format intention.region.time
-        // However, thread might only have 'region' property or we need to reconstruct key.
-        // js/tapestry.js stores region, time, intention.
-        const key = `${thread.intention}.${thread.region}.${thread.time}`;
-        const loc = this.locations[key];
+    /**
+     * Renders again with the last inputs (animation frames).
+     */
+    redraw() {
+        this.render(this.threads, this.locations, this.ghosts, this.threatZones, this.vanguardUnits);
+    }
+
+    // One pending frame at most, however often render() is called
+    _requestOwnFrame() {
+        if (this._ownFrame !== null) return;
+        this._ownFrame = requestAnimationFrame(() => {
+            this._ownFrame = null;
+            this.redraw();
+        });
+    }
+
+    // --- Layer Cache ---
+
+    _composite(name, key, draw, alpha = 1) {
+        const layer = this.layers[name];
+        const w = Math.max(1, Math.round(this.width * this.dpr));
+        const h = Math.max(1, Math.round(this.height * this.dpr));
+
+        if (!layer.canvas) {
+            layer.canvas = document.createElement('canvas');
+            layer.ctx = layer.canvas.getContext('2d');
+        }
+        if (layer.canvas.width !== w || layer.canvas.height !== h) {
+            layer.canvas.width = w;
+            layer.canvas.height = h;
+            layer.key = null;
+        }
+
+        if (layer.key !== key) {
+            const ctx = layer.ctx;
+            ctx.setTransform(1, 0, 0, 1, 0, 0);
+            ctx.clearRect(0, 0, w, h);
+            // Same space as the main canvas: CSS pixels, origin at the map padding
+            ctx.setTransform(this.dpr, 0, 0, this.dpr, 40 * this.dpr, 40 * this.dpr);
+            draw(ctx);
+            layer.key = key;
+            this.layerRedraws[name] = (this.layerRedraws[name] || 0) + 1;
+        }
+
+        this.ctx.save();
+        this.ctx.globalAlpha = alpha;
+        this.ctx.drawImage(layer.canvas, 0, 0, this.width, this.height);
+        this.ctx.restore();
+    }
+
+    _drawMap(ctx, mapWidth, mapHeight) {
+        ctx.beginPath();
+        this.mapPath.forEach((pt, i) => {
+            const x = (pt.x / 100) * mapWidth;
+            const y = (pt.y / 100) * mapHeight;
+            if (i === 0) ctx.moveTo(x, y);
+            else ctx.lineTo(x, y);
+        });
+        ctx.closePath();
 
-        if (loc && loc.coordinates) return loc.coordinates;
+        // Map Styling: Tactical Grid
+        ctx.strokeStyle = '#334433';
+        ctx.lineWidth = 2;
+        ctx.stroke();
 
-        // Fallback based on region string if exact match fails
-        if (thread.region === 'coast') return { x: 25, y: 55 };
-        if (thread.region === 'medina') return { x: 60, y: 30 };
-        if (thread.region === 'sahara') return { x: 75, y: 75 };
+        // Semi-transparent fill to reveal heatmap underneath
+        ctx.fillStyle = 'rgba(10, 26, 10, 0.4)';
+        ctx.fill();
 
-        return { x: 50, y: 50 }; // Default center
+        // Draw Grid Lines
+        ctx.strokeStyle = '#1a2a1a';
+        ctx.lineWidth = 1;
+        for (let i = 10; i < 100; i += 10) {
+            // Vertical
+            const x = (i / 100) * mapWidth;
+            ctx.beginPath();
+            ctx.moveTo(x, 0);
+            ctx.lineTo(x, mapHeight);
+            ctx.stroke();
+            // Horizontal
+            const y = (i / 100) * mapHeight;
+            ctx.beginPath();
+            ctx.moveTo(0, y);
+            ctx.lineTo(mapWidth, y);
+            ctx.stroke();
+        }
+    }
+
+    _drawZoneFills(ctx, mapWidth, mapHeight) {
+        // Drawn opaque; the pulse is applied as layer alpha when compositing
+        this.threatZones.forEach((zone) => {
+            const x = (zone.x / 100) * mapWidth;
+            const y = (zone.y / 100) * mapHeight;
+            const r = zone.r || 15;
+
+            ctx.fillStyle =
+                zone.level === 'HIGH' || zone.level === 'CRITICAL'
+                    ? 'rgb(255, 0, 0)'
+                    : 'rgb(255, 165, 0)';
+            ctx.beginPath();
+            ctx.arc(x, y, r * 1.5, 0, Math.PI * 2);
+            ctx.fill();
+        });
+    }
+
+    _drawZoneRings(ctx, mapWidth, mapHeight) {
+        ctx.strokeStyle = '#ff3333';
+        ctx.lineWidth = 1;
+        ctx.setLineDash([2, 4]);
+        this.threatZones.forEach((zone) => {
+            const x = (zone.x / 100) * mapWidth;
+            const y = (zone.y / 100) * mapHeight;
+            const r = zone.r || 15;
+
+            ctx.beginPath();
+            ctx.arc(x, y, r * 1.5, 0, Math.PI * 2);
+            ctx.stroke();
+        });
+        ctx.setLineDash([]);
+    }
+
+    _drawUnits(ctx, mapWidth, mapHeight) {
+        this.vanguardUnits.forEach((unit) => {
+            const x = (unit.x / 100) * mapWidth;
+            const y = (unit.y / 100) * mapHeight;
+
+            ctx.save();
+            ctx.translate(x, y);
+            ctx.rotate(unit.heading);
+
+            // Draw FOV Cone
+            ctx.fillStyle = unit.type === 'INTERCEPTOR'
+                ? 'rgba(255, 165, 0, 0.1)'
+                : 'rgba(0, 255, 255, 0.1)';
+            ctx.beginPath();
+            ctx.moveTo(0, 0);
+            ctx.arc(0, 0, 40, -Math.PI / 4, Math.PI / 4);
+            ctx.fill();
+
+            // Draw Unit (Triangle)
+            ctx.fillStyle = unit.type === 'INTERCEPTOR' ? '#ffaa00' : '#00ffff';
+            ctx.beginPath();
+            ctx.moveTo(6, 0);
+            ctx.lineTo(-4, 4);
+            ctx.lineTo(-4, -4);
+            ctx.closePath();
+            ctx.fill();
+
+            // Draw Scan Pulse if scanning
+            if (unit.status === 'SCANNING') {
+                ctx.strokeStyle = unit.type === 'INTERCEPTOR' ? '#ffaa00' : '#00ffff';
+                ctx.globalAlpha = Math.max(0, 1 - (unit.scanPulse % 1));
+                ctx.beginPath();
+                ctx.arc(0, 0, unit.scanPulse * 10, 0, Math.PI * 2);
+                ctx.stroke();
+            }
+
+            ctx.restore();
+
+            // Draw Label
+            ctx.fillStyle = '#ffffff';
+            ctx.font = '9px Courier New';
+            ctx.fillText(unit.id, x + 8, y);
+
+            // Draw Selection Ring
+            if (unit.id === this.activeUnitId) {
+                ctx.strokeStyle = '#00ff00';
+                ctx.lineWidth = 1;
+                ctx.beginPath();
+                ctx.arc(x, y, 15, 0, Math.PI * 2);
+                ctx.stroke();
+            }
+        });
+    }
+
+    _drawThreads(ctx, mapWidth, mapHeight) {
+        const count = this.threads.length;
+        if (count === 0) return;
+        const xs = this.coords.x;
+        const ys = this.coords.y;
+
+        // Draw Connections for Real Threads
+        ctx.strokeStyle = '#c67605'; // Gold
+        ctx.lineWidth = 2;
+        ctx.setLineDash([5, 5]);
+        ctx.beginPath();
+        ctx.moveTo((xs[0] / 100) * mapWidth, (ys[0] / 100) * mapHeight);
+        for (let i = 1; i < count; i++) {
+            ctx.lineTo((xs[i] / 100) * mapWidth, (ys[i] / 100) * mapHeight);
+        }
+        ctx.stroke();
+        ctx.setLineDash([]);
+
+        // Draw Nodes for Real Threads (one path, one fill)
+        ctx.fillStyle = '#c67605';
+        ctx.beginPath();
+        for (let i = 0; i < count; i++) {
+            const x = (xs[i] / 100) * mapWidth;
+            const y = (ys[i] / 100) * mapHeight;
+            ctx.moveTo(x + 4, y);
+            ctx.arc(x, y, 4, 0, Math.PI * 2);
+        }
+        ctx.fill();
+    }
+
+    // --- Coordinate Cache ---
+
+    /**
+     * Keeps per-thread map coordinates (0-100 space) in typed arrays.
+     * Appended threads are resolved once through the shared LocationIndex;
+     * any other change to the ledger rebuilds the arrays.
+     */
+    _updateCoords(threads, locations) {
+        if (locations !== this._indexedLocations) {
+            this._locationIndex = LocationIndex.for(locations);
+            this._indexedLocations = locations;
+            this.coords.count = 0;
+            this.coords.head = null;
+        }
+
+        const coords = this.coords;
+        const count = threads.length;
+        const head = count > 0 ? threads[count - 1] : null;
+        if (count === coords.count && this._sameThread(head, coords.head)) return;
+
+        let start = 0;
+        if (count > coords.count && coords.count > 0 && this._sameThread(threads[coords.count - 1], coords.head)) {
+            start = coords.count;
+        }
+
+        if (coords.x.length < count) {
+            const capacity = Math.max(count, coords.x.length * 2, 64);
+            const x = new Float32Array(capacity);
+            const y = new Float32Array(capacity);
+            x.set(coords.x.subarray(0, start));
+            y.set(coords.y.subarray(0, start));
+            coords.x = x;
+            coords.y = y;
+        }
+
+        for (let i = start; i < count; i++) {
+            const pt = this._getThreadCoords(threads[i]);
+            coords.x[i] = pt.x;
+            coords.y[i] = pt.y;
+        }
+
+        coords.count = count;
+        coords.head = head;
+    }
+
+    _sameThread(a, b) {
+        if (a === b) return true;
+        return !!(a && b && a.hash && a.hash === b.hash);
+    }
+
+    _getThreadCoords(thread) {
+        return this._locationIndex.threadCoords(thread);
     }
 
     _bindEvents() {
@@ -349,16 +498,14 @@ export class MapRenderer {
 
             // Check Thread Collisions
             let foundThread = -1;
-            this.threads.forEach((t, i) => {
-                const coords = this._getThreadCoords(t);
-                if (coords) {
-                    const tx = 40 + (coords.x / 100) * drawW;
-                    const ty = 40 + (coords.y / 100) * drawH;
-                    if (Math.hypot(mouseX - tx, mouseY - ty) < 15) {
-                        foundThread = i;
-                    }
+            const { x: xs, y: ys, count } = this.coords;
+            for (let i = 0; i < count; i++) {
+                const tx = 40 + (xs[i] / 100) * drawW;
+                const ty = 40 + (ys[i] / 100) * drawH;
+                if (Math.hypot(mouseX - tx, mouseY - ty) < 15) {
+                    foundThread = i;
                 }
-            });
+            }
 
             // Check Unit Collisions
             let foundUnit = null;
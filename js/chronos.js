@@ -1,19 +1,42 @@
+// Candidate space for the batch "best next move" search
+export const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+export const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+export const TIMES = ['dawn', 'midday', 'dusk', 'night'];
+
+// Fields the forecast actually reads; keeps worker messages small
+export const compactThread = (t) => ({
+    intention: t.intention,
+    region: t.region,
+    time: t.time,
+    timestamp: t.timestamp,
+    hash: t.hash
+});
+
 export class ChronosEngine {
     constructor(horizonEngine, SentinelClass) {
         this.horizon = horizonEngine;
         this.SentinelClass = SentinelClass;
+        // Scratch instance for stateless evaluation; never assessed, so the live Sentinel is untouched
+        this.sentinel = new SentinelClass(horizonEngine);
+        this._baseline = null;
+
+        // Worker is created lazily on the first rankAsync()
+        this.worker = undefined;
+        this.pendingRequests = new Map();
+        this.requestIdCounter = 0;
+        this._workerSync = { length: 0, head: null };
     }
 
     /**
      * Simulates the impact of a proposed thread on the system.
+     * The baseline is cached per ledger head and extended incrementally, so a
+     * simulation costs O(1) in ledger size instead of a deep copy plus two full scans.
      * @param {Array} currentThreads - The existing tapestry.
      * @param {Object} proposedThread - The thread to simulate ({intention, region, time}).
      * @returns {Object} A tactical forecast report.
      */
     simulate(currentThreads, proposedThread) {
-        // 1. Create the hypothetical timeline
-        // Deep copy to ensure no reference pollution
-        const simulatedThreads = JSON.parse(JSON.stringify(currentThreads));
+        const baseline = this.getBaseline(currentThreads);
 
         // Add timestamp if missing (usually added by Ledger)
         const simThread = {
@@ -21,20 +44,123 @@ export class ChronosEngine {
             timestamp: Date.now(),
             id: `sim-${Date.now()}`
         };
-        simulatedThreads.push(simThread);
 
-        // 2. Establish Baseline (Current State)
-        // We use fresh instances to avoid mutating the live Sentinel
-        const baselineSentinel = new this.SentinelClass(this.horizon);
-        const baselineReport = baselineSentinel.assess(currentThreads);
-        const baselineHorizon = this.horizon.analyze(currentThreads);
+        const simHorizon = this.horizon.summarize(this.horizon.extend(baseline.state, simThread));
+        return this._forecast(baseline, simThread, simHorizon);
+    }
+
+    /**
+     * Batch "best next move" search. Scores every intention × region × time
+     * candidate against one shared baseline and ranks them best-first.
+     * @param {Array} currentThreads - The existing tapestry.
+     * @param {Object} options - { limit } to truncate the ranked list.
+     * @returns {Array} Forecast reports, highest DEFCON delta then balance delta first.
+     */
+    rank(currentThreads, options = {}) {
+        const baseline = this.getBaseline(currentThreads);
+        const timestamp = Date.now();
+        const results = [];
+
+        INTENTIONS.forEach((intention) => {
+            // Horizon only sees the intention, so project it once per intention
+            const simHorizon = this.horizon.summarize(
+                this.horizon.extend(baseline.state, { intention })
+            );
+            REGIONS.forEach((region) => {
+                TIMES.forEach((time) => {
+                    const candidate = {
+                        intention,
+                        region,
+                        time,
+                        timestamp,
+                        id: `sim-${intention}-${region}-${time}`
+                    };
+                    results.push(this._forecast(baseline, candidate, simHorizon));
+                });
+            });
+        });
+
+        // Array.prototype.sort is stable, so ties keep candidate order
+        results.sort(
+            (a, b) => b.deltas.defcon - a.deltas.defcon || b.deltas.balance - a.deltas.balance
+        );
+        return options.limit ? results.slice(0, options.limit) : results;
+    }
+
+    /**
+     * Runs rank() in a Web Worker so the sweep never blocks the UI thread.
+     * Only threads appended since the last call are posted to the worker.
+     * Falls back to the main thread where workers are unavailable.
+     * @returns {Promise<Array>} Ranked forecast reports.
+     */
+    rankAsync(currentThreads, options = {}) {
+        const worker = this._getWorker();
+        if (!worker) return Promise.resolve(this.rank(currentThreads, options));
+
+        const synced = this._workerSync;
+        const resume =
+            synced.length > 0 &&
+            currentThreads.length >= synced.length &&
+            this._sameThread(currentThreads[synced.length - 1], synced.head);
+        const from = resume ? synced.length : 0;
+
+        const payload = {
+            reset: !resume,
+            threads: currentThreads.slice(from).map(compactThread),
+            options
+        };
+        this._workerSync = {
+            length: currentThreads.length,
+            head: currentThreads[currentThreads.length - 1] || null
+        };
+
+        return new Promise((resolve, reject) => {
+            const id = this.requestIdCounter++;
+            this.pendingRequests.set(id, { resolve, reject });
+            worker.postMessage({ type: 'rank', id, payload });
+        });
+    }
+
+    _getWorker() {
+        if (this.worker !== undefined) return this.worker;
+        if (typeof Worker === 'undefined') {
+            this.worker = null;
+            return null;
+        }
 
-        // 3. Run Simulation (Future State)
-        const simSentinel = new this.SentinelClass(this.horizon);
-        const simReport = simSentinel.assess(simulatedThreads);
-        const simHorizon = this.horizon.analyze(simulatedThreads);
+        this.worker = new Worker('js/chronos.worker.js', { type: 'module' });
+        this.worker.onmessage = (e) => {
+            const { type, id, result, error } = e.data;
+            if (this.pendingRequests.has(id)) {
+                const { resolve, reject } = this.pendingRequests.get(id);
+                this.pendingRequests.delete(id);
 
-        // 4. Calculate Deltas
+                if (type === 'success') {
+                    resolve(result);
+                } else {
+                    reject(new Error(error));
+                }
+            }
+        };
+        this.worker.onerror = (e) => {
+            console.error('Chronos Worker Error:', e);
+            // Worker state is unknown after a crash; resend the full ledger next time
+            this._workerSync = { length: 0, head: null };
+            this._rejectPending(new Error('Chronos worker failed'));
+        };
+        return this.worker;
+    }
+
+    _forecast(baseline, simThread, simHorizon) {
+        const baselineReport = baseline.report;
+        const baselineHorizon = baseline.analysis;
+        const simReport = this.sentinel.evaluate(
+            [...baseline.tail, simThread],
+            simHorizon,
+            baseline.length + 1
+        );
+
+        // Calculate Deltas
         const defconDelta = simReport.defcon - baselineReport.defcon;
         const balanceDelta = simHorizon.balanceScore - baselineHorizon.balanceScore;
 
@@ -66,6 +192,68 @@ export class ChronosEngine {
         };
     }
 
+    /**
+     * Returns the cached baseline for a ledger, recomputing only what changed.
+     * Appends since the last call are folded into the running aggregates;
+     * any other change (reset, import, different ledger) triggers a full rebuild.
+     */
+    getBaseline(threads) {
+        const length = threads.length;
+        const head = length > 0 ? threads[length - 1] : null;
+        const cached = this._baseline;
+
+        if (cached && cached.length === length && this._sameThread(cached.head, head)) {
+            return cached;
+        }
+
+        let state;
+        if (
+            cached &&
+            cached.length > 0 &&
+            length > cached.length &&
+            this._sameThread(threads[cached.length - 1], cached.head)
+        ) {
+            state = this.horizon.accumulate(threads, this.horizon.cloneState(cached.state), cached.length);
+        } else {
+            state = this.horizon.accumulate(threads);
+        }
+
+        const analysis = this.horizon.summarize(state);
+        this._baseline = {
+            length,
+            head,
+            state,
+            analysis,
+            report: this.sentinel.evaluate(threads.slice(-5), analysis, length),
+            // Sentinel rules look at the last 5 threads; keep 4 so the proposal completes the window
+            tail: threads.slice(-4)
+        };
+        return this._baseline;
+    }
+
+    invalidate() {
+        this._baseline = null;
+    }
+
+    terminate() {
+        if (this.worker) this.worker.terminate();
+        this.worker = undefined;
+        this._workerSync = { length: 0, head: null };
+        this._rejectPending(new Error('Chronos terminated'));
+    }
+
+    // Settles every outstanding rankAsync() with an error
+    _rejectPending(error) {
+        const pending = [...this.pendingRequests.values()];
+        this.pendingRequests.clear();
+        pending.forEach(({ reject }) => reject(error));
+    }
+
+    _sameThread(a, b) {
+        if (a === b) return true;
+        return !!(a && b && a.hash && a.hash === b.hash);
+    }
+
     _generateAdvisory(defconDelta, balanceDelta, finalDefcon) {
         if (finalDefcon === 1) return "CRITICAL WARNING: Action will trigger DEFCON 1.";
         if (defconDelta < 0) return "WARNING: This action escalates the threat level.";
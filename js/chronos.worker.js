@@ -0,0 +1,30 @@
+// Chronos Worker - Runs the batch "best next move" search off the UI thread.
+// Keeps its own copy of the ledger; the main thread only posts appended threads.
+
+import { HorizonEngine } from './horizon.js';
+import { SentinelEngine } from './sentinel.js';
+import { ChronosEngine } from './chronos.js';
+
+const chronos = new ChronosEngine(new HorizonEngine(), SentinelEngine);
+let ledger = [];
+
+self.onmessage = (e) => {
+    const { type, id, payload } = e.data;
+
+    try {
+        if (type === 'rank') {
+            if (payload.reset) {
+                ledger = [];
+                chronos.invalidate();
+            }
+            for (const thread of payload.threads) ledger.push(thread);
+
+            const result = chronos.rank(ledger, payload.options);
+            self.postMessage({ type: 'success', id, result });
+        } else {
+            throw new Error(`Unknown worker command: ${type}`);
+        }
+    } catch (error) {
+        self.postMessage({ type: 'error', id, error: error.message });
+    }
+};
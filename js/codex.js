@@ -1,66 +1,203 @@
 // The Crystalline Codex: Steganographic Data Transport
 // Refactored to use Web Workers for performance (Operation Thread Breaker)
+//
+// Requests run on a small pool of codex.worker.js instances (sized from
+// navigator.hardwareConcurrency, spawned on demand). Each worker takes one job
+// at a time from a shared queue, so a batch spreads across the pool and a slow
+// shard never blocks the rest. Shard files are handed over as Blobs and decoded
+// inside the worker; bitmaps and raw pixel buffers are transferred, not copied.
+
+const MAX_POOL_SIZE = 8;
+
+function defaultPoolSize() {
+    const cores = typeof navigator !== 'undefined' && navigator.hardwareConcurrency;
+    // Leave a core for the UI thread
+    return Math.max(1, Math.min((cores || 4) - 1, MAX_POOL_SIZE));
+}
 
 export class CodexEngine {
-    constructor() {
-        this.worker = new Worker('js/codex.worker.js');
-        this.pendingRequests = new Map();
+    /**
+     * @param {Object} options - { workers } pool size (default: cores - 1, max 8)
+     */
+    constructor(options = {}) {
+        this.poolSize = options.workers || defaultPoolSize();
+        this.workers = []; // { worker, job }
+        this.queue = [];
         this.requestIdCounter = 0;
+        this.batchCounter = 0;
+    }
+
+    // --- Pool ---
 
-        this.worker.onmessage = (e) => {
+    _spawn() {
+        const slot = { worker: new Worker('js/codex.worker.js'), job: null };
+
+        slot.worker.onmessage = (e) => {
             const { type, id, result, error } = e.data;
-            if (this.pendingRequests.has(id)) {
-                const { resolve, reject } = this.pendingRequests.get(id);
-                this.pendingRequests.delete(id);
-
-                if (type === 'success') {
-                    resolve(result);
-                } else {
-                    reject(new Error(error));
-                }
+            const job = slot.job;
+            if (!job || job.id !== id) return;
+            slot.job = null;
+
+            if (type === 'success') {
+                job.resolve(result);
+            } else {
+                job.reject(new Error(error));
             }
+            this._pump();
         };
 
-        this.worker.onerror = (e) => {
+        slot.worker.onerror = (e) => {
             console.error('Codex Worker Error:', e);
-            // Fail all pending requests if the worker crashes?
-            // For now, just log.
+            // A crashed worker fails only its own job and is replaced on demand
+            const job = slot.job;
+            slot.worker.terminate();
+            this.workers.splice(this.workers.indexOf(slot), 1);
+            if (job) job.reject(new Error(e.message || 'Codex worker crashed'));
+            this._pump();
         };
+
+        this.workers.push(slot);
+        return slot;
     }
 
-    _request(type, payload, transferables = []) {
+    _pump() {
+        while (this.queue.length > 0) {
+            let slot = this.workers.find((s) => s.job === null);
+            if (!slot && this.workers.length < this.poolSize) slot = this._spawn();
+            if (!slot) return;
+
+            const job = this.queue.shift();
+            slot.job = job;
+            slot.worker.postMessage({ type: job.type, id: job.id, payload: job.payload }, job.transferables);
+        }
+    }
+
+    _request(type, payload, transferables = [], batch = null) {
         return new Promise((resolve, reject) => {
             const id = this.requestIdCounter++;
-            this.pendingRequests.set(id, { resolve, reject });
-            this.worker.postMessage({ type, id, payload }, transferables);
+            this.queue.push({ id, type, payload, transferables, batch, resolve, reject });
+            this._pump();
         });
     }
 
-    async forgeShard(data, carrierImage = null) {
-        let carrierBitmap = null;
-        const transferables = [];
-
-        if (carrierImage) {
-            // carrierImage is likely an HTMLImageElement or Blob
-            // We need an ImageBitmap for the worker
-            carrierBitmap = await createImageBitmap(carrierImage);
-            transferables.push(carrierBitmap);
+    /**
+     * Normalizes an image for the worker. Blobs/Files go as-is (decoded in the
+     * worker); ImageData and ImageBitmaps are transferred.
+     */
+    async _source(image, transferables) {
+        if (typeof Blob !== 'undefined' && image instanceof Blob) return image;
+        if (image && image.data && image.data.buffer && image.width) {
+            transferables.push(image.data.buffer);
+            return { buffer: image.data.buffer, width: image.width, height: image.height };
         }
+        // ImageBitmap, or an element that has to be rasterized here
+        const bitmap = typeof ImageBitmap !== 'undefined' && image instanceof ImageBitmap
+            ? image
+            : await createImageBitmap(image);
+        transferables.push(bitmap);
+        return bitmap;
+    }
+
+    // --- Single shard ---
+
+    async forgeShard(data, carrierImage = null, batch = null) {
+        const transferables = [];
+        const carrier = carrierImage ? await this._source(carrierImage, transferables) : null;
 
         // Returns a Blob
-        return this._request('forge', { data, carrierBitmap }, transferables);
+        return this._request('forge', { data, carrier }, transferables, batch);
     }
 
-    async scanShard(imageFile) {
-        // imageFile is a File/Blob
-        const imageBitmap = await createImageBitmap(imageFile);
-        const transferables = [imageBitmap];
+    async scanShard(imageFile, batch = null) {
+        const transferables = [];
+        const source = await this._source(imageFile, transferables);
 
         // Returns JSON object
-        return this._request('scan', { imageBitmap }, transferables);
+        return this._request('scan', { source }, transferables, batch);
     }
 
+    // --- Batches ---
+
+    /**
+     * Scans many shards across the pool.
+     * @param {Array<Blob|ImageBitmap|ImageData>} images
+     * @param {Object} options - { onProgress({ done, total, failed }) }
+     * @returns {AsyncGenerator<{ index, ok, data?, error? }>} In completion order
+     */
+    scanMany(images, options = {}) {
+        return this._stream(images, (image, batch) => this.scanShard(image, batch), 'data', options);
+    }
+
+    /**
+     * Forges many shards across the pool.
+     * @param {Array<Object>} items - Payloads, or { data, carrier } pairs
+     * @param {Object} options - { onProgress({ done, total, failed }) }
+     * @returns {AsyncGenerator<{ index, ok, blob?, error? }>} In completion order
+     */
+    forgeMany(items, options = {}) {
+        return this._stream(
+            items,
+            (item, batch) =>
+                item && item.data !== undefined
+                    ? this.forgeShard(item.data, item.carrier || null, batch)
+                    : this.forgeShard(item, null, batch),
+            'blob',
+            options
+        );
+    }
+
+    async *_stream(items, submit, field, options) {
+        const batch = ++this.batchCounter;
+        const total = items.length;
+        const onProgress = options.onProgress || null;
+        const settled = [];
+        let wake = null;
+
+        items.forEach((item, index) => {
+            Promise.resolve()
+                .then(() => submit(item, batch))
+                .then(
+                    (result) => ({ index, ok: true, [field]: result }),
+                    (error) => ({ index, ok: false, error: error.message })
+                )
+                .then((entry) => {
+                    settled.push(entry);
+                    if (wake) wake();
+                });
+        });
+
+        let done = 0;
+        let failed = 0;
+        try {
+            while (done < total) {
+                if (settled.length === 0) {
+                    await new Promise((resolve) => (wake = resolve));
+                    wake = null;
+                    continue;
+                }
+                const entry = settled.shift();
+                done++;
+                if (!entry.ok) failed++;
+                if (onProgress) onProgress({ done, total, failed });
+                yield entry;
+            }
+        } finally {
+            // Consumer stopped early: drop (and settle) this batch's jobs that have not started
+            const dropped = this.queue.filter((job) => job.batch === batch);
+            this.queue = this.queue.filter((job) => job.batch !== batch);
+            dropped.forEach((job) => job.reject(new Error('Codex batch cancelled')));
+        }
+    }
+
+    // Stops every worker; running and queued jobs all reject
     terminate() {
-        this.worker.terminate();
+        const jobs = this.workers.filter((slot) => slot.job).map((slot) => slot.job).concat(this.queue);
+        this.workers.forEach((slot) => {
+            slot.worker.terminate();
+            slot.job = null;
+        });
+        this.workers = [];
+        this.queue = [];
+        jobs.forEach((job) => job.reject(new Error('Codex terminated')));
     }
 }
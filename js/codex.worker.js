@@ -1,23 +1,25 @@
 // Codex Worker - Handles computationally expensive steganography operations
+//
+// Pixels are handled a word at a time: each RGBA pixel is one little-endian
+// Uint32 (R in the low byte), so its three carrier bits are read or written
+// with a mask and two shifts instead of per-channel byte loops.
 
 const MAGIC = [0x4d, 0x41, 0x52, 0x51]; // 'MARQ'
 const VERSION = 1;
 const HEADER_SIZE = 9;
+const LSB_MASK = 0x00010101; // R, G and B low bits of an RGBA word
 
 self.onmessage = async (e) => {
     const { type, id, payload } = e.data;
 
     try {
         if (type === 'forge') {
-            const result = await forgeShard(
-                payload.data,
-                payload.carrierBitmap
-            );
+            const result = await forgeShard(payload.data, payload.carrier);
             // Blobs are not transferable, only ArrayBuffers, ImageBitmaps, etc.
             // Structured cloning is sufficient and efficient for Blobs.
             self.postMessage({ type: 'success', id, result });
         } else if (type === 'scan') {
-            const result = await scanShard(payload.imageBitmap);
+            const result = await scanShard(payload.source);
             self.postMessage({ type: 'success', id, result });
         } else {
             throw new Error(`Unknown worker command: ${type}`);
@@ -27,23 +29,37 @@ self.onmessage = async (e) => {
     }
 };
 
-async function forgeShard(data, carrierBitmap = null) {
-    const jsonString = JSON.stringify(data);
-    const textEncoder = new TextEncoder();
-    const payloadData = textEncoder.encode(jsonString);
-    const totalSize = HEADER_SIZE + payloadData.length;
+function _frame(data) {
+    const payloadData = new TextEncoder().encode(JSON.stringify(data));
+    const fullData = new Uint8Array(HEADER_SIZE + payloadData.length);
+    fullData.set(MAGIC, 0);
+    fullData[4] = VERSION;
+    // Length (Big Endian)
+    fullData[5] = (payloadData.length >> 24) & 0xff;
+    fullData[6] = (payloadData.length >> 16) & 0xff;
+    fullData[7] = (payloadData.length >> 8) & 0xff;
+    fullData[8] = payloadData.length & 0xff;
+    fullData.set(payloadData, HEADER_SIZE);
+    return fullData;
+}
+
+async function forgeShard(data, carrier = null) {
+    const fullData = _frame(data);
+    const totalSize = fullData.length;
     const requiredPixels = Math.ceil((totalSize * 8) / 3);
 
     let width, height;
     let canvas;
     let ctx;
 
-    if (carrierBitmap) {
-        width = carrierBitmap.width;
-        height = carrierBitmap.height;
+    if (carrier) {
+        const bitmap = carrier instanceof Blob ? await createImageBitmap(carrier) : carrier;
+        width = bitmap.width;
+        height = bitmap.height;
         canvas = new OffscreenCanvas(width, height);
         ctx = canvas.getContext('2d');
-        ctx.drawImage(carrierBitmap, 0, 0);
+        ctx.drawImage(bitmap, 0, 0);
+        if (bitmap.close) bitmap.close();
     } else {
         const dim = Math.ceil(Math.sqrt(requiredPixels));
         width = Math.max(dim + 20, 200);
@@ -59,57 +75,21 @@ async function forgeShard(data, carrierBitmap = null) {
         );
     }
 
-    const imageData = ctx.getImageData(0, 0, width, height);
-    const pixels = imageData.data;
-
-    const fullData = new Uint8Array(totalSize);
-    fullData.set(MAGIC, 0);
-    fullData[4] = VERSION;
-    // Length (Big Endian)
-    fullData[5] = (payloadData.length >> 24) & 0xff;
-    fullData[6] = (payloadData.length >> 16) & 0xff;
-    fullData[7] = (payloadData.length >> 8) & 0xff;
-    fullData[8] = payloadData.length & 0xff;
-    fullData.set(payloadData, 9);
-
-    let dataIndex = 0;
-    let bitIndex = 0;
-
-    for (let i = 0; i < pixels.length; i += 4) {
-        if (dataIndex >= totalSize) break;
-
-        for (let c = 0; c < 3; c++) {
-            if (dataIndex >= totalSize) break;
-
-            const byte = fullData[dataIndex];
-            const bit = (byte >> (7 - bitIndex)) & 1;
-
-            pixels[i + c] = (pixels[i + c] & 0xfe) | bit;
-
-            bitIndex++;
-            if (bitIndex === 8) {
-                bitIndex = 0;
-                dataIndex++;
-            }
-        }
-    }
-
+    // Only the rows that carry the frame are read back and rewritten
+    const rows = Math.ceil(requiredPixels / width);
+    const imageData = ctx.getImageData(0, 0, width, rows);
+    _writeBytes(new Uint32Array(imageData.data.buffer), fullData);
     ctx.putImageData(imageData, 0, 0);
 
     const blob = await canvas.convertToBlob({ type: 'image/png' });
     return blob;
 }
 
-async function scanShard(imageBitmap) {
-    const canvas = new OffscreenCanvas(imageBitmap.width, imageBitmap.height);
-    const ctx = canvas.getContext('2d');
-    ctx.drawImage(imageBitmap, 0, 0);
+async function scanShard(source) {
+    const image = await _pixelSource(source);
 
-    const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height);
-    const pixels = imageData.data;
-
-    // 1. Read Header
-    const headerBytes = _readBytes(pixels, 9);
+    // 1. Read Header (only the rows it occupies)
+    const headerBytes = _readBytes(image.read(_rowsFor(HEADER_SIZE, image.width)), HEADER_SIZE);
 
     if (
         headerBytes[0] !== MAGIC[0] ||
@@ -136,7 +116,8 @@ async function scanShard(imageBitmap) {
     }
 
     // 2. Read Payload
-    const payloadBytes = _readBytes(pixels, dataLength, 9);
+    const words = image.read(_rowsFor(HEADER_SIZE + dataLength, image.width));
+    const payloadBytes = _readBytes(words, dataLength, HEADER_SIZE);
     const textDecoder = new TextDecoder();
     const jsonString = textDecoder.decode(payloadBytes);
 
@@ -147,39 +128,82 @@ async function scanShard(imageBitmap) {
     }
 }
 
-function _readBytes(pixels, length, byteOffset = 0) {
-    const result = new Uint8Array(length);
-    let currentByte = 0;
-    let bitsRead = 0;
-    let byteIndex = 0;
-
-    let totalBitsPassed = byteOffset * 8;
-    let pixelIndex = Math.floor(totalBitsPassed / 3) * 4;
-    let channelIndex = totalBitsPassed % 3;
-
-    for (let i = pixelIndex; i < pixels.length; i += 4) {
-        if (byteIndex >= length) break;
+function _rowsFor(byteCount, width) {
+    return Math.ceil(Math.ceil((byteCount * 8) / 3) / width);
+}
 
-        for (let c = channelIndex; c < 3; c++) {
-            if (byteIndex >= length) break;
+// { width, height, read(rows) -> Uint32Array } over a Blob, ImageBitmap or raw RGBA buffer
+async function _pixelSource(source) {
+    if (source && source.buffer instanceof ArrayBuffer) {
+        const words = new Uint32Array(source.buffer);
+        return {
+            width: source.width,
+            height: source.height,
+            read: (rows) => words.subarray(0, Math.min(rows, source.height) * source.width)
+        };
+    }
 
-            const bit = pixels[i + c] & 1;
-            currentByte = (currentByte << 1) | bit;
-            bitsRead++;
+    const bitmap = source instanceof Blob ? await createImageBitmap(source) : source;
+    const { width, height } = bitmap;
+    const canvas = new OffscreenCanvas(width, height);
+    const ctx = canvas.getContext('2d', { willReadFrequently: true });
+    ctx.drawImage(bitmap, 0, 0);
+    if (bitmap.close) bitmap.close();
+    return {
+        width,
+        height,
+        read: (rows) => new Uint32Array(ctx.getImageData(0, 0, width, Math.min(rows, height)).data.buffer)
+    };
+}
 
-            if (bitsRead === 8) {
-                result[byteIndex] = currentByte;
-                byteIndex++;
-                currentByte = 0;
-                bitsRead = 0;
-            }
+// Three carrier bits (R, G, B low bits, MSB first) per pixel word
+function _readBytes(words, length, byteOffset = 0) {
+    const result = new Uint8Array(length);
+    const bitStart = byteOffset * 8;
+    let p = Math.floor(bitStart / 3);
+    let skip = bitStart % 3; // Bits of the first pixel already consumed by earlier bytes
+    let acc = 0;
+    let held = 0;
+    let out = 0;
+
+    while (out < length) {
+        if (p >= words.length) throw new Error('Invalid Codex Shard: Image too small for payload.');
+        const w = words[p++];
+        let bits = ((w & 1) << 2) | ((w >>> 7) & 2) | ((w >>> 16) & 1);
+        let count = 3;
+        if (skip) {
+            count -= skip;
+            bits &= (1 << count) - 1;
+            skip = 0;
+        }
+        acc = (acc << count) | bits;
+        held += count;
+        if (held >= 8) {
+            held -= 8;
+            result[out++] = (acc >>> held) & 0xff;
+            acc &= (1 << held) - 1;
         }
-        channelIndex = 0;
     }
 
     return result;
 }
 
+function _writeBytes(words, bytes) {
+    const totalBits = bytes.length * 8;
+    for (let p = 0, bit = 0; bit < totalBits; p++, bit += 3) {
+        let w = words[p] & ~LSB_MASK;
+        for (let c = 0; c < 3 && bit + c < totalBits; c++) {
+            const b = (bytes[(bit + c) >> 3] >> (7 - ((bit + c) & 7))) & 1;
+            w |= b << (c * 8);
+        }
+        if (bit + 3 > totalBits) {
+            // Last pixel only partly used: keep its untouched low bits
+            for (let c = totalBits - bit; c < 3; c++) w |= words[p] & (1 << (c * 8));
+        }
+        words[p] = w >>> 0;
+    }
+}
+
 function _generateCamouflage(ctx, width, height) {
     ctx.fillStyle = '#000';
     ctx.fillRect(0, 0, width, height);
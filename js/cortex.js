@@ -3,122 +3,257 @@
  *
  * Analysis engine that transforms linear thread data into a relational graph structure.
  * Identifies semantic and temporal connections between tactical threads.
+ *
+ * Edges are generated per appended thread from region/intention buckets and a
+ * time-sorted window, so a full build is O(E + N log N) instead of comparing
+ * every pair, and appending one thread only touches that thread's partners.
  */
+
+const TIME_WINDOW = 60 * 60 * 1000; // 1 Hour
+
 export class CortexEngine {
-    constructor() {
+    /**
+     * @param {Object} options - { maxEdgesPerNode } caps how many earlier threads
+     *   each thread links to per relation (region, intention, each side in time).
+     *   Connectivity, and therefore clustering, is unchanged by the cap.
+     *   Omit for the full graph. { memo } is an optional shared LedgerMemo.
+     */
+    constructor(options = {}) {
         this.cache = new Map();
+        this.maxEdgesPerNode = options.maxEdgesPerNode || 0;
+        this.memo = options.memo || null;
+        this._state = null;
     }
 
     /**
      * Analyzes the ledger and builds a relational graph.
+     * Reuses the previous graph when the ledger has only grown.
      * @param {Array} threads - The list of threads from TapestryLedger
      * @returns {Object} { nodes, edges, clusters }
      */
     analyze(threads) {
+        if (this.memo) {
+            // The cap changes the edge set, so it is part of the key
+            return this.memo.get(`cortex.analyze:${this.maxEdgesPerNode}`, threads, () => this._analyze(threads));
+        }
+        return this._analyze(threads);
+    }
+
+    _analyze(threads) {
         if (!threads || threads.length === 0) {
+            this._state = null;
             return { nodes: [], edges: [], clusters: [] };
         }
 
-        const nodes = threads.map((t, i) => ({
+        let state = this._state;
+        const resume =
+            state &&
+            threads.length >= state.nodes.length &&
+            this._sameThread(threads[state.nodes.length - 1], state.nodes[state.nodes.length - 1].data);
+        if (!resume) {
+            state = this._state = this._createState();
+        }
+
+        for (let i = state.nodes.length; i < threads.length; i++) {
+            this._append(state, threads[i]);
+        }
+
+        if (!state.clusters) state.clusters = this._findClusters(state);
+
+        return {
+            nodes: state.nodes.slice(),
+            edges: state.edges.slice(),
+            clusters: state.clusters
+        };
+    }
+
+    /**
+     * Incremental path: adds one thread to the cached graph.
+     * @returns {Array} The edges created for the new node
+     */
+    append(thread) {
+        if (!this._state) this._state = this._createState();
+        const before = this._state.edges.length;
+        this._append(this._state, thread);
+        return this._state.edges.slice(before);
+    }
+
+    _createState() {
+        return {
+            nodes: [],
+            edges: [],
+            byRegion: new Map(),
+            byIntention: new Map(),
+            timeOrder: [], // Node indices sorted by timestamp
+            parent: [], // Union-find forest over node indices
+            mark: [], // Per-node stamp used to dedupe partners
+            clusters: null
+        };
+    }
+
+    _append(state, t) {
+        const j = state.nodes.length;
+        const node = {
             id: t.id || t.hash.substring(0, 12),
-            index: i,
+            index: j,
             data: t,
             // Physics state
             x: Math.random() * 100, // Initial random position
             y: Math.random() * 100,
             vx: 0,
             vy: 0
-        }));
-
-        const edges = [];
-        const thresholdTime = 60 * 60 * 1000; // 1 Hour
-
-        for (let i = 0; i < nodes.length; i++) {
-            for (let j = i + 1; j < nodes.length; j++) {
-                const a = nodes[i];
-                const b = nodes[j];
-                let weight = 0;
-                let types = [];
-
-                // 1. Spatial Correlation (Region)
-                if (a.data.region === b.data.region && a.data.region !== 'unknown') {
-                    weight += 1.0;
-                    types.push('region');
-                }
-
-                // 2. Intentional Correlation
-                if (a.data.intention === b.data.intention) {
-                    weight += 0.5;
-                    types.push('intention');
-                }
-
-                // 3. Temporal Correlation
-                const timeDiff = Math.abs(a.data.timestamp - b.data.timestamp);
-                if (timeDiff < thresholdTime) {
-                    weight += 0.8;
-                    types.push('time');
-                }
-
-                // 4. Semantic Linking (Title/Narrative tags - simplified)
-                // Note: We don't have narrative in basic thread list unless loaded,
-                // but we check titles for common words if needed.
-                // Keeping it lightweight for now.
-
-                if (weight > 0) {
-                    edges.push({
-                        source: a.id,
-                        target: b.id,
-                        sourceIndex: i,
-                        targetIndex: j,
-                        weight: weight,
-                        types: types
-                    });
-                }
+        };
+        state.nodes.push(node);
+        state.parent.push(j);
+        state.mark.push(-1);
+        state.clusters = null;
+
+        const cap = this.maxEdgesPerNode;
+        const partners = [];
+        const add = (p) => {
+            if (state.mark[p] !== j) {
+                state.mark[p] = j;
+                partners.push(p);
             }
+        };
+
+        // 1. Spatial Correlation (Region)
+        if (t.region !== 'unknown') {
+            this._bucketPartners(state.byRegion, t.region, cap, add);
         }
 
-        const clusters = this._findClusters(nodes, edges);
+        // 2. Intentional Correlation
+        this._bucketPartners(state.byIntention, t.intention, cap, add);
+
+        // 3. Temporal Correlation (sorted-time sweep)
+        this._timePartners(state, t.timestamp, cap, add);
 
-        return { nodes, edges, clusters };
+        partners.sort((a, b) => a - b);
+        partners.forEach((p) => {
+            const edge = this._link(state.nodes[p], node);
+            if (edge) {
+                state.edges.push(edge);
+                this._union(state.parent, p, j);
+            }
+        });
+
+        // Register the new node for later threads
+        this._bucket(state.byRegion, t.region).push(j);
+        this._bucket(state.byIntention, t.intention).push(j);
+        const pos = this._lowerBound(state, t.timestamp + 1);
+        state.timeOrder.splice(pos, 0, j);
     }
 
-    _findClusters(nodes, edges) {
-        const visited = new Set();
-        const clusters = [];
+    _link(a, b) {
+        let weight = 0;
+        const types = [];
 
-        // Build adjacency list for traversal
-        const adj = new Map();
-        nodes.forEach(n => adj.set(n.id, []));
-        edges.forEach(e => {
-            adj.get(e.source).push(e.target);
-            adj.get(e.target).push(e.source);
-        });
+        if (a.data.region === b.data.region && a.data.region !== 'unknown') {
+            weight += 1.0;
+            types.push('region');
+        }
+        if (a.data.intention === b.data.intention) {
+            weight += 0.5;
+            types.push('intention');
+        }
+        if (Math.abs(a.data.timestamp - b.data.timestamp) < TIME_WINDOW) {
+            weight += 0.8;
+            types.push('time');
+        }
 
-        nodes.forEach(node => {
-            if (!visited.has(node.id)) {
-                const cluster = [];
-                const queue = [node.id];
-                visited.add(node.id);
-
-                while (queue.length > 0) {
-                    const currentId = queue.shift();
-                    cluster.push(currentId);
-
-                    const neighbors = adj.get(currentId) || [];
-                    neighbors.forEach(neighborId => {
-                        if (!visited.has(neighborId)) {
-                            visited.add(neighborId);
-                            queue.push(neighborId);
-                        }
-                    });
-                }
-
-                if (cluster.length > 1) {
-                    clusters.push(cluster);
-                }
-            }
+        if (weight === 0) return null;
+        return {
+            source: a.id,
+            target: b.id,
+            sourceIndex: a.index,
+            targetIndex: b.index,
+            weight: weight,
+            types: types
+        };
+    }
+
+    _bucket(map, key) {
+        let list = map.get(key);
+        if (!list) {
+            list = [];
+            map.set(key, list);
+        }
+        return list;
+    }
+
+    _bucketPartners(map, key, cap, add) {
+        const list = map.get(key);
+        if (!list) return;
+        const start = cap ? Math.max(0, list.length - cap) : 0;
+        for (let k = start; k < list.length; k++) add(list[k]);
+    }
+
+    _timePartners(state, ts, cap, add) {
+        const order = state.timeOrder;
+        const nodes = state.nodes;
+        const pos = this._lowerBound(state, ts);
+
+        // Sweep outwards from the insertion point on each side. Capping per side
+        // keeps both immediate neighbours, so time-window connectivity survives the cap.
+        for (let k = pos - 1, taken = 0; k >= 0 && (!cap || taken < cap); k--, taken++) {
+            if (!(ts - nodes[order[k]].data.timestamp < TIME_WINDOW)) break;
+            add(order[k]);
+        }
+        for (let k = pos, taken = 0; k < order.length && (!cap || taken < cap); k++, taken++) {
+            if (!(nodes[order[k]].data.timestamp - ts < TIME_WINDOW)) break;
+            add(order[k]);
+        }
+    }
+
+    _lowerBound(state, ts) {
+        // First position whose timestamp is >= ts
+        const order = state.timeOrder;
+        const nodes = state.nodes;
+        let lo = 0;
+        let hi = order.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (nodes[order[mid]].data.timestamp < ts) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    // --- Union-Find ---
+
+    _find(parent, i) {
+        while (parent[i] !== i) {
+            parent[i] = parent[parent[i]]; // Path halving
+            i = parent[i];
+        }
+        return i;
+    }
+
+    _union(parent, a, b) {
+        const ra = this._find(parent, a);
+        const rb = this._find(parent, b);
+        // Attach to the older root so cluster roots stay stable as threads append
+        if (ra < rb) parent[rb] = ra;
+        else if (rb < ra) parent[ra] = rb;
+    }
+
+    _findClusters(state) {
+        const groups = new Map();
+        state.nodes.forEach((node, i) => {
+            const root = this._find(state.parent, i);
+            if (!groups.has(root)) groups.set(root, []);
+            groups.get(root).push(node.id);
         });
 
+        const clusters = [];
+        groups.forEach((cluster) => {
+            if (cluster.length > 1) clusters.push(cluster);
+        });
         return clusters.sort((a, b) => b.length - a.length);
     }
+
+    _sameThread(a, b) {
+        if (a === b) return true;
+        return !!(a && b && a.hash && a.hash === b.hash);
+    }
 }
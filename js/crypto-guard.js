@@ -1,11 +1,76 @@
+// AES-GCM helpers shared by CryptoGuard and crypto.worker.js
+
+import { SEGMENT_SIZE } from './ledger-store.js';
+
+export function toBase64(buffer) {
+    const bytes = new Uint8Array(buffer);
+    let binary = '';
+    // Chunked to stay under argument-count limits on large ledgers
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+    return btoa(binary);
+}
+
+export function fromBase64(base64) {
+    const binary = atob(base64);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes.buffer;
+}
+
+// Encrypts JSON-serializable data under a fresh random IV
+export async function sealJSON(key, data) {
+    const iv = crypto.getRandomValues(new Uint8Array(12));
+    const ciphertext = await crypto.subtle.encrypt(
+        { name: 'AES-GCM', iv: iv },
+        key,
+        new TextEncoder().encode(JSON.stringify(data))
+    );
+    return { ciphertext: toBase64(ciphertext), iv: toBase64(iv) };
+}
+
+export async function openJSON(key, iv, ciphertext) {
+    const decrypted = await crypto.subtle.decrypt(
+        { name: 'AES-GCM', iv: fromBase64(iv) },
+        key,
+        fromBase64(ciphertext)
+    );
+    return JSON.parse(new TextDecoder().decode(decrypted));
+}
+
+const APPROX_THREAD_BYTES = 256; // Rough ciphertext size per thread, for worker routing
+const MAC_ALGO = { name: 'HMAC', hash: 'SHA-256', length: 256 };
+
 export class CryptoGuard {
-    constructor() {
+    /**
+     * @param {Object} options - { worker: 'auto' | false, workerThreshold } moves
+     *   AES-GCM for calls of at least workerThreshold threads to crypto.worker.js.
+     *   The default is one compacted ledger segment: single-thread appends stay
+     *   inline, compactions and whole-ledger saves go to the worker.
+     */
+    constructor(options = {}) {
         this.passwordCache = null; // Stored only in memory
         this.algo = { name: 'AES-GCM', length: 256 };
+
+        // Session key material. PBKDF2 runs once per (password, salt) and the
+        // CryptoKey is reused for every save until lock, unlock or a new password.
+        this.sessionSalt = null; // Base64 salt new packets are sealed under
+        this._sessionKeys = new Map(); // Base64 salt -> Promise<CryptoKey>
+        this.derivations = 0;
+
+        this.workerMode = options.worker === undefined ? 'auto' : options.worker;
+        this.workerThreshold = options.workerThreshold || SEGMENT_SIZE;
+        this.worker = undefined; // Created lazily on the first large payload
+        this.pendingRequests = new Map();
+        this.requestIdCounter = 0;
     }
 
-    // PBKDF2 Key Derivation
-    async deriveKey(password, salt) {
+    // PBKDF2 Key Derivation (AES-GCM by default, HMAC for session MAC keys)
+    async deriveKey(password, salt, algo = this.algo, usages = ['encrypt', 'decrypt']) {
+        this.derivations++;
         const enc = new TextEncoder();
         const keyMaterial = await window.crypto.subtle.importKey(
             'raw',
@@ -23,32 +88,67 @@ export class CryptoGuard {
                 hash: 'SHA-256'
             },
             keyMaterial,
-            this.algo,
+            algo,
             false,
-            ['encrypt', 'decrypt']
+            usages
         );
     }
 
+    // Cached key for the session password under a given salt
+    _sessionKey(salt, mac = false) {
+        const id = mac ? `mac:${salt}` : salt;
+        let key = this._sessionKeys.get(id);
+        if (!key) {
+            key = mac
+                ? this.deriveKey(this.passwordCache, this._base64ToBuffer(salt), MAC_ALGO, ['sign', 'verify'])
+                : this.deriveKey(this.passwordCache, this._base64ToBuffer(salt));
+            key.catch(() => this._sessionKeys.delete(id));
+            this._sessionKeys.set(id, key);
+        }
+        return key;
+    }
+
+    /**
+     * HMAC-SHA-256 key bound to the session password, for signing data kept at
+     * rest (integrity checkpoints). Use a salt of its own, not a packet salt, so
+     * it never shares key bits with the AES key. Cached until the session rotates.
+     * @param {string} salt - Base64 salt stored with the signed data
+     */
+    sessionMacKey(salt) {
+        if (!this.passwordCache) return Promise.reject(new Error('No active session.'));
+        return this._sessionKey(salt, true);
+    }
+
+    newSalt() {
+        return this._bufferToBase64(window.crypto.getRandomValues(new Uint8Array(16)));
+    }
+
     async encrypt(data, password) {
         if (!password) throw new Error('Encryption requires a password.');
 
-        // Generate new salt and IV
-        const salt = window.crypto.getRandomValues(new Uint8Array(16));
-        const iv = window.crypto.getRandomValues(new Uint8Array(12));
-
-        const key = await this.deriveKey(password, salt);
-        const enc = new TextEncoder();
+        let salt;
+        let key;
+        if (password === this.passwordCache) {
+            if (!this.sessionSalt) {
+                this.sessionSalt = this.newSalt();
+            }
+            salt = this.sessionSalt;
+            key = await this._sessionKey(salt);
+        } else {
+            // One-off password: derive under a fresh salt, nothing cached
+            salt = this.newSalt();
+            key = await this.deriveKey(password, this._base64ToBuffer(salt));
+        }
 
-        const ciphertext = await window.crypto.subtle.encrypt(
-            { name: 'AES-GCM', iv: iv },
-            key,
-            enc.encode(JSON.stringify(data))
-        );
+        // Fresh IV per packet, even under a reused session key
+        const sealed = this._useWorker(Array.isArray(data) ? data.length : 0)
+            ? await this._offload('encrypt', { key, data }, () => sealJSON(key, data))
+            : await sealJSON(key, data);
 
         return {
-            ciphertext: this._bufferToBase64(ciphertext),
-            iv: this._bufferToBase64(iv),
-            salt: this._bufferToBase64(salt),
+            ciphertext: sealed.ciphertext,
+            iv: sealed.iv,
+            salt: salt,
             version: 1,
             tag: 'AEGIS_SECURE'
         };
@@ -59,20 +159,21 @@ export class CryptoGuard {
         if (encryptedPacket.tag !== 'AEGIS_SECURE')
             throw new Error('Invalid encryption format.');
 
-        const salt = this._base64ToBuffer(encryptedPacket.salt);
-        const iv = this._base64ToBuffer(encryptedPacket.iv);
-        const ciphertext = this._base64ToBuffer(encryptedPacket.ciphertext);
-
-        const key = await this.deriveKey(password, salt);
+        const { salt, iv, ciphertext } = encryptedPacket;
+        let key;
+        if (password === this.passwordCache) {
+            // The first packet read after unlock fixes the salt new saves reuse
+            if (!this.sessionSalt) this.sessionSalt = salt;
+            key = await this._sessionKey(salt);
+        } else {
+            key = await this.deriveKey(password, this._base64ToBuffer(salt));
+        }
 
         try {
-            const decryptedBuffer = await window.crypto.subtle.decrypt(
-                { name: 'AES-GCM', iv: iv },
-                key,
-                ciphertext
-            );
-            const dec = new TextDecoder();
-            return JSON.parse(dec.decode(decryptedBuffer));
+            if (this._useWorker(ciphertext.length / APPROX_THREAD_BYTES)) {
+                return await this._offload('decrypt', { key, iv, ciphertext }, () => openJSON(key, iv, ciphertext));
+            }
+            return await openJSON(key, iv, ciphertext);
         } catch {
             throw new Error(
                 'Decryption failed. Incorrect password or data corruption.'
@@ -81,8 +182,13 @@ export class CryptoGuard {
     }
 
     // Session Management
+    // Setting a password (unlock or change) rotates the session: cached keys are
+    // dropped and re-derived on next use.
     setSessionPassword(password) {
+        if (password === this.passwordCache) return;
         this.passwordCache = password;
+        this.sessionSalt = null;
+        this._sessionKeys.clear();
     }
 
     getSessionPassword() {
@@ -91,30 +197,80 @@ export class CryptoGuard {
 
     clearSession() {
         this.passwordCache = null;
+        this.sessionSalt = null;
+        this._sessionKeys.clear();
     }
 
     hasSession() {
         return !!this.passwordCache;
     }
 
+    // --- Worker ---
+
+    _useWorker(threadCount) {
+        return this.workerMode === 'auto' && threadCount >= this.workerThreshold && !!this._getWorker();
+    }
+
+    _getWorker() {
+        if (this.worker !== undefined) return this.worker;
+        if (typeof Worker === 'undefined') {
+            this.worker = null;
+            return null;
+        }
+
+        const worker = new Worker('js/crypto.worker.js', { type: 'module' });
+        this.worker = worker;
+        this.worker.onmessage = (e) => {
+            const { type, id, result, error } = e.data;
+            if (this.pendingRequests.has(id)) {
+                const { resolve, reject } = this.pendingRequests.get(id);
+                this.pendingRequests.delete(id);
+
+                if (type === 'success') {
+                    resolve(result);
+                } else {
+                    reject(new Error(error));
+                }
+            }
+        };
+        this.worker.onerror = (e) => {
+            console.error('Crypto Worker Error:', e);
+            // A crashed worker answers nothing: fail what it holds and stay on
+            // the main thread from now on
+            const pending = [...this.pendingRequests.values()];
+            this.pendingRequests.clear();
+            worker.terminate();
+            this.worker = null;
+            pending.forEach(({ reject }) => reject(new Error('Crypto worker failed')));
+        };
+        return this.worker;
+    }
+
+    // Worker request, redone on the main thread if the worker dies under it
+    async _offload(type, payload, inline) {
+        try {
+            return await this._request(type, payload);
+        } catch (e) {
+            if (this.worker !== null) throw e;
+            return inline();
+        }
+    }
+
+    // CryptoKey objects are structured-cloneable, so the worker uses the session key as-is
+    _request(type, payload) {
+        return new Promise((resolve, reject) => {
+            const id = this.requestIdCounter++;
+            this.pendingRequests.set(id, { resolve, reject });
+            this.worker.postMessage({ type, id, payload });
+        });
+    }
+
     // Utilities
     _bufferToBase64(buffer) {
-        let binary = '';
-        const bytes = new Uint8Array(buffer);
-        const len = bytes.byteLength;
-        for (let i = 0; i < len; i++) {
-            binary += String.fromCharCode(bytes[i]);
-        }
-        return window.btoa(binary);
+        return toBase64(buffer);
     }
 
     _base64ToBuffer(base64) {
-        const binary_string = window.atob(base64);
-        const len = binary_string.length;
-        const bytes = new Uint8Array(len);
-        for (let i = 0; i < len; i++) {
-            bytes[i] = binary_string.charCodeAt(i);
-        }
-        return bytes.buffer;
+        return fromBase64(base64);
     }
 }
@@ -0,0 +1,22 @@
+// Crypto Worker - Serializes and AES-GCM seals/opens large ledgers off the UI thread.
+// Receives the session CryptoKey with each request; never sees the password.
+
+import { sealJSON, openJSON } from './crypto-guard.js';
+
+self.onmessage = async (e) => {
+    const { type, id, payload } = e.data;
+
+    try {
+        if (type === 'encrypt') {
+            const result = await sealJSON(payload.key, payload.data);
+            self.postMessage({ type: 'success', id, result });
+        } else if (type === 'decrypt') {
+            const result = await openJSON(payload.key, payload.iv, payload.ciphertext);
+            self.postMessage({ type: 'success', id, result });
+        } else {
+            throw new Error(`Unknown worker command: ${type}`);
+        }
+    } catch (error) {
+        self.postMessage({ type: 'error', id, error: error.message });
+    }
+};
@@ -0,0 +1,230 @@
+/**
+ * Frame Scheduler // One Render Loop For Every Engine
+ *
+ * Engines register a named task and request it when their output is stale.
+ * Requests coalesce into at most one animation frame, so any number of redraw
+ * triggers within a frame cost one redraw. A task that returns true wants
+ * another frame (physics, pulsing ghosts, moving units); when no task does,
+ * the loop stops and an idle tab schedules nothing. Hidden tabs get no frames
+ * at all; pending work runs when the tab is shown again.
+ *
+ * Each frame runs dirty tasks by priority until the frame budget is spent;
+ * the rest wait one frame and then run first. A task that overruns its own
+ * budget sits out frames in proportion to the overrun, so a slow engine
+ * degrades its own frame rate instead of everyone's. Interval tasks (widgets
+ * polled once a second) are woken by a timer rather than holding the loop.
+ */
+
+const DEFAULT_FRAME_BUDGET = 12; // ms of task work per frame
+const DEFAULT_TASK_BUDGET = 8; // ms before a task is throttled
+const MAX_COOLDOWN = 8; // Most frames a slow task sits out
+
+export class FrameScheduler {
+    /**
+     * @param {Object} options - { frameBudget } ms per frame; { requestFrame,
+     *   cancelFrame, now } clock hooks (default: requestAnimationFrame and
+     *   performance.now); { document } for visibility (default: global)
+     */
+    constructor(options = {}) {
+        this.frameBudget = options.frameBudget || DEFAULT_FRAME_BUDGET;
+        this.tasks = new Map(); // name -> task
+        this.stats = { frames: 0, overBudgetFrames: 0 };
+        this.hidden = false;
+
+        this._order = []; // Tasks by descending priority
+        this._frame = null;
+        this._now = options.now || (() => performance.now());
+
+        if (options.requestFrame) {
+            this._requestFrame = options.requestFrame;
+            this._cancelFrame = options.cancelFrame || (() => {});
+        } else if (typeof requestAnimationFrame === 'function') {
+            this._requestFrame = (cb) => requestAnimationFrame(cb);
+            this._cancelFrame = (id) => cancelAnimationFrame(id);
+        } else {
+            this._requestFrame = (cb) => setTimeout(() => cb(this._now()), 16);
+            this._cancelFrame = (id) => clearTimeout(id);
+        }
+
+        const doc = options.document || (typeof document !== 'undefined' ? document : null);
+        if (doc && typeof doc.addEventListener === 'function') {
+            this.hidden = doc.visibilityState === 'hidden';
+            doc.addEventListener('visibilitychange', () => this.setHidden(doc.visibilityState === 'hidden'));
+        }
+    }
+
+    /**
+     * Adds (or replaces) a task. The task is called with the frame time and
+     * returns true to be run again next frame, or after its interval.
+     * @param {string} name
+     * @param {Function} run - (time) => boolean
+     * @param {Object} options - { priority } higher runs first (default 0);
+     *   { budget } ms per run (default 8); { interval } ms between runs
+     */
+    register(name, run, options = {}) {
+        this.unregister(name);
+        const task = {
+            name,
+            run,
+            priority: options.priority || 0,
+            budget: options.budget || DEFAULT_TASK_BUDGET,
+            interval: options.interval || 0,
+            dirty: false,
+            waiting: false, // Deferred last frame; runs first this one
+            cooldown: 0,
+            timer: null,
+            runs: 0,
+            deferred: 0,
+            skipped: 0,
+            overruns: 0,
+            totalMs: 0,
+            lastMs: 0,
+            maxMs: 0
+        };
+        this.tasks.set(name, task);
+        this._order = [...this.tasks.values()].sort((a, b) => b.priority - a.priority);
+        return task;
+    }
+
+    unregister(name) {
+        const task = this.tasks.get(name);
+        if (!task) return;
+        clearTimeout(task.timer);
+        this.tasks.delete(name);
+        this._order = this._order.filter((t) => t !== task);
+    }
+
+    /**
+     * Marks a task dirty for the next frame, or after a delay. Repeated
+     * requests before the task runs are free.
+     * @param {string} name
+     * @param {number} delay - ms to wait first (default 0)
+     */
+    request(name, delay = 0) {
+        const task = this.tasks.get(name);
+        if (!task) return;
+        if (delay > 0) {
+            if (task.timer !== null) return;
+            task.timer = setTimeout(() => {
+                task.timer = null;
+                this.request(name);
+            }, delay);
+            return;
+        }
+        task.dirty = true;
+        this._schedule();
+    }
+
+    /**
+     * Drops a pending request (a delayed one too).
+     */
+    cancel(name) {
+        const task = this.tasks.get(name);
+        if (!task) return;
+        task.dirty = false;
+        task.waiting = false;
+        clearTimeout(task.timer);
+        task.timer = null;
+    }
+
+    isPending(name) {
+        const task = this.tasks.get(name);
+        return !!task && (task.dirty || task.timer !== null);
+    }
+
+    setHidden(hidden) {
+        this.hidden = hidden;
+        if (hidden) {
+            if (this._frame !== null) this._cancelFrame(this._frame);
+            this._frame = null;
+        } else if (this._order.some((t) => t.dirty)) {
+            this._schedule();
+        }
+    }
+
+    /**
+     * Per-task timing counters.
+     * @returns {{ frames, overBudgetFrames, tasks: Object<string, Object> }}
+     */
+    getStats() {
+        const tasks = {};
+        for (const t of this._order) {
+            tasks[t.name] = {
+                runs: t.runs,
+                deferred: t.deferred,
+                skipped: t.skipped,
+                overruns: t.overruns,
+                lastMs: t.lastMs,
+                maxMs: t.maxMs,
+                avgMs: t.runs ? t.totalMs / t.runs : 0
+            };
+        }
+        return { ...this.stats, tasks };
+    }
+
+    // --- Frame Loop ---
+
+    _schedule() {
+        if (this._frame !== null || this.hidden) return;
+        this._frame = this._requestFrame((time) => this._tick(time));
+    }
+
+    _tick(time) {
+        this._frame = null;
+        if (this.hidden) return;
+        this.stats.frames++;
+
+        const start = this._now();
+        const order = this._order.filter((t) => t.waiting).concat(this._order.filter((t) => !t.waiting));
+        let ran = false;
+        let pending = false;
+
+        for (const task of order) {
+            if (!task.dirty || !this.tasks.has(task.name)) continue;
+
+            if (task.cooldown > 0) {
+                task.cooldown--;
+                task.skipped++;
+                pending = true;
+                continue;
+            }
+            if (ran && !task.waiting && this._now() - start >= this.frameBudget) {
+                task.waiting = true;
+                task.deferred++;
+                pending = true;
+                continue;
+            }
+
+            task.dirty = false;
+            task.waiting = false;
+            ran = true;
+
+            const t0 = this._now();
+            let again = false;
+            try {
+                again = task.run(time);
+            } catch (e) {
+                console.error(`[SCHEDULER] Task ${task.name} failed`, e);
+            }
+            const ms = this._now() - t0;
+
+            task.runs++;
+            task.lastMs = ms;
+            task.totalMs += ms;
+            if (ms > task.maxMs) task.maxMs = ms;
+            if (ms > task.budget) {
+                task.overruns++;
+                task.cooldown = Math.min(MAX_COOLDOWN, Math.floor(ms / task.budget) - 1);
+            }
+
+            if (again && this.tasks.get(task.name) === task) {
+                if (task.interval) this.request(task.name, task.interval);
+                else task.dirty = true;
+            }
+            if (task.dirty) pending = true;
+        }
+
+        if (this._now() - start > this.frameBudget) this.stats.overBudgetFrames++;
+        if (pending) this._schedule();
+    }
+}
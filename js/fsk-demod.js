@@ -0,0 +1,250 @@
+/**
+ * Streaming FSK Demodulator // Sonic Shard receiver
+ *
+ * Consumes PCM in arbitrary chunks (128-sample worklet quanta, whole files)
+ * and returns SPCT frames as soon as their last bit arrives. Work per sample
+ * is constant: each sample is correlated once against precomputed mark/space
+ * quadrature tables and folded into a sub-bit block. A bit decision is made at
+ * every block boundary from the last `phases` blocks (one bit period), which
+ * gives `phases` interleaved bit streams at different bit phases:
+ *
+ *   search   each phase stream shifts its bits into a 32-bit register and is
+ *            compared against the SPCT header; the centre of the run of
+ *            matching phases becomes the bit clock
+ *   header   version + length bytes are read on that clock
+ *   payload  bytes are collected while an early/late gate nudges the clock by
+ *            one block when neighbouring phases decide bits more cleanly
+ */
+
+export const SPCT_HEADER = 0x53504354; // 'SPCT'
+export const MAX_SIGNAL_PAYLOAD = 50000;
+
+const SIGNAL_VERSION = 1;
+const GATE_THRESHOLD = 1.5; // Accumulated early/late margin before the clock slips a block
+
+function gcd(a, b) {
+    while (b) [a, b] = [b, a % b];
+    return a;
+}
+
+/**
+ * cos/sin of 2*pi*freq*n/sampleRate over one exact period of the tone, so the
+ * table can be walked forever with a wrapping index.
+ */
+export function quadratureTable(freq, sampleRate, maxLength = 1 << 16) {
+    let period = maxLength;
+    if (Number.isInteger(freq) && Number.isInteger(sampleRate)) {
+        period = Math.min(sampleRate / gcd(freq, sampleRate), maxLength);
+    }
+    const cos = new Float32Array(period);
+    const sin = new Float32Array(period);
+    const w = (2 * Math.PI * freq) / sampleRate;
+    for (let n = 0; n < period; n++) {
+        cos[n] = Math.cos(w * n);
+        sin[n] = Math.sin(w * n);
+    }
+    return { cos, sin, period };
+}
+
+export class FSKDemodulator {
+    /**
+     * @param {Object} options - { sampleRate, baudRate, markFreq, spaceFreq,
+     *   phases (blocks per bit, default 8), maxPayload }
+     */
+    constructor(options) {
+        this.sampleRate = options.sampleRate;
+        this.samplesPerBit = options.sampleRate / options.baudRate;
+        this.phases = options.phases || 8;
+        this.maxPayload = options.maxPayload || MAX_SIGNAL_PAYLOAD;
+
+        this.mark = quadratureTable(options.markFreq, options.sampleRate);
+        this.space = quadratureTable(options.spaceFreq, options.sampleRate);
+        this.markIndex = 0;
+        this.spaceIndex = 0;
+
+        // Open block accumulators
+        this.mRe = 0;
+        this.mIm = 0;
+        this.sRe = 0;
+        this.sIm = 0;
+
+        // Ring of the last `phases` blocks' quadrature sums, plus decision margins
+        const P = this.phases;
+        this.ringMRe = new Float32Array(P);
+        this.ringMIm = new Float32Array(P);
+        this.ringSRe = new Float32Array(P);
+        this.ringSIm = new Float32Array(P);
+        this.margins = new Float32Array(P);
+
+        this.sampleCount = 0;
+        this.block = 0;
+        this.blockEnd = this._boundary(1);
+
+        this.registers = new Uint32Array(P); // Header search, one per phase
+        this.decoder = new TextDecoder('utf-8', { fatal: true });
+        this._reset();
+    }
+
+    _boundary(block) {
+        return Math.round((block * this.samplesPerBit) / this.phases);
+    }
+
+    _reset() {
+        this.state = 'search';
+        this.registers.fill(0);
+        this.matchFirst = -1; // First block whose phase stream matched the header
+        this.matchLast = -1;
+        this.nextBit = -1; // Block the locked clock samples next
+        this.gate = 0;
+        this.bitCount = 0;
+        this.current = 0;
+        this.header = new Uint8Array(5); // version + u32 length
+        this.payload = null;
+        this.length = 0;
+    }
+
+    /**
+     * Feeds samples; returns the frames (parsed JSON) completed by them.
+     * @param {Float32Array|Array<number>} samples
+     * @returns {Array<Object>}
+     */
+    push(samples) {
+        const frames = [];
+        const mc = this.mark.cos;
+        const msn = this.mark.sin;
+        const sc = this.space.cos;
+        const ssn = this.space.sin;
+        const mp = this.mark.period;
+        const sp = this.space.period;
+        let mi = this.markIndex;
+        let si = this.spaceIndex;
+
+        for (let i = 0; i < samples.length; i++) {
+            const s = samples[i];
+            this.mRe += s * mc[mi];
+            this.mIm += s * msn[mi];
+            this.sRe += s * sc[si];
+            this.sIm += s * ssn[si];
+            if (++mi === mp) mi = 0;
+            if (++si === sp) si = 0;
+
+            if (++this.sampleCount === this.blockEnd) {
+                const frame = this._closeBlock();
+                if (frame !== null) frames.push(frame);
+            }
+        }
+
+        this.markIndex = mi;
+        this.spaceIndex = si;
+        return frames;
+    }
+
+    _closeBlock() {
+        const P = this.phases;
+        const block = this.block;
+        const slot = block % P;
+        this.ringMRe[slot] = this.mRe;
+        this.ringMIm[slot] = this.mIm;
+        this.ringSRe[slot] = this.sRe;
+        this.ringSIm[slot] = this.sIm;
+        this.mRe = this.mIm = this.sRe = this.sIm = 0;
+        this.block++;
+        this.blockEnd = this._boundary(this.block + 1);
+        if (block < P - 1) return null; // First full bit window not seen yet
+
+        // Correlation over the bit window ending at this block
+        let mRe = 0;
+        let mIm = 0;
+        let sRe = 0;
+        let sIm = 0;
+        for (let k = 0; k < P; k++) {
+            mRe += this.ringMRe[k];
+            mIm += this.ringMIm[k];
+            sRe += this.ringSRe[k];
+            sIm += this.ringSIm[k];
+        }
+        const markE = mRe * mRe + mIm * mIm;
+        const spaceE = sRe * sRe + sIm * sIm;
+        const bit = markE > spaceE ? 1 : 0;
+        this.margins[slot] = Math.abs(markE - spaceE) / (markE + spaceE + 1e-12);
+
+        if (this.state === 'search') {
+            this._search(block, slot, bit);
+            return null;
+        }
+
+        // Early/late gate, evaluated once the block after the sampled one is in
+        if (block === this.nextBit - P + 1) {
+            const onTime = (block - 1) % P;
+            const early = this.margins[(onTime + P - 1) % P];
+            const late = this.margins[slot];
+            this.gate += late - early;
+            if (this.gate > GATE_THRESHOLD) {
+                this.nextBit++;
+                this.gate = 0;
+            } else if (this.gate < -GATE_THRESHOLD) {
+                this.nextBit--;
+                this.gate = 0;
+            }
+        }
+
+        if (block !== this.nextBit) return null;
+        this.nextBit += P;
+        return this._takeBit(bit);
+    }
+
+    _search(block, slot, bit) {
+        const P = this.phases;
+        const reg = ((this.registers[slot] << 1) | bit) >>> 0;
+        this.registers[slot] = reg;
+
+        if (reg === SPCT_HEADER) {
+            if (this.matchFirst < 0) this.matchFirst = block;
+            if (this.matchLast < 0 || this.matchLast === block - 1) this.matchLast = block;
+        }
+
+        // Every phase of this bit period has been seen: lock on the centre of the
+        // run. Its first post-header bit is still at least one block away.
+        if (this.matchFirst >= 0 && block >= this.matchFirst + P - 1) {
+            const centre = Math.floor((this.matchFirst + this.matchLast) / 2);
+            this.state = 'header';
+            this.nextBit = centre + P;
+            this.gate = 0;
+        }
+    }
+
+    _takeBit(bit) {
+        this.current = (this.current << 1) | bit;
+        if (++this.bitCount % 8 !== 0) return null;
+
+        const byte = this.current & 0xff;
+        this.current = 0;
+        const index = this.bitCount / 8 - 1;
+
+        if (this.state === 'header') {
+            this.header[index] = byte;
+            if (index < 4) return null;
+            const h = this.header;
+            this.length = ((h[1] << 24) | (h[2] << 16) | (h[3] << 8) | h[4]) >>> 0;
+            if (h[0] !== SIGNAL_VERSION || this.length === 0 || this.length > this.maxPayload) {
+                this._reset(); // False lock on noise
+                return null;
+            }
+            this.payload = new Uint8Array(this.length);
+            this.state = 'payload';
+            return null;
+        }
+
+        this.payload[index - 5] = byte;
+        if (index - 5 < this.length - 1) return null;
+
+        let frame = null;
+        try {
+            frame = JSON.parse(this.decoder.decode(this.payload));
+        } catch {
+            frame = null; // Corrupted in transit; keep listening
+        }
+        this._reset();
+        return frame;
+    }
+}
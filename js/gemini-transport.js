@@ -0,0 +1,297 @@
+/**
+ * Gemini Transport // Frame-Coalesced Binary Uplink
+ *
+ * Outgoing messages are queued and sent once per animation frame as a single
+ * binary packet instead of one structured-clone post per event. Within a
+ * frame, state-like messages (heartbeats, ledger heads, state syncs) keep only
+ * their latest value and consecutive ledger deltas to the same target merge.
+ *
+ *   frame    'G' | version u8 | sender | count | message*
+ *   message  type u8 | name (custom types only) | body length | body
+ *
+ * Heartbeats, ledger heads, ledger requests and ledger deltas have fixed
+ * binary bodies; deltas carry their threads as an MQSC scroll body (see
+ * scroll-codec.js) linked to the head they extend. Anything else is JSON.
+ * Strings and integers use the scroll codec's varints, hashes are raw 32 bytes.
+ *
+ * The link is a BroadcastChannel between tabs of this browser, or a WebSocket
+ * to a relay hub (tools/gemini_relay.py) that fans frames out to other peers.
+ */
+
+import { ByteReader, ByteWriter, readScrollBody, writeScrollBody } from './scroll-codec.js';
+
+export const FRAME_MAGIC = 0x47; // 'G'
+export const FRAME_VERSION = 1;
+export const GENESIS_HASH = 'GENESIS_HASH';
+
+const CHANNEL_NAME = 'marq-tactical-link';
+const FLUSH_TIMEOUT = 100; // ms; animation frames stall in background tabs
+const RECONNECT_MIN = 1000;
+const RECONNECT_MAX = 30000;
+
+const jsonBody = {
+    write: (w, payload) => w.string(JSON.stringify(payload === undefined ? null : payload)),
+    read: (r) => JSON.parse(r.string())
+};
+
+const writeHash = (w, hash) => {
+    if (hash === GENESIS_HASH) return w.u8(0);
+    w.u8(1);
+    w.hash(hash);
+};
+
+const readHash = (r) => (r.u8() === 0 ? GENESIS_HASH : r.hash());
+
+// Type code -> body codec. Code 0 is a custom type with a JSON body.
+const CODECS = [
+    null,
+    { type: 'HELLO', ...jsonBody },
+    { type: 'WELCOME', ...jsonBody },
+    {
+        type: 'HEARTBEAT',
+        write: (w, p) => {
+            w.varint(p.ts);
+            w.string(p.mode);
+        },
+        read: (r) => ({ ts: r.varint(), mode: r.string() })
+    },
+    {
+        type: 'LEDGER_HEAD',
+        write: (w, p) => {
+            w.varint(p.length);
+            writeHash(w, p.hash);
+        },
+        read: (r) => ({ length: r.varint(), hash: readHash(r) })
+    },
+    {
+        type: 'LEDGER_REQUEST',
+        write: (w, p) => {
+            w.string(p.to);
+            w.varint(p.from);
+            writeHash(w, p.hash);
+        },
+        read: (r) => ({ to: r.string(), from: r.varint(), hash: readHash(r) })
+    },
+    {
+        type: 'LEDGER_DELTA',
+        write: (w, p) => {
+            w.string(p.to || '');
+            w.varint(p.from);
+            writeHash(w, p.base);
+            writeScrollBody(w, p.threads, p.base);
+        },
+        read: (r) => {
+            const to = r.string();
+            const from = r.varint();
+            const base = readHash(r);
+            return { to, from, base, threads: [...readScrollBody(r, base).threads] };
+        }
+    }
+];
+
+const TYPE_CODES = new Map(CODECS.map((codec, code) => [codec && codec.type, code]));
+
+// Only the newest value of these matters within a frame
+const LATEST_ONLY = new Set(['HEARTBEAT', 'LEDGER_HEAD', 'STATE_UPDATE']);
+
+/**
+ * Packs messages into one binary frame.
+ * @param {string} sender
+ * @param {Array<{ type: string, payload: * }>} messages
+ * @returns {Uint8Array}
+ */
+export function encodeFrame(sender, messages) {
+    const w = new ByteWriter(256);
+    w.u8(FRAME_MAGIC);
+    w.u8(FRAME_VERSION);
+    w.string(sender);
+    w.varint(messages.length);
+
+    for (const { type, payload } of messages) {
+        const code = TYPE_CODES.get(type) || 0;
+        const body = new ByteWriter(64);
+        (code ? CODECS[code] : jsonBody).write(body, payload);
+
+        w.u8(code);
+        if (!code) w.string(type);
+        const bytes = body.finish();
+        w.varint(bytes.length);
+        w.bytes(bytes);
+    }
+    return w.finish();
+}
+
+/**
+ * Unpacks a frame written by encodeFrame.
+ * @param {Uint8Array|ArrayBuffer} data
+ * @returns {{ sender: string, messages: Array<{ type, payload }> }}
+ */
+export function decodeFrame(data) {
+    const bytes = data instanceof Uint8Array ? data : new Uint8Array(data);
+    if (bytes[0] !== FRAME_MAGIC) throw new Error('Invalid Gemini frame');
+    if (bytes[1] !== FRAME_VERSION) throw new Error(`Unsupported Gemini frame version ${bytes[1]}`);
+
+    const r = new ByteReader(bytes, 2);
+    const sender = r.string();
+    const count = r.varint();
+    const messages = [];
+    for (let i = 0; i < count; i++) {
+        const code = r.u8();
+        const type = code ? null : r.string();
+        const length = r.varint();
+        const end = r.pos + length;
+        if (end > bytes.length) throw new Error('Invalid Gemini frame: Truncated message');
+
+        // Newer peers may send types this build does not know: skip them
+        const codec = code ? CODECS[code] : jsonBody;
+        if (codec) {
+            const body = new ByteReader(bytes.subarray(r.pos, end));
+            messages.push({ type: type || codec.type, payload: codec.read(body) });
+        }
+        r.pos = end;
+    }
+    return { sender, messages };
+}
+
+export class GeminiTransport {
+    /**
+     * @param {string} sender - Local peer id stamped on every frame
+     * @param {Object} options - { relay } WebSocket URL of a relay hub (default:
+     *   BroadcastChannel); { schedule } frame scheduler (default:
+     *   requestAnimationFrame)
+     */
+    constructor(sender, options = {}) {
+        this.sender = sender;
+        this.relay = options.relay || null;
+        this.queue = [];
+        this.onmessage = null; // ({ type, payload, sender }) per received message
+        this.onconnect = null; // Relay (re)connected
+        this.stats = { framesSent: 0, messagesSent: 0, bytesSent: 0, framesReceived: 0 };
+        this.lastSent = 0;
+
+        this._schedule =
+            options.schedule ||
+            (typeof requestAnimationFrame === 'function' ? (cb) => requestAnimationFrame(cb) : null);
+        this._pending = false;
+        this._timer = null;
+        this._socket = null;
+        this._backoff = RECONNECT_MIN;
+        this._closed = false;
+
+        if (this.relay) {
+            this._connectRelay();
+        } else {
+            this.channel = new BroadcastChannel(CHANNEL_NAME);
+            this.channel.onmessage = (e) => this._receive(e.data);
+        }
+    }
+
+    /**
+     * Queues a message for the next frame.
+     */
+    send(type, payload) {
+        const queue = this.queue;
+        if (LATEST_ONLY.has(type)) {
+            const index = queue.findIndex((m) => m.type === type);
+            if (index >= 0) {
+                queue[index].payload = payload;
+                return this._request();
+            }
+        } else if (type === 'LEDGER_DELTA') {
+            const last = queue[queue.length - 1];
+            if (
+                last &&
+                last.type === type &&
+                last.payload.to === payload.to &&
+                last.payload.from + last.payload.threads.length === payload.from
+            ) {
+                last.payload = { ...last.payload, threads: last.payload.threads.concat(payload.threads) };
+                return this._request();
+            }
+        }
+        queue.push({ type, payload });
+        this._request();
+    }
+
+    _request() {
+        if (this._pending) return;
+        this._pending = true;
+        if (this._schedule) this._schedule(() => this.flush());
+        this._timer = setTimeout(() => this.flush(), FLUSH_TIMEOUT);
+    }
+
+    /**
+     * Sends everything queued as one frame. Called by the scheduler; safe to call
+     * directly.
+     */
+    flush() {
+        this._pending = false;
+        clearTimeout(this._timer);
+        this._timer = null;
+        if (this.queue.length === 0) return;
+        // Held while the relay is reconnecting
+        if (this.relay && !(this._socket && this._socket.readyState === 1)) return;
+
+        const messages = this.queue;
+        this.queue = [];
+        let frame;
+        try {
+            frame = encodeFrame(this.sender, messages);
+        } catch (e) {
+            console.error('[GEMINI] Dropped unencodable frame', e);
+            return;
+        }
+
+        if (this.relay) this._socket.send(frame);
+        else this.channel.postMessage(frame);
+
+        this.lastSent = Date.now();
+        this.stats.framesSent++;
+        this.stats.messagesSent += messages.length;
+        this.stats.bytesSent += frame.length;
+    }
+
+    _receive(data) {
+        let frame;
+        try {
+            frame = decodeFrame(data);
+        } catch (e) {
+            console.warn('[GEMINI] Ignored malformed frame', e.message);
+            return;
+        }
+        if (frame.sender === this.sender) return;
+        this.stats.framesReceived++;
+        if (!this.onmessage) return;
+        for (const { type, payload } of frame.messages) {
+            this.onmessage({ type, payload, sender: frame.sender });
+        }
+    }
+
+    // --- Relay ---
+
+    _connectRelay() {
+        const socket = new WebSocket(this.relay);
+        socket.binaryType = 'arraybuffer';
+        this._socket = socket;
+
+        socket.onopen = () => {
+            this._backoff = RECONNECT_MIN;
+            if (this.onconnect) this.onconnect();
+            this.flush();
+        };
+        socket.onmessage = (e) => this._receive(e.data);
+        socket.onclose = () => {
+            if (this._closed) return;
+            // Queued messages wait for the next connection
+            setTimeout(() => this._connectRelay(), this._backoff);
+            this._backoff = Math.min(this._backoff * 2, RECONNECT_MAX);
+        };
+    }
+
+    close() {
+        this._closed = true;
+        clearTimeout(this._timer);
+        if (this._socket) this._socket.close();
+        if (this.channel) this.channel.close();
+    }
+}
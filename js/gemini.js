@@ -1,48 +1,121 @@
 /**
  * Project GEMINI: Distributed Tactical Uplink Engine
  * Enables multi-window command and control via local synchronization.
+ *
+ * Messages go out through GeminiTransport, coalesced into one binary frame per
+ * animation frame. Ledgers converge by head hash: every peer announces its
+ * { length, hash } head, a peer that sees a longer head asks that peer for the
+ * threads after its own head, and the answer is appended only if it links on
+ * and verifies. Since heads are re-announced on (re)connect, a peer that was
+ * away fills the gap on its own. Diverged ledgers are left alone; scroll
+ * imports remain the way to replace one. Encrypted ledgers are never shared.
+ *
+ * Tabs of this browser talk over a BroadcastChannel. A relay hub is only used
+ * once the user links it (`gemini relay`), and only if it is same-origin or on
+ * the configured allowlist; the ledger stays off the relay until the user also
+ * opts in to sharing it (`gemini relay share`).
  */
 
+import { GeminiTransport } from './gemini-transport.js';
+
+const HEARTBEAT_INTERVAL = 3000;
+const PEER_TIMEOUT = 10000;
+const MAX_DELTA_THREADS = 2048; // Per answer; the requester asks again for the rest
+const REQUEST_TIMEOUT = 5000; // Before an unanswered gap request is retried
+
 export class GeminiEngine {
-    constructor(state, ledger, terminal, ui) {
-        this.channel = new BroadcastChannel('marq-tactical-link');
+    /**
+     * @param {Object} options - { relay } WebSocket URL of a relay hub offered
+     *   for linking (default: the ?relay= URL parameter); { relays } origins
+     *   allowed besides this page's own (each must also be in the page's CSP
+     *   connect-src)
+     */
+    constructor(state, ledger, terminal, ui, options = {}) {
         this.state = state;
         this.ledger = ledger;
         this.terminal = terminal;
         this.ui = ui;
 
         this.id = Math.random().toString(36).substring(2, 9);
-        this.peers = new Map(); // id -> { lastSeen, mode }
+        this.peers = new Map(); // id -> { lastSeen, mode, head }
         this.listeners = new Map();
+        this._requests = new Map(); // peer id -> time of the open gap request
+        this._published = null; // Last head announced to peers
 
-        this.channel.onmessage = (e) => this._handleMessage(e.data);
+        this.relays = options.relays || [];
+        // Offered relay; nothing connects to it until linkRelay()
+        this.relay = this._allowedRelay(options.relay || this._getRelay());
+        this.shareLedger = false; // Ledger sync over the relay, opt-in
+        this._openTransport(null);
 
-        // Periodic heartbeat to maintain peer list
+        // Any frame proves liveness, so heartbeats only go out on a quiet link
         this.heartbeatInterval = setInterval(() => {
-            this.broadcast('HEARTBEAT', {
-                ts: Date.now(),
-                mode: this._getMode()
-            });
+            if (Date.now() - this.transport.lastSent >= HEARTBEAT_INTERVAL - 100) {
+                this.broadcast('HEARTBEAT', {
+                    ts: Date.now(),
+                    mode: this._getMode()
+                });
+                this._announceHead();
+            }
             this._prunePeers();
-        }, 3000);
+        }, HEARTBEAT_INTERVAL);
 
         console.info(`[GEMINI] Uplink established. ID: ${this.id}`);
     }
 
+    /**
+     * Moves the uplink onto the offered relay. Called on explicit user opt-in
+     * only; with share the ledger is synced over the relay as well.
+     * @returns {boolean} False if no allowed relay was offered
+     */
+    linkRelay({ share = false } = {}) {
+        if (!this.relay) return false;
+        this.shareLedger = share;
+        if (this.transport.relay !== this.relay) {
+            this._openTransport(this.relay);
+        } else if (share) {
+            this._announceHead();
+        }
+        return true;
+    }
+
+    /**
+     * Drops the relay and goes back to the local channel.
+     */
+    unlinkRelay() {
+        this.shareLedger = false;
+        if (!this.transport.relay) return;
+        this._openTransport(null);
+        this.connect();
+    }
+
+    _openTransport(relay) {
+        if (this.transport) this.transport.close();
+        this.peers.clear();
+        this._requests.clear();
+        this._published = null;
+
+        this.transport = new GeminiTransport(this.id, { relay });
+        this.transport.onmessage = (msg) => this._handleMessage(msg);
+        // Fresh relay connection: re-announce so both sides fill any gap
+        this.transport.onconnect = () => this.connect();
+        this.channel = this.transport.channel;
+        this._updateUI();
+    }
+
     connect() {
         this.broadcast('HELLO', {
             id: this.id,
             mode: this._getMode()
         });
+        this._announceHead();
     }
 
+    /**
+     * Queues a message for the next frame (see GeminiTransport).
+     */
     broadcast(type, payload) {
-        this.channel.postMessage({
-            type,
-            payload,
-            sender: this.id,
-            timestamp: Date.now()
-        });
+        this.transport.send(type, payload);
     }
 
     addListener(type, callback) {
@@ -56,13 +129,37 @@ export class GeminiEngine {
         return this.peers.size;
     }
 
+    /**
+     * Pushes threads woven since the last announcement to every peer, then the
+     * new head. Call after a local append.
+     */
+    async publishLedger() {
+        const head = this._head();
+        if (!head) return;
+        const last = this._published;
+        if (last && head.length > last.length && head.length - last.length <= MAX_DELTA_THREADS) {
+            const threads = await this.ledger.getRange(last.length, head.length);
+            const linked = last.length === 0 ? 'GENESIS_HASH' : threads[0] && threads[0].previousHash;
+            // Only a straight extension of what peers last saw is pushed
+            if (threads.length > 0 && linked === last.hash) {
+                this.broadcast('LEDGER_DELTA', { to: '', from: last.length, base: last.hash, threads });
+            }
+        }
+        this._announceHead();
+    }
+
     _handleMessage(data) {
         const { type, payload, sender } = data;
         if (sender === this.id) return; // Ignore self
 
+        // Any traffic keeps a known peer alive
+        const known = this.peers.get(sender);
+        if (known) known.lastSeen = Date.now();
+
         // System messages
         if (type === 'HELLO' || type === 'HEARTBEAT') {
             this.peers.set(sender, {
+                ...known,
                 lastSeen: Date.now(),
                 mode: payload.mode
             });
@@ -75,6 +172,7 @@ export class GeminiEngine {
                     isEncrypted: this.ledger.status === 'LOCKED'
                     // Could share session key here if we implement secure handshake
                 });
+                this._announceHead();
             }
             this._updateUI();
             return;
@@ -82,6 +180,7 @@ export class GeminiEngine {
 
         if (type === 'WELCOME') {
              this.peers.set(sender, {
+                ...known,
                 lastSeen: Date.now(),
                 mode: payload.mode
             });
@@ -90,18 +189,95 @@ export class GeminiEngine {
             return;
         }
 
+        // Ledger sync
+        if (type === 'LEDGER_HEAD') return this._onHead(payload, sender);
+        if (type === 'LEDGER_REQUEST') return this._onRequest(payload, sender);
+        if (type === 'LEDGER_DELTA') return this._onDelta(payload, sender);
+
         // Custom listeners
+        this._emit(type, payload, sender);
+    }
+
+    _emit(type, payload, sender) {
         if (this.listeners.has(type)) {
             this.listeners.get(type).forEach(cb => cb(payload, sender));
         }
     }
 
+    // --- Ledger Sync ---
+
+    // Local head, or null while the ledger cannot be shared
+    _head() {
+        const ledger = this.ledger;
+        if (!ledger || ledger.status !== 'READY' || typeof ledger.getHead !== 'function') return null;
+        if (this.transport.relay && !this.shareLedger) return null;
+        if (ledger.crypto && ledger.crypto.hasSession()) return null;
+        return ledger.getHead();
+    }
+
+    _announceHead() {
+        const head = this._head();
+        if (!head) return;
+        this._published = head;
+        this.broadcast('LEDGER_HEAD', head);
+    }
+
+    _onHead(head, sender) {
+        const peer = this.peers.get(sender);
+        if (peer) peer.head = head;
+
+        const local = this._head();
+        if (!local || head.length <= local.length || head.hash === local.hash) return;
+
+        const pending = this._requests.get(sender);
+        if (pending && Date.now() - pending < REQUEST_TIMEOUT) return;
+        this._requests.set(sender, Date.now());
+        this.broadcast('LEDGER_REQUEST', { to: sender, from: local.length, hash: local.hash });
+    }
+
+    async _onRequest(request, sender) {
+        if (request.to !== this.id) return;
+        const local = this._head();
+        if (!local || request.from >= local.length) return;
+
+        const start = Math.max(0, request.from - 1);
+        const threads = await this.ledger.getRange(start, request.from + MAX_DELTA_THREADS);
+        const base = request.from === 0 ? 'GENESIS_HASH' : threads.shift().hash;
+        // A different link at their head means the ledgers forked
+        if (base !== request.hash) return;
+
+        this.broadcast('LEDGER_DELTA', { to: sender, from: request.from, base, threads });
+    }
+
+    async _onDelta(delta, sender) {
+        if (delta.to && delta.to !== this.id) return;
+        this._requests.delete(sender);
+        if (!this._head()) return;
+
+        let added;
+        try {
+            added = await this.ledger.mergeThreads(delta.threads, delta.base);
+        } catch (e) {
+            // Pushed deltas that do not fit are expected; heads sort those out
+            if (delta.to) console.warn(`[GEMINI] Rejected ledger delta from ${sender}: ${e.message}`);
+            return;
+        }
+        if (added === 0) return;
+
+        this._emit('LEDGER_SYNCED', { added, from: delta.from }, sender);
+        // More to fetch if their head is still ahead of ours
+        const peer = this.peers.get(sender);
+        if (peer && peer.head) this._onHead(peer.head, sender);
+        this._announceHead();
+    }
+
     _prunePeers() {
         const now = Date.now();
         let changed = false;
         for (const [id, peer] of this.peers) {
-            if (now - peer.lastSeen > 10000) { // 10s timeout
+            if (now - peer.lastSeen > PEER_TIMEOUT) {
                 this.peers.delete(id);
+                this._requests.delete(id);
                 changed = true;
             }
         }
@@ -113,6 +289,33 @@ export class GeminiEngine {
         return params.get('mode') || 'default';
     }
 
+    _getRelay() {
+        const params = new URLSearchParams(window.location.search);
+        return params.get('relay');
+    }
+
+    // Normalized relay URL, or null unless it is a ws(s) URL on this page's
+    // host or an allowlisted origin
+    _allowedRelay(url) {
+        if (!url) return null;
+        let parsed;
+        try {
+            parsed = new URL(url, window.location.href);
+        } catch (e) {
+            parsed = null;
+        }
+        if (!parsed || (parsed.protocol !== 'ws:' && parsed.protocol !== 'wss:')) {
+            console.warn(`[GEMINI] Ignored relay ${url}: Not a WebSocket URL`);
+            return null;
+        }
+        const page = window.location.host;
+        if (parsed.host !== page && !this.relays.includes(parsed.origin)) {
+            console.warn(`[GEMINI] Ignored relay ${url}: Not same-origin or allowlisted`);
+            return null;
+        }
+        return parsed.href;
+    }
+
     _updateUI() {
         // Update Link Indicator if UI exists
         if (this.ui && this.ui.updateGeminiStatus) {
@@ -2,14 +2,83 @@
 // Analyzes the TapestryLedger to project future trajectory and suggest strategic balance.
 
 export class HorizonEngine {
-    constructor() {
+    // options.memo: optional shared LedgerMemo for analyze() / project() results
+    constructor(options = {}) {
         this.intentions = ['serenity', 'vibrancy', 'awe', 'legacy'];
         this.times = ['dawn', 'midday', 'dusk', 'night'];
+        this.memo = options.memo || null;
     }
 
     // Analyzes the current thread history to determine dominant patterns
     analyze(threads) {
+        if (this.memo) {
+            return this.memo.get('horizon.analyze', threads, () => this._analyze(threads));
+        }
+        return this._analyze(threads);
+    }
+
+    _analyze(threads) {
         if (!threads || threads.length === 0) {
+            return this.summarize(this.createState());
+        }
+        return this.summarize(this.accumulate(threads));
+    }
+
+    // --- Running Aggregates ---
+    // analyze() is a fold over the ledger. Exposing the fold state lets callers
+    // (Chronos) keep a baseline and apply single threads in O(1).
+
+    createState() {
+        return {
+            counts: { serenity: 0, vibrancy: 0, awe: 0, legacy: 0 },
+            total: 0,
+            streak: 0,
+            lastIntention: null
+        };
+    }
+
+    cloneState(state) {
+        return {
+            counts: { ...state.counts },
+            total: state.total,
+            streak: state.streak,
+            lastIntention: state.lastIntention
+        };
+    }
+
+    // Folds threads[start..end) into state (mutates and returns it)
+    accumulate(threads, state = this.createState(), start = 0, end = threads.length) {
+        for (let i = start; i < end; i++) {
+            this._push(state, threads[i]);
+        }
+        return state;
+    }
+
+    // Returns a new state with one thread applied; the input state is untouched
+    extend(state, thread) {
+        const next = this.cloneState(state);
+        this._push(next, thread);
+        return next;
+    }
+
+    _push(state, t) {
+        if (state.counts[t.intention] !== undefined) {
+            state.counts[t.intention]++;
+        }
+
+        if (t.intention === state.lastIntention) {
+            state.streak++;
+        } else {
+            state.streak = 1;
+        }
+        state.lastIntention = t.intention;
+        state.total++;
+    }
+
+    // Converts fold state into the public analysis report
+    summarize(state) {
+        const total = state.total;
+        if (total === 0) {
             return {
                 dominance: { intention: 'None', percent: 0 },
                 counts: {},
@@ -18,27 +87,11 @@ export class HorizonEngine {
             };
         }
 
-        const counts = { serenity: 0, vibrancy: 0, awe: 0, legacy: 0 };
-        let lastIntention = null;
-        let streak = 0;
-
-        threads.forEach((t) => {
-            if (counts[t.intention] !== undefined) {
-                counts[t.intention]++;
-            }
-
-            if (t.intention === lastIntention) {
-                streak++;
-            } else {
-                streak = 1;
-            }
-            lastIntention = t.intention;
-        });
+        const counts = { ...state.counts };
 
         // Calculate Dominance
         let maxCount = 0;
         let dominantIntention = 'None';
-        let total = threads.length;
 
         for (const [key, value] of Object.entries(counts)) {
             if (value > maxCount) {
@@ -68,14 +121,21 @@ export class HorizonEngine {
             },
             counts: counts,
             balanceScore: balanceScore,
-            streak: streak,
-            lastIntention: lastIntention
+            streak: state.streak,
+            lastIntention: state.lastIntention
         };
     }
 
     // Generates "Ghost Threads" - potential future states
     project(threads) {
         if (!threads || threads.length === 0) return [];
+        if (this.memo) {
+            return this.memo.get('horizon.project', threads, () => this._project(threads));
+        }
+        return this._project(threads);
+    }
+
+    _project(threads) {
 
         const analysis = this.analyze(threads);
         const projections = [];
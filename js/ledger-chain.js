@@ -0,0 +1,274 @@
+/**
+ * Ledger Chain // Hashing, Validation & Streaming Scroll Import
+ *
+ * Shared by TapestryLedger (main thread) and scroll.worker.js. Scrolls are read
+ * as a byte stream: a small incremental scanner cuts the top-level JSON array
+ * into one object per thread, so memory tracks the parsed threads rather than
+ * the file text, and threads are schema-checked and hash-verified in batches
+ * while the rest of the file is still being read. Binary scrolls (see
+ * scroll-codec.js) go through the same batch checks.
+ */
+
+import { isBinaryScroll, openScroll } from './scroll-codec.js';
+
+export const MAX_SCROLL_BYTES = 256 * 1024 * 1024;
+export const MAX_SCROLL_THREADS = 1000000;
+const VERIFY_BATCH = 1024; // Threads per validate + hash batch (and progress report)
+
+export function toHex(bytes) {
+    let hex = '';
+    for (let i = 0; i < bytes.length; i++) {
+        hex += (bytes[i] < 16 ? '0' : '') + bytes[i].toString(16);
+    }
+    return hex;
+}
+
+export async function sha256(message) {
+    const msgBuffer = new TextEncoder().encode(message);
+    const hashBuffer = await crypto.subtle.digest('SHA-256', msgBuffer);
+    return toHex(new Uint8Array(hashBuffer));
+}
+
+// Canonical hashed payload of a thread, given the hash it links to
+export function linkPayload(thread, previousHash) {
+    return JSON.stringify({
+        intention: thread.intention,
+        time: thread.time,
+        region: thread.region,
+        title: thread.title,
+        timestamp: thread.timestamp,
+        previousHash: previousHash
+    });
+}
+
+// --- Schema ---
+
+const VALID_INTENTIONS = new Set(['serenity', 'vibrancy', 'awe', 'legacy', 'unknown']);
+const VALID_TIMES = new Set(['dawn', 'midday', 'dusk', 'night', 'unknown']);
+// Alpha-numeric + specific safe chars. Prevents script injection via title/region
+// if they are rendered anywhere sensitive.
+const SAFE_TEXT = /^[a-zA-Z0-9\s\-_.,!?'"()]+$/;
+const HEX_HASH = /^[a-f0-9]{64}$/i;
+
+export function validateThread(thread) {
+    if (!thread || typeof thread !== 'object') return false;
+
+    // Type checks
+    if (typeof thread.id !== 'string') return false;
+    if (typeof thread.intention !== 'string') return false;
+    if (typeof thread.time !== 'string') return false;
+    if (typeof thread.region !== 'string') return false;
+    if (typeof thread.title !== 'string') return false;
+    if (typeof thread.hash !== 'string') return false;
+    if (typeof thread.timestamp !== 'number') return false;
+
+    // Content checks (Sanitization / Whitelisting)
+    if (thread.id.length > 32) return false;
+    if (thread.title.length > 100) return false;
+    if (thread.region.length > 50) return false;
+    if (!SAFE_TEXT.test(thread.title)) return false;
+    if (!SAFE_TEXT.test(thread.region)) return false;
+
+    // Enum checks
+    if (!VALID_INTENTIONS.has(thread.intention)) return false;
+    if (!VALID_TIMES.has(thread.time)) return false;
+
+    // Hash format check (Hex)
+    return HEX_HASH.test(thread.hash);
+}
+
+// --- Chain Verification ---
+
+/**
+ * Verifies a chain batch by batch. Each link's previousHash is its
+ * predecessor's stored hash, so a batch's digests run concurrently.
+ */
+export class ChainVerifier {
+    constructor(previousHash = 'GENESIS_HASH') {
+        this.previousHash = previousHash;
+        this.count = 0;
+    }
+
+    /**
+     * @returns {Promise<Object|null>} { index, calculatedHash } of the first bad link
+     */
+    async verify(batch) {
+        const digests = batch.map((thread, k) =>
+            sha256(linkPayload(thread, k === 0 ? this.previousHash : batch[k - 1].hash))
+        );
+        const hashes = await Promise.all(digests);
+        for (let k = 0; k < hashes.length; k++) {
+            if (hashes[k] !== batch[k].hash) {
+                return { index: this.count + k, calculatedHash: hashes[k] };
+            }
+        }
+        if (batch.length > 0) this.previousHash = batch[batch.length - 1].hash;
+        this.count += batch.length;
+        return null;
+    }
+}
+
+// --- Streaming Parser ---
+
+const QUOTE = 34;
+const BACKSLASH = 92;
+const COMMA = 44;
+const LBRACE = 123;
+const RBRACE = 125;
+const LBRACKET = 91;
+const RBRACKET = 93;
+
+/**
+ * Incremental scanner for a top-level JSON array of objects.
+ * push() takes text chunks split anywhere and returns the objects completed so
+ * far; only the text of the object in progress is buffered.
+ */
+export class ScrollParser {
+    constructor() {
+        this.depth = 0;
+        this.inString = false;
+        this.escape = false;
+        this.expect = 'root'; // root | first | value | separator | end
+        this.pending = '';
+    }
+
+    push(chunk) {
+        const out = [];
+        let start = this.depth >= 2 ? 0 : -1;
+
+        for (let i = 0; i < chunk.length; i++) {
+            const c = chunk.charCodeAt(i);
+
+            if (this.inString) {
+                if (this.escape) this.escape = false;
+                else if (c === BACKSLASH) this.escape = true;
+                else if (c === QUOTE) this.inString = false;
+                continue;
+            }
+
+            if (this.depth >= 2) {
+                if (c === QUOTE) {
+                    this.inString = true;
+                } else if (c === LBRACE || c === LBRACKET) {
+                    this.depth++;
+                } else if (c === RBRACE || c === RBRACKET) {
+                    this.depth--;
+                    if (this.depth === 1) {
+                        out.push(JSON.parse(this.pending + chunk.slice(start, i + 1)));
+                        this.pending = '';
+                        start = -1;
+                        this.expect = 'separator';
+                    }
+                }
+                continue;
+            }
+
+            // Structural position: root or between array elements
+            if (c === 32 || c === 10 || c === 13 || c === 9) continue;
+
+            if (this.expect === 'root' && c === LBRACKET) {
+                this.depth = 1;
+                this.expect = 'first';
+            } else if ((this.expect === 'first' || this.expect === 'value') && c === LBRACE) {
+                this.depth = 2;
+                start = i;
+            } else if (this.expect === 'separator' && c === COMMA) {
+                this.expect = 'value';
+            } else if ((this.expect === 'first' || this.expect === 'separator') && c === RBRACKET) {
+                this.depth = 0;
+                this.expect = 'end';
+            } else if (this.expect === 'root') {
+                throw new Error('Invalid format: Root must be an array');
+            } else {
+                throw new Error('Invalid format: Scroll must be an array of thread objects');
+            }
+        }
+
+        if (start >= 0) this.pending += chunk.slice(start);
+        return out;
+    }
+
+    finish() {
+        if (this.expect !== 'end') throw new Error('Invalid format: Truncated scroll');
+    }
+}
+
+/**
+ * Streams a scroll Blob/File: parse, schema-check and hash-verify in batches.
+ * Accepts JSON scrolls and binary (MQSC) scrolls, detected by their magic.
+ * Throws on the first invalid thread or broken link; nothing is returned
+ * (or committed by the caller) unless the whole scroll checks out.
+ * @param {Blob} blob
+ * @param {Object} options - { maxThreads, onProgress({ threads, bytes, totalBytes }) }
+ * @returns {Promise<Array>} The verified threads
+ */
+export async function readScroll(blob, options = {}) {
+    const maxThreads = options.maxThreads || MAX_SCROLL_THREADS;
+    const onProgress = options.onProgress || null;
+
+    const verifier = new ChainVerifier();
+    const threads = [];
+    let batch = [];
+    let bytes = 0;
+
+    const flush = async () => {
+        for (let k = 0; k < batch.length; k++) {
+            if (!validateThread(batch[k])) {
+                throw new Error(
+                    `Invalid schema or data types in imported threads (thread ${threads.length + k})`
+                );
+            }
+        }
+        const failure = await verifier.verify(batch);
+        if (failure) {
+            throw new Error(`Integrity check failed for imported scroll (thread ${failure.index})`);
+        }
+        for (const thread of batch) threads.push(thread);
+        batch = [];
+        if (onProgress) onProgress({ threads: threads.length, bytes, totalBytes: blob.size });
+    };
+
+    const take = async (parsed) => {
+        for (const thread of parsed) {
+            batch.push(thread);
+            if (threads.length + batch.length > maxThreads) {
+                throw new Error(`Too many threads in scroll (Limit: ${maxThreads})`);
+            }
+            if (batch.length >= VERIFY_BATCH) await flush();
+        }
+    };
+
+    const head = new Uint8Array(await blob.slice(0, 4).arrayBuffer());
+    if (isBinaryScroll(head)) {
+        // Binary scrolls are small enough to inflate whole; threads are still
+        // decoded lazily and verified batch by batch
+        const scroll = await openScroll(new Uint8Array(await blob.arrayBuffer()));
+        if (scroll.count > maxThreads) {
+            throw new Error(`Too many threads in scroll (Limit: ${maxThreads})`);
+        }
+        for (const thread of scroll.threads) {
+            batch.push(thread);
+            if (batch.length >= VERIFY_BATCH) {
+                bytes = Math.round(((threads.length + batch.length) / scroll.count) * blob.size);
+                await flush();
+            }
+        }
+        bytes = blob.size;
+        await flush();
+        return threads;
+    }
+
+    const parser = new ScrollParser();
+    const decoder = new TextDecoder();
+    const reader = blob.stream().getReader();
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        bytes += value.length;
+        await take(parser.push(decoder.decode(value, { stream: true })));
+    }
+    await take(parser.push(decoder.decode()));
+    parser.finish();
+    await flush();
+    return threads;
+}
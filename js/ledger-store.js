@@ -0,0 +1,339 @@
+/**
+ * Ledger Store // Append-Only Segment Storage
+ *
+ * Persists the TapestryLedger as segments in IndexedDB instead of one JSON
+ * blob in localStorage. A weave writes a single one-thread segment; once a
+ * full SEGMENT_SIZE run of appends has accumulated it is compacted into one
+ * segment in the background. Reads fetch only the segments covering a range,
+ * so the ledger can page in its tail first and the rest later.
+ *
+ * Segment payloads go through a codec ({ encrypted, seal, open }) supplied by
+ * the ledger, which keeps encryption out of the store.
+ */
+
+export const SEGMENT_SIZE = 256; // Threads per compacted segment
+
+export const PLAIN_CODEC = {
+    encrypted: false,
+    seal: (threads) => ({ threads }),
+    open: (record) => {
+        if (!record.threads) throw new Error('Segment is encrypted');
+        return record.threads;
+    }
+};
+
+/**
+ * The ledger moved between reading its meta and committing an append (another
+ * tab appended first). Nothing was written.
+ */
+export class LedgerConflictError extends Error {
+    constructor(expected, actual) {
+        super(`Ledger moved: expected length ${expected}, found ${actual}`);
+        this.name = 'LedgerConflictError';
+        this.expected = expected;
+        this.actual = actual;
+    }
+}
+
+export class LedgerStore {
+    /**
+     * Returns an IndexedDB-backed store, or null where IndexedDB is unavailable
+     * (callers fall back to localStorage).
+     */
+    static create(name) {
+        if (typeof indexedDB === 'undefined') return null;
+        return new LedgerStore(new IndexedDBBackend(name));
+    }
+
+    /**
+     * @param {Object} backend - IndexedDBBackend or MemoryBackend
+     * @param {Object} options - { segmentSize }
+     */
+    constructor(backend, options = {}) {
+        this.backend = backend;
+        this.segmentSize = options.segmentSize || SEGMENT_SIZE;
+        this._queue = Promise.resolve();
+    }
+
+    // Serializes operations so reads never observe a half-finished compaction
+    _enqueue(op) {
+        const run = this._queue.then(op);
+        this._queue = run.catch(() => {});
+        return run;
+    }
+
+    /**
+     * @returns {Promise<Object|null>} { length, compacted, encrypted, headHash }
+     */
+    getMeta() {
+        return this._enqueue(async () => (await this.backend.getMeta()) || null);
+    }
+
+    /**
+     * Writes one thread as its own segment. Compaction is queued behind it but
+     * not awaited, so a weave only pays for its own record.
+     *
+     * The record and the new meta commit in one readwrite transaction that first
+     * checks the stored length is still the one the record was built for, so two
+     * tabs appending at once never write the same slot. When another tab got
+     * there first the append is rebuilt on the new head, or, when `at` is given,
+     * rejected with a LedgerConflictError.
+     * @param {Object} thread
+     * @param {Object} codec
+     * @param {number|null} at - Index the thread must land at (its chain position)
+     */
+    async append(thread, codec = PLAIN_CODEC, at = null) {
+        const meta = await this._enqueue(async () => {
+            for (;;) {
+                const meta = (await this.backend.getMeta()) || {
+                    length: 0,
+                    compacted: 0,
+                    encrypted: codec.encrypted,
+                    headHash: null
+                };
+                if (at !== null && meta.length !== at) throw new LedgerConflictError(at, meta.length);
+
+                const record = { start: meta.length, count: 1, ...(await codec.seal([thread])) };
+                const next = { ...meta, length: meta.length + 1, headHash: thread.hash };
+                try {
+                    await this.backend.commit({ meta: next, put: [record], expectLength: meta.length });
+                    return next;
+                } catch (e) {
+                    if (!(e instanceof LedgerConflictError)) throw e;
+                }
+            }
+        });
+
+        if (meta.length - meta.compacted >= this.segmentSize) {
+            this._enqueue(() => this._compact(codec)).catch((e) =>
+                console.error('Ledger compaction failed', e)
+            );
+        }
+        return meta;
+    }
+
+    /**
+     * Rewrites the whole ledger (import, clear, migration, encryption changes).
+     */
+    replace(threads, codec = PLAIN_CODEC) {
+        return this._enqueue(async () => {
+            const size = this.segmentSize;
+            const put = [];
+            for (let start = 0; start < threads.length; start += size) {
+                const chunk = threads.slice(start, start + size);
+                put.push({ start, count: chunk.length, ...(await codec.seal(chunk)) });
+            }
+            await this.backend.commit({
+                clear: true,
+                meta: {
+                    length: threads.length,
+                    compacted: Math.floor(threads.length / size) * size,
+                    encrypted: codec.encrypted,
+                    headHash: threads.length ? threads[threads.length - 1].hash : null
+                },
+                put
+            });
+        });
+    }
+
+    /**
+     * Reads threads [from, to) from the segments covering that range.
+     */
+    readRange(from, to, codec = PLAIN_CODEC) {
+        return this._enqueue(async () => {
+            if (to <= from) return [];
+            // No segment holds more than segmentSize threads, so this lower bound
+            // catches a segment that starts before `from` but overlaps it
+            const records = await this.backend.getSegments(Math.max(0, from - this.segmentSize + 1), to);
+            const out = [];
+            for (const record of records) {
+                if (record.start + record.count <= from) continue;
+                const threads = await codec.open(record);
+                for (let k = Math.max(0, from - record.start); k < threads.length && record.start + k < to; k++) {
+                    out.push(threads[k]);
+                }
+            }
+            return out;
+        });
+    }
+
+    /**
+     * Returns the CryptoKey kept under name, storing candidate if there is none
+     * yet. Keys are stored as CryptoKey objects, so a non-extractable key never
+     * exists as bytes in storage. When two tabs race, the first stored key wins.
+     */
+    keepKey(name, candidate) {
+        return this.backend.keepKey(name, candidate);
+    }
+
+    // Meta is re-read for every run and the commit is guarded like an append, so
+    // an append from another tab while a run is being sealed is never overwritten;
+    // the run is rebuilt against the new meta instead.
+    async _compact(codec) {
+        const size = this.segmentSize;
+        for (;;) {
+            const meta = await this.backend.getMeta();
+            if (!meta || meta.length - meta.compacted < size) return;
+
+            const start = meta.compacted;
+            const end = start + size;
+            const records = await this.backend.getSegments(start, end);
+            const threads = [];
+            for (const record of records) {
+                threads.push(...(await codec.open(record)));
+            }
+            if (threads.length !== size) return; // Inconsistent run; the next replace() rewrites it
+
+            try {
+                await this.backend.commit({
+                    meta: { ...meta, compacted: end },
+                    // Overwrites the first record of the run (same key) and drops the rest
+                    put: [{ start, count: size, ...(await codec.seal(threads)) }],
+                    remove: records.filter((r) => r.start !== start).map((r) => r.start),
+                    expectLength: meta.length
+                });
+            } catch (e) {
+                if (!(e instanceof LedgerConflictError)) throw e;
+            }
+        }
+    }
+}
+
+// --- Backends ---
+// Both expose getMeta(), getSegments(lower, upper) for segment starts in
+// [lower, upper) ascending, commit({ clear, meta, put, remove, expectLength })
+// applied atomically (nothing is written and LedgerConflictError is thrown when
+// expectLength is set and the stored length differs), and keepKey(name, candidate)
+// for CryptoKeys kept beside the ledger.
+
+function request(req) {
+    return new Promise((resolve, reject) => {
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+export class IndexedDBBackend {
+    constructor(name) {
+        this.name = name;
+        this._db = null; // Opened on first use
+    }
+
+    _open() {
+        if (!this._db) {
+            this._db = new Promise((resolve, reject) => {
+                const req = indexedDB.open(this.name, 2);
+                req.onupgradeneeded = (e) => {
+                    const db = req.result;
+                    if (e.oldVersion < 1) {
+                        db.createObjectStore('segments', { keyPath: 'start' });
+                        db.createObjectStore('meta');
+                    }
+                    if (e.oldVersion < 2) db.createObjectStore('keys');
+                };
+                req.onsuccess = () => resolve(req.result);
+                req.onerror = () => reject(req.error);
+            });
+        }
+        return this._db;
+    }
+
+    async getMeta() {
+        const db = await this._open();
+        return request(db.transaction('meta').objectStore('meta').get('ledger'));
+    }
+
+    async getSegments(lower, upper) {
+        if (upper <= lower) return [];
+        const db = await this._open();
+        const range = IDBKeyRange.bound(lower, upper, false, true);
+        return request(db.transaction('segments').objectStore('segments').getAll(range));
+    }
+
+    async commit({ clear = false, meta = null, put = [], remove = [], expectLength = null }) {
+        const db = await this._open();
+        const tx = db.transaction(['segments', 'meta'], 'readwrite');
+        const segments = tx.objectStore('segments');
+        const write = () => {
+            if (clear) segments.clear();
+            remove.forEach((key) => segments.delete(key));
+            put.forEach((record) => segments.put(record));
+            if (meta) tx.objectStore('meta').put(meta, 'ledger');
+        };
+
+        let conflict = null;
+        if (expectLength === null) {
+            write();
+        } else {
+            // Read and write in the same transaction, so no other tab can commit between
+            const req = tx.objectStore('meta').get('ledger');
+            req.onsuccess = () => {
+                const length = req.result ? req.result.length : 0;
+                if (length === expectLength) {
+                    write();
+                } else {
+                    conflict = new LedgerConflictError(expectLength, length);
+                    tx.abort();
+                }
+            };
+        }
+
+        return new Promise((resolve, reject) => {
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(conflict || tx.error);
+            tx.onabort = () => reject(conflict || tx.error);
+        });
+    }
+
+    async keepKey(name, candidate) {
+        const db = await this._open();
+        const tx = db.transaction('keys', 'readwrite');
+        const keys = tx.objectStore('keys');
+        let kept = candidate;
+        const req = keys.get(name);
+        req.onsuccess = () => {
+            if (req.result) kept = req.result;
+            else keys.put(candidate, name);
+        };
+
+        return new Promise((resolve, reject) => {
+            tx.oncomplete = () => resolve(kept);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+}
+
+// In-memory backend with the same copy semantics as IndexedDB (tests, diagnostics)
+export class MemoryBackend {
+    constructor() {
+        this.meta = null;
+        this.segments = new Map();
+        this.keys = new Map();
+    }
+
+    async getMeta() {
+        return this.meta ? { ...this.meta } : null;
+    }
+
+    async getSegments(lower, upper) {
+        return [...this.segments.values()]
+            .filter((r) => r.start >= lower && r.start < upper)
+            .sort((a, b) => a.start - b.start)
+            .map((r) => structuredClone(r));
+    }
+
+    async commit({ clear = false, meta = null, put = [], remove = [], expectLength = null }) {
+        const length = this.meta ? this.meta.length : 0;
+        if (expectLength !== null && length !== expectLength) throw new LedgerConflictError(expectLength, length);
+        if (clear) this.segments.clear();
+        remove.forEach((key) => this.segments.delete(key));
+        put.forEach((record) => this.segments.set(record.start, structuredClone(record)));
+        if (meta) this.meta = { ...meta };
+    }
+
+    async keepKey(name, candidate) {
+        if (!this.keys.has(name)) this.keys.set(name, candidate);
+        return this.keys.get(name);
+    }
+}
@@ -0,0 +1,108 @@
+// Location Index: precomputed lookups over the location table in data.js.
+// Location keys are 'intention.region.time'; they are split once here into
+// nested Maps, so Oracle, Prometheus and Cartographer resolve a thread or a
+// projection without building or splitting key strings. Per-thread map
+// coordinates are cached by hash, since a thread's fields never change.
+
+import { locations as defaultLocations } from './data.js';
+
+// Region fallbacks for threads with no exact location (0-100 map space)
+const REGION_FALLBACKS = new Map([
+    ['coast', { x: 25, y: 55 }],
+    ['medina', { x: 60, y: 30 }],
+    ['sahara', { x: 75, y: 75 }]
+]);
+const CENTER = { x: 50, y: 50 };
+const MAX_CACHED = 1 << 20; // Hash cache entries before it starts over
+
+const indexes = new WeakMap(); // locations object -> LocationIndex
+
+export class LocationIndex {
+    /**
+     * Shared index for a locations table (one per table object).
+     * @param {Object} locations - Defaults to the data.js table
+     */
+    static for(locations = defaultLocations) {
+        if (!locations || typeof locations !== 'object') return EMPTY_INDEX;
+        let index = indexes.get(locations);
+        if (!index) {
+            index = new LocationIndex(locations);
+            indexes.set(locations, index);
+        }
+        return index;
+    }
+
+    constructor(locations) {
+        this._byKey = new Map(); // intention -> region -> time -> entry
+        this._byIntentionTime = new Map(); // intention -> time -> first entry
+        this._coords = new Map(); // thread hash -> coordinates
+
+        for (const [key, location] of Object.entries(locations || {})) {
+            if (!location) continue;
+            const [intention, region, time] = key.split('.');
+            const entry = {
+                key,
+                intention,
+                region,
+                time,
+                title: location.title,
+                coordinates: location.coordinates
+            };
+
+            let regions = this._byKey.get(intention);
+            if (!regions) this._byKey.set(intention, (regions = new Map()));
+            let times = regions.get(region);
+            if (!times) regions.set(region, (times = new Map()));
+            times.set(time, entry);
+
+            let byTime = this._byIntentionTime.get(intention);
+            if (!byTime) this._byIntentionTime.set(intention, (byTime = new Map()));
+            // Table order decides between regions sharing an intention and time
+            if (!byTime.has(time)) byTime.set(time, entry);
+        }
+    }
+
+    /**
+     * @returns {Object|null} { key, intention, region, time, title, coordinates }
+     */
+    get(intention, region, time) {
+        const regions = this._byKey.get(intention);
+        const times = regions && regions.get(region);
+        return (times && times.get(time)) || null;
+    }
+
+    /**
+     * First location for an intention at a time of day, in any region.
+     * @returns {Object|null}
+     */
+    find(intention, time) {
+        const byTime = this._byIntentionTime.get(intention);
+        return (byTime && byTime.get(time)) || null;
+    }
+
+    /**
+     * Map coordinates (0-100 space) of a thread: its exact location, else its
+     * region's fallback, else the map centre. Cached by thread hash.
+     */
+    threadCoords(thread) {
+        const hash = thread.hash;
+        if (hash) {
+            const cached = this._coords.get(hash);
+            if (cached) return cached;
+        }
+
+        const entry = this.get(thread.intention, thread.region, thread.time);
+        const coords = (entry && entry.coordinates) || REGION_FALLBACKS.get(thread.region) || CENTER;
+
+        if (hash) {
+            if (this._coords.size >= MAX_CACHED) this._coords.clear();
+            this._coords.set(hash, coords);
+        }
+        return coords;
+    }
+}
+
+const EMPTY_INDEX = new LocationIndex({});
+
+// The index over data.js, shared by every engine
+export const locationIndex = LocationIndex.for(defaultLocations);
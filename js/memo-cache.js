@@ -0,0 +1,91 @@
+/**
+ * Ledger Memo // Shared Analysis Cache
+ *
+ * Engines derive their outputs (Horizon analysis and projections, Sentinel
+ * threats, Cortex graphs, Oracle maps) purely from the ledger. Every thread's
+ * hash chains over its predecessors, so (length, head hash) identifies a
+ * ledger's full contents and is enough to key those outputs. Entries are
+ * evicted least-recently-used once the cache is full.
+ *
+ * Cached values are shared between callers and must be treated as read-only.
+ */
+
+export class LedgerMemo {
+    /**
+     * @param {Object} options - { maxEntries } bound across all namespaces
+     */
+    constructor(options = {}) {
+        this.maxEntries = options.maxEntries || 64;
+        this.entries = new Map(); // Insertion order doubles as recency order
+        this.hits = 0;
+        this.misses = 0;
+    }
+
+    /**
+     * Identity key for a ledger, or null when it cannot be keyed safely
+     * (unhashed threads, e.g. legacy data before migration).
+     */
+    static keyFor(threads) {
+        if (!threads) return null;
+        const length = threads.length;
+        if (length === 0) return '0:';
+        const head = threads[length - 1];
+        if (!head || typeof head.hash !== 'string') return null;
+        return `${length}:${head.hash}`;
+    }
+
+    /**
+     * Returns the cached value for (namespace, ledger), computing it on a miss.
+     * @param {string} namespace - Output name, e.g. 'horizon.analyze'
+     * @param {Array} threads - The ledger (or ledger prefix) the value derives from
+     * @param {Function} compute - Produces the value on a miss
+     */
+    get(namespace, threads, compute) {
+        const ledgerKey = LedgerMemo.keyFor(threads);
+        if (ledgerKey === null) {
+            this.misses++;
+            return compute();
+        }
+
+        const key = `${namespace}|${ledgerKey}`;
+        if (this.entries.has(key)) {
+            const value = this.entries.get(key);
+            // Refresh recency
+            this.entries.delete(key);
+            this.entries.set(key, value);
+            this.hits++;
+            return value;
+        }
+
+        this.misses++;
+        const value = compute();
+        this.entries.set(key, value);
+        if (this.entries.size > this.maxEntries) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+        return value;
+    }
+
+    /**
+     * Drops cached values, optionally only those of one namespace.
+     */
+    invalidate(namespace = null) {
+        if (namespace === null) {
+            this.entries.clear();
+            return;
+        }
+        const prefix = `${namespace}|`;
+        for (const key of [...this.entries.keys()]) {
+            if (key.startsWith(prefix)) this.entries.delete(key);
+        }
+    }
+
+    stats() {
+        return {
+            size: this.entries.size,
+            maxEntries: this.maxEntries,
+            hits: this.hits,
+            misses: this.misses
+        };
+    }
+}
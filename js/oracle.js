@@ -1,12 +1,16 @@
 // The Oracle Interface: Strategic Operations & Geospatial Integration
 // Bridges the Horizon Engine (Forecast) and Cartographer (Map) to provide actionable intelligence.
 
+import { LocationIndex } from './location-index.js';
+
 export class OracleEngine {
-    constructor(horizon, mapRenderer, locations) {
+    constructor(horizon, mapRenderer, locations, options = {}) {
         this.horizon = horizon;
         this.mapRenderer = mapRenderer;
         this.locations = locations;
+        this.locationIndex = LocationIndex.for(locations);
         this.activeMode = false;
+        this.memo = options.memo || null; // Optional shared LedgerMemo
 
         // Base coordinates for Intentions (Fallbacks)
         this.baseCoordinates = {
@@ -25,6 +29,13 @@ export class OracleEngine {
 
     // Generates actionable strategic options based on Horizon projections
     generateStrategicMap(threads) {
+        if (this.memo) {
+            return this.memo.get('oracle.map', threads, () => this._generateStrategicMap(threads));
+        }
+        return this._generateStrategicMap(threads);
+    }
+
+    _generateStrategicMap(threads) {
         const projections = this.horizon.project(threads);
 
         // Augment ghosts with geospatial data
@@ -48,17 +59,14 @@ export class OracleEngine {
 
     // Resolves a specific location key or falls back to a base of operations
     _resolveLocation(intention, time) {
-        // 1. Try to find exact match in known data
-        // Keys are intention.region.time
-        for (const [key, data] of Object.entries(this.locations)) {
-            const parts = key.split('.');
-            if (parts[0] === intention && parts[2] === time) {
-                return {
-                    coordinates: data.coordinates,
-                    region: parts[1],
-                    title: data.title
-                };
-            }
+        // 1. Known location for this intention and time (any region)
+        const location = this.locationIndex.find(intention, time);
+        if (location) {
+            return {
+                coordinates: location.coordinates,
+                region: location.region,
+                title: location.title
+            };
         }
 
         // 2. Fallback: Base of Operations
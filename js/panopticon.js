@@ -1,3 +1,80 @@
+// Panopticon: tactical replay of captured states.
+// Snapshots live in a bounded ring buffer. Every snapshot keeps its counts;
+// keyframes also keep the Sentinel report and the Horizon fold state. A
+// scrub rebuilds Horizon from the nearest keyframe over the threads woven
+// since, and reads the report from Sentinel's threat timeline, so replay
+// never re-analyzes the ledger or touches the live Sentinel state.
+
+const MAX_SNAPSHOTS = 512;
+const KEYFRAME_INTERVAL = 16; // Snapshots per keyframe
+
+/**
+ * Bounded ring buffer of snapshots, oldest first. Capture times never
+ * decrease, so lookups by time are binary searches.
+ */
+export class SnapshotStore {
+    constructor(capacity = MAX_SNAPSHOTS) {
+        this.capacity = capacity;
+        this.items = new Array(capacity);
+        this.start = 0; // Slot of the oldest snapshot
+        this.length = 0;
+    }
+
+    get(index) {
+        if (index < 0 || index >= this.length) return undefined;
+        return this.items[(this.start + index) % this.capacity];
+    }
+
+    last() {
+        return this.get(this.length - 1);
+    }
+
+    /**
+     * Appends a snapshot, overwriting the oldest when full.
+     * @returns {Object|null} The evicted snapshot
+     */
+    push(snapshot) {
+        if (this.length < this.capacity) {
+            this.items[(this.start + this.length) % this.capacity] = snapshot;
+            this.length++;
+            return null;
+        }
+        const evicted = this.items[this.start];
+        this.items[this.start] = snapshot;
+        this.start = (this.start + 1) % this.capacity;
+        return evicted;
+    }
+
+    /**
+     * Index of the last snapshot taken at or before time, or -1.
+     */
+    indexAt(time) {
+        let lo = 0;
+        let hi = this.length - 1;
+        let found = -1;
+        while (lo <= hi) {
+            const mid = (lo + hi) >> 1;
+            if (this.get(mid).time <= time) {
+                found = mid;
+                lo = mid + 1;
+            } else {
+                hi = mid - 1;
+            }
+        }
+        return found;
+    }
+
+    /**
+     * Index of the nearest keyframe at or before index, or -1.
+     */
+    keyframeAt(index) {
+        for (let i = Math.min(index, this.length - 1); i >= 0; i--) {
+            if (this.get(i).keyframe) return i;
+        }
+        return -1;
+    }
+}
+
 export class PanopticonEngine {
     /**
      * @param {Object} ledger - TapestryLedger instance
@@ -11,12 +88,13 @@ export class PanopticonEngine {
         this.renderers = renderers;
         this.ui = ui;
 
-        this.snapshots = [];
+        this.horizon = sentinel.horizon;
+
+        this.snapshots = new SnapshotStore(MAX_SNAPSHOTS);
         this.currentIndex = -1; // -1 indicates LIVE mode
         this.isReplaying = false;
-
-        // Configuration
-        this.MAX_SNAPSHOTS = 100; // Circular buffer size if needed, though session length usually small
+        this.replayState = null; // Rebuilt state of the snapshot on screen
+        this._sinceKeyframe = 0;
 
         this._initUI();
     }
@@ -24,26 +102,55 @@ export class PanopticonEngine {
     /**
      * Captures the current state of the tactical environment.
      * Should be called after every successful weave or significant event.
+     * Capturing an unchanged ledger again is a no-op.
      */
     capture() {
-        const threads = this.ledger.getThreads();
-        const report = this.sentinel.getReport();
+        const threads = this.ledger.getView();
+        const count = threads.length;
+        const head = count > 0 ? threads[count - 1].hash || null : null;
+        const last = this.snapshots.last();
+        if (last && last.threadCount === count && last.head === head) return last;
+
+        // Read from the timeline: the live report may not include this weave yet
+        const report = this.sentinel.scanHistory(threads).reportAt(count - 1);
+        const now = Date.now();
+        const time = last ? Math.max(now, last.time) : now;
 
         const snapshot = {
-            id: Date.now(),
-            timestamp: new Date().toLocaleTimeString([], { hour12: false }),
-            threadCount: threads.length,
+            id: time,
+            time,
+            timestamp: new Date(time).toLocaleTimeString([], { hour12: false }),
+            threadCount: count,
+            head,
             defcon: report.defcon,
-            threatCount: report.threats.length
+            threatCount: report.threats.length,
+            keyframe: null
         };
 
-        this.snapshots.push(snapshot);
+        if (!last || this._sinceKeyframe >= KEYFRAME_INTERVAL - 1) {
+            snapshot.keyframe = this._keyframe(threads, count, report);
+            this._sinceKeyframe = 0;
+        } else {
+            this._sinceKeyframe++;
+        }
+
+        // The oldest snapshot must stay a keyframe for the others to rebuild from
+        const store = this.snapshots;
+        if (store.length === store.capacity && store.length > 1) {
+            const next = store.get(1);
+            if (!next.keyframe) next.keyframe = this._keyframeFor(1);
+        }
+        if (store.push(snapshot) && this.isReplaying) {
+            this.currentIndex = Math.max(0, this.currentIndex - 1);
+        }
+
         this._updateTimelineUI();
+        return snapshot;
     }
 
     /**
      * Enters Replay Mode at the specified snapshot index.
-     * @param {number} index - Index in the snapshots array
+     * @param {number} index - Index in the snapshot store, oldest first
      */
     scrubTo(index) {
         if (index < 0 || index >= this.snapshots.length) return;
@@ -51,21 +158,11 @@ export class PanopticonEngine {
         this.isReplaying = true;
         this.currentIndex = index;
 
-        const snapshot = this.snapshots[index];
-        const allThreads = this.ledger.getThreads();
-
-        // Reconstruct state
-        // We assume threads are append-only.
-        // If snapshot.threadCount > allThreads.length, the ledger was cleared.
-        // In that case, we can only show what we have (or handle clears differently).
-        const visibleThreads = allThreads.slice(0, snapshot.threadCount);
-
-        // We must re-run sentinel logic on the historical data to get accurate derived state (zones, etc)
-        // or we could have stored it. Re-running is cleaner for "Simulation".
-        const historicalReport = this.sentinel.assess(visibleThreads);
+        const snapshot = this.snapshots.get(index);
+        this.replayState = this._rebuild(index);
 
         // Force Render
-        this._applyState(visibleThreads, historicalReport);
+        this._applyState(this.replayState.threads, this.replayState.report);
 
         // Update UI status
         this._updateStatusDisplay(`REPLAY: ${snapshot.timestamp} // T-MINUS ${this.snapshots.length - 1 - index}`);
@@ -74,14 +171,27 @@ export class PanopticonEngine {
         document.body.classList.add('panopticon-active');
     }
 
+    /**
+     * Enters Replay Mode at the last snapshot taken at or before a time.
+     * @param {number} time - Epoch ms; earlier than every snapshot means the oldest
+     * @returns {number} The snapshot index, or -1 if there are none
+     */
+    scrubToTime(time) {
+        if (this.snapshots.length === 0) return -1;
+        const index = Math.max(0, this.snapshots.indexAt(time));
+        this.scrubTo(index);
+        return index;
+    }
+
     /**
      * Returns to Live Mode.
      */
     returnToLive() {
         this.isReplaying = false;
         this.currentIndex = -1;
+        this.replayState = null;
 
-        const threads = this.ledger.getThreads();
+        const threads = this.ledger.getView();
         const report = this.sentinel.assess(threads); // Re-assess live
 
         this._applyState(threads, report);
@@ -92,6 +202,84 @@ export class PanopticonEngine {
         document.body.classList.remove('panopticon-active');
     }
 
+    // --- Keyframes ---
+
+    _keyframe(threads, count, report) {
+        // Fold Horizon forward from the previous keyframe when it still applies
+        const store = this.snapshots;
+        const previous = store.get(store.keyframeAt(store.length - 1));
+        let state;
+        if (previous && this._holds(threads, previous) && previous.threadCount <= count) {
+            state = this.horizon.accumulate(
+                threads,
+                this.horizon.cloneState(previous.keyframe.horizon),
+                previous.threadCount,
+                count
+            );
+        } else {
+            state = this.horizon.accumulate(threads, this.horizon.createState(), 0, count);
+        }
+        return { report, horizon: state };
+    }
+
+    // Promotes a snapshot to a keyframe, from its rebuilt state
+    _keyframeFor(index) {
+        const rebuilt = this._rebuild(index);
+        return { report: rebuilt.report, horizon: rebuilt.horizonState };
+    }
+
+    // Whether the ledger still starts with the threads a snapshot saw
+    _holds(threads, snapshot) {
+        const count = snapshot.threadCount;
+        if (count > threads.length) return false;
+        return count === 0 || (threads[count - 1].hash || null) === snapshot.head;
+    }
+
+    /**
+     * State at a snapshot: threads, Sentinel report and Horizon summary.
+     * If the ledger was since replaced, the nearest keyframe's stored state
+     * is the best record left and is returned with stale set.
+     */
+    _rebuild(index) {
+        const snapshot = this.snapshots.get(index);
+        const key = this.snapshots.get(this.snapshots.keyframeAt(index));
+        const threads = this.ledger.getView();
+        const visibleThreads = threads.slice(0, snapshot.threadCount);
+
+        // The oldest snapshot is always a keyframe, so there is one to start from
+        if (!this._holds(threads, snapshot)) {
+            return {
+                threads: visibleThreads,
+                report: key.keyframe.report,
+                horizonState: key.keyframe.horizon,
+                horizon: this.horizon.summarize(key.keyframe.horizon),
+                stale: true
+            };
+        }
+
+        const horizonState =
+            key === snapshot
+                ? key.keyframe.horizon
+                : this.horizon.accumulate(
+                      threads,
+                      this.horizon.cloneState(key.keyframe.horizon),
+                      key.threadCount,
+                      snapshot.threadCount
+                  );
+        const report =
+            key === snapshot
+                ? key.keyframe.report
+                : this.sentinel.scanHistory(threads).reportAt(snapshot.threadCount - 1);
+
+        return {
+            threads: visibleThreads,
+            report,
+            horizonState,
+            horizon: this.horizon.summarize(horizonState),
+            stale: false
+        };
+    }
+
     _applyState(threads, report) {
         if (this.renderers.mandala) {
             this.renderers.mandala.render(threads);
@@ -261,7 +449,8 @@ export class PanopticonEngine {
         // Use replaceChildren to clear safely
         this.elements.markers.replaceChildren();
 
-        this.snapshots.forEach((snap, i) => {
+        for (let i = 0; i < count; i++) {
+            const snap = this.snapshots.get(i);
             if (snap.defcon < 3) {
                 const marker = document.createElement('div');
                 marker.className = `p-marker defcon-${snap.defcon}`;
@@ -269,7 +458,7 @@ export class PanopticonEngine {
                 marker.title = `DEFCON ${snap.defcon}`;
                 this.elements.markers.appendChild(marker);
             }
-        });
+        }
     }
 
     _updateControls() {
@@ -284,7 +473,8 @@ export class PanopticonEngine {
         this.elements.metadata.replaceChildren();
 
         if (this.isReplaying) {
-            const snap = this.snapshots[index];
+            const snap = this.snapshots.get(index);
+            const replay = this.replayState;
 
             const createMetaItem = (label, value, defconClass) => {
                 const span = document.createElement('span');
@@ -299,6 +489,11 @@ export class PanopticonEngine {
                 createMetaItem('DEFCON', snap.defcon, `defcon-${snap.defcon}`),
                 createMetaItem('THREATS', snap.threatCount)
             );
+            if (replay) {
+                this.elements.metadata.append(
+                    createMetaItem('BALANCE', `${replay.horizon.balanceScore}%${replay.stale ? ' (ARCHIVED)' : ''}`)
+                );
+            }
         } else {
             this.elements.metadata.textContent = "SYSTEM LIVE. MONITORING STREAM.";
         }
@@ -1,9 +1,20 @@
+import { LocationIndex } from './location-index.js';
+
 export class PrometheusEngine {
     constructor() {
         this.canvas = document.createElement('canvas');
-        this.ctx = this.canvas.getContext('2d', { willReadFrequently: true });
+        this.ctx = this.canvas.getContext('2d');
         this.width = 0;
         this.height = 0;
+
+        // Cached density state (see update())
+        this.density = new Float32Array(0);
+        this.imageData = null;
+        this.kernel = null;
+        this.count = 0; // Threads folded into the density grid
+        this.head = null; // Last folded thread, used to detect append-only growth
+        this.dirty = null; // Pending colorize rect {x0, y0, x1, y1}
+        this.version = 0; // Bumped whenever the canvas pixels change
         // Thermal Gradient Palette (256 values)
         this.palette = this._generatePalette();
     }
@@ -60,101 +71,175 @@ export class PrometheusEngine {
 
     /**
      * Updates the heatmap based on threads.
+     * Density lives in a Float32 grid that only grows by the threads appended
+     * since the last call (keyed on the ledger head), and the colour pass only
+     * runs over the region that changed. Unchanged ledgers cost nothing, so map
+     * frames reduce to a blit of this.canvas.
      * @param {Array} threads - The tapestry threads.
      * @param {Object} locations - The location definitions.
      * @param {number} width - Target width.
      * @param {number} height - Target height.
+     * @returns {boolean} True if the heatmap canvas changed.
      */
     update(threads, locations, width, height) {
         if (this.width !== width || this.height !== height) {
-            this.canvas.width = width;
-            this.canvas.height = height;
-            this.width = width;
-            this.height = height;
+            this._resize(width, height);
+        }
+
+        const count = threads ? threads.length : 0;
+        const head = count > 0 ? threads[count - 1] : null;
+
+        if (count === this.count && this._sameThread(head, this.head)) {
+            return this._flush();
+        }
+
+        // Append-only growth keeps the existing density; anything else rebuilds
+        const appended =
+            count > this.count &&
+            (this.count === 0 || this._sameThread(threads[this.count - 1], this.head));
+        if (!appended) {
+            this.density.fill(0);
+            this.count = 0;
+            this._markDirty(0, 0, this.width, this.height);
+        }
+
+        const index = LocationIndex.for(locations);
+        for (let i = this.count; i < count; i++) {
+            this._splat(threads[i], index);
         }
+        this.count = count;
+        this.head = head;
 
-        this.ctx.clearRect(0, 0, width, height);
+        return this._flush();
+    }
+
+    _resize(width, height) {
+        this.canvas.width = width;
+        this.canvas.height = height;
+        this.width = width;
+        this.height = height;
+
+        this.density = new Float32Array(width * height);
+        this.imageData = width > 0 && height > 0 ? this.ctx.createImageData(width, height) : null;
+        this.kernel = this._buildKernel(Math.max(20, width * 0.05));
+
+        // Force a full rebuild at the new scale
+        this.count = 0;
+        this.head = null;
+        this._markDirty(0, 0, width, height);
+    }
 
-        if (!threads || threads.length === 0) return;
+    _buildKernel(radius) {
+        // Precomputed splat matching the old per-thread radial gradient:
+        // alpha 0.15 at the centre, 0.05 at half radius, 0 at the edge.
+        // Values are in 0-255 intensity units so the grid indexes the palette directly.
+        const r = Math.ceil(radius);
+        const size = r * 2 + 1;
+        const weights = new Float32Array(size * size);
+
+        for (let ky = 0; ky < size; ky++) {
+            for (let kx = 0; kx < size; kx++) {
+                const d = Math.hypot(kx - r, ky - r) / radius;
+                let alpha = 0;
+                if (d < 0.5) alpha = 0.15 - (d / 0.5) * 0.1;
+                else if (d < 1) alpha = 0.05 * (1 - (d - 0.5) / 0.5);
+                weights[ky * size + kx] = alpha * 255;
+            }
+        }
+        return { radius: r, size, weights };
+    }
+
+    _splat(thread, index) {
+        const coords = index.threadCoords(thread);
 
-        // 1. Accumulate Density (Grayscale)
-        // We assume 0-100 coordinate space inputs, so we scale to width/height.
-        // Padding must match Cartographer's padding (40px) logic or receive raw coords.
-        // To be safe, we will rely on Cartographer passing us the exact drawing area dimensions,
-        // or we replicate the mapping logic.
-        // Let's assume the passed width/height is the full canvas size.
         // Cartographer logic: padding = 40.
         // x = (pt.x / 100) * (width - 80) + 40
         // y = (pt.y / 100) * (height - 80) + 40
-
         const padding = 40;
-        const mapW = width - padding * 2;
-        const mapH = height - padding * 2;
-
-        // Use 'lighter' (additive) blending to accumulate overlapping points
-        // OR 'screen'. 'lighter' can exceed 255 which wraps or clamps.
-        // Canvas 'lighter' adds values up to max.
-        this.ctx.globalCompositeOperation = 'lighter';
-
-        threads.forEach((thread) => {
-            const coords = this._getThreadCoords(thread, locations);
-            if (!coords) return;
-
-            // Apply Jitter
-            const jitter = this._calculateJitter(thread);
-            const x = ((coords.x + jitter.x) / 100) * mapW + padding;
-            const y = ((coords.y + jitter.y) / 100) * mapH + padding;
-
-            // Draw Gradient Blob
-            // Size depends on map scale, say 5% of width?
-            const radius = Math.max(20, width * 0.05);
-
-            const grad = this.ctx.createRadialGradient(x, y, 0, x, y, radius);
-            // Alpha determines "heat" contribution of a single thread
-            grad.addColorStop(0, 'rgba(255, 255, 255, 0.15)'); // Center intensity
-            grad.addColorStop(0.5, 'rgba(255, 255, 255, 0.05)');
-            grad.addColorStop(1, 'rgba(255, 255, 255, 0)');
-
-            this.ctx.fillStyle = grad;
-            this.ctx.beginPath();
-            this.ctx.arc(x, y, radius, 0, Math.PI * 2);
-            this.ctx.fill();
-        });
-
-        // 2. Colorize
-        this._colorize();
+        const mapW = this.width - padding * 2;
+        const mapH = this.height - padding * 2;
+
+        // Apply Jitter
+        const jitter = this._calculateJitter(thread);
+        const cx = Math.round(((coords.x + jitter.x) / 100) * mapW + padding);
+        const cy = Math.round(((coords.y + jitter.y) / 100) * mapH + padding);
+
+        const { radius, size, weights } = this.kernel;
+        const x0 = Math.max(0, cx - radius);
+        const y0 = Math.max(0, cy - radius);
+        const x1 = Math.min(this.width, cx + radius + 1);
+        const y1 = Math.min(this.height, cy + radius + 1);
+        if (x0 >= x1 || y0 >= y1) return;
+
+        const density = this.density;
+        for (let y = y0; y < y1; y++) {
+            const row = y * this.width;
+            const krow = (y - cy + radius) * size - cx + radius;
+            for (let x = x0; x < x1; x++) {
+                density[row + x] += weights[krow + x];
+            }
+        }
+        this._markDirty(x0, y0, x1 - x0, y1 - y0);
     }
 
-    _colorize() {
-        const imageData = this.ctx.getImageData(0, 0, this.width, this.height);
-        const data = imageData.data;
-        const len = data.length;
+    _markDirty(x, y, w, h) {
+        const d = this.dirty;
+        if (!d) {
+            this.dirty = { x0: x, y0: y, x1: x + w, y1: y + h };
+            return;
+        }
+        d.x0 = Math.min(d.x0, x);
+        d.y0 = Math.min(d.y0, y);
+        d.x1 = Math.max(d.x1, x + w);
+        d.y1 = Math.max(d.y1, y + h);
+    }
 
-        // Map grayscale alpha/intensity to color palette
-        for (let i = 0; i < len; i += 4) {
-            // const alpha = data[i + 3]; // Unused
-            // Wait, if we drew white (255,255,255) with alpha, 'lighter' adds RGB and Alpha.
-            // If we used white, R=G=B. We can use the Red channel as the intensity value.
-            // However, browsers handle 'lighter' differently with Alpha.
-            // Safer to check the Red channel (since we drew White).
+    _flush() {
+        if (!this.dirty) return false;
+        this._colorize(this.dirty);
+        this.dirty = null;
+        this.version++;
+        return true;
+    }
 
-            const intensity = data[i]; // 0-255
+    _colorize(rect) {
+        if (!this.imageData) return;
 
-            if (intensity > 0) {
-                // Map intensity to palette
-                const pIdx = Math.min(255, intensity) * 4;
+        const x0 = Math.max(0, rect.x0);
+        const y0 = Math.max(0, rect.y0);
+        const x1 = Math.min(this.width, rect.x1);
+        const y1 = Math.min(this.height, rect.y1);
+        if (x0 >= x1 || y0 >= y1) return;
 
-                // If intensity is very low, we might want to keep it transparent
-                // The palette handles this (low index = low alpha)
+        const data = this.imageData.data;
+        const density = this.density;
+        const palette = this.palette;
 
-                data[i] = this.palette[pIdx];     // R
-                data[i + 1] = this.palette[pIdx + 1]; // G
-                data[i + 2] = this.palette[pIdx + 2]; // B
-                data[i + 3] = this.palette[pIdx + 3]; // A
+        // Map accumulated intensity to the thermal palette
+        // (low index = low alpha, so faint edges stay translucent)
+        for (let y = y0; y < y1; y++) {
+            let i = y * this.width + x0;
+            let p = i * 4;
+            for (let x = x0; x < x1; x++, i++, p += 4) {
+                const intensity = density[i];
+                if (intensity >= 1) {
+                    const pIdx = (intensity >= 255 ? 255 : intensity | 0) * 4;
+                    data[p] = palette[pIdx]; // R
+                    data[p + 1] = palette[pIdx + 1]; // G
+                    data[p + 2] = palette[pIdx + 2]; // B
+                    data[p + 3] = palette[pIdx + 3]; // A
+                } else {
+                    data[p] = data[p + 1] = data[p + 2] = data[p + 3] = 0;
+                }
             }
         }
 
-        this.ctx.putImageData(imageData, 0, 0);
+        this.ctx.putImageData(this.imageData, 0, 0, x0, y0, x1 - x0, y1 - y0);
+    }
+
+    _sameThread(a, b) {
+        if (a === b) return true;
+        return !!(a && b && a.hash && a.hash === b.hash);
     }
 
     _calculateJitter(thread) {
@@ -171,22 +256,4 @@ export class PrometheusEngine {
 
         return { x, y };
     }
-
-    _getThreadCoords(thread, locations) {
-        // Replicate basic logic or rely on passed enriched objects?
-        // Ideally Cartographer should pass enriched objects, but for now we duplicate
-        // the lightweight fallback logic to keep Prometheus standalone.
-
-        // Try exact match
-        const key = `${thread.intention}.${thread.region}.${thread.time}`;
-        if (locations[key]) return locations[key].coordinates;
-
-        // Fallbacks (Must match MapRenderer or use a shared utility)
-        if (thread.region === 'coast') return { x: 25, y: 55 };
-        if (thread.region === 'medina') return { x: 60, y: 30 };
-        if (thread.region === 'sahara') return { x: 75, y: 75 };
-        if (thread.region === 'kasbah') return { x: 50, y: 50 }; // Added kasbah
-
-        return { x: 50, y: 50 };
-    }
 }
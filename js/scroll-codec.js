@@ -0,0 +1,349 @@
+/**
+ * Scroll Codec // Compact Binary Scroll Format (MQSC v1)
+ *
+ * The JSON scroll spells out every hash as 64 hex characters and repeats the
+ * intention/time/region strings on every thread. The binary form interns those
+ * enums, stores hashes as raw 32-byte digests, delta-encodes timestamps and
+ * derives each previousHash from the chain itself. tools/scroll_codec.py reads
+ * and writes the same layout; JSON stays the interchange fallback.
+ *
+ *   header  "MQSC" | version u8 | flags u8 (bit 0: body is a zlib stream)
+ *   body    count | strings: n, (len, utf8)* | thread*
+ *   thread  tflags u8 | intention | time | region   (string table indices)
+ *           timestamp   zigzag delta from the previous thread, or f64 LE
+ *           title       len, utf8
+ *           id          prefix length of the hash, or len, utf8
+ *           hash        32 bytes
+ *
+ * All integers are unsigned LEB128 varints unless noted. The body codec and
+ * byte helpers are exported for gemini-transport.js, which carries ledger
+ * deltas as scroll bodies that link to a peer's head instead of genesis.
+ */
+
+export const SCROLL_MAGIC = 'MQSC';
+export const SCROLL_VERSION = 1;
+
+const FLAG_ZLIB = 1;
+
+// Per-thread flags
+const T_ID_PREFIX = 1; // id is the first N hex chars of the hash
+const T_FLOAT_TIME = 2; // timestamp stored as a raw float64
+const T_LINKED = 4; // thread carries previousHash (= predecessor's hash)
+
+const MAX_DELTA = 2 ** 51; // Keeps zigzagged deltas inside safe integers
+const HEX = Array.from({ length: 256 }, (_, i) => (i < 16 ? '0' : '') + i.toString(16));
+const HEX_HASH = /^[0-9a-f]{64}$/;
+
+export class ByteWriter {
+    constructor(capacity = 4096) {
+        this.buf = new Uint8Array(capacity);
+        this.pos = 0;
+    }
+
+    _reserve(n) {
+        if (this.pos + n <= this.buf.length) return;
+        let size = this.buf.length * 2;
+        while (size < this.pos + n) size *= 2;
+        const next = new Uint8Array(size);
+        next.set(this.buf.subarray(0, this.pos));
+        this.buf = next;
+    }
+
+    u8(value) {
+        this._reserve(1);
+        this.buf[this.pos++] = value;
+    }
+
+    // Arithmetic rather than bitwise so values above 2^32 survive
+    varint(value) {
+        this._reserve(8);
+        while (value >= 0x80) {
+            this.buf[this.pos++] = (value % 0x80) | 0x80;
+            value = Math.floor(value / 0x80);
+        }
+        this.buf[this.pos++] = value;
+    }
+
+    bytes(bytes) {
+        this._reserve(bytes.length);
+        this.buf.set(bytes, this.pos);
+        this.pos += bytes.length;
+    }
+
+    string(value) {
+        const bytes = new TextEncoder().encode(value);
+        this.varint(bytes.length);
+        this.bytes(bytes);
+    }
+
+    f64(value) {
+        this._reserve(8);
+        new DataView(this.buf.buffer).setFloat64(this.pos, value, true);
+        this.pos += 8;
+    }
+
+    hash(hex) {
+        this._reserve(32);
+        for (let i = 0; i < 32; i++) {
+            this.buf[this.pos++] = parseInt(hex.substr(i * 2, 2), 16);
+        }
+    }
+
+    finish() {
+        return this.buf.slice(0, this.pos);
+    }
+}
+
+export class ByteReader {
+    constructor(bytes, pos = 0) {
+        this.buf = bytes;
+        this.pos = pos;
+        this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        this.decoder = new TextDecoder('utf-8', { fatal: true });
+    }
+
+    _need(n) {
+        if (this.pos + n > this.buf.length) throw new Error('Invalid format: Truncated scroll');
+    }
+
+    u8() {
+        this._need(1);
+        return this.buf[this.pos++];
+    }
+
+    varint() {
+        let value = 0;
+        let scale = 1;
+        for (;;) {
+            const byte = this.u8();
+            value += (byte & 0x7f) * scale;
+            if (byte < 0x80) return value;
+            scale *= 0x80;
+            if (scale > 2 ** 56) throw new Error('Invalid format: Varint overflow');
+        }
+    }
+
+    string() {
+        const length = this.varint();
+        this._need(length);
+        const value = this.decoder.decode(this.buf.subarray(this.pos, this.pos + length));
+        this.pos += length;
+        return value;
+    }
+
+    f64() {
+        this._need(8);
+        const value = this.view.getFloat64(this.pos, true);
+        this.pos += 8;
+        return value;
+    }
+
+    hash() {
+        this._need(32);
+        let hex = '';
+        for (let i = 0; i < 32; i++) hex += HEX[this.buf[this.pos++]];
+        return hex;
+    }
+}
+
+const zigzag = (n) => (n >= 0 ? n * 2 : -n * 2 - 1);
+const unzigzag = (n) => (n % 2 === 0 ? n / 2 : -(n + 1) / 2);
+
+async function pipe(bytes, stream) {
+    const out = new Blob([bytes]).stream().pipeThrough(stream);
+    return new Uint8Array(await new Response(out).arrayBuffer());
+}
+
+/**
+ * True if the bytes start with the binary scroll magic.
+ * @param {Uint8Array} bytes - At least the first 4 bytes of the file
+ */
+export function isBinaryScroll(bytes) {
+    return (
+        bytes.length >= 4 &&
+        bytes[0] === 0x4d && // M
+        bytes[1] === 0x51 && // Q
+        bytes[2] === 0x53 && // S
+        bytes[3] === 0x43 // C
+    );
+}
+
+/**
+ * Writes the scroll body (count, string table, threads) for threads linking
+ * back to previousHash.
+ * @param {ByteWriter} body
+ * @param {Array} threads
+ * @param {string} previousHash - Hash the first thread links to
+ */
+export function writeScrollBody(body, threads, previousHash = 'GENESIS_HASH') {
+    const strings = new Map();
+    const intern = (value) => {
+        let index = strings.get(value);
+        if (index === undefined) {
+            index = strings.size;
+            strings.set(value, index);
+        }
+        return index;
+    };
+    for (const thread of threads) {
+        intern(thread.intention);
+        intern(thread.time);
+        intern(thread.region);
+    }
+
+    body.varint(threads.length);
+    body.varint(strings.size);
+    for (const value of strings.keys()) body.string(value);
+
+    let previousTime = 0;
+    for (let i = 0; i < threads.length; i++) {
+        const thread = threads[i];
+        if (typeof thread.hash !== 'string' || !HEX_HASH.test(thread.hash)) {
+            throw new Error(`Binary scrolls need lowercase hex hashes (thread ${i})`);
+        }
+        const hasLink = thread.previousHash !== undefined;
+        if (hasLink && thread.previousHash !== previousHash) {
+            throw new Error(`Broken chain link at thread ${i}`);
+        }
+
+        const ts = thread.timestamp;
+        const delta = ts - previousTime;
+        const intTime = Number.isSafeInteger(ts) && Number.isSafeInteger(previousTime) && Math.abs(delta) <= MAX_DELTA;
+        const idPrefix = thread.id.length <= 64 && thread.hash.startsWith(thread.id);
+
+        body.u8((idPrefix ? T_ID_PREFIX : 0) | (intTime ? 0 : T_FLOAT_TIME) | (hasLink ? T_LINKED : 0));
+        body.varint(strings.get(thread.intention));
+        body.varint(strings.get(thread.time));
+        body.varint(strings.get(thread.region));
+        if (intTime) body.varint(zigzag(delta));
+        else body.f64(ts);
+        body.string(thread.title);
+        if (idPrefix) body.varint(thread.id.length);
+        else body.string(thread.id);
+        body.hash(thread.hash);
+
+        previousHash = thread.hash;
+        previousTime = ts;
+    }
+}
+
+/**
+ * Encodes threads as a binary scroll.
+ * Only the canonical thread fields are carried; hashes must be lowercase hex
+ * and any previousHash must link to the preceding thread.
+ * @param {Array} threads
+ * @param {Object} options - { compress: true } wraps the body in a zlib stream
+ *   (skipped where CompressionStream is unavailable)
+ * @returns {Promise<Uint8Array>}
+ */
+export async function encodeScroll(threads, options = {}) {
+    const compress = options.compress !== false && typeof CompressionStream !== 'undefined';
+
+    const body = new ByteWriter(64 + threads.length * 64);
+    writeScrollBody(body, threads);
+
+    let payload = body.finish();
+    if (compress) payload = await pipe(payload, new CompressionStream('deflate'));
+
+    const out = new Uint8Array(6 + payload.length);
+    out.set(new TextEncoder().encode(SCROLL_MAGIC), 0);
+    out[4] = SCROLL_VERSION;
+    out[5] = compress ? FLAG_ZLIB : 0;
+    out.set(payload, 6);
+    return out;
+}
+
+/**
+ * Opens a binary scroll: checks the header and inflates the body if needed.
+ * @param {Uint8Array} bytes
+ * @returns {Promise<{ count: number, threads: Iterable<Object> }>} Threads are
+ *   decoded lazily so callers can validate them in batches
+ */
+export async function openScroll(bytes) {
+    if (!isBinaryScroll(bytes)) throw new Error('Invalid format: Not a binary scroll');
+    if (bytes.length < 6) throw new Error('Invalid format: Truncated scroll');
+    if (bytes[4] !== SCROLL_VERSION) throw new Error(`Unsupported scroll version ${bytes[4]}`);
+
+    let body = bytes.subarray(6);
+    if (bytes[5] & FLAG_ZLIB) {
+        if (typeof DecompressionStream === 'undefined') {
+            throw new Error('Compressed scrolls are not supported in this browser');
+        }
+        try {
+            body = await pipe(body, new DecompressionStream('deflate'));
+        } catch {
+            throw new Error('Invalid format: Corrupt zlib frame');
+        }
+    }
+
+    const reader = new ByteReader(body);
+    const { count, threads } = readScrollBody(reader);
+
+    function* checked() {
+        yield* threads;
+        if (reader.pos !== body.length) throw new Error('Invalid format: Trailing data in scroll');
+    }
+
+    return { count, threads: checked() };
+}
+
+/**
+ * Reads a scroll body written by writeScrollBody.
+ * @param {ByteReader} reader
+ * @param {string} previousHash - Hash the first thread links to
+ * @returns {{ count: number, threads: Iterable<Object> }} Threads decode lazily
+ */
+export function readScrollBody(reader, previousHash = 'GENESIS_HASH') {
+    const count = reader.varint();
+    const strings = [];
+    const stringCount = reader.varint();
+    for (let i = 0; i < stringCount; i++) strings.push(reader.string());
+
+    const lookup = (index) => {
+        if (index >= strings.length) throw new Error('Invalid format: Bad string index');
+        return strings[index];
+    };
+
+    function* threads() {
+        let previousTime = 0;
+        for (let i = 0; i < count; i++) {
+            const flags = reader.u8();
+            const intention = lookup(reader.varint());
+            const time = lookup(reader.varint());
+            const region = lookup(reader.varint());
+            const timestamp = flags & T_FLOAT_TIME ? reader.f64() : previousTime + unzigzag(reader.varint());
+            const title = reader.string();
+            const idLength = flags & T_ID_PREFIX ? reader.varint() : -1;
+            const explicitId = idLength < 0 ? reader.string() : null;
+            const hash = reader.hash();
+
+            // Same key order as TapestryLedger.addThread
+            const thread = {
+                id: explicitId === null ? hash.substring(0, idLength) : explicitId,
+                intention,
+                time,
+                region,
+                title,
+                timestamp
+            };
+            if (flags & T_LINKED) thread.previousHash = previousHash;
+            thread.hash = hash;
+
+            previousHash = hash;
+            previousTime = timestamp;
+            yield thread;
+        }
+    }
+
+    return { count, threads: threads() };
+}
+
+/**
+ * Decodes a whole binary scroll.
+ * @param {Uint8Array} bytes
+ * @returns {Promise<Array>}
+ */
+export async function decodeScroll(bytes) {
+    const { threads } = await openScroll(bytes);
+    return [...threads];
+}
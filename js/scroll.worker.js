@@ -0,0 +1,21 @@
+// Scroll Worker - Streams, validates and hash-verifies imported scrolls off the UI thread.
+
+import { readScroll } from './ledger-chain.js';
+
+self.onmessage = async (e) => {
+    const { type, id, payload } = e.data;
+
+    try {
+        if (type === 'import') {
+            const result = await readScroll(payload.file, {
+                maxThreads: payload.maxThreads,
+                onProgress: (progress) => self.postMessage({ type: 'progress', id, progress })
+            });
+            self.postMessage({ type: 'success', id, result });
+        } else {
+            throw new Error(`Unknown worker command: ${type}`);
+        }
+    } catch (error) {
+        self.postMessage({ type: 'error', id, error: error.message });
+    }
+};
@@ -1,10 +1,62 @@
+// Detection rules, shared by live assessment and the threat timeline
+const SURGE_WINDOW = 5; // Threads woven within SURGE_SPAN
+const SURGE_SPAN = 60 * 1000;
+// A ledger longer than POLARIZATION_MIN with a Horizon balance score below
+// POLARIZATION_BALANCE is polarized
+const POLARIZATION_BALANCE = 25;
+const POLARIZATION_MIN = 5;
+const CONGESTION_RUN = 3; // Consecutive threads in one region
+
+const SEVERITY = { LOW: 1, MEDIUM: 2, HIGH: 3, CRITICAL: 4 };
+
+const THREATS = {
+    surge: (region) => ({
+        type: 'TEMPORAL_SURGE',
+        level: 'HIGH',
+        message: 'Rapid narrative acceleration detected.',
+        region: region
+    }),
+    polarization: (intention) => ({
+        type: 'POLARIZATION',
+        level: 'MEDIUM',
+        message: `Extreme dominance of ${intention}. System equilibrium at risk.`,
+        region: 'global'
+    }),
+    congestion: (region) => ({
+        type: 'LOCALIZED_CONGESTION',
+        level: 'LOW',
+        message: `High concentration in ${region} sector.`,
+        region: region
+    })
+};
+
+// Timeline flag bits, one per rule
+const FLAG_SURGE = 1;
+const FLAG_POLARIZATION = 2;
+const FLAG_CONGESTION = 4;
+const NO_DOMINANCE = 255;
+
+// DEFCON for each flag combination: 5 - highest severity
+const DEFCON_BY_FLAGS = Uint8Array.from({ length: 8 }, (_, flags) => {
+    if (flags & FLAG_SURGE) return 5 - SEVERITY.HIGH;
+    if (flags & FLAG_POLARIZATION) return 5 - SEVERITY.MEDIUM;
+    if (flags & FLAG_CONGESTION) return 5 - SEVERITY.LOW;
+    return 5;
+});
+
 export class SentinelEngine {
-    constructor(horizonEngine) {
+    /**
+     * @param {HorizonEngine} horizonEngine
+     * @param {Object} options - { memo } optional shared LedgerMemo for threat scans
+     */
+    constructor(horizonEngine, options = {}) {
         this.horizon = horizonEngine;
+        this.memo = options.memo || null;
         this.status = 'STANDBY'; // STANDBY, ACTIVE, ALERT
         this.defcon = 5; // 5 (Peace) to 1 (Critical)
         this.threats = [];
         this.lastScanTime = 0;
+        this.timeline = new ThreatTimeline(this);
     }
 
     /**
@@ -22,60 +74,92 @@ export class SentinelEngine {
             return this.getReport();
         }
 
+        const scan = () => this.detect(threads.slice(-5), this.horizon.analyze(threads), threads.length);
+        this.threats = this.memo ? this.memo.get('sentinel.threats', threads, scan) : scan();
+
+        this._updateDefcon();
+        return this.getReport();
+    }
+
+    /**
+     * Stateless assessment from the ledger tail and a precomputed Horizon analysis.
+     * Every rule only looks at the last 5 threads plus global balance, so callers
+     * holding running aggregates (Chronos) can project a report without the full ledger.
+     * Does not touch the live DEFCON state.
+     * @param {Array} recent - The last (up to) 5 threads
+     * @param {Object} analysis - HorizonEngine analysis of the whole ledger
+     * @param {number} length - Total ledger length
+     * @returns {Object} Report including defcon, threats, and zones
+     */
+    evaluate(recent, analysis, length) {
+        if (length === 0) {
+            return { status: 'STANDBY', defcon: 5, threats: [], zones: [] };
+        }
+        const threats = this.detect(recent, analysis, length);
+        const defcon = this._defconFor(threats);
+        return {
+            status: this._statusFor(defcon),
+            defcon: defcon,
+            threats: threats,
+            zones: this._generateThreatZones(threats)
+        };
+    }
+
+    /**
+     * Threat history of a ledger: the assessment at every position, scanning
+     * only threads not seen before. Prefixes of the scanned ledger (Panopticon
+     * replay) cost nothing. Does not touch the live DEFCON state.
+     * @param {Array} threads - The full tapestry ledger
+     * @returns {ThreatTimeline}
+     */
+    scanHistory(threads) {
+        return this.timeline.extend(threads);
+    }
+
+    detect(recent, analysis, length) {
+        const threats = [];
+
         // 1. Frequency Analysis (Temporal Surge)
         // Check timestamps of last 5 threads
-        if (threads.length >= 5) {
-            const recent = threads.slice(-5);
+        if (length >= SURGE_WINDOW && recent.length >= SURGE_WINDOW) {
+            const window = recent.slice(-SURGE_WINDOW);
             const duration =
-                recent[recent.length - 1].timestamp - recent[0].timestamp;
+                window[window.length - 1].timestamp - window[0].timestamp;
             // If 5 threads in less than 60 seconds?
-            if (duration < 60 * 1000) {
-                this.threats.push({
-                    type: 'TEMPORAL_SURGE',
-                    level: 'HIGH',
-                    message: 'Rapid narrative acceleration detected.',
-                    region: recent[recent.length - 1].region
-                });
+            if (duration < SURGE_SPAN) {
+                threats.push(THREATS.surge(window[window.length - 1].region));
             }
         }
 
         // 2. Pattern Analysis (Horizon Hook)
-        const analysis = this.horizon.analyze(threads);
-        if (analysis.balanceScore < 25 && threads.length > 5) {
-            this.threats.push({
-                type: 'POLARIZATION',
-                level: 'MEDIUM',
-                message: `Extreme dominance of ${analysis.dominance.intention}. System equilibrium at risk.`,
-                region: 'global'
-            });
+        if (analysis.balanceScore < POLARIZATION_BALANCE && length > POLARIZATION_MIN) {
+            threats.push(THREATS.polarization(analysis.dominance.intention));
         }
 
         // 3. Geospatial Clustering (Simulated)
         // If last 3 threads are in same region
-        if (threads.length >= 3) {
-            const recent = threads.slice(-3);
-            const region = recent[0].region;
-            if (recent.every((t) => t.region === region)) {
-                this.threats.push({
-                    type: 'LOCALIZED_CONGESTION',
-                    level: 'LOW',
-                    message: `High concentration in ${region} sector.`,
-                    region: region
-                });
+        if (length >= CONGESTION_RUN && recent.length >= CONGESTION_RUN) {
+            const window = recent.slice(-CONGESTION_RUN);
+            const region = window[0].region;
+            if (window.every((t) => t.region === region)) {
+                threats.push(THREATS.congestion(region));
             }
         }
 
-        this._updateDefcon();
-        return this.getReport();
+        return threats;
     }
 
     _updateDefcon() {
+        this.defcon = this._defconFor(this.threats);
+        this.status = this._statusFor(this.defcon);
+    }
+
+    _defconFor(threats) {
         let maxSeverity = 0;
-        const severityMap = { LOW: 1, MEDIUM: 2, HIGH: 3, CRITICAL: 4 };
 
-        this.threats.forEach((t) => {
-            if (severityMap[t.level] > maxSeverity)
-                maxSeverity = severityMap[t.level];
+        threats.forEach((t) => {
+            if (SEVERITY[t.level] > maxSeverity)
+                maxSeverity = SEVERITY[t.level];
         });
 
         // DEFCON mapping: 5 - maxSeverity
@@ -84,11 +168,13 @@ export class SentinelEngine {
         // 2 -> 3 (Medium)
         // 3 -> 2 (High)
         // 4 -> 1 (Critical)
-        this.defcon = 5 - maxSeverity;
+        return 5 - maxSeverity;
+    }
 
-        if (this.defcon < 3) this.status = 'ALERT';
-        else if (this.defcon < 5) this.status = 'ACTIVE';
-        else this.status = 'STANDBY';
+    _statusFor(defcon) {
+        if (defcon < 3) return 'ALERT';
+        if (defcon < 5) return 'ACTIVE';
+        return 'STANDBY';
     }
 
     getReport() {
@@ -100,7 +186,7 @@ export class SentinelEngine {
         };
     }
 
-    _generateThreatZones() {
+    _generateThreatZones(threats = this.threats) {
         // Convert threats to map coordinates
         // We'll rely on the map to interpret 'region' strings or provide generic coords here
         const zones = [];
@@ -111,7 +197,7 @@ export class SentinelEngine {
             kasbah: { x: 50, y: 50, r: 10 } // Generic center
         };
 
-        this.threats.forEach((t) => {
+        threats.forEach((t) => {
             if (t.region && t.region !== 'global' && regionCoords[t.region]) {
                 zones.push({
                     ...regionCoords[t.region],
@@ -123,3 +209,183 @@ export class SentinelEngine {
         return zones;
     }
 }
+
+/**
+ * Threat Timeline: the Sentinel rules evaluated at every ledger position.
+ * Entry i is what assess(threads.slice(0, i + 1)) reports. The surge and
+ * congestion windows slide along the ledger (the timestamp four threads back,
+ * the current same-region run) and Horizon balance is a running fold, so the
+ * first scan is one O(N) pass and appended threads cost O(new threads).
+ * Per-position results are packed in typed arrays.
+ */
+export class ThreatTimeline {
+    constructor(sentinel) {
+        this.sentinel = sentinel;
+        this.horizon = sentinel.horizon;
+        this.reset();
+    }
+
+    reset() {
+        this.length = 0;
+        this.defcon = new Uint8Array(0); // DEFCON at each position
+        this.flags = new Uint8Array(0); // FLAG_* bits of the rules that fired
+        this.balance = new Uint8Array(0); // Horizon balance score
+        this.dominant = new Uint8Array(0); // Index into horizon intentions, or NO_DOMINANCE
+        this._threads = null;
+        this._state = this.horizon.createState();
+        this._run = 0; // Same-region run ending at the last position
+    }
+
+    /**
+     * Scans threads past the end of the timeline. A ledger that does not
+     * continue the scanned one is rescanned from the start; a prefix of it
+     * leaves the timeline as it is.
+     * @param {Array} threads
+     * @returns {ThreatTimeline} this
+     */
+    extend(threads) {
+        const list = threads || [];
+        if (!this._continues(list)) this.reset();
+        if (list.length <= this.length) return this;
+
+        this._grow(list.length);
+        const horizon = this.horizon;
+        const state = this._state;
+        const intentions = horizon.intentions;
+
+        for (let i = this.length; i < list.length; i++) {
+            const thread = list[i];
+            horizon.accumulate(list, state, i, i + 1);
+            const analysis = horizon.summarize(state);
+            const length = i + 1;
+
+            this._run = i > 0 && list[i - 1].region === thread.region ? this._run + 1 : 1;
+
+            let flags = 0;
+            if (length >= SURGE_WINDOW && thread.timestamp - list[length - SURGE_WINDOW].timestamp < SURGE_SPAN) {
+                flags |= FLAG_SURGE;
+            }
+            if (analysis.balanceScore < POLARIZATION_BALANCE && length > POLARIZATION_MIN) {
+                flags |= FLAG_POLARIZATION;
+            }
+            if (this._run >= CONGESTION_RUN) flags |= FLAG_CONGESTION;
+
+            const dominant = intentions.indexOf(analysis.dominance.intention);
+            this.flags[i] = flags;
+            this.defcon[i] = DEFCON_BY_FLAGS[flags];
+            this.balance[i] = analysis.balanceScore;
+            this.dominant[i] = dominant < 0 ? NO_DOMINANCE : dominant;
+        }
+
+        this.length = list.length;
+        this._threads = list;
+        return this;
+    }
+
+    // Thread hashes chain, so a matching thread at the shorter length means
+    // a matching prefix; unhashed threads must be the same objects.
+    _continues(threads) {
+        const shared = Math.min(this.length, threads.length);
+        if (shared === 0) return true;
+        const a = this._threads[shared - 1];
+        const b = threads[shared - 1];
+        return a === b || (!!a.hash && a.hash === b.hash);
+    }
+
+    _grow(length) {
+        if (length <= this.defcon.length) return;
+        const capacity = Math.max(length, this.defcon.length * 2, 64);
+        for (const name of ['defcon', 'flags', 'balance', 'dominant']) {
+            const next = new Uint8Array(capacity);
+            next.set(this[name].subarray(0, this.length));
+            this[name] = next;
+        }
+    }
+
+    // --- Queries ---
+
+    /**
+     * DEFCON after thread i (5 before the first thread).
+     */
+    defconAt(i) {
+        return i >= 0 && i < this.length ? this.defcon[i] : 5;
+    }
+
+    /**
+     * Threats after thread i, as detect() lists them.
+     */
+    threatsAt(i) {
+        if (i < 0 || i >= this.length) return [];
+        const flags = this.flags[i];
+        const region = this._threads[i].region;
+        const threats = [];
+        if (flags & FLAG_SURGE) threats.push(THREATS.surge(region));
+        if (flags & FLAG_POLARIZATION) {
+            const dominant = this.dominant[i];
+            threats.push(THREATS.polarization(dominant === NO_DOMINANCE ? 'None' : this.horizon.intentions[dominant]));
+        }
+        if (flags & FLAG_CONGESTION) threats.push(THREATS.congestion(region));
+        return threats;
+    }
+
+    /**
+     * Full report after thread i, shaped like SentinelEngine.getReport().
+     */
+    reportAt(i) {
+        if (i < 0 || i >= this.length) {
+            return { status: 'STANDBY', defcon: 5, threats: [], zones: [] };
+        }
+        const threats = this.threatsAt(i);
+        const defcon = this.defcon[i];
+        return {
+            status: this.sentinel._statusFor(defcon),
+            defcon: defcon,
+            threats: threats,
+            zones: this.sentinel._generateThreatZones(threats)
+        };
+    }
+
+    /**
+     * Per-position DEFCON for threads [start, end), as a view (no copy).
+     */
+    range(start = 0, end = this.length) {
+        const from = Math.max(0, Math.min(start, this.length));
+        return this.defcon.subarray(from, Math.max(from, Math.min(end, this.length)));
+    }
+
+    /**
+     * Worst DEFCON in [start, end) and where it was first reached.
+     * @returns {{ index: number, defcon: number }} index -1 if the range is clear
+     */
+    peak(start = 0, end = this.length) {
+        const view = this.range(start, end);
+        const from = Math.max(0, start);
+        let index = -1;
+        let defcon = 5;
+        for (let i = 0; i < view.length; i++) {
+            if (view[i] < defcon) {
+                defcon = view[i];
+                index = from + i;
+            }
+        }
+        return { index, defcon };
+    }
+
+    /**
+     * Positions in [start, end) where DEFCON changed from the one before.
+     * @returns {Array<{ index: number, defcon: number }>}
+     */
+    transitions(start = 0, end = this.length) {
+        const view = this.range(start, end);
+        const from = Math.max(0, Math.min(start, this.length));
+        const changes = [];
+        let previous = this.defconAt(from - 1);
+        for (let i = 0; i < view.length; i++) {
+            if (view[i] !== previous) {
+                changes.push({ index: from + i, defcon: view[i] });
+                previous = view[i];
+            }
+        }
+        return changes;
+    }
+}
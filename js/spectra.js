@@ -1,3 +1,5 @@
+import { FSKDemodulator } from './fsk-demod.js';
+
 export class SpectraEngine {
     constructor() {
         // Protocol Constants
@@ -71,7 +73,7 @@ export class SpectraEngine {
      * Listens for incoming signals via Microphone.
      * Returns a function to STOP listening.
      * @param {Function} onData - Callback when valid JSON is received.
-     * @param {Function} onStatus - Callback (status, metadata).
+     * @param {Function} onStatus - Callback ('listening' | 'receiving' | 'stopped').
      * @returns {Promise<Function>} - Stop function.
      */
     async listenSignal(onData, onStatus) {
@@ -92,61 +94,64 @@ export class SpectraEngine {
             this.analyser.fftSize = 2048;
             this.microphone.connect(this.analyser);
 
-            // Buffer for recording
-            const recordingBuffer = [];
-            const processor = this.ctx.createScriptProcessor(4096, 1, 1);
-
-            this.microphone.connect(processor);
-            processor.connect(this.ctx.destination); // Required for Chrome to fire events
-
-            let isProcessing = false;
-
-            processor.onaudioprocess = (e) => {
-                const input = e.inputBuffer.getChannelData(0);
-                // Copy to recording buffer
-                // We keep a rolling window of ~30 seconds max to avoid memory issues
-                // 44100 * 30 = 1.3M floats (5MB). Safe.
-                for (let i = 0; i < input.length; i++) {
-                    recordingBuffer.push(input[i]);
-                }
-
-                // Limit buffer size
-                if (recordingBuffer.length > 44100 * 60) {
-                     recordingBuffer.splice(0, input.length); // Rotate
-                }
-
-                // Check for signal presence (simple energy check at high freq)
-                // We delegate visualizer to UI via getAnalyser()
+            // Demodulation streams sample by sample: frames are delivered as soon
+            // as their last bit arrives, with no rolling recording to rescan.
+            let done = false;
+            const handleFrame = (data) => {
+                if (done) return;
+                onData(data);
+                stop();
+            };
+            const handleState = (state) => {
+                if (!done) onStatus(state === 'search' ? 'listening' : 'receiving');
             };
 
-            // Polling scanner (Try to decode every 2 seconds)
-            const scannerInterval = setInterval(async () => {
-                if (isProcessing) return;
-                isProcessing = true;
-
-                try {
-                    // Quick scan of the last N seconds
-                    const result = this._decodeFSK(recordingBuffer, this.ctx.sampleRate, this.LIVE_BAUD_RATE);
-                    if (result) {
-                        onData(result);
-                        stop();
-                    }
-                } catch {
-                    // Ignore decoding errors (noise)
-                } finally {
-                    isProcessing = false;
+            const options = {
+                baudRate: this.LIVE_BAUD_RATE,
+                markFreq: this.MARK_FREQ,
+                spaceFreq: this.SPACE_FREQ
+            };
+            let node;
+            if (this.ctx.audioWorklet && typeof AudioWorkletNode !== 'undefined') {
+                if (!this._workletReady) {
+                    this._workletReady = this.ctx.audioWorklet.addModule('js/spectra.worklet.js');
+                    this._workletReady.catch(() => (this._workletReady = null));
                 }
-            }, 2000);
+                await this._workletReady;
+                node = new AudioWorkletNode(this.ctx, 'spectra-demod', { processorOptions: options });
+                node.port.onmessage = (e) => {
+                    if (e.data.type === 'frame') handleFrame(e.data.data);
+                    else if (e.data.type === 'state') handleState(e.data.state);
+                };
+            } else {
+                // Legacy fallback: same demodulator on the main thread
+                const demod = new FSKDemodulator({ sampleRate: this.ctx.sampleRate, ...options });
+                let state = demod.state;
+                node = this.ctx.createScriptProcessor(4096, 1, 1);
+                node.onaudioprocess = (e) => {
+                    const frames = demod.push(e.inputBuffer.getChannelData(0));
+                    if (demod.state !== state) {
+                        state = demod.state;
+                        handleState(state);
+                    }
+                    if (frames.length > 0) handleFrame(frames[0]);
+                };
+            }
+
+            this.microphone.connect(node);
+            node.connect(this.ctx.destination); // Keeps the node pulled; its output is silent
 
             onStatus('listening');
 
             const stop = () => {
-                clearInterval(scannerInterval);
+                if (done) return;
+                done = true;
+                if (node.port) node.port.postMessage({ type: 'stop' });
+                node.disconnect();
                 if (this.microphone) {
                     this.microphone.disconnect();
                     stream.getTracks().forEach(t => t.stop());
                 }
-                if (processor) processor.disconnect();
                 onStatus('stopped');
             };
 
@@ -320,115 +325,14 @@ export class SpectraEngine {
     }
 
     _decodeFSK(pcmData, sampleRate, baudRate) {
-        // Robust Decoding Logic (Correlation-based)
-        const samplesPerBitFloat = sampleRate / baudRate;
-        const samplesPerBit = Math.floor(samplesPerBitFloat);
-        const totalSamples = pcmData.length;
-        let bitStream = [];
-
-        // Pre-calculate coefficients
-        // w = 2*pi*f/sr
-        const wMark = (2 * Math.PI * this.MARK_FREQ) / sampleRate;
-        const wSpace = (2 * Math.PI * this.SPACE_FREQ) / sampleRate;
-
-        // Optimized Goertzel-ish correlation
-        const correlate = (startSample, freqOmega) => {
-            let sumI = 0;
-            let sumQ = 0;
-            for (let i = 0; i < samplesPerBit; i++) {
-                if (startSample + i >= totalSamples) break;
-                const s = pcmData[startSample + i];
-                sumI += s * Math.cos(freqOmega * i);
-                sumQ += s * Math.sin(freqOmega * i);
-            }
-            return Math.sqrt(sumI * sumI + sumQ * sumQ);
-        };
-
-        // Phase Sync: We assume the buffer might contain the signal anywhere.
-        // We need to find the "SPCT" header: 01010011 01010000 01000011 01010100
-        // Or simplified: Just scan bits and look for the byte sequence.
-
-        // 1. Bit Extraction
-        // We use float index to prevent drift over long messages
-        const maxBits = Math.floor(totalSamples / samplesPerBitFloat);
-        for (let i = 0; i < maxBits; i++) {
-            const sampleIdx = Math.floor(i * samplesPerBitFloat);
-            const markE = correlate(sampleIdx, wMark);
-            const spaceE = correlate(sampleIdx, wSpace);
-            bitStream.push(markE > spaceE ? 1 : 0);
-        }
-
-        // 2. Stream Search for Header
-        // SPCT = 0x53 0x50 0x43 0x54
-        // Binary: 01010011 01010000 01000011 01010100
-
-        // Convert bitStream to a string for regex search? Or rolling window.
-        // There might be bit-slip, but for now assuming aligned bits (simple)
-        // If we wanted to be robust against phase shift, we'd slide sample-by-sample, which is expensive.
-        // Compromise: We scanned aligned to samplesPerBit. If the leader tone works, we are mostly aligned?
-        // Actually, without precise start detection, the bit grid is arbitrary.
-        // *Improvement*: Scan for the Start Bit (Transition from Space to Mark) in the PCM data first?
-
-        // Let's rely on the bit stream for now. If it fails, we might need a sliding correlator.
-
-        const bytes = [];
-        let headerIdx = -1;
-
-        // Convert to bytes
-        for (let i = 0; i < bitStream.length - 32; i++) {
-            // Check for SPCT
-            if (this._matchHeader(bitStream, i)) {
-                headerIdx = i;
-                break;
-            }
-        }
-
-        if (headerIdx === -1) {
-             // Try to shift by half-bit? No, too complex.
-             // Assume failure if not found.
-             return null;
-        }
-
-        // Decode from header index
-        for (let i = headerIdx; i < bitStream.length; i += 8) {
-             let b = 0;
-             for (let j = 0; j < 8; j++) {
-                 if (i + j < bitStream.length) {
-                     b = (b << 1) | bitStream[i + j];
-                 }
-             }
-             bytes.push(b);
-        }
-
-        // Validate structure
-        const version = bytes[4];
-        if (version !== this.VERSION) return null; // Wrong version
-
-        const len = (bytes[5] << 24) | (bytes[6] << 16) | (bytes[7] << 8) | bytes[8];
-        if (len <= 0 || len > 50000 || 9 + len > bytes.length) return null;
-
-        const payloadBytes = new Uint8Array(bytes.slice(9, 9 + len));
-        const textDecoder = new TextDecoder();
-        try {
-            const jsonString = textDecoder.decode(payloadBytes);
-            return JSON.parse(jsonString);
-        } catch {
-            return null;
-        }
-    }
-
-    _matchHeader(bits, offset) {
-        // SPCT: 0x53, 0x50, 0x43, 0x54
-        const pattern = [
-            0,1,0,1,0,0,1,1, // S
-            0,1,0,1,0,0,0,0, // P
-            0,1,0,0,0,0,1,1, // C
-            0,1,0,1,0,1,0,0  // T
-        ];
-        for(let k=0; k<32; k++) {
-            if(bits[offset+k] !== pattern[k]) return false;
-        }
-        return true;
+        const demod = new FSKDemodulator({
+            sampleRate,
+            baudRate,
+            markFreq: this.MARK_FREQ,
+            spaceFreq: this.SPACE_FREQ
+        });
+        const frames = demod.push(pcmData);
+        return frames.length > 0 ? frames[0] : null;
     }
 
     _bufferToWav(abuffer) {
@@ -0,0 +1,34 @@
+// Spectra Worklet - Demodulates microphone input on the audio rendering thread.
+
+import { FSKDemodulator } from './fsk-demod.js';
+
+class SpectraDemodProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        const { baudRate, markFreq, spaceFreq } = options.processorOptions;
+        // sampleRate is a global of the AudioWorkletGlobalScope
+        this.demod = new FSKDemodulator({ sampleRate, baudRate, markFreq, spaceFreq });
+        this.state = this.demod.state;
+        this.active = true;
+
+        this.port.onmessage = (e) => {
+            if (e.data.type === 'stop') this.active = false;
+        };
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (channel) {
+            const frames = this.demod.push(channel);
+            for (const data of frames) this.port.postMessage({ type: 'frame', data });
+
+            if (this.demod.state !== this.state) {
+                this.state = this.demod.state;
+                this.port.postMessage({ type: 'state', state: this.state });
+            }
+        }
+        return this.active;
+    }
+}
+
+registerProcessor('spectra-demod', SpectraDemodProcessor);
@@ -1,5 +1,11 @@
+const REFRESH_INTERVAL = 1000;
+
 export class StratcomSystem {
-    constructor(tapestryLedger, horizon, sentinel, vanguard, terminal, ui) {
+    /**
+     * @param {Object} options - { scheduler } FrameScheduler that paces widget
+     *   refreshes (default: a plain interval timer)
+     */
+    constructor(tapestryLedger, horizon, sentinel, vanguard, terminal, ui, options = {}) {
         this.ledger = tapestryLedger;
         this.horizon = horizon;
         this.sentinel = sentinel;
@@ -8,6 +14,7 @@ export class StratcomSystem {
         this.ui = ui;
         this.active = false;
         this.interval = null;
+        this.scheduler = options.scheduler || null;
 
         // Cache DOM elements
         this.elements = {};
@@ -45,14 +52,29 @@ export class StratcomSystem {
     }
 
     startLoop() {
-        if (this.interval) clearInterval(this.interval);
+        this.stopLoop();
         this.update(); // Immediate update
-        this.interval = setInterval(() => this.update(), 1000);
+
+        if (this.scheduler) {
+            // Refreshes land in a frame, and pause with the tab
+            this.scheduler.register(
+                'stratcom',
+                () => {
+                    this.update();
+                    return this.active;
+                },
+                { interval: REFRESH_INTERVAL, budget: 4, priority: -1 }
+            );
+            this.scheduler.request('stratcom', REFRESH_INTERVAL);
+        } else {
+            this.interval = setInterval(() => this.update(), REFRESH_INTERVAL);
+        }
     }
 
     stopLoop() {
         if (this.interval) clearInterval(this.interval);
         this.interval = null;
+        if (this.scheduler) this.scheduler.unregister('stratcom');
     }
 
     update() {
@@ -71,7 +93,7 @@ export class StratcomSystem {
 
         // 2. Horizon Widget
         if (this.horizon && this.ledger) {
-            const threads = this.ledger.getThreads();
+            const threads = this.ledger.getView();
             const analysis = this.horizon.analyze(threads);
             if (this.elements.balance) {
                  this.elements.balance.innerHTML = `<span class="highlight">${analysis.balanceScore}%</span> // ${analysis.dominance.intention.toUpperCase()}`;
@@ -119,7 +141,7 @@ export class StratcomSystem {
 
         // 5. Ticker Widget
         if (this.elements.ticker && this.ledger) {
-            const threads = this.ledger.getThreads();
+            const threads = this.ledger.getView();
             if (threads.length > 0) {
                 const latest = threads[threads.length - 1];
                 const timeStr = new Date(latest.timestamp).toLocaleTimeString();
@@ -0,0 +1,338 @@
+/**
+ * Project SYNAPSE // Force Layout
+ *
+ * Barnes–Hut force-directed layout over struct-of-arrays node storage.
+ * Shared by SynapseRenderer (main thread) and synapse.worker.js.
+ */
+
+export const LAYOUT_DEFAULTS = {
+    attraction: 0.05,
+    repulsion: 2000,
+    damping: 0.85,
+    centerForce: 0.002,
+    // Opening angle: cells smaller than theta * distance are treated as one mass.
+    // 0 is exact all-pairs; ~1 is coarse but fast.
+    theta: 0.8,
+    // Per-tick speed cap; keeps close-range repulsion from going unstable
+    maxSpeed: 10,
+    // Cooling: forces are scaled by alpha, which decays each tick so even
+    // graphs that would otherwise jitter forever come to rest (~300 ticks)
+    alphaDecay: 0.0228,
+    // Simulation stops once mean |v| per node drops below this
+    energyThreshold: 0.01
+};
+
+const EMPTY = -1;
+const INTERNAL = -2;
+const MAX_DEPTH = 32; // Coincident nodes share a leaf past this depth
+
+/**
+ * Region quadtree with per-cell mass and centre-of-mass sums.
+ * Cells live in flat typed arrays and are reused between frames.
+ */
+export class QuadTree {
+    constructor(capacity = 64) {
+        this._alloc(capacity);
+        this.size = 0;
+        this.stack = new Int32Array(256);
+    }
+
+    _alloc(capacity) {
+        const grow = (Type, old, n) => {
+            const next = new Type(n);
+            if (old) next.set(old.subarray(0, Math.min(old.length, n)));
+            return next;
+        };
+        this.mass = grow(Float32Array, this.mass, capacity);
+        this.sumX = grow(Float64Array, this.sumX, capacity);
+        this.sumY = grow(Float64Array, this.sumY, capacity);
+        this.x0 = grow(Float32Array, this.x0, capacity);
+        this.y0 = grow(Float32Array, this.y0, capacity);
+        this.extent = grow(Float32Array, this.extent, capacity);
+        this.body = grow(Int32Array, this.body, capacity);
+        this.depth = grow(Uint8Array, this.depth, capacity);
+        this.children = grow(Int32Array, this.children, capacity * 4);
+        this.capacity = capacity;
+    }
+
+    _newCell(x0, y0, extent, depth) {
+        if (this.size >= this.capacity) this._alloc(this.capacity * 2);
+        const c = this.size++;
+        this.mass[c] = 0;
+        this.sumX[c] = 0;
+        this.sumY[c] = 0;
+        this.x0[c] = x0;
+        this.y0[c] = y0;
+        this.extent[c] = extent;
+        this.body[c] = EMPTY;
+        this.depth[c] = depth;
+        this.children.fill(EMPTY, c * 4, c * 4 + 4);
+        return c;
+    }
+
+    _child(cell, x, y) {
+        const half = this.extent[cell] / 2;
+        const right = x >= this.x0[cell] + half ? 1 : 0;
+        const bottom = y >= this.y0[cell] + half ? 1 : 0;
+        const slot = cell * 4 + right + bottom * 2;
+        let c = this.children[slot];
+        if (c === EMPTY) {
+            c = this._newCell(
+                this.x0[cell] + right * half,
+                this.y0[cell] + bottom * half,
+                half,
+                this.depth[cell] + 1
+            );
+            // _newCell may reallocate; index into the fresh array
+            this.children[slot] = c;
+        }
+        return c;
+    }
+
+    /**
+     * Rebuilds the tree over the first `count` points.
+     */
+    build(xs, ys, count) {
+        let minX = Infinity;
+        let minY = Infinity;
+        let maxX = -Infinity;
+        let maxY = -Infinity;
+        for (let i = 0; i < count; i++) {
+            if (xs[i] < minX) minX = xs[i];
+            if (xs[i] > maxX) maxX = xs[i];
+            if (ys[i] < minY) minY = ys[i];
+            if (ys[i] > maxY) maxY = ys[i];
+        }
+
+        this.size = 0;
+        const extent = Math.max(maxX - minX, maxY - minY, 1) * 1.0001;
+        this._newCell(minX, minY, extent, 0);
+
+        for (let i = 0; i < count; i++) {
+            this._insert(i, xs[i], ys[i], xs, ys);
+        }
+    }
+
+    _insert(i, x, y, xs, ys) {
+        let cell = 0;
+        for (;;) {
+            this.mass[cell] += 1;
+            this.sumX[cell] += x;
+            this.sumY[cell] += y;
+
+            const b = this.body[cell];
+            if (b === EMPTY) {
+                this.body[cell] = i;
+                return;
+            }
+            if (b >= 0) {
+                // Occupied leaf: stack coincident points, otherwise split
+                if (this.depth[cell] >= MAX_DEPTH) return;
+                this.body[cell] = INTERNAL;
+                const moved = this._child(cell, xs[b], ys[b]);
+                this.mass[moved] = 1;
+                this.sumX[moved] = xs[b];
+                this.sumY[moved] = ys[b];
+                this.body[moved] = b;
+            }
+            cell = this._child(cell, x, y);
+        }
+    }
+
+    /**
+     * Accumulates the repulsive force on point i into fx/fy.
+     */
+    repel(i, x, y, theta, repulsion, fx, fy) {
+        const theta2 = theta * theta;
+        let stack = this.stack;
+        let top = 0;
+        stack[top++] = 0;
+        let ax = 0;
+        let ay = 0;
+
+        while (top > 0) {
+            const cell = stack[--top];
+            const m = this.mass[cell];
+            if (m === 0) continue;
+
+            const body = this.body[cell];
+            // Leaf holding i (alone or with coincident twins) exerts no usable force
+            if (body === i) continue;
+
+            const dx = x - this.sumX[cell] / m;
+            const dy = y - this.sumY[cell] / m;
+            let distSq = dx * dx + dy * dy;
+            const extent = this.extent[cell];
+
+            if (body >= 0 || extent * extent < theta2 * distSq) {
+                if (distSq < 0.1) distSq = 0.1;
+                const f = (repulsion * m) / (distSq * Math.sqrt(distSq));
+                ax += dx * f;
+                ay += dy * f;
+                continue;
+            }
+
+            if (top + 4 > stack.length) {
+                const next = new Int32Array(stack.length * 2);
+                next.set(stack);
+                stack = this.stack = next;
+            }
+            const base = cell * 4;
+            for (let k = 0; k < 4; k++) {
+                const c = this.children[base + k];
+                if (c !== EMPTY) stack[top++] = c;
+            }
+        }
+
+        fx[i] += ax;
+        fy[i] += ay;
+    }
+}
+
+export class ForceLayout {
+    constructor(params = {}) {
+        this.params = { ...LAYOUT_DEFAULTS, ...params };
+        this.width = 0;
+        this.height = 0;
+        this.count = 0;
+        this.x = new Float32Array(0);
+        this.y = new Float32Array(0);
+        this.vx = new Float32Array(0);
+        this.vy = new Float32Array(0);
+        this.fx = new Float32Array(0);
+        this.fy = new Float32Array(0);
+        this.edgeSource = new Int32Array(0);
+        this.edgeTarget = new Int32Array(0);
+        this.edgeWeight = new Float32Array(0);
+        this.tree = new QuadTree();
+        this.alpha = 1;
+    }
+
+    /**
+     * Restores cooling so the layout moves again (new graph, drag, resize).
+     */
+    reheat(alpha = 1) {
+        this.alpha = Math.max(this.alpha, alpha);
+    }
+
+    resize(width, height) {
+        this.width = width;
+        this.height = height;
+    }
+
+    /**
+     * Takes ownership of the position/velocity arrays for `count` nodes.
+     */
+    setNodes(x, y, vx, vy, count = x.length) {
+        this.count = count;
+        this.alpha = 1;
+        this.x = x;
+        this.y = y;
+        this.vx = vx;
+        this.vy = vy;
+        if (this.fx.length < count) {
+            this.fx = new Float32Array(count);
+            this.fy = new Float32Array(count);
+        }
+    }
+
+    setEdges(source, target, weight) {
+        this.edgeSource = source;
+        this.edgeTarget = target;
+        this.edgeWeight = weight;
+    }
+
+    /**
+     * Advances the simulation one tick.
+     * @param {number} pinned - Node index held by the pointer (not integrated), or -1
+     * @returns {number} Total kinetic energy (sum of |v|) after the step
+     */
+    step(pinned = -1) {
+        const { attraction, repulsion, damping, centerForce, theta, maxSpeed } = this.params;
+        const maxSpeedSq = maxSpeed * maxSpeed;
+        const alpha = this.alpha;
+        this.alpha *= 1 - this.params.alphaDecay;
+        const n = this.count;
+        const { x, y, vx, vy, fx, fy } = this;
+        const cx = this.width / 2;
+        const cy = this.height / 2;
+
+        fx.fill(0, 0, n);
+        fy.fill(0, 0, n);
+
+        // Repulsion (Barnes–Hut, O(N log N))
+        this.tree.build(x, y, n);
+        for (let i = 0; i < n; i++) {
+            this.tree.repel(i, x[i], y[i], theta, repulsion, fx, fy);
+        }
+
+        // Attraction (Edges) - Hooke's Law
+        const src = this.edgeSource;
+        const dst = this.edgeTarget;
+        const w = this.edgeWeight;
+        for (let e = 0; e < src.length; e++) {
+            const s = src[e];
+            const t = dst[e];
+            const dx = x[t] - x[s];
+            const dy = y[t] - y[s];
+            // f = dist * k * weight along the unit vector reduces to dx * k * weight
+            const k = attraction * w[e];
+            fx[s] += dx * k;
+            fy[s] += dy * k;
+            fx[t] -= dx * k;
+            fy[t] -= dy * k;
+        }
+
+        // Center Gravity & Integration
+        let energy = 0;
+        const maxX = this.width - 10;
+        const maxY = this.height - 10;
+        for (let i = 0; i < n; i++) {
+            // Dragged node doesn't move by physics
+            if (i === pinned) continue;
+
+            const ax = (fx[i] + (cx - x[i]) * centerForce) * alpha;
+            const ay = (fy[i] + (cy - y[i]) * centerForce) * alpha;
+
+            let ux = (vx[i] + ax) * damping;
+            let uy = (vy[i] + ay) * damping;
+            const speedSq = ux * ux + uy * uy;
+            if (speedSq > maxSpeedSq) {
+                const scale = maxSpeed / Math.sqrt(speedSq);
+                ux *= scale;
+                uy *= scale;
+            }
+            vx[i] = ux;
+            vy[i] = uy;
+
+            let nx = x[i] + vx[i];
+            let ny = y[i] + vy[i];
+
+            // Boundary (a wall absorbs the velocity pushing into it, so
+            // nodes pressed against the edge can still come to rest)
+            if (nx < 10 || nx > maxX) {
+                nx = nx < 10 ? 10 : maxX;
+                vx[i] = 0;
+            }
+            if (ny < 10 || ny > maxY) {
+                ny = ny < 10 ? 10 : maxY;
+                vy[i] = 0;
+            }
+
+            x[i] = nx;
+            y[i] = ny;
+            energy += Math.abs(vx[i]) + Math.abs(vy[i]);
+        }
+        return energy;
+    }
+
+    energy() {
+        let e = 0;
+        for (let i = 0; i < this.count; i++) e += Math.abs(this.vx[i]) + Math.abs(this.vy[i]);
+        return e;
+    }
+
+    isSettled(energy = this.energy()) {
+        return energy < this.params.energyThreshold * Math.max(1, this.count);
+    }
+}
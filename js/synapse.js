@@ -4,8 +4,14 @@
  * Force-directed graph renderer for the HTML5 Canvas.
  * Visualizes the relationships identified by CortexEngine.
  */
+import { ForceLayout } from './synapse-physics.js';
+
 export class SynapseRenderer {
-    constructor(canvas) {
+    /**
+     * @param {HTMLCanvasElement} canvas
+     * @param {Object} options - { theta, worker: true|false|'auto', workerThreshold }
+     */
+    constructor(canvas, options = {}) {
         this.canvas = canvas;
         this.ctx = canvas.getContext('2d');
         this.dpr = window.devicePixelRatio || 1;
@@ -20,6 +26,14 @@ export class SynapseRenderer {
         this.hoveredNode = null;
         this.isSimulating = false;
 
+        // Physics (struct-of-arrays positions live in the layout)
+        this.options = { worker: 'auto', workerThreshold: 2000, ...options };
+        this.layout = new ForceLayout(options.theta !== undefined ? { theta: options.theta } : {});
+        this.energy = 0;
+        this.worker = null;
+        this.workerBusy = false;
+        this.generation = 0;
+
         this._resize();
     }
 
@@ -34,20 +48,22 @@ export class SynapseRenderer {
         this.canvas.width = this.width * this.dpr;
         this.canvas.height = this.height * this.dpr;
         this.ctx.scale(this.dpr, this.dpr);
+        if (this.layout) {
+            this.layout.resize(this.width, this.height);
+            this.layout.reheat();
+            if (this.worker) this._workerInit();
+            this.isSimulating = this.nodes.length > 0;
+        }
     }
 
     /**
      * Renders the graph.
-     * @param {Object} graph - { nodes, edges } from CortexEngine
+     * @param {Object} [graph] - { nodes, edges } from CortexEngine. Omit to keep
+     *   animating the current graph (called from the RAF loop).
      */
     render(graph) {
-        if (!graph) return;
-
-        // Initialize positions if new graph
-        // (Simple check: if node counts match, we assume it's the same graph frame-to-frame mostly)
-        // But if IDs change, we reset.
-        // For this MVP, we re-ingest if passed, but preserve positions if IDs match.
-        this._syncGraph(graph);
+        if (graph) this._syncGraph(graph);
+        if (!graph && this.nodes.length === 0) return;
 
         this.ctx.clearRect(0, 0, this.width, this.height);
 
@@ -59,12 +75,15 @@ export class SynapseRenderer {
             this._simulatePhysics();
         }
 
+        const xs = this.layout.x;
+        const ys = this.layout.y;
+
         // Draw Edges
         this.ctx.lineWidth = 1;
         this.edges.forEach(edge => {
-            const source = this.nodes[edge.sourceIndex];
-            const target = this.nodes[edge.targetIndex];
-            if (!source || !target) return;
+            const s = edge.sourceIndex;
+            const t = edge.targetIndex;
+            if (s >= this.nodes.length || t >= this.nodes.length) return;
 
             const opacity = Math.min(1, edge.weight * 0.4);
 
@@ -74,160 +93,198 @@ export class SynapseRenderer {
             else this.ctx.strokeStyle = `rgba(200, 200, 200, ${opacity})`;
 
             this.ctx.beginPath();
-            this.ctx.moveTo(source.x, source.y);
-            this.ctx.lineTo(target.x, target.y);
+            this.ctx.moveTo(xs[s], ys[s]);
+            this.ctx.lineTo(xs[t], ys[t]);
             this.ctx.stroke();
         });
 
-        // Draw Nodes
-        this.nodes.forEach(node => {
-            const isHover = this.hoveredNode === node;
-            const isDrag = this.draggedNode === node;
-
-            // Intention Colors
-            const colors = {
-                serenity: '#4a7c82',
-                vibrancy: '#c67605',
-                awe: '#b85b47',
-                legacy: '#5d4037',
-                unknown: '#888'
-            };
+        // Draw Nodes (one path per intention colour)
+        const colors = {
+            serenity: '#4a7c82',
+            vibrancy: '#c67605',
+            awe: '#b85b47',
+            legacy: '#5d4037',
+            unknown: '#888'
+        };
+        const batches = new Map();
+        this.nodes.forEach((node, i) => {
+            if (node === this.hoveredNode) return;
             const color = colors[node.data.intention] || '#888';
-
-            // Draw Node
+            if (!batches.has(color)) batches.set(color, []);
+            batches.get(color).push(i);
+        });
+        batches.forEach((indices, color) => {
             this.ctx.beginPath();
-            this.ctx.arc(node.x, node.y, isHover ? 8 : 5, 0, Math.PI * 2);
+            indices.forEach((i) => {
+                this.ctx.moveTo(xs[i] + 5, ys[i]);
+                this.ctx.arc(xs[i], ys[i], 5, 0, Math.PI * 2);
+            });
             this.ctx.fillStyle = color;
             this.ctx.fill();
+        });
 
-            // Glow/Border
-            if (isHover || isDrag) {
-                this.ctx.strokeStyle = '#fff';
-                this.ctx.lineWidth = 2;
-                this.ctx.stroke();
+        // Glow/Border
+        [this.hoveredNode, this.draggedNode].forEach((node, k) => {
+            if (!node || (k === 1 && node === this.hoveredNode)) return;
+            const i = node.slot;
+            const isHover = node === this.hoveredNode;
 
-                // Tooltip
-                this._drawTooltip(node);
-            }
-        });
+            this.ctx.beginPath();
+            this.ctx.arc(xs[i], ys[i], isHover ? 8 : 5, 0, Math.PI * 2);
+            this.ctx.fillStyle = colors[node.data.intention] || '#888';
+            this.ctx.fill();
+            this.ctx.strokeStyle = '#fff';
+            this.ctx.lineWidth = 2;
+            this.ctx.stroke();
 
-        // Loop if simulating
-        if (this.isSimulating && this._energy() > 0.5) {
-            // Keep loop active via requestAnimationFrame in parent or internal?
-            // Since this is called by App's render loop (Horizon loop usually),
-            // we rely on the parent calling render() repeatedly.
-            // If parent isn't looping, we force it?
-            // For now, we assume App calls render() on RAF.
-        }
+            // Tooltip
+            this._drawTooltip(node);
+        });
     }
 
     _syncGraph(graph) {
         // Map existing positions to new nodes
-        const nodeMap = new Map();
-        this.nodes.forEach(n => nodeMap.set(n.id, {x: n.x, y: n.y, vx: n.vx, vy: n.vy}));
-
-        this.nodes = graph.nodes.map(n => {
-            const existing = nodeMap.get(n.id);
-            if (existing) {
-                n.x = existing.x;
-                n.y = existing.y;
-                n.vx = existing.vx;
-                n.vy = existing.vy;
+        const previous = new Map();
+        this.nodes.forEach((n, i) => previous.set(n.id, i));
+
+        const count = graph.nodes.length;
+        const old = this.layout;
+        const x = new Float32Array(count);
+        const y = new Float32Array(count);
+        const vx = new Float32Array(count);
+        const vy = new Float32Array(count);
+
+        this.nodes = graph.nodes.map((n, i) => {
+            const j = previous.get(n.id);
+            if (j !== undefined) {
+                x[i] = old.x[j];
+                y[i] = old.y[j];
+                vx[i] = old.vx[j];
+                vy[i] = old.vy[j];
             } else {
                 // Spawn in center
-                n.x = this.width/2 + (Math.random() - 0.5) * 50;
-                n.y = this.height/2 + (Math.random() - 0.5) * 50;
+                x[i] = this.width / 2 + (Math.random() - 0.5) * 50;
+                y[i] = this.height / 2 + (Math.random() - 0.5) * 50;
             }
+            n.slot = i;
             return n;
         });
         this.edges = graph.edges;
+
+        const source = new Int32Array(this.edges.length);
+        const target = new Int32Array(this.edges.length);
+        const weight = new Float32Array(this.edges.length);
+        this.edges.forEach((e, k) => {
+            source[k] = e.sourceIndex;
+            target[k] = e.targetIndex;
+            weight[k] = e.weight;
+        });
+
+        this.layout.resize(this.width, this.height);
+        this.layout.setNodes(x, y, vx, vy, count);
+        this.layout.setEdges(source, target, weight);
+
+        if (this._useWorker(count)) {
+            this._workerInit();
+        } else if (this.worker) {
+            // Small graph again: step on the main thread. The worker still holds
+            // the previous graph, so stop it and ignore any reply in flight.
+            this.terminate();
+            this.generation++;
+        }
         this.isSimulating = true;
     }
 
     _simulatePhysics() {
-        const k = 0.05; // Attraction
-        const repulsion = 2000;
-        const damping = 0.85;
-        const centerForce = 0.002;
-
-        const cx = this.width / 2;
-        const cy = this.height / 2;
-
-        // Reset forces
-        this.nodes.forEach(node => {
-            node.fx = 0;
-            node.fy = 0;
-        });
+        const pinned = this.draggedNode ? this.draggedNode.slot : -1;
 
-        // Repulsion (All pairs - O(N^2) but N is small < 1000)
-        for (let i = 0; i < this.nodes.length; i++) {
-            for (let j = i + 1; j < this.nodes.length; j++) {
-                const a = this.nodes[i];
-                const b = this.nodes[j];
-                const dx = a.x - b.x;
-                const dy = a.y - b.y;
-                let distSq = dx * dx + dy * dy;
-                if (distSq < 0.1) distSq = 0.1;
-
-                const f = repulsion / distSq;
-                const fx = (dx / Math.sqrt(distSq)) * f;
-                const fy = (dy / Math.sqrt(distSq)) * f;
-
-                a.fx += fx;
-                a.fy += fy;
-                b.fx -= fx;
-                b.fy -= fy;
-            }
+        if (this.worker) {
+            this._workerStep(pinned);
+            return;
         }
 
-        // Attraction (Edges)
-        this.edges.forEach(edge => {
-            const s = this.nodes[edge.sourceIndex];
-            const t = this.nodes[edge.targetIndex];
-            const dx = t.x - s.x;
-            const dy = t.y - s.y;
-            const dist = Math.sqrt(dx*dx + dy*dy);
-
-            // Hooke's Law
-            const f = dist * k * edge.weight;
-            const fx = (dx / dist) * f;
-            const fy = (dy / dist) * f;
-
-            s.fx += fx;
-            s.fy += fy;
-            t.fx -= fx;
-            t.fy -= fy;
-        });
+        this.energy = this.layout.step(pinned);
 
-        // Center Gravity & Integration
-        this.nodes.forEach(node => {
-            // Dragged node doesn't move by physics
-            if (node === this.draggedNode) return;
+        // Convergence cutoff: stop stepping once the graph has settled
+        if (pinned === -1 && this.layout.isSettled(this.energy)) {
+            this.isSimulating = false;
+        }
+    }
 
-            // Gravity to center
-            node.fx += (cx - node.x) * centerForce;
-            node.fy += (cy - node.y) * centerForce;
+    _energy() {
+        return this.worker ? this.energy : this.layout.energy();
+    }
 
-            // Update Velocity
-            node.vx = (node.vx + node.fx) * damping;
-            node.vy = (node.vy + node.fy) * damping;
+    // --- Worker Hosting ---
 
-            // Update Position
-            node.x += node.vx;
-            node.y += node.vy;
+    _useWorker(count) {
+        if (typeof Worker === 'undefined') return false;
+        if (this.options.worker === 'auto') return count >= this.options.workerThreshold;
+        return !!this.options.worker;
+    }
 
-            // Boundary
-            if (node.x < 10) node.x = 10;
-            if (node.x > this.width - 10) node.x = this.width - 10;
-            if (node.y < 10) node.y = 10;
-            if (node.y > this.height - 10) node.y = this.height - 10;
+    _workerInit() {
+        if (!this.worker) {
+            this.worker = new Worker('js/synapse.worker.js', { type: 'module' });
+            this.worker.onmessage = (e) => this._onWorkerMessage(e.data);
+            this.worker.onerror = (e) => {
+                console.error('Synapse Worker Error:', e);
+                // Fall back to main-thread stepping
+                this.worker = null;
+                this.workerBusy = false;
+            };
+        }
+
+        const { x, y, vx, vy, edgeSource, edgeTarget, edgeWeight } = this.layout;
+        this.generation++;
+        this.workerBusy = false;
+        this.worker.postMessage({
+            type: 'init',
+            generation: this.generation,
+            payload: {
+                width: this.width,
+                height: this.height,
+                params: this.layout.params,
+                x: x.slice(),
+                y: y.slice(),
+                vx: vx.slice(),
+                vy: vy.slice(),
+                edgeSource,
+                edgeTarget,
+                edgeWeight
+            }
         });
     }
 
-    _energy() {
-        let e = 0;
-        this.nodes.forEach(n => e += Math.abs(n.vx) + Math.abs(n.vy));
-        return e;
+    _workerStep(pinned) {
+        // One step in flight at a time; frames in between redraw the last positions
+        if (this.workerBusy) return;
+        this.workerBusy = true;
+        const pin = pinned >= 0
+            ? { index: pinned, x: this.layout.x[pinned], y: this.layout.y[pinned] }
+            : null;
+        this.worker.postMessage({ type: 'step', generation: this.generation, payload: { pin } });
+    }
+
+    _onWorkerMessage(msg) {
+        if (msg.generation !== this.generation) return; // Stale graph
+        if (msg.type === 'positions') {
+            this.workerBusy = false;
+            this.layout.x = msg.x;
+            this.layout.y = msg.y;
+            if (msg.vx) {
+                this.layout.vx = msg.vx;
+                this.layout.vy = msg.vy;
+            }
+            this.energy = msg.energy;
+            if (!this.draggedNode && msg.settled) this.isSimulating = false;
+        }
+    }
+
+    terminate() {
+        if (this.worker) this.worker.terminate();
+        this.worker = null;
+        this.workerBusy = false;
     }
 
     _drawGrid() {
@@ -248,8 +305,8 @@ export class SynapseRenderer {
     _drawTooltip(node) {
         const text = node.data.title;
         const sub = `${node.data.region} // ${node.data.time}`;
-        const x = node.x;
-        const y = node.y - 15;
+        const x = this.layout.x[node.slot];
+        const y = this.layout.y[node.slot] - 15;
 
         this.ctx.font = '12px Inter';
         const w = Math.max(this.ctx.measureText(text).width, this.ctx.measureText(sub).width) + 10;
@@ -277,31 +334,37 @@ export class SynapseRenderer {
 
         if (type === 'move') {
             if (this.draggedNode) {
-                this.draggedNode.x = cx;
-                this.draggedNode.y = cy;
+                this.layout.x[this.draggedNode.slot] = cx;
+                this.layout.y[this.draggedNode.slot] = cy;
+                this.layout.reheat(0.3);
                 this.isSimulating = true; // Wake up
             } else {
-                this.hoveredNode = this._findNode(cx, cy);
+                const hovered = this._findNode(cx, cy);
+                const changed = hovered !== this.hoveredNode;
+                this.hoveredNode = hovered;
+                return changed;
             }
         } else if (type === 'down') {
             this.draggedNode = this._findNode(cx, cy);
-            if (this.draggedNode) {
-                this.draggedNode.vx = 0;
-                this.draggedNode.vy = 0;
+            if (this.draggedNode && !this.worker) {
+                this.layout.vx[this.draggedNode.slot] = 0;
+                this.layout.vy[this.draggedNode.slot] = 0;
             }
         } else if (type === 'up') {
             this.draggedNode = null;
         }
+        return false;
     }
 
     _findNode(x, y) {
         // Simple radius check
+        const xs = this.layout.x;
+        const ys = this.layout.y;
         for (let i = this.nodes.length - 1; i >= 0; i--) {
-            const n = this.nodes[i];
-            const dx = x - n.x;
-            const dy = y - n.y;
+            const dx = x - xs[i];
+            const dy = y - ys[i];
             if (dx*dx + dy*dy < 100) { // Radius 10
-                return n;
+                return this.nodes[i];
             }
         }
         return null;
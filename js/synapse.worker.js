@@ -0,0 +1,42 @@
+// Synapse Worker - Hosts the Barnes–Hut layout off the UI thread.
+// Receives the graph once per change, then steps on demand and posts positions back.
+
+import { ForceLayout } from './synapse-physics.js';
+
+let layout = null;
+let generation = -1;
+
+self.onmessage = (e) => {
+    const { type, payload } = e.data;
+
+    if (type === 'init') {
+        generation = e.data.generation;
+        layout = new ForceLayout(payload.params);
+        layout.resize(payload.width, payload.height);
+        layout.setNodes(payload.x, payload.y, payload.vx, payload.vy, payload.x.length);
+        layout.setEdges(payload.edgeSource, payload.edgeTarget, payload.edgeWeight);
+    } else if (type === 'step') {
+        if (!layout || e.data.generation !== generation) return;
+
+        let pinned = -1;
+        if (payload.pin) {
+            pinned = payload.pin.index;
+            layout.x[pinned] = payload.pin.x;
+            layout.y[pinned] = payload.pin.y;
+            layout.vx[pinned] = 0;
+            layout.vy[pinned] = 0;
+            layout.reheat(0.3);
+        }
+
+        const energy = layout.step(pinned);
+        const x = layout.x.slice();
+        const y = layout.y.slice();
+        // Velocities too, so a re-init (resize) resumes the motion instead of restarting it
+        const vx = layout.vx.slice();
+        const vy = layout.vy.slice();
+        self.postMessage(
+            { type: 'positions', generation, x, y, vx, vy, energy, settled: layout.isSettled(energy) },
+            [x.buffer, y.buffer, vx.buffer, vy.buffer]
+        );
+    }
+};
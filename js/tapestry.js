@@ -1,19 +1,119 @@
 import { CryptoGuard } from './crypto-guard.js';
-
-async function sha256(message) {
-    const msgBuffer = new TextEncoder().encode(message);
-    const hashBuffer = await crypto.subtle.digest('SHA-256', msgBuffer);
-    const hashArray = Array.from(new Uint8Array(hashBuffer));
-    return hashArray.map((b) => b.toString(16).padStart(2, '0')).join('');
+import { LedgerStore, LedgerConflictError, PLAIN_CODEC } from './ledger-store.js';
+import {
+    sha256,
+    toHex,
+    linkPayload,
+    validateThread,
+    ChainVerifier,
+    readScroll,
+    MAX_SCROLL_BYTES
+} from './ledger-chain.js';
+import { encodeScroll } from './scroll-codec.js';
+
+function fromHex(hex) {
+    const bytes = new Uint8Array(hex.length >> 1);
+    for (let i = 0; i < bytes.length; i++) {
+        bytes[i] = parseInt(hex.substr(i * 2, 2), 16);
+    }
+    return bytes;
 }
 
+const CHECKPOINT_INTERVAL = 128; // Threads between integrity checkpoints
+const HASH_BATCH = 256; // Digests in flight per verification batch
+const FIRST_PAGE = 512; // Newest threads loaded before initialize() resolves
+
+const EMPTY_VIEW = Object.freeze([]);
+
 export class TapestryLedger {
-    constructor(storageKey = 'marq_tapestry_threads') {
+    /**
+     * @param {string} storageKey
+     * @param {Object} options - { checkpointInterval } threads between signed
+     *   integrity checkpoints (see verifyIntegrity); { store } overrides the
+     *   storage backend (null forces the legacy localStorage blob)
+     */
+    constructor(storageKey = 'marq_tapestry_threads', options = {}) {
         this.storageKey = storageKey;
         this.crypto = new CryptoGuard();
+        this.checkpointInterval = options.checkpointInterval || CHECKPOINT_INTERVAL;
+        this.checkpoint = null; // { index, mac } of the last signed checkpoint
+        this._checkpointKey = null;
+        this.lastVerifiedFrom = 0; // First index hashed by the last verification
         this.isIntegrityVerified = false;
         this.status = 'UNINITIALIZED'; // UNINITIALIZED, LOCKED, READY
         this.threads = []; // Will be populated in initialize
+        this._view = EMPTY_VIEW;
+        this._viewSource = null;
+
+        // Append-only IndexedDB segments where available, else one localStorage blob
+        this.store = options.store !== undefined ? options.store : LedgerStore.create(storageKey);
+        // With a store, threads may hold only the newest page while older history
+        // loads; offset is the ledger index of threads[0] (0 once hydrated)
+        this.offset = 0;
+        this._hydration = null;
+        // Appends (local weaves, peer merges) run one at a time, each against
+        // the head the previous one left
+        this._writes = Promise.resolve();
+        // localStorage key whose 'storage' events signal a change from another tab
+        this.syncKey = this.store ? `${storageKey}_rev` : storageKey;
+    }
+
+    get length() {
+        return this.offset + this.threads.length;
+    }
+
+    _threadAt(index) {
+        return this.threads[index - this.offset];
+    }
+
+    /**
+     * Resolves once the full history is in memory (immediately without a store).
+     */
+    hydrated() {
+        if (this.offset === 0) return Promise.resolve();
+        if (!this._hydration) {
+            const codec = this._codec();
+            const loaded = this.threads;
+            this._hydration = this.store
+                .readRange(0, this.offset, codec)
+                .then((older) => {
+                    // Dropped if the ledger was replaced (reload, import, lock) meanwhile
+                    if (this.threads !== loaded) return;
+                    this.threads = older.concat(loaded);
+                    this.offset = 0;
+                })
+                .finally(() => {
+                    this._hydration = null;
+                });
+        }
+        return this._hydration;
+    }
+
+    _resetWindow() {
+        this.offset = 0;
+        this._hydration = null;
+    }
+
+    // Segment codec for the current session: plaintext or AES-GCM per segment
+    _codec(password = this.crypto.getSessionPassword()) {
+        if (!password) return PLAIN_CODEC;
+        return {
+            encrypted: true,
+            seal: async (threads) => ({ packet: await this.crypto.encrypt(threads, password) }),
+            open: (record) => {
+                if (!record.packet) throw new Error('Segment is not encrypted');
+                return this.crypto.decrypt(record.packet, password);
+            }
+        };
+    }
+
+    // Lets other tabs know the store changed (IndexedDB has no storage events)
+    _announce() {
+        try {
+            localStorage.setItem(this.syncKey, String(Date.now()));
+        } catch {
+            // Sync is best-effort
+        }
     }
 
     _loadRaw() {
@@ -22,6 +122,17 @@ export class TapestryLedger {
 
     async _save() {
         if (this.status === 'LOCKED') return; // Cannot save if locked
+        if (this.store) {
+            try {
+                // Full rewrite; only for whole-ledger changes. Weaves use _append.
+                await this.hydrated();
+                await this.store.replace(this.threads, this._codec());
+                this._announce();
+            } catch (e) {
+                console.error('Failed to save tapestry threads', e);
+            }
+            return;
+        }
         try {
             let dataToSave = this.threads;
 
@@ -37,7 +148,30 @@ export class TapestryLedger {
         }
     }
 
+    // Persists the thread just pushed onto threads. Returns false when another
+    // tab appended first: the thread is dropped and that tab's appends pulled
+    // in, so the caller can chain onto the new head instead.
+    async _append(thread) {
+        if (!this.store) {
+            await this._save();
+            return true;
+        }
+        try {
+            await this.store.append(thread, this._codec(), this.length - 1);
+            this._announce();
+        } catch (e) {
+            if (e instanceof LedgerConflictError) {
+                this.threads.pop();
+                await this._reloadFromStore();
+                return false;
+            }
+            console.error('Failed to save tapestry thread', e);
+        }
+        return true;
+    }
+
     async initialize() {
+        if (this.store) return this._initializeFromStore();
         const raw = this._loadRaw();
 
         if (!raw) {
@@ -72,7 +206,7 @@ export class TapestryLedger {
                 // Migrating legacy tapestry data to ledger format...
                 await this._migrateData();
             }
-            await this.verifyIntegrity();
+            await this.verifyIntegrity({ fromCheckpoint: true });
             this.status = 'READY';
             return 'READY';
         }
@@ -83,21 +217,129 @@ export class TapestryLedger {
         return 'READY';
     }
 
+    // Loads the newest page (and the checkpointed link it verifies from), then
+    // pages in older history in the background instead of parsing it all up front
+    async _initializeFromStore() {
+        let meta = await this.store.getMeta();
+        if (!meta) {
+            if (this._hasEncryptedLegacyBlob()) {
+                // Migrated on unlock, once it can be decrypted
+                this.status = 'LOCKED';
+                return 'LOCKED';
+            }
+            await this._migrateFromLocalStorage();
+            meta = await this.store.getMeta();
+        }
+
+        if (!meta || meta.length === 0) {
+            this.threads = [];
+            this.status = 'READY';
+            this.isIntegrityVerified = true;
+            return 'READY';
+        }
+        if (meta.encrypted) {
+            this.status = 'LOCKED';
+            return 'LOCKED';
+        }
+
+        await this._loadFromStore(meta, PLAIN_CODEC);
+        this.status = 'READY';
+        return 'READY';
+    }
+
+    async _loadFromStore(meta, codec) {
+        // The window must reach back to the checkpointed link for a tail-only
+        // verification; without a checkpoint everything is needed anyway
+        const checkpointIndex = this._storedCheckpointIndex();
+        let from = 0;
+        if (checkpointIndex >= 0 && checkpointIndex < meta.length) {
+            from = Math.min(Math.max(0, meta.length - FIRST_PAGE), checkpointIndex);
+        }
+
+        this._resetWindow();
+        this.threads = await this.store.readRange(from, meta.length, codec);
+        this.offset = from;
+        await this.verifyIntegrity({ fromCheckpoint: true });
+        if (this.offset > 0) {
+            this.hydrated().catch((e) => console.error('Failed to load ledger history', e));
+        }
+    }
+
+    _hasEncryptedLegacyBlob() {
+        try {
+            const parsed = JSON.parse(this._loadRaw());
+            return !!(parsed && parsed.tag === 'AEGIS_SECURE');
+        } catch {
+            return false;
+        }
+    }
+
+    // One-time move of the localStorage ledger into the store
+    async _migrateFromLocalStorage() {
+        const raw = this._loadRaw();
+        if (!raw) return;
+
+        let parsed;
+        try {
+            parsed = JSON.parse(raw);
+        } catch {
+            console.error('Corrupt storage.');
+            return;
+        }
+        if (!Array.isArray(parsed)) return;
+
+        this.threads = parsed;
+        if (this.threads.some((t) => !t.hash)) {
+            await this._migrateData(); // Rehashes and saves through the store
+        } else {
+            await this.store.replace(this.threads, PLAIN_CODEC);
+        }
+        localStorage.removeItem(this.storageKey);
+    }
+
     async unlock(password) {
         if (this.status !== 'LOCKED') return true;
+        if (this.store) return this._unlockStore(password);
 
         const raw = this._loadRaw();
         const encrypted = JSON.parse(raw);
 
         try {
+            // Session first, so the key derived here is the one later saves reuse
+            this.crypto.setSessionPassword(password);
             const decrypted = await this.crypto.decrypt(encrypted, password);
             this.threads = decrypted;
+            this.status = 'READY';
+            await this.verifyIntegrity({ fromCheckpoint: true });
+            return true;
+        } catch (e) {
+            console.error('Unlock failed:', e);
+            this.crypto.clearSession();
+            return false;
+        }
+    }
+
+    async _unlockStore(password) {
+        try {
             this.crypto.setSessionPassword(password);
+            const codec = this._codec(password);
+            let meta = await this.store.getMeta();
+            if (!meta) {
+                // Encrypted localStorage ledger from before the store existed
+                const decrypted = await this.crypto.decrypt(JSON.parse(this._loadRaw()), password);
+                await this.store.replace(decrypted, codec);
+                localStorage.removeItem(this.storageKey);
+                meta = await this.store.getMeta();
+            }
+            await this._loadFromStore(meta, codec);
+            await this.hydrated();
             this.status = 'READY';
-            await this.verifyIntegrity();
             return true;
         } catch (e) {
             console.error('Unlock failed:', e);
+            this.crypto.clearSession();
+            this.threads = [];
+            this._resetWindow();
             return false;
         }
     }
@@ -105,6 +347,7 @@ export class TapestryLedger {
     async lock() {
         if (!this.crypto.hasSession()) return false; // Can't lock if no password known
         this.status = 'LOCKED';
+        this._resetWindow();
         this.threads = []; // Clear memory
         this.crypto.clearSession(); // Clear key from memory
         // Data is already encrypted on disk from last save
@@ -112,14 +355,18 @@ export class TapestryLedger {
     }
 
     async enableEncryption(password) {
+        await this.hydrated();
         this.crypto.setSessionPassword(password);
         await this._save(); // Will encrypt now
+        await this._resignCheckpoint();
     }
 
     async disableEncryption() {
         if (!this.crypto.hasSession()) return false;
+        await this.hydrated();
         this.crypto.clearSession();
         await this._save(); // Will save as plaintext
+        await this._resignCheckpoint();
         return true;
     }
 
@@ -156,42 +403,205 @@ export class TapestryLedger {
         await this._save();
     }
 
-    async verifyIntegrity() {
+    /**
+     * Verifies the hash chain.
+     * By default every link is re-hashed. With { fromCheckpoint: true } (used at
+     * startup) the chain up to the last signed checkpoint is trusted and only the
+     * tail after it is hashed; a missing or invalid checkpoint falls back to a
+     * full pass. Successful passes advance the checkpoint.
+     * A full pass waits for older history still paging in from the store.
+     * @param {Object} options - { fromCheckpoint }
+     * @returns {Promise<boolean>}
+     */
+    async verifyIntegrity(options = {}) {
         if (this.threads.length === 0) {
             this.isIntegrityVerified = true;
             return true;
         }
 
-        let previousHash = 'GENESIS_HASH';
-        for (let i = 0; i < this.threads.length; i++) {
-            const thread = this.threads[i];
-
-            // Reconstruct payload to verify
-            const dataString = JSON.stringify({
-                intention: thread.intention,
-                time: thread.time,
-                region: thread.region,
-                title: thread.title,
-                timestamp: thread.timestamp,
-                previousHash: previousHash
-            });
-            const calculatedHash = await sha256(dataString);
+        let start = 0;
+        if (options.fromCheckpoint) {
+            // Only checkpoints inside the loaded window are found
+            const checkpoint = await this._loadCheckpoint();
+            if (checkpoint) start = checkpoint.index + 1;
+        }
+        if (start === 0) await this.hydrated();
+        this.lastVerifiedFrom = start;
 
-            if (calculatedHash !== thread.hash) {
-                console.warn(
-                    `Integrity failure at thread ${i}. Expected ${calculatedHash}, got ${thread.hash}`
-                );
-                thread.integrityStatus = 'corrupted';
-                this.isIntegrityVerified = false;
-                return false;
-            }
-            previousHash = thread.hash;
+        const failure = await this._verifyChain(this.threads, start - this.offset);
+        if (failure) {
+            console.warn(
+                `Integrity failure at thread ${failure.index + this.offset}. Expected ${failure.calculatedHash}, got ${this.threads[failure.index].hash}`
+            );
+            this.threads[failure.index].integrityStatus = 'corrupted';
+            this.isIntegrityVerified = false;
+            return false;
         }
         this.isIntegrityVerified = true;
+        await this._writeCheckpoint();
         return true;
     }
 
-    async addThread(data) {
+    /**
+     * Hashes threads[start..] against their stored links. threads[0] is taken to
+     * be the genesis link, so windows must start verification past their first entry.
+     * Each link's previousHash is the stored hash of its predecessor, so the
+     * digests are independent and run concurrently in batches; the first
+     * mismatch is the same one a sequential walk would stop at.
+     * @returns {Promise<Object|null>} { index, calculatedHash } of the first bad link
+     */
+    async _verifyChain(threads, start = 0) {
+        for (let base = start; base < threads.length; base += HASH_BATCH) {
+            const end = Math.min(base + HASH_BATCH, threads.length);
+            const digests = [];
+            for (let i = base; i < end; i++) {
+                const previousHash = i === 0 ? 'GENESIS_HASH' : threads[i - 1].hash;
+                digests.push(sha256(linkPayload(threads[i], previousHash)));
+            }
+            const hashes = await Promise.all(digests);
+            for (let k = 0; k < hashes.length; k++) {
+                if (hashes[k] !== threads[base + k].hash) {
+                    return { index: base + k, calculatedHash: hashes[k] };
+                }
+            }
+        }
+        return null;
+    }
+
+    // --- Integrity Checkpoints ---
+    // A checkpoint is an HMAC over (index, hash) of a verified link, stored next
+    // to the ledger. The hash itself is not stored, so an encrypted ledger leaks
+    // nothing; it is recomputed from threads[index] when the checkpoint is checked.
+    //
+    // The HMAC key decides what a checkpoint is worth:
+    // - Encrypted ledgers sign with a key derived from the session password
+    //   (under a salt stored in the checkpoint). Storage never holds it, so a
+    //   checkpoint cannot be forged for an edited or swapped-in ledger.
+    // - Plaintext ledgers sign with a non-extractable per-device CryptoKey kept
+    //   in IndexedDB, or a random key in localStorage without a store. Whoever can
+    //   write the ledger can replace that key (or rehash the whole chain), so
+    //   these checkpoints only guard against accidental corruption and partial
+    //   edits. `verify` in the terminal re-hashes everything on demand.
+
+    _getCheckpointKey(salt) {
+        if (this.crypto.hasSession()) return this.crypto.sessionMacKey(salt);
+        if (!this._checkpointKey) {
+            this._checkpointKey = this._deviceCheckpointKey();
+            this._checkpointKey.catch(() => (this._checkpointKey = null));
+        }
+        return this._checkpointKey;
+    }
+
+    async _deviceCheckpointKey() {
+        const keyName = `${this.storageKey}_checkpoint_key`;
+        if (this.store) {
+            localStorage.removeItem(keyName); // Raw key from before the store existed
+            const candidate = await crypto.subtle.generateKey(
+                { name: 'HMAC', hash: 'SHA-256', length: 256 },
+                false,
+                ['sign', 'verify']
+            );
+            return this.store.keepKey('checkpoint', candidate);
+        }
+
+        let hex = localStorage.getItem(keyName);
+        if (!hex || !/^[a-f0-9]{64}$/.test(hex)) {
+            hex = toHex(crypto.getRandomValues(new Uint8Array(32)));
+            localStorage.setItem(keyName, hex);
+        }
+        return crypto.subtle.importKey(
+            'raw',
+            fromHex(hex),
+            { name: 'HMAC', hash: 'SHA-256' },
+            false,
+            ['sign', 'verify']
+        );
+    }
+
+    _checkpointMessage(index) {
+        return new TextEncoder().encode(`${index}:${this._threadAt(index).hash}`);
+    }
+
+    async _loadCheckpoint() {
+        const raw = localStorage.getItem(`${this.storageKey}_checkpoint`);
+        if (!raw) return null;
+        try {
+            const checkpoint = JSON.parse(raw);
+            const { index, mac, salt } = checkpoint;
+            if (!Number.isInteger(index) || index < this.offset || index >= this.length) return null;
+            if (typeof mac !== 'string' || !/^[a-f0-9]{64}$/.test(mac)) return null;
+            // Signed under the other kind of key (encryption was added or removed)
+            if (this.crypto.hasSession() !== (typeof salt === 'string')) return null;
+
+            const key = await this._getCheckpointKey(salt);
+            const valid = await crypto.subtle.verify('HMAC', key, fromHex(mac), this._checkpointMessage(index));
+            if (!valid) {
+                console.warn(`Integrity checkpoint at thread ${index} rejected; running full verification.`);
+                return null;
+            }
+            this.checkpoint = checkpoint;
+            return checkpoint;
+        } catch {
+            return null;
+        }
+    }
+
+    // Signs the last whole interval of the (verified) chain
+    async _writeCheckpoint() {
+        const interval = this.checkpointInterval;
+        const index = Math.floor(this.length / interval) * interval - 1;
+        if (index < this.offset) return;
+        if (this.checkpoint && this.checkpoint.index === index) return;
+
+        try {
+            let salt;
+            if (this.crypto.hasSession()) {
+                // Keep the salt (and so the derived key) of the previous checkpoint
+                salt = this.checkpoint && this.checkpoint.salt ? this.checkpoint.salt : this.crypto.newSalt();
+            }
+            const key = await this._getCheckpointKey(salt);
+            const signature = await crypto.subtle.sign('HMAC', key, this._checkpointMessage(index));
+            this.checkpoint = { index, mac: toHex(new Uint8Array(signature)), ...(salt && { salt }) };
+            localStorage.setItem(`${this.storageKey}_checkpoint`, JSON.stringify(this.checkpoint));
+        } catch (e) {
+            console.error('Failed to save integrity checkpoint', e);
+        }
+    }
+
+    // The checkpoint key follows the password; re-sign when it changes
+    async _resignCheckpoint() {
+        if (!this.checkpoint) return;
+        this.checkpoint = null;
+        await this._writeCheckpoint();
+    }
+
+    // Unverified index of the stored checkpoint, used to size the first page
+    _storedCheckpointIndex() {
+        try {
+            const checkpoint = JSON.parse(localStorage.getItem(`${this.storageKey}_checkpoint`));
+            return checkpoint && Number.isInteger(checkpoint.index) ? checkpoint.index : -1;
+        } catch {
+            return -1;
+        }
+    }
+
+    _clearCheckpoint() {
+        this.checkpoint = null;
+        localStorage.removeItem(`${this.storageKey}_checkpoint`);
+    }
+
+    // Runs op after every append queued before it
+    _exclusive(op) {
+        const run = this._writes.then(op);
+        this._writes = run.catch(() => {});
+        return run;
+    }
+
+    addThread(data) {
+        return this._exclusive(() => this._addThread(data));
+    }
+
+    async _addThread(data) {
         if (this.status === 'LOCKED') throw new Error('Ledger is Locked');
 
         const previousHash =
@@ -218,11 +628,16 @@ export class TapestryLedger {
         };
 
         this.threads.push(thread);
-        await this._save();
+        if (!(await this._append(thread))) return this._addThread(data);
+        // Only extend checkpoints over a chain already known to be sound
+        if (this.isIntegrityVerified && this.length % this.checkpointInterval === 0) {
+            await this._writeCheckpoint();
+        }
         return thread;
     }
 
     async reload() {
+        if (this.store) return this._reloadFromStore();
         const raw = this._loadRaw();
         if (!raw) {
             this.threads = [];
@@ -248,7 +663,7 @@ export class TapestryLedger {
                         password
                     );
                     this.threads = decrypted;
-                    await this.verifyIntegrity();
+                    await this.verifyIntegrity({ fromCheckpoint: true });
                 } catch (e) {
                     console.error(
                         'Reload failed: Key mismatch or corruption',
@@ -265,17 +680,146 @@ export class TapestryLedger {
             // Plaintext
             if (Array.isArray(parsed)) {
                 this.threads = parsed;
-                await this.verifyIntegrity();
+                await this.verifyIntegrity({ fromCheckpoint: true });
                 this.status = 'READY';
             }
         }
     }
 
+    // Another tab wrote to the store: pull in its appends, or reload on divergence
+    async _reloadFromStore() {
+        const meta = await this.store.getMeta();
+        if (!meta || meta.length === 0) {
+            this._resetWindow();
+            this.threads = [];
+            return;
+        }
+        if (meta.encrypted && !this.crypto.hasSession()) {
+            this.status = 'LOCKED';
+            this._resetWindow();
+            this.threads = [];
+            return;
+        }
+
+        const codec = this._codec();
+        try {
+            const head = this.threads[this.threads.length - 1];
+            if (head && meta.length === this.length && meta.headHash === head.hash) return;
+
+            if (head && meta.length > this.length) {
+                const appended = await this.store.readRange(this.length, meta.length, codec);
+                if (appended.length > 0 && appended[0].previousHash === head.hash) {
+                    for (const thread of appended) this.threads.push(thread);
+                    await this.verifyIntegrity({ fromCheckpoint: true });
+                    return;
+                }
+            }
+
+            this.checkpoint = null;
+            await this._loadFromStore(meta, codec);
+            this.status = 'READY';
+        } catch (e) {
+            console.error('Reload failed: Key mismatch or corruption', e);
+            this.status = 'LOCKED';
+            this._resetWindow();
+            this.threads = [];
+        }
+    }
+
+    /**
+     * Mutable copy of the loaded threads. With a store, older history may still
+     * be paging in right after initialize(); await hydrated() for the full ledger.
+     */
     getThreads() {
         if (this.status === 'LOCKED') return [];
         return [...this.threads];
     }
 
+    /**
+     * Read-only snapshot of the ledger for hot paths (render loops, engine passes).
+     * The frozen array is reused until the ledger changes instead of being copied
+     * per call, which also lets memoized engines see the same array every frame.
+     * Use getThreads() when a mutable copy is needed.
+     */
+    getView() {
+        if (this.status === 'LOCKED') return EMPTY_VIEW;
+        const threads = this.threads;
+        const n = threads.length;
+        const view = this._view;
+        if (this._viewSource !== threads || view.length !== n || (n > 0 && view[n - 1] !== threads[n - 1])) {
+            this._view = Object.freeze(threads.slice());
+            this._viewSource = threads;
+        }
+        return this._view;
+    }
+
+    // --- Peer Sync (see gemini.js) ---
+
+    /**
+     * @returns {{ length: number, hash: string }} Head link ('GENESIS_HASH' when empty)
+     */
+    getHead() {
+        const n = this.length;
+        return { length: n, hash: n > 0 ? this._threadAt(n - 1).hash : 'GENESIS_HASH' };
+    }
+
+    /**
+     * Threads [start, end), paging in older history if the range needs it.
+     */
+    async getRange(start, end = this.length) {
+        if (start < this.offset) await this.hydrated();
+        return this.threads.slice(Math.max(0, start - this.offset), Math.max(0, end - this.offset));
+    }
+
+    /**
+     * Appends threads received from a peer. previousHash is the head they were
+     * cut from; threads the ledger already holds (e.g. written by a tab sharing
+     * the store) are skipped, so the delta may overlap the local head.
+     * Merges queue behind other appends, so overlapping deltas (two peers
+     * answering one gap) are checked against the head the previous one left.
+     * @returns {Promise<number>} Threads appended
+     */
+    mergeThreads(threads, previousHash) {
+        return this._exclusive(() => this._mergeThreads(threads, previousHash));
+    }
+
+    async _mergeThreads(threads, previousHash) {
+        if (this.status !== 'READY') throw new Error('Ledger is Locked');
+        // Pull in appends from other tabs first so they are not written twice
+        if (this.store) await this._reloadFromStore();
+
+        const head = this.getHead();
+        let start = 0;
+        if (previousHash !== head.hash) {
+            start = threads.findIndex((thread) => thread.hash === head.hash) + 1;
+            if (start === 0) throw new Error('Delta does not extend this ledger');
+        }
+        const fresh = threads.slice(start);
+        if (fresh.length === 0) return 0;
+
+        if (!fresh.every((thread) => validateThread(thread))) {
+            throw new Error('Invalid schema or data types in delta');
+        }
+        const failure = await new ChainVerifier(head.hash).verify(fresh);
+        if (failure) throw new Error(`Integrity check failed for delta at thread ${failure.index}`);
+
+        const before = this.length;
+        for (let i = 0; i < fresh.length; i++) {
+            this.threads.push(fresh[i]);
+            if (this.store && !(await this._append(fresh[i]))) {
+                // Another tab moved the head; merge the rest against it
+                return i + (await this._mergeThreads(threads, previousHash));
+            }
+        }
+        if (!this.store) await this._save();
+
+        const interval = this.checkpointInterval;
+        if (this.isIntegrityVerified && Math.floor(before / interval) !== Math.floor(this.length / interval)) {
+            await this._writeCheckpoint();
+        }
+        return fresh.length;
+    }
+
     async importScroll(jsonString) {
         if (this.status === 'LOCKED')
             throw new Error('Unlock ledger to import');
@@ -303,16 +847,13 @@ export class TapestryLedger {
                     'Invalid schema or data types in imported threads'
                 );
 
-            // verify the imported chain
-            const tempLedger = new TapestryLedger('temp');
-            tempLedger.threads = imported;
-            const valid = await tempLedger.verifyIntegrity();
+            // verify the imported chain (always in full)
+            const failure = await this._verifyChain(imported);
 
-            if (!valid)
+            if (failure)
                 throw new Error('Integrity check failed for imported scroll');
 
-            this.threads = imported;
-            await this._save();
+            await this._commitImport(imported);
             return true;
         } catch (e) {
             console.error('Import failed', e);
@@ -320,54 +861,103 @@ export class TapestryLedger {
         }
     }
 
-    _validateThreadSchema(thread) {
-        // Type checks
-        if (typeof thread.id !== 'string') return false;
-        if (typeof thread.intention !== 'string') return false;
-        if (typeof thread.time !== 'string') return false;
-        if (typeof thread.region !== 'string') return false;
-        if (typeof thread.title !== 'string') return false;
-        if (typeof thread.hash !== 'string') return false;
-        if (typeof thread.timestamp !== 'number') return false;
-
-        // Content checks (Sanitization / Whitelisting)
-        if (thread.id.length > 32) return false;
-        if (thread.title.length > 100) return false;
-        if (thread.region.length > 50) return false;
-
-        // Regex Validation (Alpha-numeric + specific safe chars)
-        // Prevent script injection via title/region if they are rendered anywhere sensitive
-        const safeTextRegex = /^[a-zA-Z0-9\s\-_.,!?'"()]+$/;
-        if (!safeTextRegex.test(thread.title)) return false;
-        if (!safeTextRegex.test(thread.region)) return false;
-
-        // Enum checks
-        const validIntentions = [
-            'serenity',
-            'vibrancy',
-            'awe',
-            'legacy',
-            'unknown'
-        ];
-        const validTimes = ['dawn', 'midday', 'dusk', 'night', 'unknown'];
-
-        if (!validIntentions.includes(thread.intention)) return false;
-        if (!validTimes.includes(thread.time)) return false;
-
-        // Hash format check (Hex)
-        if (!/^[a-f0-9]{64}$/i.test(thread.hash)) return false;
+    /**
+     * Streaming import for scroll files of any practical size (100k+ threads).
+     * The file is parsed incrementally and validated and hash-verified in
+     * batches inside scroll.worker.js (inline where workers are unavailable).
+     * The ledger is replaced only once the whole scroll has verified.
+     * @param {Blob} file
+     * @param {Object} options - { onProgress({ threads, bytes, totalBytes }) }
+     * @returns {Promise<number>} Number of threads imported
+     */
+    async importScrollFile(file, options = {}) {
+        if (this.status === 'LOCKED')
+            throw new Error('Unlock ledger to import');
 
-        return true;
+        try {
+            if (file.size > MAX_SCROLL_BYTES) throw new Error('File too large');
+            const imported = await this._readScrollFile(file, options.onProgress);
+            await this._commitImport(imported);
+            return imported.length;
+        } catch (e) {
+            console.error('Import failed', e);
+            throw e;
+        }
+    }
+
+    _readScrollFile(file, onProgress = null) {
+        if (typeof Worker === 'undefined') {
+            return readScroll(file, { onProgress });
+        }
+
+        // One worker per import; a finished import has nothing worth keeping warm
+        const worker = new Worker('js/scroll.worker.js', { type: 'module' });
+        return new Promise((resolve, reject) => {
+            worker.onmessage = (e) => {
+                const { type, result, error, progress } = e.data;
+                if (type === 'progress') {
+                    if (onProgress) onProgress(progress);
+                    return;
+                }
+                worker.terminate();
+                if (type === 'success') resolve(result);
+                else reject(new Error(error));
+            };
+            worker.onerror = (e) => {
+                worker.terminate();
+                reject(new Error(e.message || 'Scroll worker failed'));
+            };
+            worker.postMessage({ type: 'import', id: 0, payload: { file } });
+        });
+    }
+
+    // Persists a verified replacement ledger before swapping it in, so a failed
+    // write (quota, aborted transaction) leaves memory and storage on the old one
+    async _commitImport(imported) {
+        if (this.store) {
+            await this.store.replace(imported, this._codec());
+            this._announce();
+        } else {
+            const data = this.crypto.hasSession()
+                ? await this.crypto.encrypt(imported, this.crypto.getSessionPassword())
+                : imported;
+            localStorage.setItem(this.storageKey, JSON.stringify(data));
+        }
+
+        this._resetWindow();
+        this.threads = imported;
+        this.isIntegrityVerified = true;
+        this._clearCheckpoint();
+        await this._writeCheckpoint();
+    }
+
+    _validateThreadSchema(thread) {
+        return validateThread(thread);
     }
 
     exportScroll() {
         if (this.status === 'LOCKED') throw new Error('Ledger Locked');
+        if (this.offset > 0) throw new Error('Ledger history still loading');
         return JSON.stringify(this.threads, null, 2);
     }
 
+    /**
+     * Compact binary scroll (see scroll-codec.js); exportScroll() stays the
+     * JSON interchange format.
+     * @param {Object} options - { compress: true }
+     * @returns {Promise<Uint8Array>}
+     */
+    async exportScrollBinary(options = {}) {
+        if (this.status === 'LOCKED') throw new Error('Ledger Locked');
+        if (this.offset > 0) throw new Error('Ledger history still loading');
+        return encodeScroll(this.threads, options);
+    }
+
     clear() {
         if (this.status === 'LOCKED') return;
+        this._resetWindow();
         this.threads = [];
+        this._clearCheckpoint();
         this._save();
     }
 }
@@ -57,6 +57,24 @@ export function registerCommands(terminal, context) {
         terminal.log(`Thread Count: ${threadCount}`, 'info');
     });
 
+    terminal.registerCommand(
+        'verify',
+        'Re-hash the full ledger chain',
+        async () => {
+            if (!checkAccess()) return;
+            const count = tapestryLedger.getView().length;
+            terminal.log(`VERIFYING ${count} LINKS...`, 'system');
+            const start = performance.now();
+            const valid = await tapestryLedger.verifyIntegrity();
+            const elapsed = Math.round(performance.now() - start);
+            if (valid) {
+                terminal.log(`CHAIN INTACT. ${count} links verified in ${elapsed}ms.`, 'success');
+            } else {
+                terminal.log('INTEGRITY FAILURE. Ledger chain is broken.', 'error');
+            }
+        }
+    );
+
     terminal.registerCommand(
         'auth',
         'Unlock the Secure Enclave',
@@ -529,8 +547,27 @@ export function registerCommands(terminal, context) {
                         terminal.log('SCAN COMPLETE. SYSTEM CLEAN.', 'success');
                     }
                 }, 800);
+            } else if (subcmd === 'history') {
+                const timeline = context.engines.sentinel.scanHistory(tapestryLedger.getView());
+                const changes = timeline.transitions();
+                const peak = timeline.peak();
+                terminal.log('--- SENTINEL THREAT TIMELINE ---', 'system');
+                terminal.log(
+                    `Threads scanned: ${timeline.length} // Peak: DEFCON ${peak.defcon}${peak.index >= 0 ? ` at #${peak.index}` : ''}`,
+                    'info'
+                );
+                if (changes.length === 0) {
+                    terminal.log('No DEFCON changes on record.', 'success');
+                }
+                changes.slice(-10).forEach(({ index, defcon }) => {
+                    const threats = timeline.threatsAt(index).map((t) => t.type).join(', ');
+                    terminal.log(
+                        `#${index}: DEFCON ${defcon}${threats ? ` (${threats})` : ''}`,
+                        defcon < 3 ? 'error' : defcon < 5 ? 'warning' : 'success'
+                    );
+                });
             } else {
-                terminal.log('Usage: sentinel [status|scan]', 'warning');
+                terminal.log('Usage: sentinel [status|scan|history]', 'warning');
             }
         }
     );
@@ -586,11 +623,38 @@ export function registerCommands(terminal, context) {
     terminal.registerCommand(
         'simulate',
         'Run Chronos Tactical Forecast',
-        (args) => {
+        async (args) => {
             if (!checkAccess()) return;
+
+            if (args[0] === 'best') {
+                const limit = parseInt(args[1], 10) || 5;
+                terminal.log('--- CHRONOS OPTIMAL VECTOR SEARCH ---', 'system');
+                terminal.log('Sweeping all candidate threads...', 'info');
+
+                try {
+                    const ranked = await context.engines.chronos.rankAsync(
+                        tapestryLedger.getThreads(),
+                        { limit }
+                    );
+                    ranked.forEach((r, i) => {
+                        const p = r.proposed;
+                        terminal.log(
+                            `${i + 1}. ${p.intention.toUpperCase()} / ${p.region} / ${p.time} :: DEFCON ${r.projected.defcon} (${r.deltas.defcon >= 0 ? '+' : ''}${r.deltas.defcon}) | Balance ${r.deltas.balance >= 0 ? '+' : ''}${r.deltas.balance}%`,
+                            r.deltas.defcon < 0 ? 'error' : r.deltas.defcon > 0 ? 'success' : 'info'
+                        );
+                    });
+                    if (ranked.length > 0) {
+                        terminal.log(`Advisory: ${ranked[0].advisory}`, 'warning');
+                    }
+                } catch (e) {
+                    terminal.log(`Search failed: ${e.message}`, 'error');
+                }
+                return;
+            }
+
             if (args.length < 3) {
                 terminal.log(
-                    'Usage: simulate <intention> <region> <time>',
+                    'Usage: simulate <intention> <region> <time> | simulate best [n]',
                     'warning'
                 );
                 return;
@@ -766,6 +830,21 @@ export function registerCommands(terminal, context) {
 
             panopticon.toggleInterface(true);
             terminal.log('PANOPTICON INTERFACE ENGAGED.', 'success');
+
+            // panopticon rewind <seconds>: replay the state from that long ago
+            if (args[0] === 'rewind') {
+                const seconds = parseFloat(args[1]);
+                if (!(seconds >= 0)) {
+                    terminal.log('Usage: panopticon [rewind <seconds>]', 'warning');
+                    return;
+                }
+                const index = panopticon.scrubToTime(Date.now() - seconds * 1000);
+                if (index < 0) {
+                    terminal.log('No snapshots captured yet.', 'warning');
+                    return;
+                }
+                terminal.log(`Replaying snapshot ${index + 1}/${panopticon.snapshots.length}.`, 'info');
+            }
             terminal.toggle(); // Close terminal to show UI
         }
     );
@@ -844,7 +923,7 @@ export function registerCommands(terminal, context) {
                     terminal.log('No semantic correlations detected.', 'warning');
                     return;
                 }
-                const strongest = analysis.edges.sort((a,b) => b.weight - a.weight)[0];
+                const strongest = [...analysis.edges].sort((a,b) => b.weight - a.weight)[0];
                 terminal.log('Top Correlation:', 'success');
                 const src = analysis.nodes[strongest.sourceIndex].data;
                 const tgt = analysis.nodes[strongest.targetIndex].data;
@@ -967,10 +1046,34 @@ export function registerCommands(terminal, context) {
                 );
                 terminal.log(`Connected Nodes: ${peers}`, 'info');
                 terminal.log(`Local ID: ${gemini.id}`, 'info');
+                const link = gemini.transport;
+                terminal.log(
+                    `Link: ${link.relay || 'local channel'} // ${link.stats.framesSent} frames, ${link.stats.messagesSent} messages, ${link.stats.bytesSent} bytes sent`,
+                    'info'
+                );
+                if (gemini.relay && !link.relay) {
+                    terminal.log(`Relay offered: ${gemini.relay} (link with 'gemini relay')`, 'info');
+                }
             } else if (subcmd === 'sync') {
                 terminal.log('Forcing state synchronization...', 'info');
                 gemini.broadcast('STATE_UPDATE', state); // Broadcast current state
                 terminal.log('Sync packet broadcasted.', 'success');
+            } else if (subcmd === 'relay') {
+                const option = args[1];
+                if (option === 'off') {
+                    gemini.unlinkRelay();
+                    terminal.log('Relay unlinked. Back on the local channel.', 'info');
+                } else if (!gemini.linkRelay({ share: option === 'share' })) {
+                    terminal.log(
+                        'No relay offered. Open with ?relay=URL (same-origin or allowlisted).',
+                        'error'
+                    );
+                } else if (gemini.shareLedger) {
+                    terminal.log(`Relay linked: ${gemini.relay} // ledger shared`, 'success');
+                } else {
+                    terminal.log(`Relay linked: ${gemini.relay} // ledger kept local`, 'success');
+                    terminal.log("Run 'gemini relay share' to sync the ledger over it.", 'info');
+                }
             } else if (subcmd === 'detach') {
                 // Open both
                 context.ui.showNotification(
@@ -988,7 +1091,7 @@ export function registerCommands(terminal, context) {
                     'width=600,height=400'
                 );
             } else {
-                terminal.log('Usage: gemini [status|sync|detach]', 'warning');
+                terminal.log('Usage: gemini [status|sync|relay [share|off]|detach]', 'warning');
             }
         }
     );
@@ -1023,4 +1126,30 @@ export function registerCommands(terminal, context) {
             }
         }
     );
+
+    terminal.registerCommand(
+        'frames',
+        'Render loop timing per engine',
+        () => {
+            const scheduler = context.engines.scheduler;
+
+            if (!scheduler) {
+                terminal.log('Frame Scheduler not initialized.', 'error');
+                return;
+            }
+
+            const stats = scheduler.getStats();
+            terminal.log('--- RENDER LOOP ---', 'system');
+            terminal.log(
+                `Frames: ${stats.frames} // over budget: ${stats.overBudgetFrames}${scheduler.hidden ? ' // PAUSED (hidden)' : ''}`,
+                'info'
+            );
+            for (const [name, t] of Object.entries(stats.tasks)) {
+                terminal.log(
+                    `${name.toUpperCase()}: ${t.runs} runs, avg ${t.avgMs.toFixed(2)}ms, max ${t.maxMs.toFixed(2)}ms // deferred ${t.deferred}, throttled ${t.skipped}`,
+                    t.overruns > 0 ? 'warning' : 'info'
+                );
+            }
+        }
+    );
 }
@@ -161,6 +161,12 @@ export class UISystem {
         this.loadingOverlay.focus();
     }
 
+    // Updates the loading message in place (progress) without re-trapping focus
+    setLoadingText(message) {
+        const textEl = document.getElementById('loading-text-content');
+        if (textEl) textEl.textContent = message;
+    }
+
     showConfirm(message, onConfirm, onCancel) {
         const modal = this.ensureConfirmModal();
         const text = modal.querySelector('#confirm-text');
@@ -1,3 +1,58 @@
+// Protocol conditions are compiled once into predicate closures and indexed
+// by the context field they read. evaluate() re-runs only the rules whose
+// field changed since they were last checked (or that were waiting out a
+// cooldown meanwhile), keeps each rule's last result, and builds the context
+// lazily: the Horizon balance is computed only when a balance rule needs it
+// and the ledger changed.
+
+const OPERATORS = {
+    '<': (a, b) => a < b,
+    '>': (a, b) => a > b,
+    '<=': (a, b) => a <= b,
+    '>=': (a, b) => a >= b,
+    '=': (a, b) => a == b, // loose equality
+    CONTAINS: (a, b) => (Array.isArray(a) || typeof a === 'string' ? a.includes(b) : false)
+};
+
+// 'field op value', spaced or compact ('defcon<2'); CONTAINS needs spaces
+const CONDITION = /^(\S+?)\s*(<=|>=|<|>|=)\s*(.+)$|^(\S+)\s+(CONTAINS)\s+(.+)$/;
+
+const NEVER = { field: null, test: () => false };
+
+/**
+ * Compiles a condition string into { field, test(context) }.
+ * Unparseable conditions compile to a predicate that is always false.
+ */
+export function compileCondition(conditionStr) {
+    if (typeof conditionStr !== 'string') return NEVER;
+    const match = CONDITION.exec(conditionStr.trim());
+    if (!match) return NEVER;
+
+    const field = match[1] || match[4];
+    const op = OPERATORS[match[2] || match[5]];
+    const valueStr = (match[3] || match[6]).split(/\s+/).join(' ');
+    const target = isNaN(parseFloat(valueStr)) ? valueStr : parseFloat(valueStr);
+
+    return {
+        field,
+        test: (context) => {
+            const actual = context[field];
+            return actual !== undefined && op(actual, target);
+        }
+    };
+}
+
+// Cheap change keys for each context field; a rule is re-checked when its key moves
+const FIELD_KEYS = {
+    defcon: (report) => report.defcon,
+    threats: (report) => report.threats.map((t) => t.type).join('|'),
+    threadCount: (report, threads) => threads.length,
+    balance: (report, threads) => [threads, threads.length]
+};
+
+const sameKey = (a, b) =>
+    a === b || (Array.isArray(a) && Array.isArray(b) && a.length === b.length && a.every((v, i) => v === b[i]));
+
 export class ValkyrieEngine {
     constructor(terminal, ui, ledger, horizon, vanguard) {
         this.terminal = terminal;
@@ -7,8 +62,20 @@ export class ValkyrieEngine {
         this.vanguard = vanguard;
         this.status = 'ACTIVE';
         this.storageKey = 'marq_valkyrie_protocols';
-        this.protocols = this._loadProtocols();
         this.executionLog = [];
+
+        // Compiled rule index (see _reindex)
+        this._rules = new WeakMap(); // protocol -> { protocol, order, field, test, result, source }
+        this._byField = new Map(); // context field -> rules reading it
+        this._dirty = new Set(); // Rules whose inputs changed since their last check
+        this._armed = new Set(); // Rules whose last check was true
+        this._keys = new Map(); // context field -> change key at the last evaluate
+        this._indexed = null;
+        this._indexedLength = 0;
+        this._balance = { threads: null, length: -1, value: 50 };
+
+        this.protocols = this._loadProtocols();
+        this._reindex();
     }
 
     _loadProtocols() {
@@ -94,6 +161,7 @@ export class ValkyrieEngine {
         };
 
         this.protocols.push(p);
+        this._reindex();
         this.saveProtocols();
         return p;
     }
@@ -102,70 +170,115 @@ export class ValkyrieEngine {
         const idx = this.protocols.findIndex(p => p.id === id);
         if (idx !== -1) {
             this.protocols.splice(idx, 1);
+            this._reindex();
             this.saveProtocols();
             return true;
         }
         return false;
     }
 
-    evaluate(sentinelReport, threads) {
-        if (this.status !== 'ACTIVE') return;
+    // --- Rule Index ---
 
-        const now = Date.now();
-        let balance = 50;
-        if (this.horizon) {
-            const analysis = this.horizon.analyze(threads);
-            balance = analysis.balanceScore;
-        }
+    /**
+     * Compiles new or edited protocols and rebuilds the field index. Rules keep
+     * their compiled predicate and last result across rebuilds.
+     */
+    _reindex() {
+        const byField = new Map();
+        const dirty = new Set();
+        const armed = new Set();
 
-        const context = {
-            defcon: sentinelReport.defcon,
-            balance: balance,
-            threats: sentinelReport.threats.map(t => t.type),
-            threadCount: threads.length
-        };
-
-        this.protocols.forEach(p => {
-            if (p.active && (now - p.lastTriggered > p.cooldown)) {
-                if (this._checkCondition(p.condition, context)) {
-                    this._execute(p);
-                }
+        this.protocols.forEach((protocol, order) => {
+            let rule = this._rules.get(protocol);
+            if (!rule || rule.source !== protocol.condition) {
+                const compiled = compileCondition(protocol.condition);
+                rule = { protocol, field: compiled.field, test: compiled.test, source: protocol.condition, result: false };
+                this._rules.set(protocol, rule);
+                dirty.add(rule);
+            } else {
+                if (this._dirty.has(rule)) dirty.add(rule);
+                if (this._armed.has(rule)) armed.add(rule);
             }
+            rule.order = order;
+
+            if (rule.field === null) return;
+            if (!byField.has(rule.field)) byField.set(rule.field, []);
+            byField.get(rule.field).push(rule);
         });
+
+        this._byField = byField;
+        this._dirty = dirty;
+        this._armed = armed;
+        this._indexed = this.protocols;
+        this._indexedLength = this.protocols.length;
     }
 
-    _checkCondition(conditionStr, context) {
-        if (typeof conditionStr !== 'string') return false;
+    // Lazy evaluation context; fields are only computed when a rule reads them
+    _context(sentinelReport, threads) {
+        const engine = this;
+        let threats = null;
+        return {
+            defcon: sentinelReport.defcon,
+            threadCount: threads.length,
+            get threats() {
+                if (threats === null) threats = sentinelReport.threats.map((t) => t.type);
+                return threats;
+            },
+            get balance() {
+                return engine._balanceOf(threads);
+            }
+        };
+    }
+
+    _balanceOf(threads) {
+        const cached = this._balance;
+        if (cached.threads !== threads || cached.length !== threads.length) {
+            cached.value = this.horizon ? this.horizon.analyze(threads).balanceScore : 50;
+            cached.threads = threads;
+            cached.length = threads.length;
+        }
+        return cached.value;
+    }
 
-        const parts = conditionStr.trim().split(/\s+/);
-        if (parts.length < 3) return false;
+    evaluate(sentinelReport, threads) {
+        if (this.status !== 'ACTIVE') return;
+        // Catch direct edits of the protocols array
+        if (this.protocols !== this._indexed || this.protocols.length !== this._indexedLength) {
+            this._reindex();
+        }
 
-        const field = parts[0];
-        const operator = parts[1];
-        const valueStr = parts.slice(2).join(' ');
+        // Invalidate the rules reading a field whose input moved
+        for (const [field, rules] of this._byField) {
+            const keyOf = FIELD_KEYS[field];
+            if (!keyOf) continue; // Unknown field: never defined, stays false
+            const key = keyOf(sentinelReport, threads);
+            if (this._keys.has(field) && sameKey(key, this._keys.get(field))) continue;
+            this._keys.set(field, key);
+            for (const rule of rules) this._dirty.add(rule);
+        }
 
-        // Resolve Field
-        let actualValue = context[field];
-        if (actualValue === undefined) return false;
+        const now = Date.now();
+        const context = this._context(sentinelReport, threads);
+        const ready = (p) => p.active && now - p.lastTriggered > p.cooldown;
 
-        // Resolve Target Value
-        let targetValue = valueStr;
-        if (!isNaN(parseFloat(valueStr))) {
-            targetValue = parseFloat(valueStr);
+        // Rules that cannot fire yet stay dirty until they can
+        for (const rule of this._dirty) {
+            if (!ready(rule.protocol)) continue;
+            rule.result = rule.test(context);
+            this._dirty.delete(rule);
+            if (rule.result) this._armed.add(rule);
+            else this._armed.delete(rule);
         }
 
-        switch (operator) {
-            case '<': return actualValue < targetValue;
-            case '>': return actualValue > targetValue;
-            case '<=': return actualValue <= targetValue;
-            case '>=': return actualValue >= targetValue;
-            case '=': return actualValue == targetValue; // loose equality
-            case 'CONTAINS':
-                if (Array.isArray(actualValue)) return actualValue.includes(targetValue);
-                if (typeof actualValue === 'string') return actualValue.includes(targetValue);
-                return false;
-            default: return false;
+        const firing = [];
+        for (const rule of this._armed) {
+            if (ready(rule.protocol)) firing.push(rule);
         }
+        firing.sort((a, b) => a.order - b.order).forEach((rule) => this._execute(rule.protocol));
+    }
+
+    _checkCondition(conditionStr, context) {
+        return compileCondition(conditionStr).test(context);
     }
 
     _execute(protocol) {
@@ -213,7 +213,7 @@ export class VanguardEngine {
     tick() {
         if (this.units.length === 0) return;
 
-        const threads = this.ledger.getThreads();
+        const threads = this.ledger.getView();
         const threatReport = this.sentinel.getReport(); // Assuming getReport is cached or fast
 
         this.units.forEach(unit => {
@@ -1,4 +1,4 @@
-const CACHE_NAME = 'marq-v2';
+const CACHE_NAME = 'marq-v10';
 const ASSETS = [
     './',
     './index.html',
@@ -8,16 +8,29 @@ const ASSETS = [
     './js/app.js',
     './js/data.js',
     './js/tapestry.js',
+    './js/ledger-chain.js',
+    './js/ledger-store.js',
+    './js/scroll-codec.js',
+    './js/memo-cache.js',
+    './js/gemini.js',
+    './js/gemini-transport.js',
     './js/audio-engine.js',
     './js/alchemy.js',
     './js/horizon.js',
     './js/terminal.js',
     './js/crypto-guard.js',
     './js/spectra.js',
+    './js/fsk-demod.js',
+    './js/spectra.worklet.js',
     './js/ui-system.js',
     './js/codex.js',
     './js/codex.worker.js',
+    './js/chronos.worker.js',
+    './js/crypto.worker.js',
+    './js/scroll.worker.js',
     './js/cartographer.js',
+    './js/location-index.js',
+    './js/frame-scheduler.js',
     './js/oracle.js',
     './assets/noise.svg'
 ];
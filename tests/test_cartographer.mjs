@@ -0,0 +1,87 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+
+// Canvas shim: every 2D context method is a no-op
+const mockContext = () =>
+    new Proxy(
+        {
+            createImageData: (w, h) => ({ width: w, height: h, data: new Uint8ClampedArray(w * h * 4) })
+        },
+        { get: (target, prop) => (prop in target ? target[prop] : () => {}), set: () => true }
+    );
+const mockCanvas = () => ({
+    width: 0,
+    height: 0,
+    style: {},
+    getContext: mockContext,
+    getBoundingClientRect: () => ({ width: 400, height: 300 }),
+    addEventListener: () => {}
+});
+
+global.window = { devicePixelRatio: 1 };
+global.document = { createElement: mockCanvas };
+global.requestAnimationFrame = () => 0;
+
+const { MapRenderer } = await import('../js/cartographer.js');
+const { locations } = await import('../js/data.js');
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+const TIMES = ['dawn', 'midday', 'dusk', 'night'];
+const makeThreads = (n) =>
+    Array.from({ length: n }, (_, i) => ({
+        intention: INTENTIONS[i % 4],
+        region: REGIONS[(i >> 2) % 4],
+        time: TIMES[(i >> 4) % 4],
+        hash: i.toString(16).padStart(8, '0')
+    }));
+
+test('MapRenderer: static layers are cached across frames', () => {
+    const map = new MapRenderer(mockCanvas());
+    const threads = makeThreads(50);
+    const units = [{ id: 'V-1', x: 10, y: 10, heading: 0, status: 'MOVING', type: 'SCOUT', scanPulse: 0 }];
+    const zones = [{ x: 25, y: 55, r: 15, level: 'LOW' }];
+
+    map.render(threads, locations, [], zones, units);
+    map.render(threads, locations, [], zones, units);
+    assert.deepStrictEqual(map.layerRedraws, { map: 1, zones: 1, zoneRings: 1, units: 1, threads: 1 });
+
+    // Only the units layer follows unit movement
+    units[0].x = 12;
+    map.render(threads, locations, [], zones, units);
+    assert.deepStrictEqual(map.layerRedraws, { map: 1, zones: 1, zoneRings: 1, units: 2, threads: 1 });
+
+    // New thread invalidates the thread layer only
+    map.render(makeThreads(51), locations, [], zones, units);
+    assert.strictEqual(map.layerRedraws.threads, 2);
+    assert.strictEqual(map.layerRedraws.map, 1);
+
+    map.resize();
+    map.render(makeThreads(51), locations, [], zones, units);
+    assert.strictEqual(map.layerRedraws.map, 2);
+});
+
+test('MapRenderer: coordinates come from the locations index', () => {
+    const map = new MapRenderer(mockCanvas());
+    const threads = makeThreads(64);
+    map.render(threads, locations, []);
+
+    threads.forEach((t, i) => {
+        const loc = locations[`${t.intention}.${t.region}.${t.time}`];
+        const fallback = { coast: { x: 25, y: 55 }, medina: { x: 60, y: 30 }, sahara: { x: 75, y: 75 } }[t.region] || { x: 50, y: 50 };
+        const expected = loc ? loc.coordinates : fallback;
+        assert.strictEqual(map.coords.x[i], Math.fround(expected.x));
+        assert.strictEqual(map.coords.y[i], Math.fround(expected.y));
+    });
+
+    // Appends only resolve the new threads
+    let lookups = 0;
+    const lookup = map._getThreadCoords.bind(map);
+    map._getThreadCoords = (t) => {
+        lookups++;
+        return lookup(t);
+    };
+    map.render(makeThreads(70), locations, []);
+    assert.strictEqual(lookups, 6);
+    assert.strictEqual(map.coords.count, 70);
+});
@@ -0,0 +1,193 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { HorizonEngine } from '../js/horizon.js';
+import { SentinelEngine } from '../js/sentinel.js';
+import { ChronosEngine } from '../js/chronos.js';
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+
+const makeLedger = (size, spacing = 30000) => {
+    const threads = [];
+    for (let i = 0; i < size; i++) {
+        threads.push({
+            intention: INTENTIONS[(i * 7) % 3],
+            region: REGIONS[Math.floor(i / 3) % 4],
+            time: 'dusk',
+            title: `T${i}`,
+            timestamp: 1000000 + i * spacing,
+            hash: `${spacing.toString(16)}:${i.toString(16).padStart(56, '0')}`
+        });
+    }
+    return threads;
+};
+
+// Reference implementation: the original full recompute over a copied ledger
+const naive = (horizon, threads, proposed) => {
+    const base = new SentinelEngine(horizon).assess(threads);
+    const sim = [...threads, { ...proposed, timestamp: Date.now() }];
+    const proj = new SentinelEngine(horizon).assess(sim);
+    return {
+        baseline: { defcon: base.defcon, balance: horizon.analyze(threads).balanceScore },
+        projected: { defcon: proj.defcon, balance: horizon.analyze(sim).balanceScore },
+        threats: proj.threats.map((t) => t.type)
+    };
+};
+
+test('Chronos: matches a full recompute', () => {
+    const horizon = new HorizonEngine();
+    const chronos = new ChronosEngine(horizon, SentinelEngine);
+    const proposed = { intention: 'awe', region: 'sahara', time: 'dusk' };
+
+    for (const size of [0, 1, 3, 4, 6, 40]) {
+        for (const spacing of [1000, 120000]) {
+            const threads = makeLedger(size, spacing);
+            const report = chronos.simulate(threads, proposed);
+            const expected = naive(horizon, threads, proposed);
+            assert.deepStrictEqual(report.baseline.defcon, expected.baseline.defcon);
+            assert.deepStrictEqual(report.baseline.balance, expected.baseline.balance);
+            assert.deepStrictEqual(report.projected.defcon, expected.projected.defcon);
+            assert.deepStrictEqual(report.projected.balance, expected.projected.balance);
+            assert.deepStrictEqual(report.threats.map((t) => t.type), expected.threats);
+        }
+    }
+});
+
+test('Chronos: reuses and extends the cached baseline', () => {
+    const horizon = new HorizonEngine();
+    const chronos = new ChronosEngine(horizon, SentinelEngine);
+    const proposed = { intention: 'legacy', region: 'coast', time: 'dawn' };
+    const threads = makeLedger(20);
+
+    chronos.simulate(threads, proposed);
+    const first = chronos._baseline;
+    chronos.simulate([...threads], proposed); // Fresh array, same head
+    assert.strictEqual(chronos._baseline, first);
+
+    let calls = 0;
+    const accumulate = horizon.accumulate.bind(horizon);
+    horizon.accumulate = (list, state, start = 0) => {
+        calls += list.length - start;
+        return accumulate(list, state, start);
+    };
+
+    const grown = makeLedger(23);
+    const report = chronos.simulate(grown, proposed);
+    assert.strictEqual(calls, 3, 'only the appended threads are folded in');
+    assert.deepStrictEqual(report.baseline.balance, horizon.analyze(grown).balanceScore);
+    assert.strictEqual(first.state.total, 20, 'previous state is not mutated');
+
+    // Divergent history forces a rebuild
+    calls = 0;
+    const rewritten = makeLedger(23).map((t, i) => (i === 10 ? t : { ...t, hash: `x${i}` }));
+    chronos.simulate(rewritten, proposed);
+    assert.strictEqual(calls, 23);
+});
+
+test('Chronos: does not mutate the ledger or live sentinel', () => {
+    const horizon = new HorizonEngine();
+    const live = new SentinelEngine(horizon);
+    live.assess(makeLedger(10));
+    const before = JSON.stringify(live.getReport());
+
+    const chronos = new ChronosEngine(horizon, SentinelEngine);
+    const threads = makeLedger(10, 1000);
+    const snapshot = JSON.stringify(threads);
+    chronos.simulate(threads, { intention: 'awe', region: 'sahara', time: 'dusk' });
+
+    assert.strictEqual(JSON.stringify(threads), snapshot);
+    assert.strictEqual(JSON.stringify(live.getReport()), before);
+});
+
+test('Chronos: rank sweeps every candidate against one baseline', () => {
+    const horizon = new HorizonEngine();
+    const chronos = new ChronosEngine(horizon, SentinelEngine);
+    const threads = makeLedger(40, 1000);
+
+    const ranked = chronos.rank(threads);
+    assert.strictEqual(ranked.length, 4 * 4 * 4);
+
+    for (let i = 1; i < ranked.length; i++) {
+        const a = ranked[i - 1].deltas;
+        const b = ranked[i].deltas;
+        assert.ok(a.defcon > b.defcon || (a.defcon === b.defcon && a.balance >= b.balance));
+    }
+
+    // Each entry matches a one-off simulation of the same candidate
+    for (const r of ranked) {
+        const single = chronos.simulate(threads, r.proposed);
+        assert.deepStrictEqual(single.projected, r.projected);
+        assert.deepStrictEqual(single.deltas, r.deltas);
+    }
+
+    assert.strictEqual(chronos.rank(threads, { limit: 3 }).length, 3);
+});
+
+test('Chronos: worker syncs appended threads only', async () => {
+    const messages = [];
+    global.self = { postMessage: (msg) => messages.push(msg) };
+    await import('../js/chronos.worker.js');
+
+    const horizon = new HorizonEngine();
+    const chronos = new ChronosEngine(horizon, SentinelEngine);
+    let posted = null;
+    chronos.worker = {
+        postMessage: (msg) => {
+            posted = msg;
+            global.self.onmessage({ data: msg });
+            const reply = messages.pop();
+            chronos.worker.onmessage({ data: reply });
+        }
+    };
+    chronos.worker.onmessage = (e) => {
+        const { resolve } = chronos.pendingRequests.get(e.data.id);
+        chronos.pendingRequests.delete(e.data.id);
+        resolve(e.data.result);
+    };
+
+    const threads = makeLedger(30);
+    const first = await chronos.rankAsync(threads, { limit: 5 });
+    assert.strictEqual(posted.payload.reset, true);
+    assert.strictEqual(posted.payload.threads.length, 30);
+    const local = chronos.rank(threads, { limit: 5 });
+    assert.deepStrictEqual(first.map((r) => r.deltas), local.map((r) => r.deltas));
+
+    const grown = makeLedger(32);
+    await chronos.rankAsync(grown);
+    assert.strictEqual(posted.payload.reset, false);
+    assert.strictEqual(posted.payload.threads.length, 2);
+
+    await chronos.rankAsync(makeLedger(10, 1000));
+    assert.strictEqual(posted.payload.reset, true);
+});
+
+test('Chronos: a crashed worker rejects outstanding sweeps', async () => {
+    const posted = [];
+    global.Worker = class {
+        postMessage(msg) {
+            posted.push(msg);
+            setTimeout(() => this.onerror(new Error('boom')), 0);
+        }
+        terminate() {}
+    };
+    const error = console.error;
+    console.error = () => {};
+
+    try {
+        const chronos = new ChronosEngine(new HorizonEngine(), SentinelEngine);
+        const threads = makeLedger(30);
+        const sweeps = [chronos.rankAsync(threads), chronos.rankAsync(makeLedger(31))];
+        for (const sweep of sweeps) await assert.rejects(sweep, /Chronos worker failed/);
+        assert.strictEqual(chronos.pendingRequests.size, 0);
+
+        // The next sweep resends the whole ledger
+        chronos.rankAsync(makeLedger(32)).catch(() => {});
+        assert.strictEqual(posted[2].payload.reset, true);
+        assert.strictEqual(posted[2].payload.threads.length, 32);
+        chronos.terminate();
+        assert.strictEqual(chronos.pendingRequests.size, 0);
+    } finally {
+        console.error = error;
+        delete global.Worker;
+    }
+});
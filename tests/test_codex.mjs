@@ -0,0 +1,219 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { CodexEngine } from '../js/codex.js';
+
+// Reference embed: the original per-channel loop from forgeShard
+const frame = (data) => {
+    const payload = new TextEncoder().encode(JSON.stringify(data));
+    const bytes = new Uint8Array(9 + payload.length);
+    bytes.set([0x4d, 0x41, 0x52, 0x51, 1]);
+    new DataView(bytes.buffer).setUint32(5, payload.length);
+    bytes.set(payload, 9);
+    return bytes;
+};
+
+const embed = (pixels, bytes) => {
+    let dataIndex = 0;
+    let bitIndex = 0;
+    for (let i = 0; i < pixels.length && dataIndex < bytes.length; i += 4) {
+        for (let c = 0; c < 3 && dataIndex < bytes.length; c++) {
+            const bit = (bytes[dataIndex] >> (7 - bitIndex)) & 1;
+            pixels[i + c] = (pixels[i + c] & 0xfe) | bit;
+            if (++bitIndex === 8) {
+                bitIndex = 0;
+                dataIndex++;
+            }
+        }
+    }
+};
+
+const noise = (length, seed = 1) => {
+    const out = new Uint8ClampedArray(length);
+    for (let i = 0; i < length; i++) out[i] = (seed = (seed * 1103515245 + 12345) % 2147483648) >> 16;
+    return out;
+};
+
+// Just enough OffscreenCanvas for the forge path
+class FakeCanvas {
+    constructor(width, height) {
+        this.width = width;
+        this.height = height;
+        this.pixels = noise(width * height * 4, width);
+    }
+
+    getContext() {
+        const canvas = this;
+        return {
+            fillRect() {},
+            beginPath() {},
+            moveTo() {},
+            lineTo() {},
+            stroke() {},
+            fillText() {},
+            drawImage() {},
+            getImageData: (x, y, w, h) => ({ data: canvas.pixels.slice(0, w * h * 4), width: w, height: h }),
+            putImageData: (image) => canvas.pixels.set(image.data, 0)
+        };
+    }
+
+    async convertToBlob() {
+        return { pixels: this.pixels, width: this.width, height: this.height };
+    }
+}
+
+const messages = [];
+global.self = { postMessage: (msg) => messages.push(msg) };
+global.OffscreenCanvas = FakeCanvas;
+await import('../js/codex.worker.js');
+
+const run = async (type, payload) => {
+    await global.self.onmessage({ data: { type, id: messages.length, payload } });
+    return messages[messages.length - 1];
+};
+
+test('Codex worker: word-at-a-time extraction matches the per-bit layout', async () => {
+    const data = { threads: Array.from({ length: 40 }, (_, i) => ({ title: `T${i}`, hash: 'ab'.repeat(32) })) };
+    for (const width of [7, 64, 333]) {
+        const height = Math.ceil(frame(data).length * 8 / 3 / width) + 2;
+        const pixels = noise(width * height * 4, width);
+        embed(pixels, frame(data));
+        const reply = await run('scan', { source: { buffer: pixels.buffer, width, height } });
+        assert.strictEqual(reply.type, 'success', reply.error);
+        assert.deepStrictEqual(reply.result, data);
+    }
+
+    const blank = new Uint8ClampedArray(64 * 4 * 4);
+    const bad = await run('scan', { source: { buffer: blank.buffer, width: 64, height: 4 } });
+    assert.strictEqual(bad.type, 'error');
+    assert.match(bad.error, /Magic header mismatch/);
+
+    const truncated = noise(8 * 8 * 4);
+    embed(truncated, frame({ big: 'x'.repeat(500) }));
+    const short = await run('scan', { source: { buffer: truncated.buffer, width: 8, height: 8 } });
+    assert.match(short.error, /too small/);
+});
+
+test('Codex worker: forged pixels scan back and keep unused low bits', async () => {
+    const data = [{ title: 'Forged', n: 1 }];
+    const reply = await run('forge', { data, carrier: null });
+    assert.strictEqual(reply.type, 'success', reply.error);
+    const { pixels, width, height } = reply.result;
+
+    const expected = noise(width * height * 4, width);
+    embed(expected, frame(data));
+    assert.deepStrictEqual(pixels, expected, 'same bits as the per-channel reference');
+
+    const scanned = await run('scan', { source: { buffer: pixels.slice().buffer, width, height } });
+    assert.deepStrictEqual(scanned.result, data);
+});
+
+// Fake pool worker: answers after a payload-controlled delay
+class FakeWorker {
+    static live = 0;
+    static peak = 0;
+    static spawned = 0;
+    static transfers = [];
+
+    constructor(url) {
+        assert.strictEqual(url, 'js/codex.worker.js');
+        FakeWorker.spawned++;
+    }
+
+    postMessage(msg, transfer) {
+        FakeWorker.transfers.push(transfer.length);
+        FakeWorker.live++;
+        FakeWorker.peak = Math.max(FakeWorker.peak, FakeWorker.live);
+        const { delay, fail, crash } = JSON.parse(msg.payload.source.label);
+        setTimeout(() => {
+            FakeWorker.live--;
+            if (crash) return this.onerror({ message: 'boom' });
+            this.onmessage({
+                data: fail
+                    ? { type: 'error', id: msg.id, error: 'Invalid Codex Shard: Magic header mismatch.' }
+                    : { type: 'success', id: msg.id, result: { delay } }
+            });
+        }, delay);
+    }
+
+    terminate() {}
+}
+
+const shard = (spec) => Object.assign(new Blob(['png']), { label: JSON.stringify(spec) });
+
+test('CodexEngine: scanMany streams results in completion order across the pool', async () => {
+    global.Worker = FakeWorker;
+    const codex = new CodexEngine({ workers: 3 });
+    const delays = [70, 10, 40, 5, 30, 20];
+    const files = delays.map((delay, i) => shard(i === 4 ? { delay, fail: true } : { delay }));
+
+    const progress = [];
+    const results = [];
+    for await (const entry of codex.scanMany(files, { onProgress: (p) => progress.push(p) })) {
+        results.push(entry);
+    }
+
+    assert.strictEqual(FakeWorker.spawned, 3);
+    assert.strictEqual(FakeWorker.peak, 3, 'never more jobs in flight than workers');
+    assert.deepStrictEqual(FakeWorker.transfers, [0, 0, 0, 0, 0, 0], 'blobs are cloned by reference');
+    // Three lanes: 1 (t10), 3 (t15), 2 (t40), 4 (t45), 5 (t60), 0 (t70)
+    assert.deepStrictEqual(results.map((r) => r.index), [1, 3, 2, 4, 5, 0]);
+    assert.deepStrictEqual(results.find((r) => r.index === 4), {
+        index: 4,
+        ok: false,
+        error: 'Invalid Codex Shard: Magic header mismatch.'
+    });
+    assert.deepStrictEqual(results.find((r) => r.index === 0), { index: 0, ok: true, data: { delay: 70 } });
+    assert.deepStrictEqual(progress[progress.length - 1], { done: 6, total: 6, failed: 1 });
+
+    // A crashed worker fails only its job and is replaced
+    const after = [];
+    for await (const entry of codex.scanMany([shard({ delay: 5, crash: true }), shard({ delay: 5 }), shard({ delay: 5 })])) {
+        after.push(entry.ok);
+    }
+    assert.deepStrictEqual(after.sort(), [false, true, true]);
+
+    // ImageData-like sources move their pixel buffer
+    const image = { data: new Uint8ClampedArray(16), width: 2, height: 2 };
+    codex._request = (type, payload, transferables) => Promise.resolve(transferables);
+    const moved = await codex.scanShard(image);
+    assert.deepStrictEqual(moved, [image.data.buffer]);
+    codex.terminate();
+});
+
+test('CodexEngine: stopping a batch or the pool settles every job', async () => {
+    global.Worker = FakeWorker;
+    const settleSoon = (promises) =>
+        Promise.race([
+            Promise.allSettled(promises),
+            new Promise((_, reject) => setTimeout(() => reject(new Error('jobs left pending')), 500))
+        ]);
+
+    const codex = new CodexEngine({ workers: 1 });
+    const jobs = [];
+    const scan = codex.scanShard.bind(codex);
+    codex.scanShard = (image, batch) => {
+        const job = scan(image, batch);
+        jobs.push(job);
+        return job;
+    };
+
+    // Leaving the loop drops the queued jobs of the batch
+    for await (const entry of codex.scanMany([1, 2, 3, 4].map(() => shard({ delay: 5 })))) {
+        assert.ok(entry.ok);
+        break;
+    }
+    const outcomes = await settleSoon(jobs);
+    assert.strictEqual(outcomes.filter((o) => o.status === 'fulfilled').length, 2, 'finished and in-flight jobs');
+    assert.deepStrictEqual(
+        outcomes.filter((o) => o.status === 'rejected').map((o) => o.reason.message),
+        ['Codex batch cancelled', 'Codex batch cancelled']
+    );
+
+    // terminate() fails the running job as well as the queued ones
+    const running = codex.scanShard(shard({ delay: 50 }));
+    const queued = codex.scanShard(shard({ delay: 50 }));
+    await new Promise((resolve) => setTimeout(resolve, 0));
+    codex.terminate();
+    const stopped = await settleSoon([running, queued]);
+    assert.deepStrictEqual(stopped.map((o) => o.reason && o.reason.message), ['Codex terminated', 'Codex terminated']);
+});
@@ -0,0 +1,101 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { CortexEngine } from '../js/cortex.js';
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah', 'unknown'];
+
+const makeThreads = (n, seed = 5) => {
+    let s = seed;
+    const rand = () => {
+        s = (s * 16807) % 2147483647;
+        return s / 2147483647;
+    };
+    let ts = 1700000000000;
+    return Array.from({ length: n }, (_, i) => {
+        ts += Math.floor(rand() * 3 * 60 * 60 * 1000);
+        return {
+            intention: INTENTIONS[Math.floor(rand() * 4)],
+            region: REGIONS[Math.floor(rand() * 5)],
+            time: 'dusk',
+            title: `T${i}`,
+            timestamp: rand() < 0.1 ? ts - 5 * 60 * 60 * 1000 : ts, // Some out-of-order entries
+            hash: `${seed}-${i.toString(16).padStart(8, '0')}`
+        };
+    });
+};
+
+// Reference: the original all-pairs construction
+const naiveEdges = (threads) => {
+    const edges = new Map();
+    for (let i = 0; i < threads.length; i++) {
+        for (let j = i + 1; j < threads.length; j++) {
+            const a = threads[i];
+            const b = threads[j];
+            let weight = 0;
+            const types = [];
+            if (a.region === b.region && a.region !== 'unknown') {
+                weight += 1.0;
+                types.push('region');
+            }
+            if (a.intention === b.intention) {
+                weight += 0.5;
+                types.push('intention');
+            }
+            if (Math.abs(a.timestamp - b.timestamp) < 60 * 60 * 1000) {
+                weight += 0.8;
+                types.push('time');
+            }
+            if (weight > 0) edges.set(`${i}-${j}`, { weight, types });
+        }
+    }
+    return edges;
+};
+
+const edgeMap = (graph) =>
+    new Map(graph.edges.map((e) => [`${e.sourceIndex}-${e.targetIndex}`, { weight: e.weight, types: e.types }]));
+
+const clusterSets = (graph) => graph.clusters.map((c) => [...c].sort().join(',')).sort();
+
+test('Cortex: bucketed edges match the all-pairs graph', () => {
+    const threads = makeThreads(150);
+    const graph = new CortexEngine().analyze(threads);
+    assert.deepStrictEqual(edgeMap(graph), naiveEdges(threads));
+    assert.strictEqual(graph.nodes.length, 150);
+});
+
+test('Cortex: appending threads matches a fresh build', () => {
+    const threads = makeThreads(120);
+    const incremental = new CortexEngine();
+    for (let n = 1; n <= threads.length; n += 7) incremental.analyze(threads.slice(0, n));
+    const grown = incremental.analyze(threads);
+
+    const fresh = new CortexEngine().analyze(threads);
+    assert.deepStrictEqual(edgeMap(grown), edgeMap(fresh));
+    assert.deepStrictEqual(clusterSets(grown), clusterSets(fresh));
+
+    const created = incremental.append({ ...threads[0], hash: 'extra', timestamp: threads[119].timestamp });
+    assert.ok(created.every((e) => e.targetIndex === 120));
+    assert.strictEqual(incremental.analyze([...threads, { hash: 'extra' }]).nodes.length, 121);
+});
+
+test('Cortex: divergent ledgers rebuild', () => {
+    const cortex = new CortexEngine();
+    cortex.analyze(makeThreads(40, 5));
+    const other = makeThreads(40, 9);
+    assert.deepStrictEqual(edgeMap(cortex.analyze(other)), naiveEdges(other));
+});
+
+test('Cortex: edge cap bounds degree without changing clusters', () => {
+    const threads = makeThreads(400);
+    const full = new CortexEngine().analyze(threads);
+    const capped = new CortexEngine({ maxEdgesPerNode: 3 }).analyze(threads);
+
+    assert.ok(capped.edges.length <= threads.length * 12);
+    assert.ok(capped.edges.length < full.edges.length);
+    assert.deepStrictEqual(clusterSets(capped), clusterSets(full));
+    const reference = naiveEdges(threads);
+    capped.edges.forEach((e) => {
+        assert.deepStrictEqual({ weight: e.weight, types: e.types }, reference.get(`${e.sourceIndex}-${e.targetIndex}`));
+    });
+});
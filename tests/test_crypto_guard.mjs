@@ -0,0 +1,120 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { CryptoGuard } from '../js/crypto-guard.js';
+
+if (!global.window) {
+    global.window = { crypto: global.crypto, btoa: global.btoa, atob: global.atob };
+}
+
+const ledger = (n) => Array.from({ length: n }, (_, i) => ({ title: `T${i}`, hash: `h${i}` }));
+
+test('CryptoGuard: derives the session key once and varies the IV per save', async () => {
+    const guard = new CryptoGuard();
+    guard.setSessionPassword('pw');
+
+    const a = await guard.encrypt(ledger(3), 'pw');
+    const b = await guard.encrypt(ledger(4), 'pw');
+    assert.strictEqual(guard.derivations, 1);
+    assert.strictEqual(a.salt, b.salt);
+    assert.notStrictEqual(a.iv, b.iv);
+
+    assert.deepStrictEqual(await guard.decrypt(b, 'pw'), ledger(4));
+    assert.strictEqual(guard.derivations, 1, 'decrypting own packets reuses the key');
+
+    // A fresh guard (another session) can still open the packet
+    assert.deepStrictEqual(await new CryptoGuard().decrypt(a, 'pw'), ledger(3));
+    await assert.rejects(new CryptoGuard().decrypt(a, 'nope'), /Decryption failed/);
+});
+
+test('CryptoGuard: rotates on unlock and password change', async () => {
+    const guard = new CryptoGuard();
+    guard.setSessionPassword('first');
+    const packet = await guard.encrypt(ledger(2), 'first');
+
+    // Unlock: the salt read from storage becomes the session salt
+    guard.clearSession();
+    guard.setSessionPassword('first');
+    await guard.decrypt(packet, 'first');
+    assert.strictEqual(guard.sessionSalt, packet.salt);
+    const before = guard.derivations;
+    await guard.encrypt(ledger(2), 'first');
+    assert.strictEqual(guard.derivations, before);
+
+    // Password change: new salt, new key
+    guard.setSessionPassword('second');
+    const changed = await guard.encrypt(ledger(2), 'second');
+    assert.notStrictEqual(changed.salt, packet.salt);
+    assert.strictEqual(guard.derivations, before + 1);
+
+    // One-off passwords are never cached
+    await guard.encrypt(ledger(1), 'other');
+    await guard.encrypt(ledger(1), 'other');
+    assert.strictEqual(guard.derivations, before + 3);
+});
+
+test('CryptoGuard: large ledgers are sealed in the worker', async () => {
+    const messages = [];
+    global.self = { postMessage: (msg) => messages.push(msg) };
+    await import('../js/crypto.worker.js');
+
+    const guard = new CryptoGuard({ workerThreshold: 10 });
+    const posted = [];
+    guard.worker = {
+        postMessage: async (msg) => {
+            posted.push(msg.type);
+            await global.self.onmessage({ data: msg });
+            guard.worker.onmessage({ data: messages.pop() });
+        }
+    };
+    guard.worker.onmessage = (e) => {
+        const { resolve, reject } = guard.pendingRequests.get(e.data.id);
+        guard.pendingRequests.delete(e.data.id);
+        if (e.data.type === 'success') resolve(e.data.result);
+        else reject(new Error(e.data.error));
+    };
+    guard.setSessionPassword('pw');
+
+    await guard.encrypt(ledger(3), 'pw');
+    assert.deepStrictEqual(posted, [], 'small payloads stay inline');
+
+    const packet = await guard.encrypt(ledger(50), 'pw');
+    assert.deepStrictEqual(posted, ['encrypt']);
+    assert.deepStrictEqual(await new CryptoGuard({ worker: false }).decrypt(packet, 'pw'), ledger(50));
+});
+
+test('CryptoGuard: a crashed worker fails over to the main thread', async () => {
+    const workers = [];
+    global.Worker = class {
+        constructor() {
+            this.terminated = false;
+            workers.push(this);
+        }
+        postMessage() {
+            // Dies before answering
+            setTimeout(() => this.onerror(new Error('boom')), 0);
+        }
+        terminate() {
+            this.terminated = true;
+        }
+    };
+    const error = console.error;
+    console.error = () => {};
+
+    try {
+        const guard = new CryptoGuard();
+        assert.strictEqual(guard.workerThreshold, 256, 'one compacted segment');
+        guard.setSessionPassword('pw');
+
+        const [a, b] = await Promise.all([guard.encrypt(ledger(300), 'pw'), guard.encrypt(ledger(256), 'pw')]);
+        assert.strictEqual(workers.length, 1);
+        assert.ok(workers[0].terminated);
+        assert.strictEqual(guard.worker, null);
+        assert.strictEqual(guard.pendingRequests.size, 0);
+        assert.deepStrictEqual(await guard.decrypt(a, 'pw'), ledger(300));
+        assert.deepStrictEqual(await guard.decrypt(b, 'pw'), ledger(256));
+        assert.strictEqual(workers.length, 1, 'no new worker after a crash');
+    } finally {
+        console.error = error;
+        delete global.Worker;
+    }
+});
@@ -1,6 +1,8 @@
 import { test } from 'node:test';
 import assert from 'node:assert';
 import { GeminiEngine } from '../js/gemini.js';
+import { decodeFrame, encodeFrame } from '../js/gemini-transport.js';
+import { TapestryLedger } from '../js/tapestry.js';
 
 // Mock BroadcastChannel
 class MockChannel {
@@ -13,18 +15,30 @@ class MockChannel {
             MockChannel.lastMessageCallback(data);
         }
     }
+    close() {}
 }
 MockChannel.lastMessageCallback = null;
 
 // Mock Globals
 global.BroadcastChannel = MockChannel;
 global.window = {
+    crypto: global.crypto,
     location: { search: '?mode=test' },
     URLSearchParams: class {
         constructor(s) { this.s = s; }
         get(k) { return 'test'; }
     }
 };
+const store = {};
+global.localStorage = {
+    getItem: (key) => (key in store ? store[key] : null),
+    setItem: (key, value) => {
+        store[key] = String(value);
+    },
+    removeItem: (key) => {
+        delete store[key];
+    }
+};
 
 test('GeminiEngine Initialization', async (t) => {
     const gemini = new GeminiEngine({}, {}, {}, {});
@@ -41,10 +55,13 @@ test('GeminiEngine Broadcast', async (t) => {
     };
 
     gemini.broadcast('TEST_TYPE', { foo: 'bar' });
+    assert.strictEqual(received, null, 'held until the next frame');
+    gemini.transport.flush();
 
-    assert.strictEqual(received.type, 'TEST_TYPE');
-    assert.strictEqual(received.payload.foo, 'bar');
-    assert.strictEqual(received.sender, gemini.id);
+    const frame = decodeFrame(received);
+    assert.strictEqual(frame.messages[0].type, 'TEST_TYPE');
+    assert.strictEqual(frame.messages[0].payload.foo, 'bar');
+    assert.strictEqual(frame.sender, gemini.id);
 
     clearInterval(gemini.heartbeatInterval);
 });
@@ -64,3 +81,193 @@ test('GeminiEngine Message Handling', async (t) => {
 
     clearInterval(gemini.heartbeatInterval);
 });
+
+test('GeminiTransport coalesces a frame into one binary packet', async () => {
+    const gemini = new GeminiEngine({}, {}, {}, {});
+    clearInterval(gemini.heartbeatInterval);
+
+    const posted = [];
+    MockChannel.lastMessageCallback = (msg) => posted.push(msg);
+
+    for (let ts = 1; ts <= 5; ts++) gemini.broadcast('HEARTBEAT', { ts, mode: 'map' });
+    gemini.broadcast('PING', { n: 1 });
+    gemini.broadcast('PING', { n: 2 });
+    gemini.broadcast('LEDGER_HEAD', { length: 3, hash: 'ab'.repeat(32) });
+    gemini.broadcast('LEDGER_HEAD', { length: 0, hash: 'GENESIS_HASH' });
+    gemini.transport.flush();
+    gemini.transport.flush();
+
+    assert.strictEqual(posted.length, 1);
+    assert.ok(posted[0] instanceof Uint8Array);
+    assert.deepStrictEqual(decodeFrame(posted[0]).messages, [
+        { type: 'HEARTBEAT', payload: { ts: 5, mode: 'map' } },
+        { type: 'PING', payload: { n: 1 } },
+        { type: 'PING', payload: { n: 2 } },
+        { type: 'LEDGER_HEAD', payload: { length: 0, hash: 'GENESIS_HASH' } }
+    ]);
+    assert.deepStrictEqual(gemini.transport.stats, {
+        framesSent: 1,
+        messagesSent: 4,
+        bytesSent: posted[0].length,
+        framesReceived: 0
+    });
+
+    // Deltas carry their threads as a scroll body linked to the base head
+    const base = 'cd'.repeat(32);
+    const threads = [
+        { id: 'ef'.repeat(6), intention: 'awe', time: 'dusk', region: 'Fes', title: 'A', timestamp: 10, previousHash: base, hash: 'ef'.repeat(32) },
+        { id: '01'.repeat(6), intention: 'awe', time: 'night', region: 'Fes', title: 'B', timestamp: 25, previousHash: 'ef'.repeat(32), hash: '01'.repeat(32) }
+    ];
+    const bytes = encodeFrame('peer', [
+        { type: 'LEDGER_DELTA', payload: { to: 'x', from: 7, base, threads } },
+        { type: 'LEDGER_REQUEST', payload: { to: 'peer', from: 0, hash: 'GENESIS_HASH' } }
+    ]);
+    assert.deepStrictEqual(decodeFrame(bytes), {
+        sender: 'peer',
+        messages: [
+            { type: 'LEDGER_DELTA', payload: { to: 'x', from: 7, base, threads } },
+            { type: 'LEDGER_REQUEST', payload: { to: 'peer', from: 0, hash: 'GENESIS_HASH' } }
+        ]
+    });
+    assert.throws(() => decodeFrame(bytes.subarray(0, bytes.length - 4)), /Truncated/);
+});
+
+test('GeminiEngine converges ledgers by head hash and fills gaps', async () => {
+    // Shared bus: every channel hears every other channel's posts
+    const bus = [];
+    class BusChannel {
+        constructor() {
+            this.onmessage = null;
+            bus.push(this);
+        }
+        postMessage(data) {
+            for (const channel of bus) if (channel !== this && channel.onmessage) channel.onmessage({ data });
+        }
+    }
+    global.BroadcastChannel = BusChannel;
+
+    const makePeer = async (key) => {
+        const ledger = new TapestryLedger(key, { store: null });
+        await ledger.initialize();
+        const gemini = new GeminiEngine({}, ledger, {}, {});
+        clearInterval(gemini.heartbeatInterval);
+        return { ledger, gemini };
+    };
+    const a = await makePeer('gemini_a');
+    const b = await makePeer('gemini_b');
+    global.BroadcastChannel = MockChannel;
+
+    const settle = async () => {
+        for (let i = 0; i < 8; i++) {
+            a.gemini.transport.flush();
+            b.gemini.transport.flush();
+            await new Promise((resolve) => setTimeout(resolve, 5));
+        }
+    };
+    const weave = (ledger, n) =>
+        Array.from({ length: n }).reduce(
+            (p, _, i) => p.then(() => ledger.addThread({ intention: 'awe', time: 'dusk', region: 'Fes', title: `T${i}` })),
+            Promise.resolve()
+        );
+
+    const synced = [];
+    b.gemini.addListener('LEDGER_SYNCED', (info) => synced.push(info.added));
+
+    await weave(a.ledger, 5);
+    a.gemini.connect();
+    b.gemini.connect();
+    await settle();
+    assert.strictEqual(b.gemini.getPeerCount(), 1);
+    assert.deepStrictEqual(b.ledger.getHead(), a.ledger.getHead());
+    assert.deepStrictEqual(JSON.parse(localStorage.getItem('gemini_b')), a.ledger.getThreads());
+
+    // Missed while unlinked: picked up from the next announced head
+    await weave(a.ledger, 3);
+    a.gemini._announceHead();
+    await settle();
+    assert.strictEqual(b.ledger.length, 8);
+
+    // Local weaves are pushed as deltas
+    await weave(a.ledger, 1);
+    await a.gemini.publishLedger();
+    await settle();
+    assert.deepStrictEqual(b.ledger.getHead(), a.ledger.getHead());
+    assert.deepStrictEqual(synced, [5, 3, 1]);
+
+    // Tampered deltas do not verify
+    const forged = { ...a.ledger.getThreads()[8], title: 'Forged' };
+    await b.gemini._onDelta({ to: b.gemini.id, from: 9, base: b.ledger.getHead().hash, threads: [{ ...forged, previousHash: b.ledger.getHead().hash }] }, 'x');
+    assert.strictEqual(b.ledger.length, 9);
+});
+
+test('GeminiEngine only links an allowed relay on opt-in and keeps the ledger off it until shared', async () => {
+    const sockets = [];
+    global.WebSocket = class {
+        constructor(url) {
+            this.url = url;
+            this.readyState = 1;
+            this.sent = [];
+            sockets.push(this);
+        }
+        send(data) {
+            this.sent.push(data);
+        }
+        close() {}
+    };
+    const page = { search: '', href: 'https://marq.example/index.html', host: 'marq.example' };
+    const location = global.window.location;
+    global.window.location = page;
+
+    try {
+        const ledger = new TapestryLedger('gemini_relay', { store: null });
+        await ledger.initialize();
+        await ledger.addThread({ intention: 'awe', time: 'dusk', region: 'Fes', title: 'Private' });
+
+        const foreign = new GeminiEngine({}, ledger, {}, {}, { relay: 'wss://evil.example/' });
+        clearInterval(foreign.heartbeatInterval);
+        assert.strictEqual(foreign.relay, null);
+        assert.strictEqual(foreign.linkRelay(), false);
+        foreign.transport.close();
+
+        const allowed = new GeminiEngine({}, ledger, {}, {}, { relay: 'wss://hub.example/', relays: ['wss://hub.example'] });
+        clearInterval(allowed.heartbeatInterval);
+        assert.strictEqual(allowed.relay, 'wss://hub.example/');
+        allowed.transport.close();
+
+        const gemini = new GeminiEngine({}, ledger, {}, {}, { relay: '/relay' });
+        clearInterval(gemini.heartbeatInterval);
+        assert.strictEqual(gemini.relay, null, 'https page, not a WebSocket URL');
+        gemini.relay = gemini._allowedRelay('wss://marq.example/relay');
+        assert.strictEqual(gemini.relay, 'wss://marq.example/relay');
+        assert.strictEqual(sockets.length, 0, 'nothing connects before opt-in');
+
+        assert.strictEqual(gemini.linkRelay(), true);
+        assert.strictEqual(sockets.length, 1);
+        const socket = sockets[0];
+        const request = { to: gemini.id, from: 0, hash: 'GENESIS_HASH' };
+        const sentTypes = () => socket.sent.flatMap((frame) => decodeFrame(frame).messages.map((m) => m.type));
+
+        // Linked but not shared: no heads out, no answers, no merges
+        gemini.connect();
+        await gemini._onRequest(request, 'peer');
+        gemini.transport.flush();
+        assert.deepStrictEqual(sentTypes(), ['HELLO']);
+        const forged = { ...ledger.getThreads()[0], id: 'ff'.repeat(6), title: 'Pushed' };
+        await gemini._onDelta({ to: '', from: 1, base: ledger.getHead().hash, threads: [forged] }, 'peer');
+        assert.strictEqual(ledger.length, 1);
+
+        gemini.linkRelay({ share: true });
+        assert.strictEqual(sockets.length, 1, 'same relay, same socket');
+        await gemini._onRequest(request, 'peer');
+        gemini.transport.flush();
+        assert.deepStrictEqual(sentTypes(), ['HELLO', 'LEDGER_HEAD', 'LEDGER_DELTA']);
+
+        gemini.unlinkRelay();
+        assert.strictEqual(gemini.transport.relay, null);
+        assert.strictEqual(gemini.shareLedger, false);
+        gemini.transport.close();
+    } finally {
+        global.window.location = location;
+        delete global.WebSocket;
+    }
+});
@@ -0,0 +1,108 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { ScrollParser, readScroll, sha256, linkPayload } from '../js/ledger-chain.js';
+import { TapestryLedger } from '../js/tapestry.js';
+
+if (!global.window) {
+    global.window = { crypto: global.crypto, btoa: global.btoa, atob: global.atob };
+}
+const store = {};
+global.localStorage = {
+    getItem: (key) => (key in store ? store[key] : null),
+    setItem: (key, value) => {
+        store[key] = String(value);
+    },
+    removeItem: (key) => {
+        delete store[key];
+    }
+};
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+
+const makeChain = async (size) => {
+    const threads = [];
+    let previousHash = 'GENESIS_HASH';
+    for (let i = 0; i < size; i++) {
+        const payload = {
+            intention: INTENTIONS[i % 4],
+            time: 'dusk',
+            region: 'sahara',
+            title: `Thread ${i}`,
+            timestamp: 1700000000000 + i * 1000,
+            previousHash
+        };
+        const hash = await sha256(linkPayload(payload, previousHash));
+        threads.push({ id: hash.substring(0, 12), ...payload, hash });
+        previousHash = hash;
+    }
+    return threads;
+};
+
+test('ScrollParser: yields the same objects however the text is split', () => {
+    const objects = [
+        { a: 'x{y}[z]', b: { c: [1, 2, { d: 'e' }] } },
+        { quote: 'say "hi" \\ there', n: -1.5e3 },
+        {}
+    ];
+    const text = JSON.stringify(objects, null, 2);
+
+    for (const size of [1, 2, 3, 7, 64, text.length]) {
+        const parser = new ScrollParser();
+        const out = [];
+        for (let i = 0; i < text.length; i += size) {
+            out.push(...parser.push(text.slice(i, i + size)));
+        }
+        parser.finish();
+        assert.deepStrictEqual(out, objects, `chunk size ${size}`);
+    }
+
+    const empty = new ScrollParser();
+    assert.deepStrictEqual(empty.push(' [ ] '), []);
+    empty.finish();
+
+    assert.throws(() => new ScrollParser().push('{"a":1}'), /Root must be an array/);
+    assert.throws(() => new ScrollParser().push('[1, 2]'), /array of thread objects/);
+    assert.throws(() => new ScrollParser().push('[{},,{}]'), /array of thread objects/);
+    const truncated = new ScrollParser();
+    truncated.push('[{"a":1},');
+    assert.throws(() => truncated.finish(), /Truncated/);
+});
+
+test('readScroll: verifies large scrolls in batches with progress', async () => {
+    const threads = await makeChain(2500);
+    const blob = new Blob([JSON.stringify(threads, null, 2)]);
+
+    const progress = [];
+    const out = await readScroll(blob, { onProgress: (p) => progress.push(p) });
+    assert.deepStrictEqual(out, threads);
+    assert.ok(progress.length >= 3);
+    assert.strictEqual(progress[progress.length - 1].threads, 2500);
+    assert.strictEqual(progress[progress.length - 1].bytes, blob.size);
+
+    const tampered = threads.map((t, i) => (i === 1500 ? { ...t, title: 'Forged' } : t));
+    await assert.rejects(readScroll(new Blob([JSON.stringify(tampered)])), /Integrity check failed.*thread 1500/);
+
+    const unsafe = threads.map((t, i) => (i === 10 ? { ...t, title: '<script>' } : t));
+    await assert.rejects(readScroll(new Blob([JSON.stringify(unsafe)])), /Invalid schema.*thread 10/);
+
+    await assert.rejects(readScroll(blob, { maxThreads: 100 }), /Too many threads/);
+});
+
+test('TapestryLedger: importScrollFile commits only a fully verified scroll', async () => {
+    const ledger = new TapestryLedger('import_ledger', { store: null });
+    await ledger.initialize();
+    await ledger.addThread({ intention: 'awe', time: 'dawn', region: 'coast', title: 'Existing' });
+    const before = ledger.getThreads();
+
+    const threads = await makeChain(1500);
+    const broken = threads.map((t, i) => (i === 1499 ? { ...t, timestamp: 0 } : t));
+    await assert.rejects(ledger.importScrollFile(new Blob([JSON.stringify(broken)])), /Integrity/);
+    assert.deepStrictEqual(ledger.getThreads(), before);
+    assert.deepStrictEqual(JSON.parse(localStorage.getItem('import_ledger')), before);
+
+    const count = await ledger.importScrollFile(new Blob([JSON.stringify(threads, null, 2)]));
+    assert.strictEqual(count, 1500);
+    assert.strictEqual(ledger.getThreads().length, 1500);
+    assert.strictEqual(JSON.parse(localStorage.getItem('import_ledger')).length, 1500);
+    assert.strictEqual(await ledger.verifyIntegrity(), true);
+});
@@ -0,0 +1,234 @@
+import { test, beforeEach } from 'node:test';
+import assert from 'node:assert';
+import { LedgerStore, LedgerConflictError, MemoryBackend, PLAIN_CODEC } from '../js/ledger-store.js';
+import { TapestryLedger } from '../js/tapestry.js';
+
+if (!global.window) {
+    global.window = { crypto: global.crypto, btoa: global.btoa, atob: global.atob };
+}
+
+const store = {};
+global.localStorage = {
+    getItem: (key) => (key in store ? store[key] : null),
+    setItem: (key, value) => {
+        store[key] = String(value);
+    },
+    removeItem: (key) => {
+        delete store[key];
+    },
+    clear: () => Object.keys(store).forEach((key) => delete store[key])
+};
+
+beforeEach(() => localStorage.clear());
+
+const thread = (i) => ({ title: `T${i}`, hash: `h${i}` });
+const weave = (ledger, i) =>
+    ledger.addThread({ intention: 'awe', time: 'dusk', region: 'sahara', title: `T${i}` });
+
+test('LedgerStore: appends, compacts full runs and reads ranges', async () => {
+    const backend = new MemoryBackend();
+    const ledgerStore = new LedgerStore(backend, { segmentSize: 4 });
+
+    for (let i = 0; i < 10; i++) await ledgerStore.append(thread(i));
+    await ledgerStore.readRange(0, 0); // Drain queued compaction
+
+    const meta = await ledgerStore.getMeta();
+    assert.deepStrictEqual(meta, { length: 10, compacted: 8, encrypted: false, headHash: 'h9' });
+    assert.deepStrictEqual([...backend.segments.keys()].sort((a, b) => a - b), [0, 4, 8, 9]);
+
+    const all = await ledgerStore.readRange(0, 10);
+    assert.deepStrictEqual(all.map((t) => t.title), Array.from({ length: 10 }, (_, i) => `T${i}`));
+    const mid = await ledgerStore.readRange(3, 9);
+    assert.deepStrictEqual(mid.map((t) => t.title), ['T3', 'T4', 'T5', 'T6', 'T7', 'T8']);
+
+    await ledgerStore.replace([thread(0), thread(1), thread(2), thread(3), thread(4)], PLAIN_CODEC);
+    assert.deepStrictEqual([...backend.segments.keys()], [0, 4]);
+    assert.strictEqual((await ledgerStore.getMeta()).compacted, 4);
+});
+
+test('LedgerStore: appends from two tabs never share a slot', async () => {
+    const backend = new MemoryBackend();
+    // Both tabs read the meta before either commits
+    let release;
+    const gate = new Promise((resolve) => (release = resolve));
+    const slow = { ...PLAIN_CODEC, seal: async (threads) => (await gate, { threads }) };
+    const tabA = new LedgerStore(backend);
+    const tabB = new LedgerStore(backend);
+
+    const appends = Promise.all([tabA.append(thread(0), slow), tabB.append(thread(1), slow)]);
+    release();
+    await appends;
+    assert.strictEqual(backend.meta.length, 2);
+    assert.deepStrictEqual((await tabA.readRange(0, 2)).map((t) => t.title).sort(), ['T0', 'T1']);
+
+    // A chained append built for an old head is refused, not rebased
+    await assert.rejects(tabB.append(thread(2), PLAIN_CODEC, 1), LedgerConflictError);
+    assert.strictEqual(backend.meta.length, 2);
+});
+
+test('LedgerStore: compaction never drops an append from another tab', async () => {
+    const backend = new MemoryBackend();
+    const tabA = new LedgerStore(backend, { segmentSize: 4 });
+    const tabB = new LedgerStore(backend, { segmentSize: 64 }); // Never compacts itself
+
+    // A compacts h0..h3 while B appends h4 mid-seal
+    let appended = null;
+    const slow = {
+        ...PLAIN_CODEC,
+        seal: async (threads) => {
+            if (threads.length === 4 && !appended) appended = tabB.append(thread(4));
+            await appended;
+            return { threads };
+        }
+    };
+    for (let i = 0; i < 4; i++) await tabA.append(thread(i), slow);
+    await tabA.readRange(0, 0); // Drain queued compaction
+
+    assert.deepStrictEqual(await tabA.getMeta(), { length: 5, compacted: 4, encrypted: false, headHash: 'h4' });
+    assert.deepStrictEqual([...backend.segments.keys()].sort((a, b) => a - b), [0, 4]);
+    assert.deepStrictEqual((await tabA.readRange(0, 5)).map((t) => t.title), ['T0', 'T1', 'T2', 'T3', 'T4']);
+});
+
+test('TapestryLedger: pages in history after a tail-first load', async () => {
+    const backend = new MemoryBackend();
+    const options = () => ({ store: new LedgerStore(backend, { segmentSize: 16 }), checkpointInterval: 64 });
+
+    const ledger = new TapestryLedger('store_ledger', options());
+    await ledger.initialize();
+    for (let i = 0; i < 700; i++) await weave(ledger, i);
+    assert.strictEqual(localStorage.getItem('store_ledger'), null, 'nothing written to the legacy key');
+    assert.ok(localStorage.getItem('store_ledger_rev'));
+
+    const reopened = new TapestryLedger('store_ledger', options());
+    assert.strictEqual(await reopened.initialize(), 'READY');
+    assert.ok(reopened.offset > 0, 'only the newest page is loaded up front');
+    assert.strictEqual(reopened.length, 700);
+    assert.strictEqual(reopened.isIntegrityVerified, true);
+    assert.strictEqual(reopened.lastVerifiedFrom, 640);
+
+    await reopened.hydrated();
+    assert.strictEqual(reopened.offset, 0);
+    assert.deepStrictEqual(reopened.getThreads(), ledger.getThreads());
+    assert.strictEqual(await reopened.verifyIntegrity(), true);
+
+    // Appends from another tab are pulled in incrementally
+    await weave(ledger, 700);
+    await reopened.reload();
+    assert.strictEqual(reopened.length, 701);
+    assert.strictEqual(reopened.threads[700].hash, ledger.threads[700].hash);
+});
+
+test('TapestryLedger: migrates the localStorage ledger into the store', async () => {
+    const legacy = new TapestryLedger('marq_tapestry_threads', { store: null });
+    await legacy.initialize();
+    for (let i = 0; i < 3; i++) await weave(legacy, i);
+    assert.ok(localStorage.getItem('marq_tapestry_threads'));
+
+    const backend = new MemoryBackend();
+    const ledger = new TapestryLedger('marq_tapestry_threads', { store: new LedgerStore(backend) });
+    assert.strictEqual(await ledger.initialize(), 'READY');
+    assert.deepStrictEqual(ledger.getThreads(), legacy.getThreads());
+    assert.strictEqual(localStorage.getItem('marq_tapestry_threads'), null);
+    assert.strictEqual(backend.meta.length, 3);
+});
+
+test('TapestryLedger: encrypted store segments lock and unlock', async () => {
+    const backend = new MemoryBackend();
+    const ledger = new TapestryLedger('secure_ledger', { store: new LedgerStore(backend) });
+    await ledger.initialize();
+    await weave(ledger, 0);
+    await ledger.enableEncryption('pw');
+    await weave(ledger, 1);
+
+    assert.strictEqual(backend.meta.encrypted, true);
+    assert.ok([...backend.segments.values()].every((r) => r.packet && !r.threads));
+
+    const reopened = new TapestryLedger('secure_ledger', { store: new LedgerStore(backend) });
+    assert.strictEqual(await reopened.initialize(), 'LOCKED');
+    assert.strictEqual(await reopened.unlock('wrong'), false);
+    assert.strictEqual(reopened.crypto.hasSession(), false);
+    assert.strictEqual(await reopened.unlock('pw'), true);
+    assert.deepStrictEqual(reopened.getThreads().map((t) => t.title), ['T0', 'T1']);
+});
+
+test('TapestryLedger: overlapping merges and weaves are applied one at a time', async () => {
+    const source = new TapestryLedger('merge_source', { store: new LedgerStore(new MemoryBackend()) });
+    await source.initialize();
+    for (let i = 0; i < 3; i++) await weave(source, i);
+    const delta = source.getThreads();
+
+    const backend = new MemoryBackend();
+    const ledger = new TapestryLedger('merge_target', { store: new LedgerStore(backend) });
+    await ledger.initialize();
+
+    // Two peers answering the same gap request, plus a local weave
+    const results = await Promise.all([
+        ledger.mergeThreads(delta, 'GENESIS_HASH'),
+        ledger.mergeThreads(delta, 'GENESIS_HASH'),
+        weave(ledger, 'local')
+    ]);
+    assert.deepStrictEqual(results.slice(0, 2), [3, 0]);
+    assert.strictEqual(ledger.length, 4);
+    assert.strictEqual(ledger.threads[3].previousHash, delta[2].hash);
+    assert.strictEqual(backend.meta.length, 4);
+    assert.strictEqual(await ledger.verifyIntegrity(), true);
+
+    // Concurrent weaves chain onto each other
+    await Promise.all([weave(ledger, 'a'), weave(ledger, 'b')]);
+    assert.strictEqual(ledger.threads[5].previousHash, ledger.threads[4].hash);
+    assert.strictEqual(await ledger.verifyIntegrity(), true);
+});
+
+test('TapestryLedger: a weave behind another tab chains onto its head', async () => {
+    const backend = new MemoryBackend();
+    const tabA = new TapestryLedger('shared_ledger', { store: new LedgerStore(backend) });
+    const tabB = new TapestryLedger('shared_ledger', { store: new LedgerStore(backend) });
+    await tabA.initialize();
+    await tabB.initialize();
+
+    await weave(tabA, 'a');
+    await weave(tabB, 'b'); // B has not seen A's append yet
+
+    assert.strictEqual(backend.meta.length, 2);
+    assert.deepStrictEqual(tabB.getThreads().map((t) => t.title), ['Ta', 'Tb']);
+    assert.strictEqual(tabB.threads[1].previousHash, tabA.threads[0].hash);
+    assert.strictEqual(await tabB.verifyIntegrity(), true);
+
+    await tabA.reload();
+    assert.deepStrictEqual(tabA.getThreads(), tabB.getThreads());
+});
+
+test('TapestryLedger: checkpoint keys never sit in plain storage', async () => {
+    const backend = new MemoryBackend();
+    const open = async () => {
+        const ledger = new TapestryLedger('keyed_ledger', { store: new LedgerStore(backend), checkpointInterval: 4 });
+        await ledger.initialize();
+        return ledger;
+    };
+    const ledger = await open();
+    for (let i = 0; i < 9; i++) await weave(ledger, i);
+
+    // Plaintext: non-extractable device key beside the ledger
+    const deviceKey = backend.keys.get('checkpoint');
+    assert.strictEqual(deviceKey.extractable, false);
+    assert.strictEqual(localStorage.getItem('keyed_ledger_checkpoint_key'), null);
+    assert.strictEqual((await open()).lastVerifiedFrom, 8);
+
+    // Encrypted: the key comes from the password; the stored checkpoint only has a salt
+    await ledger.enableEncryption('pw');
+    const signed = JSON.parse(localStorage.getItem('keyed_ledger_checkpoint'));
+    assert.strictEqual(signed.index, 7);
+    assert.ok(signed.salt);
+
+    let reopened = await open();
+    assert.strictEqual(await reopened.unlock('pw'), true);
+    assert.strictEqual(reopened.lastVerifiedFrom, 8);
+
+    // Anyone can use the device key, but it no longer signs an encrypted ledger
+    const message = new TextEncoder().encode(`7:${ledger.threads[7].hash}`);
+    const forged = Buffer.from(await crypto.subtle.sign('HMAC', deviceKey, message)).toString('hex');
+    localStorage.setItem('keyed_ledger_checkpoint', JSON.stringify({ ...signed, mac: forged }));
+    reopened = await open();
+    assert.strictEqual(await reopened.unlock('pw'), true);
+    assert.strictEqual(reopened.lastVerifiedFrom, 0, 'forged checkpoint ignored');
+});
@@ -0,0 +1,66 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { LocationIndex, locationIndex } from '../js/location-index.js';
+import { locations } from '../js/data.js';
+import { OracleEngine } from '../js/oracle.js';
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy', 'unknown'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah', 'atlas'];
+const TIMES = ['dawn', 'midday', 'dusk', 'night'];
+
+// The linear scan Oracle used before the index
+const scan = (intention, time) => {
+    for (const [key, data] of Object.entries(locations)) {
+        const parts = key.split('.');
+        if (parts[0] === intention && parts[2] === time) return { key, region: parts[1], data };
+    }
+    return null;
+};
+
+test('LocationIndex: lookups match the location table', () => {
+    assert.strictEqual(LocationIndex.for(locations), locationIndex, 'one shared index per table');
+    assert.strictEqual(LocationIndex.for(), locationIndex);
+
+    for (const intention of INTENTIONS) {
+        for (const time of TIMES) {
+            const expected = scan(intention, time);
+            const found = locationIndex.find(intention, time);
+            assert.strictEqual(found && found.key, expected && expected.key);
+            if (expected) assert.strictEqual(found.coordinates, expected.data.coordinates);
+
+            for (const region of REGIONS) {
+                const entry = locationIndex.get(intention, region, time);
+                const location = locations[`${intention}.${region}.${time}`];
+                assert.strictEqual(entry ? entry.coordinates : undefined, location ? location.coordinates : undefined);
+            }
+        }
+    }
+    assert.strictEqual(LocationIndex.for(null).get('awe', 'sahara', 'dusk'), null);
+});
+
+test('LocationIndex: thread coordinates fall back by region and are cached by hash', () => {
+    const index = new LocationIndex(locations);
+    const exact = { intention: 'awe', region: 'sahara', time: 'dusk', hash: 'a1' };
+    assert.strictEqual(index.threadCoords(exact), locations['awe.sahara.dusk'].coordinates);
+    assert.deepStrictEqual(index.threadCoords({ intention: 'awe', region: 'medina', time: 'dawn', hash: 'b2' }), { x: 60, y: 30 });
+    assert.deepStrictEqual(index.threadCoords({ intention: 'awe', region: 'kasbah', time: 'dawn' }), { x: 50, y: 50 });
+
+    // Cached by hash: the lookup is not repeated
+    index._byKey.clear();
+    assert.strictEqual(index.threadCoords(exact), locations['awe.sahara.dusk'].coordinates);
+});
+
+test('OracleEngine: ghosts resolve through the index', () => {
+    const horizon = {
+        project: () => [
+            { intention: 'awe', time: 'dusk', type: 'momentum' },
+            { intention: 'legacy', time: 'night', type: 'balance' }
+        ]
+    };
+    const [known, outpost] = new OracleEngine(horizon, null, locations).generateStrategicMap([]);
+    assert.strictEqual(known.region, 'sahara');
+    assert.strictEqual(known.locationTitle, locations['awe.sahara.dusk'].title);
+    assert.deepStrictEqual(outpost.coordinates, { x: 45, y: 15 });
+    assert.strictEqual(outpost.locationTitle, 'Legacy Outpost');
+    assert.strictEqual(outpost.strategicValue, 'High');
+});
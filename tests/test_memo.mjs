@@ -0,0 +1,124 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { LedgerMemo } from '../js/memo-cache.js';
+import { HorizonEngine } from '../js/horizon.js';
+import { SentinelEngine } from '../js/sentinel.js';
+import { CortexEngine } from '../js/cortex.js';
+import { OracleEngine } from '../js/oracle.js';
+import { TapestryLedger } from '../js/tapestry.js';
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+
+const makeLedger = (size) => {
+    const threads = [];
+    for (let i = 0; i < size; i++) {
+        threads.push({
+            intention: INTENTIONS[(i * 7) % 3],
+            region: REGIONS[Math.floor(i / 3) % 4],
+            time: 'dusk',
+            title: `T${i}`,
+            timestamp: 1000000 + i * 1000,
+            hash: i.toString(16).padStart(64, '0')
+        });
+    }
+    return threads;
+};
+
+test('LedgerMemo: keys on length and head hash', () => {
+    const memo = new LedgerMemo();
+    let computed = 0;
+    const compute = () => ++computed;
+
+    const threads = makeLedger(10);
+    assert.strictEqual(memo.get('a', threads, compute), 1);
+    assert.strictEqual(memo.get('a', [...threads], compute), 1, 'fresh array, same ledger');
+    assert.strictEqual(memo.get('b', threads, compute), 2, 'namespaces are separate');
+    assert.strictEqual(memo.get('a', makeLedger(11), compute), 3);
+    assert.strictEqual(memo.get('a', threads.slice(0, 5), compute), 4);
+
+    // Unhashed ledgers are never cached
+    const legacy = [{ intention: 'awe' }];
+    memo.get('a', legacy, compute);
+    memo.get('a', legacy, compute);
+    assert.strictEqual(computed, 6);
+    assert.deepStrictEqual(memo.stats(), { size: 4, maxEntries: 64, hits: 1, misses: 6 });
+});
+
+test('LedgerMemo: evicts least recently used entries', () => {
+    const memo = new LedgerMemo({ maxEntries: 2 });
+    const a = makeLedger(1);
+    const b = makeLedger(2);
+    const c = makeLedger(3);
+
+    memo.get('x', a, () => 'a');
+    memo.get('x', b, () => 'b');
+    memo.get('x', a, () => 'stale'); // Touch a, so b is now oldest
+    memo.get('x', c, () => 'c');
+
+    assert.strictEqual(memo.entries.size, 2);
+    assert.strictEqual(memo.get('x', a, () => 'recomputed'), 'a');
+    assert.strictEqual(memo.get('x', b, () => 'recomputed'), 'recomputed');
+
+    memo.invalidate('x');
+    assert.strictEqual(memo.entries.size, 0);
+});
+
+test('LedgerMemo: engines return cached outputs that match uncached ones', () => {
+    const memo = new LedgerMemo();
+    const threads = makeLedger(40);
+    const locations = {
+        'awe.sahara.dusk': { coordinates: { x: 75, y: 75 }, title: 'Dunes' }
+    };
+
+    const plain = new HorizonEngine();
+    const horizon = new HorizonEngine({ memo });
+    const analysis = horizon.analyze(threads);
+    assert.deepStrictEqual(analysis, plain.analyze(threads));
+    assert.strictEqual(horizon.analyze([...threads]), analysis);
+    assert.strictEqual(horizon.project(threads), horizon.project(threads));
+
+    const sentinel = new SentinelEngine(horizon, { memo });
+    const report = sentinel.assess(threads);
+    assert.deepStrictEqual(report, new SentinelEngine(plain).assess(threads));
+    assert.strictEqual(sentinel.assess(threads).threats, report.threats);
+
+    const cortex = new CortexEngine({ maxEdgesPerNode: 4, memo });
+    const graph = cortex.analyze(threads);
+    assert.strictEqual(cortex.analyze(threads), graph);
+    assert.strictEqual(graph.edges.length, new CortexEngine({ maxEdgesPerNode: 4 }).analyze(threads).edges.length);
+    const full = new CortexEngine({ memo }).analyze(threads);
+    assert.notStrictEqual(full, graph, 'edge cap is part of the key');
+
+    const oracle = new OracleEngine(horizon, null, locations, { memo });
+    const ghosts = oracle.generateStrategicMap(threads);
+    assert.strictEqual(oracle.generateStrategicMap(threads), ghosts);
+    assert.ok(ghosts.length > 0);
+
+    // Growth is a different ledger
+    const grown = makeLedger(41);
+    assert.notStrictEqual(horizon.analyze(grown), analysis);
+    assert.deepStrictEqual(horizon.analyze(grown), plain.analyze(grown));
+});
+
+test('TapestryLedger: read-only view is reused until the ledger changes', () => {
+    const ledger = new TapestryLedger('memo-test');
+    ledger.threads = makeLedger(5);
+
+    const view = ledger.getView();
+    assert.ok(Object.isFrozen(view));
+    assert.strictEqual(ledger.getView(), view);
+    assert.deepStrictEqual([...view], ledger.getThreads());
+
+    ledger.threads.push(makeLedger(6)[5]);
+    const grown = ledger.getView();
+    assert.notStrictEqual(grown, view);
+    assert.strictEqual(grown.length, 6);
+    assert.strictEqual(view.length, 5, 'earlier views are snapshots');
+
+    ledger.threads = makeLedger(6);
+    assert.notStrictEqual(ledger.getView(), grown, 'replaced ledger gets a new view');
+
+    ledger.status = 'LOCKED';
+    assert.strictEqual(ledger.getView().length, 0);
+});
@@ -0,0 +1,121 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert';
+
+// Minimal DOM for the replay interface
+const createMockElement = () => ({
+    style: {},
+    dataset: {},
+    classList: { add: () => {}, remove: () => {}, toggle: () => {}, contains: () => true },
+    append: () => {},
+    appendChild: () => {},
+    replaceChildren: () => {},
+    setAttribute: () => {},
+    addEventListener: () => {}
+});
+global.document = { createElement: createMockElement, createTextNode: () => ({}), body: createMockElement() };
+global.window = {};
+
+const { PanopticonEngine, SnapshotStore } = await import('../js/panopticon.js');
+const { SentinelEngine } = await import('../js/sentinel.js');
+const { HorizonEngine } = await import('../js/horizon.js');
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara'];
+
+const makeThread = (i, salt = '') => ({
+    intention: i % 7 < 4 ? 'awe' : INTENTIONS[i % 4],
+    region: REGIONS[Math.floor(i / 3) % 3],
+    time: 'dawn',
+    timestamp: 1_700_000_000_000 + i * (i % 5 === 0 ? 90_000 : 4_000),
+    hash: `t${salt}${i}`
+});
+
+// Append-only ledger whose view is replaced on change, like TapestryLedger
+const createLedger = () => {
+    let view = Object.freeze([]);
+    return {
+        getView: () => view,
+        add: (thread) => (view = Object.freeze([...view, thread])),
+        replace: (threads) => (view = Object.freeze(threads))
+    };
+};
+
+const createPanopticon = () => {
+    const ledger = createLedger();
+    const sentinel = new SentinelEngine(new HorizonEngine());
+    const rendered = [];
+    const panopticon = new PanopticonEngine(
+        ledger,
+        sentinel,
+        { map: { render: (threads, locations, ghosts, zones) => rendered.push({ threads, zones }) } },
+        {}
+    );
+    return { ledger, sentinel, panopticon, rendered };
+};
+
+describe('SnapshotStore', () => {
+    it('keeps the newest snapshots and finds them by time', () => {
+        const store = new SnapshotStore(4);
+        for (let i = 0; i < 6; i++) store.push({ time: i * 10, keyframe: i % 2 === 0 });
+
+        assert.strictEqual(store.length, 4);
+        assert.deepStrictEqual([0, 1, 2, 3].map((i) => store.get(i).time), [20, 30, 40, 50]);
+        assert.strictEqual(store.get(4), undefined);
+
+        assert.strictEqual(store.indexAt(5), -1);
+        assert.strictEqual(store.indexAt(20), 0);
+        assert.strictEqual(store.indexAt(39), 1);
+        assert.strictEqual(store.indexAt(1000), 3);
+        assert.strictEqual(store.keyframeAt(3), 2);
+    });
+});
+
+describe('PanopticonEngine replay', () => {
+    it('rebuilds any snapshot from keyframes without touching live state', () => {
+        const { ledger, sentinel, panopticon } = createPanopticon();
+        const reference = new SentinelEngine(new HorizonEngine());
+        const horizon = new HorizonEngine();
+
+        for (let i = 0; i < 600; i++) {
+            ledger.add(makeThread(i));
+            panopticon.capture();
+        }
+        panopticon.capture(); // Unchanged ledger: no new snapshot
+
+        const store = panopticon.snapshots;
+        assert.strictEqual(store.length, 512, 'bounded');
+        assert.strictEqual(store.get(0).threadCount, 89, 'oldest were evicted');
+        assert.ok(store.get(0).keyframe, 'oldest stays a keyframe');
+
+        const liveDefcon = sentinel.defcon;
+        for (const index of [0, 1, 15, 16, 17, 200, 511]) {
+            panopticon.scrubTo(index);
+            const threads = ledger.getView().slice(0, store.get(index).threadCount);
+            const state = panopticon.replayState;
+            assert.strictEqual(state.stale, false);
+            assert.deepStrictEqual(state.report, reference.assess(threads), `report at ${index}`);
+            assert.deepStrictEqual(state.horizon, horizon.analyze(threads), `horizon at ${index}`);
+        }
+        assert.strictEqual(sentinel.defcon, liveDefcon, 'live sentinel untouched');
+
+        // By time: the last snapshot taken at or before
+        const target = store.get(300);
+        assert.strictEqual(panopticon.scrubToTime(target.time), store.indexAt(target.time));
+        assert.ok(store.get(panopticon.currentIndex).time <= target.time);
+    });
+
+    it('falls back to the nearest keyframe once the ledger is replaced', () => {
+        const { ledger, panopticon } = createPanopticon();
+        for (let i = 0; i < 40; i++) {
+            ledger.add(makeThread(i));
+            panopticon.capture();
+        }
+        const keyframe = panopticon.snapshots.get(16).keyframe;
+        assert.ok(keyframe);
+
+        ledger.replace(Array.from({ length: 40 }, (_, i) => makeThread(i, 'fork')));
+        panopticon.scrubTo(20);
+        assert.strictEqual(panopticon.replayState.stale, true);
+        assert.strictEqual(panopticon.replayState.report, keyframe.report);
+    });
+});
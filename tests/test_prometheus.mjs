@@ -0,0 +1,79 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+
+// Minimal canvas shim: Prometheus only needs createImageData/putImageData
+let puts = [];
+global.document = {
+    createElement: () => ({
+        width: 0,
+        height: 0,
+        getContext: () => ({
+            createImageData: (w, h) => ({ width: w, height: h, data: new Uint8ClampedArray(w * h * 4) }),
+            putImageData: (img, x, y, dx, dy, dw, dh) => puts.push({ dx, dy, dw, dh })
+        })
+    })
+};
+
+const { PrometheusEngine } = await import('../js/prometheus.js');
+
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+const makeThreads = (n, salt = '') =>
+    Array.from({ length: n }, (_, i) => ({
+        intention: 'awe',
+        region: REGIONS[i % 4],
+        time: 'dusk',
+        hash: `${salt}${i.toString(16).padStart(8, '0')}`
+    }));
+
+test('Prometheus: incremental appends match a full rebuild', () => {
+    const threads = makeThreads(25);
+
+    const incremental = new PrometheusEngine();
+    for (let n = 0; n <= threads.length; n += 5) {
+        incremental.update(threads.slice(0, n), {}, 300, 200);
+    }
+
+    const full = new PrometheusEngine();
+    full.update(threads, {}, 300, 200);
+
+    assert.deepStrictEqual(incremental.density, full.density);
+    assert.deepStrictEqual(incremental.imageData.data, full.imageData.data);
+    assert.ok(full.density.some((v) => v > 0));
+});
+
+test('Prometheus: unchanged ledger skips the colorize pass', () => {
+    const engine = new PrometheusEngine();
+    const threads = makeThreads(10);
+
+    assert.strictEqual(engine.update(threads, {}, 300, 200), true);
+    const version = engine.version;
+    puts = [];
+
+    assert.strictEqual(engine.update([...threads], {}, 300, 200), false);
+    assert.strictEqual(engine.version, version);
+    assert.strictEqual(puts.length, 0);
+
+    // A single append only repaints the splat footprint
+    engine.update(makeThreads(11), {}, 300, 200);
+    assert.strictEqual(puts.length, 1);
+    assert.ok(puts[0].dw < 300 || puts[0].dh < 200);
+});
+
+test('Prometheus: divergent history and resize rebuild the grid', () => {
+    const engine = new PrometheusEngine();
+    engine.update(makeThreads(10), {}, 300, 200);
+
+    const other = makeThreads(10, 'x');
+    engine.update(other, {}, 300, 200);
+    const reference = new PrometheusEngine();
+    reference.update(other, {}, 300, 200);
+    assert.deepStrictEqual(engine.density, reference.density);
+
+    engine.update(other, {}, 400, 250);
+    assert.strictEqual(engine.density.length, 400 * 250);
+    assert.strictEqual(engine.count, 10);
+
+    engine.update([], {}, 400, 250);
+    assert.ok(engine.density.every((v) => v === 0));
+    assert.ok(engine.imageData.data.every((v) => v === 0));
+});
@@ -0,0 +1,136 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert';
+import { FrameScheduler } from '../js/frame-scheduler.js';
+
+// Manual frame driver with a fake clock
+const createScheduler = (options = {}) => {
+    const frames = [];
+    const clock = { now: 0 };
+    const scheduler = new FrameScheduler({
+        requestFrame: (cb) => frames.push(cb),
+        cancelFrame: () => frames.pop(),
+        now: () => clock.now,
+        document: null,
+        ...options
+    });
+    const step = () => {
+        const cb = frames.shift();
+        if (cb) cb(clock.now);
+        return !!cb;
+    };
+    return { scheduler, frames, clock, step };
+};
+
+describe('FrameScheduler', () => {
+    it('coalesces requests into one frame and idles when clean', () => {
+        const { scheduler, frames, step } = createScheduler();
+        let runs = 0;
+        scheduler.register('view', () => {
+            runs++;
+            return false;
+        });
+
+        scheduler.request('view');
+        scheduler.request('view');
+        scheduler.request('view');
+        assert.strictEqual(frames.length, 1, 'one frame for three requests');
+
+        step();
+        assert.strictEqual(runs, 1);
+        assert.strictEqual(frames.length, 0, 'nothing dirty, no next frame');
+        assert.strictEqual(step(), false);
+    });
+
+    it('keeps animating tasks running until they settle', () => {
+        const { scheduler, step } = createScheduler();
+        let remaining = 3;
+        scheduler.register('physics', () => --remaining > 0);
+
+        scheduler.request('physics');
+        let frames = 0;
+        while (step()) frames++;
+        assert.strictEqual(frames, 3);
+        assert.strictEqual(scheduler.getStats().tasks.physics.runs, 3);
+    });
+
+    it('defers work past the frame budget and throttles slow tasks', () => {
+        const { scheduler, clock, step } = createScheduler({ frameBudget: 10 });
+        const order = [];
+        const work = (name, ms) => () => {
+            order.push(name);
+            clock.now += ms;
+            return false;
+        };
+        scheduler.register('units', work('units', 12), { priority: 2, budget: 4 });
+        scheduler.register('map', work('map', 2), { priority: 1 });
+
+        scheduler.request('units');
+        scheduler.request('map');
+        step();
+        assert.deepStrictEqual(order, ['units'], 'map waits: units spent the budget');
+        assert.strictEqual(scheduler.getStats().overBudgetFrames, 1);
+
+        // Deferred work runs first next frame. Units overran 4ms by 3x, so it
+        // sits out two frames (this one and the next) before running again.
+        scheduler.request('units');
+        step();
+        assert.deepStrictEqual(order, ['units', 'map']);
+        step();
+        assert.deepStrictEqual(order, ['units', 'map']);
+        step();
+        assert.deepStrictEqual(order, ['units', 'map', 'units']);
+
+        const stats = scheduler.getStats().tasks;
+        assert.strictEqual(stats.map.deferred, 1);
+        assert.strictEqual(stats.units.skipped, 2);
+        assert.strictEqual(stats.units.overruns, 2);
+        assert.strictEqual(stats.units.maxMs, 12);
+    });
+
+    it('pauses while hidden and resumes pending work', () => {
+        const { scheduler, frames, step } = createScheduler();
+        let runs = 0;
+        scheduler.register('view', () => {
+            runs++;
+            return false;
+        });
+
+        scheduler.setHidden(true);
+        scheduler.request('view');
+        assert.strictEqual(frames.length, 0);
+
+        scheduler.setHidden(false);
+        assert.strictEqual(frames.length, 1);
+        step();
+        assert.strictEqual(runs, 1);
+    });
+
+    it('wakes interval tasks by timer instead of spinning frames', async () => {
+        const { scheduler, frames, step } = createScheduler();
+        let runs = 0;
+        scheduler.register(
+            'widgets',
+            () => {
+                runs++;
+                return runs < 2;
+            },
+            { interval: 5 }
+        );
+
+        scheduler.request('widgets');
+        step();
+        assert.strictEqual(runs, 1);
+        assert.strictEqual(frames.length, 0, 'no frames between refreshes');
+        assert.ok(scheduler.isPending('widgets'));
+
+        await new Promise((resolve) => setTimeout(resolve, 20));
+        step();
+        assert.strictEqual(runs, 2);
+        assert.strictEqual(scheduler.isPending('widgets'), false);
+
+        scheduler.request('widgets', 5);
+        scheduler.unregister('widgets');
+        await new Promise((resolve) => setTimeout(resolve, 20));
+        assert.strictEqual(frames.length, 0, 'unregister drops the timer');
+    });
+});
@@ -0,0 +1,68 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { encodeScroll, decodeScroll, isBinaryScroll } from '../js/scroll-codec.js';
+import { readScroll, sha256, linkPayload } from '../js/ledger-chain.js';
+
+const REGIONS = ['sahara', 'kyoto', 'patagonia'];
+
+const makeChain = async (size) => {
+    const threads = [];
+    let previousHash = 'GENESIS_HASH';
+    for (let i = 0; i < size; i++) {
+        const payload = {
+            intention: i % 2 ? 'awe' : 'serenity',
+            time: i % 3 ? 'dusk' : 'dawn',
+            region: REGIONS[i % 3],
+            title: `Thread ${i}`,
+            timestamp: 1700000000000 + i * 7919 - (i % 5) * 20000,
+            previousHash
+        };
+        const hash = await sha256(linkPayload(payload, previousHash));
+        threads.push({ id: hash.substring(0, 12), ...payload, hash });
+        previousHash = hash;
+    }
+    return threads;
+};
+
+test('ScrollCodec: round-trips threads and beats pretty JSON on size', async () => {
+    const threads = await makeChain(2000);
+    const json = JSON.stringify(threads, null, 2);
+
+    for (const compress of [false, true]) {
+        const bytes = await encodeScroll(threads, { compress });
+        assert.ok(isBinaryScroll(bytes));
+        assert.strictEqual(bytes[5], compress ? 1 : 0);
+        const decoded = await decodeScroll(bytes);
+        assert.deepStrictEqual(decoded, threads);
+        assert.strictEqual(JSON.stringify(decoded, null, 2), json, 'key order and values survive');
+        assert.ok(bytes.length * 3 < json.length, `${bytes.length} vs ${json.length}`);
+    }
+
+    // Non-canonical fields still round-trip: custom ids, fractional time, no previousHash
+    const odd = threads.slice(0, 3).map((t) => ({ ...t }));
+    odd[0].id = 'custom-id';
+    odd[1].timestamp = 1700000000000.5;
+    delete odd[2].previousHash;
+    assert.deepStrictEqual(await decodeScroll(await encodeScroll(odd)), odd);
+
+    await assert.rejects(encodeScroll([{ ...threads[0], hash: threads[0].hash.toUpperCase() }]), /lowercase hex/);
+    await assert.rejects(encodeScroll([threads[1]]), /Broken chain link at thread 0/);
+});
+
+test('ScrollCodec: readScroll verifies binary scrolls like JSON ones', async () => {
+    const threads = await makeChain(1500);
+    const bytes = await encodeScroll(threads);
+
+    const progress = [];
+    const out = await readScroll(new Blob([bytes]), { onProgress: (p) => progress.push(p) });
+    assert.deepStrictEqual(out, threads);
+    assert.strictEqual(progress[progress.length - 1].bytes, bytes.length);
+
+    // Flip a byte of the last stored hash: the chain no longer verifies
+    const raw = await encodeScroll(threads, { compress: false });
+    raw[raw.length - 1] ^= 1;
+    await assert.rejects(readScroll(new Blob([raw])), /Integrity check failed.*thread 1499/);
+
+    await assert.rejects(readScroll(new Blob([raw.subarray(0, raw.length - 10)])), /Truncated/);
+    await assert.rejects(readScroll(new Blob([bytes]), { maxThreads: 100 }), /Too many threads/);
+});
@@ -0,0 +1,83 @@
+import { describe, it } from 'node:test';
+import assert from 'node:assert';
+import { SentinelEngine } from '../js/sentinel.js';
+import { HorizonEngine } from '../js/horizon.js';
+
+const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+
+// Deterministic ledger with bursts, region runs and one-sided stretches
+const makeThreads = (n, seed = 7) => {
+    let x = seed;
+    const rand = () => ((x = (x * 1103515245 + 12345) % 2147483648) / 2147483648);
+    let ts = 1_700_000_000_000;
+    let region = 'coast';
+    return Array.from({ length: n }, (_, i) => {
+        ts += rand() < 0.5 ? 5_000 : 120_000;
+        if (rand() < 0.4) region = REGIONS[Math.floor(rand() * 4)];
+        const intention = i % 40 < 20 ? 'serenity' : INTENTIONS[Math.floor(rand() * 4)];
+        return { intention, region, time: 'dawn', timestamp: ts, hash: `h${seed}-${i}` };
+    });
+};
+
+describe('SentinelEngine threat timeline', () => {
+    it('matches assess() on every ledger prefix', () => {
+        const threads = makeThreads(300);
+        const live = new SentinelEngine(new HorizonEngine());
+        const timeline = new SentinelEngine(new HorizonEngine()).scanHistory(threads);
+
+        assert.strictEqual(timeline.length, 300);
+        for (let n = 0; n <= threads.length; n++) {
+            const expected = live.assess(threads.slice(0, n));
+            const actual = timeline.reportAt(n - 1);
+            assert.deepStrictEqual(actual, expected, `prefix ${n}`);
+        }
+    });
+
+    it('extends incrementally and rescans a different ledger', () => {
+        const threads = makeThreads(200);
+        const sentinel = new SentinelEngine(new HorizonEngine());
+        const full = new SentinelEngine(new HorizonEngine()).scanHistory(threads);
+
+        const timeline = sentinel.scanHistory(threads.slice(0, 120));
+        let pushed = 0;
+        const accumulate = sentinel.horizon.accumulate.bind(sentinel.horizon);
+        sentinel.horizon.accumulate = (...args) => {
+            pushed += args[3] - args[2];
+            return accumulate(...args);
+        };
+
+        // Copies of the same threads continue the scan; prefixes are free
+        sentinel.scanHistory(threads.map((t) => ({ ...t })));
+        assert.strictEqual(pushed, 80, 'only appended threads are scanned');
+        sentinel.scanHistory(threads.slice(0, 50));
+        assert.strictEqual(timeline.length, 200);
+        assert.deepStrictEqual(timeline.range(), full.range());
+
+        sentinel.scanHistory(makeThreads(60, 99));
+        assert.strictEqual(timeline.length, 60);
+        assert.deepStrictEqual(timeline.range(), new SentinelEngine(new HorizonEngine()).scanHistory(makeThreads(60, 99)).range());
+        assert.strictEqual(sentinel.defcon, 5, 'live state untouched');
+    });
+
+    it('answers range queries', () => {
+        const threads = makeThreads(400);
+        const timeline = new SentinelEngine(new HorizonEngine()).scanHistory(threads);
+        const defcon = Array.from(timeline.range());
+
+        const peak = timeline.peak(100, 300);
+        const window = defcon.slice(100, 300);
+        assert.strictEqual(peak.defcon, Math.min(...window));
+        assert.strictEqual(peak.index, 100 + window.indexOf(peak.defcon));
+
+        const changes = timeline.transitions(100, 300);
+        assert.ok(changes.length > 0);
+        for (const { index, defcon: level } of changes) {
+            assert.ok(index >= 100 && index < 300);
+            assert.strictEqual(level, defcon[index]);
+            assert.notStrictEqual(level, timeline.defconAt(index - 1));
+        }
+        assert.strictEqual(timeline.defconAt(-1), 5);
+        assert.strictEqual(timeline.range(390, 900).length, 10);
+    });
+});
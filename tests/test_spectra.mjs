@@ -0,0 +1,117 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { FSKDemodulator, quadratureTable } from '../js/fsk-demod.js';
+import { SpectraEngine } from '../js/spectra.js';
+
+const MARK = 18000;
+const SPACE = 16000;
+
+// Leader tone, sync bit and SPCT frame as _playLiveFSK sends them, with noise
+// and a low drone; `drift` stretches the bit clock (sender/receiver mismatch)
+const synthesize = (data, { sampleRate = 44100, baudRate = 40, lead = 0.37, drift = 1, seed = 7 } = {}) => {
+    const payload = new TextEncoder().encode(JSON.stringify(data));
+    const message = new Uint8Array(9 + payload.length);
+    message.set([0x53, 0x50, 0x43, 0x54, 1, 0, 0, payload.length >> 8, payload.length & 0xff]);
+    message.set(payload, 9);
+
+    const bits = [1];
+    for (const byte of message) for (let k = 7; k >= 0; k--) bits.push((byte >> k) & 1);
+
+    let state = seed;
+    const random = () => ((state = (state * 1103515245 + 12345) % 2147483648) / 2147483648);
+
+    const start = Math.floor(sampleRate * lead);
+    const spb = (sampleRate / baudRate) * drift;
+    const n = start + Math.ceil(bits.length * spb) + sampleRate;
+    const pcm = new Float32Array(n);
+    let phase = 0;
+    for (let i = 0; i < n; i++) {
+        const b = i >= start ? bits[Math.floor((i - start) / spb)] : undefined;
+        phase += (2 * Math.PI * (b === 1 ? MARK : SPACE)) / sampleRate;
+        pcm[i] = 0.3 * Math.sin(phase) + 0.3 * (random() * 2 - 1) + 0.4 * Math.sin((2 * Math.PI * 110 * i) / sampleRate);
+    }
+    return pcm;
+};
+
+const demodulate = (pcm, options, quantum = 128) => {
+    const demod = new FSKDemodulator({ markFreq: MARK, spaceFreq: SPACE, ...options });
+    const frames = [];
+    for (let i = 0; i < pcm.length; i += quantum) frames.push(...demod.push(pcm.subarray(i, i + quantum)));
+    return frames;
+};
+
+const DATA = { type: 'thread', payload: { title: 'Signal in the noise', xp: 42 } };
+
+test('quadratureTable: spans an exact period of the tone', () => {
+    assert.strictEqual(quadratureTable(18000, 44100).period, 49);
+    assert.strictEqual(quadratureTable(16000, 48000).period, 3);
+    const { cos, sin, period } = quadratureTable(16000, 44100);
+    const w = (2 * Math.PI * 16000) / 44100;
+    assert.ok(Math.abs(cos[period - 1] - Math.cos(w * (period - 1))) < 1e-6);
+    assert.ok(Math.abs(Math.cos(w * period) - 1) < 1e-9, 'wraps back to phase 0');
+    assert.ok(Math.abs(sin[0]) < 1e-9);
+});
+
+test('FSKDemodulator: decodes worklet-sized quanta at any bit phase', () => {
+    for (const [sampleRate, baudRate] of [[44100, 40], [48000, 40], [44100, 200]]) {
+        for (const lead of [0.37, 0.5123]) {
+            const pcm = synthesize(DATA, { sampleRate, baudRate, lead });
+            assert.deepStrictEqual(demodulate(pcm, { sampleRate, baudRate }), [DATA], `${sampleRate}/${baudRate}/${lead}`);
+        }
+    }
+    // Chunking does not matter
+    const pcm = synthesize(DATA);
+    assert.deepStrictEqual(demodulate(pcm, { sampleRate: 44100, baudRate: 40 }, 4096), [DATA]);
+    assert.deepStrictEqual(demodulate(pcm, { sampleRate: 44100, baudRate: 40 }, 1), [DATA]);
+});
+
+test('FSKDemodulator: tracks clock drift and ignores noise', () => {
+    for (const drift of [0.995, 1.005]) {
+        const pcm = synthesize(DATA, { drift });
+        assert.deepStrictEqual(demodulate(pcm, { sampleRate: 44100, baudRate: 40 }), [DATA], `drift ${drift}`);
+    }
+
+    let state = 3;
+    const noise = Float32Array.from({ length: 44100 * 5 }, () => (state = (state * 69069 + 1) % 4294967296) / 2147483648 - 1);
+    assert.deepStrictEqual(demodulate(noise, { sampleRate: 44100, baudRate: 40 }), []);
+
+    // Two frames back to back in one stream
+    const one = synthesize(DATA);
+    const twice = new Float32Array(one.length * 2);
+    twice.set(one, 0);
+    twice.set(one, one.length);
+    assert.deepStrictEqual(demodulate(twice, { sampleRate: 44100, baudRate: 40 }), [DATA, DATA]);
+});
+
+test('SpectraEngine: file decoding and the worklet share the demodulator', async () => {
+    const spectra = new SpectraEngine();
+    const pcm = synthesize(DATA, { baudRate: spectra.BAUD_RATE, lead: 0 });
+    assert.deepStrictEqual(spectra._decodeFSK(pcm, 44100, spectra.BAUD_RATE), DATA);
+
+    const posted = [];
+    let Processor = null;
+    global.sampleRate = 44100;
+    global.AudioWorkletProcessor = class {
+        constructor() {
+            this.port = { postMessage: (msg) => posted.push(msg) };
+        }
+    };
+    global.registerProcessor = (name, cls) => {
+        assert.strictEqual(name, 'spectra-demod');
+        Processor = cls;
+    };
+    await import('../js/spectra.worklet.js');
+
+    const processor = new Processor({
+        processorOptions: { baudRate: spectra.LIVE_BAUD_RATE, markFreq: MARK, spaceFreq: SPACE }
+    });
+    const live = synthesize(DATA);
+    for (let i = 0; i < live.length; i += 128) {
+        assert.strictEqual(processor.process([[live.subarray(i, i + 128)]]), true);
+    }
+    assert.deepStrictEqual(posted.filter((m) => m.type === 'frame').map((m) => m.data), [DATA]);
+    assert.deepStrictEqual(
+        posted.filter((m) => m.type === 'state').map((m) => m.state),
+        ['header', 'payload', 'search']
+    );
+});
@@ -4,7 +4,7 @@ import { StratcomSystem } from '../js/stratcom.js';
 
 // Mock Dependencies
 const mockLedger = {
-    getThreads: () => [{ intention: 'test', title: 'Test Thread', timestamp: Date.now(), region: 'coast' }]
+    getView: () => [{ intention: 'test', title: 'Test Thread', timestamp: Date.now(), region: 'coast' }]
 };
 const mockHorizon = {
     analyze: () => ({ balanceScore: 50, dominance: { intention: 'test' } })
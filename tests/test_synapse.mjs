@@ -0,0 +1,149 @@
+import { test } from 'node:test';
+import assert from 'node:assert';
+import { QuadTree, ForceLayout } from '../js/synapse-physics.js';
+
+const rand = (seed) => () => {
+    seed = (seed * 16807) % 2147483647;
+    return seed / 2147483647;
+};
+
+const points = (n, seed = 7) => {
+    const r = rand(seed);
+    const x = new Float32Array(n);
+    const y = new Float32Array(n);
+    for (let i = 0; i < n; i++) {
+        x[i] = r() * 800;
+        y[i] = r() * 600;
+    }
+    return { x, y };
+};
+
+// Reference: the original all-pairs repulsion
+const bruteForce = (x, y, repulsion) => {
+    const n = x.length;
+    const fx = new Float64Array(n);
+    const fy = new Float64Array(n);
+    for (let i = 0; i < n; i++) {
+        for (let j = i + 1; j < n; j++) {
+            const dx = x[i] - x[j];
+            const dy = y[i] - y[j];
+            let distSq = dx * dx + dy * dy;
+            if (distSq < 0.1) distSq = 0.1;
+            const f = repulsion / distSq;
+            const dist = Math.sqrt(distSq);
+            fx[i] += (dx / dist) * f;
+            fy[i] += (dy / dist) * f;
+            fx[j] -= (dx / dist) * f;
+            fy[j] -= (dy / dist) * f;
+        }
+    }
+    return { fx, fy };
+};
+
+const repelAll = (x, y, theta) => {
+    const tree = new QuadTree(4);
+    tree.build(x, y, x.length);
+    const fx = new Float32Array(x.length);
+    const fy = new Float32Array(x.length);
+    for (let i = 0; i < x.length; i++) tree.repel(i, x[i], y[i], theta, 2000, fx, fy);
+    return { fx, fy };
+};
+
+test('Synapse: Barnes–Hut with theta 0 matches all-pairs repulsion', () => {
+    const { x, y } = points(300);
+    const exact = bruteForce(x, y, 2000);
+    const bh = repelAll(x, y, 0);
+    for (let i = 0; i < x.length; i++) {
+        assert.ok(Math.abs(bh.fx[i] - exact.fx[i]) <= 1e-3 * (1 + Math.abs(exact.fx[i])));
+        assert.ok(Math.abs(bh.fy[i] - exact.fy[i]) <= 1e-3 * (1 + Math.abs(exact.fy[i])));
+    }
+});
+
+test('Synapse: approximation error stays small at the default theta', () => {
+    const { x, y } = points(2000, 11);
+    const exact = bruteForce(x, y, 2000);
+    const bh = repelAll(x, y, 0.8);
+
+    let err = 0;
+    let norm = 0;
+    for (let i = 0; i < x.length; i++) {
+        err += Math.hypot(bh.fx[i] - exact.fx[i], bh.fy[i] - exact.fy[i]);
+        norm += Math.hypot(exact.fx[i], exact.fy[i]);
+    }
+    assert.ok(err / norm < 0.05, `relative error ${(err / norm).toFixed(4)}`);
+});
+
+test('Synapse: coincident nodes do not blow up the tree', () => {
+    const x = new Float32Array(500).fill(100);
+    const y = new Float32Array(500).fill(100);
+    const { fx, fy } = repelAll(x, y, 0.8);
+    assert.ok(fx.every(Number.isFinite) && fy.every(Number.isFinite));
+});
+
+test('Synapse: layout settles and reports convergence', () => {
+    const n = 200;
+    const { x, y } = points(n, 3);
+    const layout = new ForceLayout();
+    layout.resize(800, 600);
+    layout.setNodes(x, y, new Float32Array(n), new Float32Array(n), n);
+    const src = Int32Array.from({ length: n - 1 }, (_, i) => i);
+    const dst = Int32Array.from({ length: n - 1 }, (_, i) => i + 1);
+    layout.setEdges(src, dst, new Float32Array(n - 1).fill(1));
+
+    let steps = 0;
+    let energy = Infinity;
+    while (!layout.isSettled(energy) && steps < 2000) {
+        energy = layout.step();
+        steps++;
+    }
+    assert.ok(layout.isSettled(energy), `not settled after ${steps} steps`);
+    assert.ok(x.every((v) => v >= 10 && v <= 790));
+});
+
+test('Synapse: a graph shrinking below the worker threshold steps on the main thread', async () => {
+    const posted = [];
+    let terminated = 0;
+    global.Worker = class {
+        postMessage(msg) {
+            posted.push(msg);
+        }
+        terminate() {
+            terminated++;
+        }
+    };
+    global.window = { devicePixelRatio: 1 };
+    const ctx = new Proxy({}, { get: (target, key) => (key in target ? target[key] : () => ({ width: 0 })), set: (target, key, value) => ((target[key] = value), true) });
+    const canvas = { width: 0, height: 0, getContext: () => ctx, getBoundingClientRect: () => ({ width: 400, height: 300, left: 0, top: 0 }) };
+    const { SynapseRenderer } = await import('../js/synapse.js');
+
+    const graph = (n) => ({
+        nodes: Array.from({ length: n }, (_, i) => ({ id: `n${i}`, data: { title: '', region: '', time: '', intention: 'awe' } })),
+        edges: []
+    });
+
+    const renderer = new SynapseRenderer(canvas, { workerThreshold: 10 });
+    renderer.render(graph(20));
+    assert.ok(renderer.worker);
+    const big = renderer.generation;
+    renderer.render();
+    assert.strictEqual(posted.at(-1).type, 'step');
+
+    // Reply carrying velocities: kept so a resize re-init resumes them
+    const vx = new Float32Array(20).fill(1.5);
+    renderer._onWorkerMessage({ type: 'positions', generation: big, x: new Float32Array(20), y: new Float32Array(20), vx, vy: vx, energy: 1, settled: false });
+    renderer.resize();
+    assert.strictEqual(posted.at(-1).type, 'init');
+    assert.strictEqual(posted.at(-1).payload.vx[0], 1.5);
+
+    renderer.render(graph(5));
+    assert.strictEqual(renderer.worker, null);
+    assert.strictEqual(terminated, 1);
+    const sent = posted.length;
+    renderer.render();
+    assert.strictEqual(posted.length, sent, 'no steps for the old graph');
+
+    // A late reply for the old graph is ignored
+    renderer._onWorkerMessage({ type: 'positions', generation: big + 1, x: new Float32Array(20), y: new Float32Array(20), energy: 1, settled: true });
+    assert.strictEqual(renderer.layout.x.length, 5);
+    delete global.Worker;
+});
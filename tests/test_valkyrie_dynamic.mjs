@@ -1,6 +1,6 @@
 import { test, describe, it, before, beforeEach } from 'node:test';
 import assert from 'node:assert';
-import { ValkyrieEngine } from '../js/valkyrie.js';
+import { ValkyrieEngine, compileCondition } from '../js/valkyrie.js';
 
 // --- MOCKS ---
 // Mock LocalStorage
@@ -188,4 +188,84 @@ describe('ValkyrieEngine (Project OMEGA)', () => {
              assert.ok(uiMock.notifications.find(n => n.msg.includes('SYSTEM LOCKDOWN')));
         });
     });
+    describe('Compiled Rules', () => {
+        it('should compile compact and spaced conditions alike', () => {
+            const ctx = { defcon: 1, threats: ['TEMPORAL_SURGE'], region: 'fes medina' };
+            assert.strictEqual(compileCondition('defcon<2').test(ctx), true);
+            assert.strictEqual(compileCondition('  defcon   <=   1 ').test(ctx), true);
+            assert.strictEqual(compileCondition('threats CONTAINS TEMPORAL_SURGE').field, 'threats');
+            assert.strictEqual(compileCondition('region CONTAINS fes  medina').test(ctx), true);
+            assert.strictEqual(compileCondition('defcon').test(ctx), false);
+            assert.strictEqual(compileCondition('ghost > 1').test(ctx), false);
+            assert.strictEqual(compileCondition(null).test(ctx), false);
+        });
+
+        it('should only compute the balance when a balance rule needs it', () => {
+            let analyses = 0;
+            const horizon = { analyze: () => (analyses++, { balanceScore: 20 }) };
+            const valkyrie = new ValkyrieEngine(terminalMock, uiMock, ledgerMock, horizon);
+            valkyrie.protocols = [];
+            valkyrie.addProtocol({ id: 'D', condition: 'defcon < 2', action: 'LOG D' });
+
+            // Zero cooldowns can still collide within one millisecond
+            const rearm = () => valkyrie.protocols.forEach((p) => (p.lastTriggered = 0));
+
+            const threads = Object.freeze([{}, {}]);
+            valkyrie.evaluate({ defcon: 1, threats: [] }, threads);
+            assert.strictEqual(analyses, 0);
+
+            valkyrie.addProtocol({ id: 'B', condition: 'balance < 30', action: 'LOG B' });
+            valkyrie.evaluate({ defcon: 5, threats: [] }, threads);
+            rearm();
+            valkyrie.evaluate({ defcon: 5, threats: [] }, threads);
+            assert.strictEqual(analyses, 1, 'same ledger view: balance reused');
+            rearm();
+            valkyrie.evaluate({ defcon: 5, threats: [] }, Object.freeze([...threads, {}]));
+            assert.strictEqual(analyses, 2);
+            assert.deepStrictEqual(terminalMock.logs.map((l) => l.msg), [
+                'VALKYRIE LOG: D',
+                'VALKYRIE LOG: B',
+                'VALKYRIE LOG: B',
+                'VALKYRIE LOG: B'
+            ]);
+        });
+
+        it('should re-check only rules whose inputs changed', () => {
+            engine.protocols = [];
+            for (let i = 0; i < 300; i++) {
+                engine.addProtocol({ id: `COUNT_${i}`, condition: `threadCount > ${i}`, action: `LOG ${i}`, cooldown: 0 });
+            }
+            engine.addProtocol({ id: 'RED', condition: 'defcon<2', action: 'LOG RED', cooldown: 0 });
+
+            const rearm = () => engine.protocols.forEach((p) => (p.lastTriggered = 0));
+            const checked = new Set();
+            for (const p of engine.protocols) {
+                const rule = engine._rules.get(p);
+                const test = rule.test;
+                rule.test = (ctx) => (checked.add(p.id), test(ctx));
+            }
+
+            const threads = new Array(3).fill({});
+            engine.evaluate({ defcon: 5, threats: [] }, threads);
+            assert.strictEqual(checked.size, 301);
+            assert.deepStrictEqual(terminalMock.logs.map((l) => l.msg), ['VALKYRIE LOG: 0', 'VALKYRIE LOG: 1', 'VALKYRIE LOG: 2']);
+
+            checked.clear();
+            terminalMock.clearLogs();
+            rearm();
+            engine.evaluate({ defcon: 1, threats: [] }, threads);
+            assert.deepStrictEqual([...checked], ['RED'], 'thread count unchanged');
+            assert.strictEqual(terminalMock.logs.length, 4, 'armed rules still fire');
+
+            // Editing a condition recompiles just that rule
+            engine.protocols[0].condition = 'threadCount > 10';
+            engine.protocols = [...engine.protocols];
+            checked.clear();
+            terminalMock.clearLogs();
+            rearm();
+            engine.evaluate({ defcon: 1, threats: [] }, threads);
+            assert.deepStrictEqual([...checked], []);
+            assert.deepStrictEqual(terminalMock.logs.map((l) => l.msg), ['VALKYRIE LOG: 1', 'VALKYRIE LOG: 2', 'VALKYRIE LOG: RED']);
+        });
+    });
 });
@@ -12,7 +12,7 @@ const mockAegis = {
 };
 
 const mockLedger = {
-    getThreads: () => []
+    getView: () => []
 };
 
 // Mock locations via global override or rewriting import if strictly needed.
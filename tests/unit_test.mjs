@@ -213,6 +213,44 @@ describe('Tactical Unit Verification', () => {
             }, /Invalid schema/);
         });
 
+        it('should verify only the tail after a signed checkpoint', async () => {
+            ledger = new TapestryLedger('test_ledger', { checkpointInterval: 4 });
+            await ledger.initialize();
+            for (let i = 0; i < 6; i++) {
+                await ledger.addThread({ intention: 'serenity', time: 'dawn', region: 'coast', title: `T${i}` });
+            }
+            assert.strictEqual(ledger.checkpoint.index, 3);
+            assert.ok(!localStorage.getItem('test_ledger_checkpoint').includes(ledger.threads[3].hash));
+
+            const reloaded = new TapestryLedger('test_ledger', { checkpointInterval: 4 });
+            await reloaded.initialize();
+            assert.strictEqual(reloaded.isIntegrityVerified, true);
+            assert.strictEqual(reloaded.lastVerifiedFrom, 4);
+
+            // A forged checkpoint is ignored and the whole chain is hashed
+            localStorage.setItem('test_ledger_checkpoint', JSON.stringify({ index: 3, mac: 'f'.repeat(64) }));
+            const forged = new TapestryLedger('test_ledger', { checkpointInterval: 4 });
+            await forged.initialize();
+            assert.strictEqual(forged.lastVerifiedFrom, 0);
+            assert.strictEqual(forged.isIntegrityVerified, true);
+
+            // Tampering behind the checkpoint is caught by a full pass on demand
+            forged.threads[1].title = 'CORRUPTED TITLE';
+            assert.strictEqual(await forged.verifyIntegrity({ fromCheckpoint: true }), true);
+            assert.strictEqual(await forged.verifyIntegrity(), false);
+            assert.strictEqual(forged.threads[1].integrityStatus, 'corrupted');
+        });
+
+        it('should report the first broken link when hashing in batches', async () => {
+            for (let i = 0; i < 5; i++) {
+                await ledger.addThread({ intention: 'awe', time: 'dusk', region: 'sahara', title: `T${i}` });
+            }
+            ledger.threads[2].region = 'coast';
+            ledger.threads[4].region = 'coast';
+            const failure = await ledger._verifyChain(ledger.threads);
+            assert.strictEqual(failure.index, 2);
+        });
+
         it('should clear the ledger', async () => {
             await ledger.addThread({ intention: 'serenity', time: 'dawn', region: 'coast', title: 'T1' });
             assert.strictEqual(ledger.getThreads().length, 1);
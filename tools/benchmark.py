@@ -0,0 +1,314 @@
+import argparse
+import functools
+import http.server
+import json
+import os
+import platform
+import socketserver
+import sys
+import threading
+import time
+
+# Engine Scaling Benchmarks
+# Loads the app headless, injects synthetic ledgers of increasing size and times
+# the analysis engines in-page with performance.now(). Results are reported as
+# JSON (p50/p95/p99 + ops/sec) and compared against a stored baseline.
+#
+#   python3 tools/benchmark.py                          # full sweep, compare to baseline
+#   python3 tools/benchmark.py --sizes 1000 10000       # quick run
+#   python3 tools/benchmark.py --update-baseline        # accept current numbers
+#
+# Interactive paths also carry an absolute frame budget: the Chronos candidate
+# sweep must finish within one 60 Hz frame on a 10k-thread ledger.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, 'tools', 'benchmark_baseline.json')
+PORT = 8091
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_TARGETS = [
+    'sentinel.assess', 'horizon.analyze', 'sentinel.assess.memo', 'horizon.analyze.memo',
+    'chronos.simulate', 'chronos.rank', 'chronos.rank.cold'
+]
+DEFAULT_THRESHOLD = 0.25  # 25% slower p50 than baseline counts as a regression
+
+FRAME_BUDGET_MS = 1000.0 / 60
+# result key -> p95 ceiling in ms, independent of the stored baseline
+BUDGETS = {
+    'chronos.rank@10000': FRAME_BUDGET_MS,
+    'chronos.rank.cold@10000': FRAME_BUDGET_MS
+}
+
+# Installed into the page once. Targets are closures (not eval'd strings) so the
+# harness works under the app's strict CSP.
+HARNESS_JS = """
+() => {
+    if (window.__bench) return;
+
+    const INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy'];
+    const REGIONS = ['coast', 'medina', 'sahara', 'kasbah'];
+    const TIMES = ['dawn', 'midday', 'dusk', 'night'];
+
+    // Deterministic PRNG (mulberry32) so every run sees the same ledger
+    const rng = (seed) => () => {
+        seed |= 0; seed = (seed + 0x6d2b79f5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+
+    const ledgers = new Map();
+
+    window.__bench = {
+        ledger(size, seed = 1) {
+            const key = `${size}:${seed}`;
+            if (ledgers.has(key)) return ledgers.get(key);
+            ledgers.clear(); // Keep at most one large ledger alive
+
+            const rand = rng(seed);
+            const threads = new Array(size);
+            let ts = Date.UTC(2025, 0, 1);
+            for (let i = 0; i < size; i++) {
+                const k = Math.floor(rand() * 4);
+                ts += Math.floor(rand() * 120000);
+                const hash = (i.toString(16).padStart(8, '0') + 'ab'.repeat(28));
+                threads[i] = {
+                    id: hash.substring(0, 12),
+                    intention: INTENTIONS[k],
+                    region: REGIONS[rand() < 0.7 ? k : Math.floor(rand() * 4)],
+                    time: TIMES[Math.floor(rand() * 4)],
+                    title: `Synthetic ${i}`,
+                    timestamp: ts,
+                    previousHash: i === 0 ? 'GENESIS_HASH' : threads[i - 1].hash,
+                    hash
+                };
+            }
+            ledgers.set(key, threads);
+            return threads;
+        },
+
+        targets: {
+            // Engines share a LedgerMemo; drop it so every run does the full scan
+            'sentinel.assess': (threads) => {
+                if (window.sentinel.memo) window.sentinel.memo.invalidate();
+                return window.sentinel.assess(threads);
+            },
+            'horizon.analyze': (threads) => {
+                if (window.horizon.memo) window.horizon.memo.invalidate();
+                return window.horizon.analyze(threads);
+            },
+            // Repeat calls on an unchanged ledger (memo hits)
+            'sentinel.assess.memo': (threads) => window.sentinel.assess(threads),
+            'horizon.analyze.memo': (threads) => window.horizon.analyze(threads),
+            'chronos.simulate': (threads) => window.chronos.simulate(threads, {
+                intention: 'awe', region: 'sahara', time: 'dusk', title: 'Benchmark Probe'
+            }),
+            // Full intention x region x time sweep against the cached baseline
+            'chronos.rank': (threads) => window.chronos.rank(threads),
+            // Same sweep including the baseline rebuild (first call after a ledger change)
+            'chronos.rank.cold': (threads) => {
+                window.chronos.invalidate();
+                return window.chronos.rank(threads);
+            }
+        },
+
+        time(name, size, runs, warmup) {
+            const fn = this.targets[name];
+            if (!fn) throw new Error(`Unknown benchmark target: ${name}`);
+            const threads = this.ledger(size);
+            for (let i = 0; i < warmup; i++) fn(threads);
+            const samples = new Array(runs);
+            for (let i = 0; i < runs; i++) {
+                const t0 = performance.now();
+                fn(threads);
+                samples[i] = performance.now() - t0;
+            }
+            return samples;
+        }
+    };
+}
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples):
+    mean = sum(samples) / len(samples)
+    return {
+        'runs': len(samples),
+        'p50': round(percentile(samples, 50), 4),
+        'p95': round(percentile(samples, 95), 4),
+        'p99': round(percentile(samples, 99), 4),
+        'mean': round(mean, 4),
+        'ops_per_sec': round(1000.0 / mean, 2) if mean > 0 else None
+    }
+
+
+def default_runs(size):
+    # Keep the sweep bounded: many samples on small ledgers, a few on huge ones
+    return max(5, min(100, 200000 // size))
+
+
+class _Server:
+    def __enter__(self):
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=ROOT)
+        handler.log_message = lambda *args: None
+        socketserver.TCPServer.allow_reuse_address = True
+        self.httpd = socketserver.ThreadingTCPServer(('', PORT), handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def open_app(playwright, extra_harness=None):
+    """Launches headless Chromium on the app with the bench harness installed."""
+    browser = playwright.chromium.launch(
+        headless=True,
+        args=['--js-flags=--max-old-space-size=4096']
+    )
+    context = browser.new_context()
+    context.add_init_script("localStorage.setItem('marq_onboarded', 'true')")
+    page = context.new_page()
+    page.goto(f'http://localhost:{PORT}/index.html')
+    page.wait_for_function('() => window.sentinel && window.horizon && window.chronos', timeout=15000)
+    page.evaluate(HARNESS_JS)
+    if extra_harness:
+        page.evaluate(extra_harness)
+    return browser, page
+
+
+def run_benchmarks(sizes, targets, runs=None, warmup=2):
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    with _Server(), sync_playwright() as p:
+        browser, page = open_app(p)
+        try:
+            for size in sizes:
+                for target in targets:
+                    n = runs or default_runs(size)
+                    print(f'  {target} @ {size:,} threads x{n}...', file=sys.stderr)
+                    samples = page.evaluate(
+                        '([name, size, runs, warmup]) => window.__bench.time(name, size, runs, warmup)',
+                        [target, size, n, warmup]
+                    )
+                    results[f'{target}@{size}'] = summarize(samples)
+        finally:
+            browser.close()
+    return results
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('results', {})
+
+
+def unbaselined(results, baseline):
+    """Result keys the baseline has no p50 for; these cannot be checked."""
+    return sorted(key for key in results if not (baseline.get(key) or {}).get('p50'))
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns a list of regressions (key, baseline p50, current p50, ratio)."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base or not base.get('p50'):
+            continue
+        ratio = current['p50'] / base['p50']
+        if ratio > 1 + threshold:
+            regressions.append({
+                'key': key,
+                'baseline_p50': base['p50'],
+                'current_p50': current['p50'],
+                'ratio': round(ratio, 3)
+            })
+    return regressions
+
+
+def check_budgets(results, budgets=BUDGETS):
+    """Returns results whose p95 exceeds an absolute budget (key, budget, p95)."""
+    violations = []
+    for key, budget in budgets.items():
+        current = results.get(key)
+        if current and current['p95'] > budget:
+            violations.append({'key': key, 'budget_ms': round(budget, 2), 'p95': current['p95']})
+    return violations
+
+
+def report(results, regressions, threshold, violations=(), missing=()):
+    return {
+        'meta': {
+            'timestamp': int(time.time()),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'threshold': threshold
+        },
+        'results': results,
+        'regressions': regressions,
+        'budget_violations': list(violations),
+        'unbaselined': list(missing)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MARQ engine scaling benchmarks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--targets', nargs='+', default=DEFAULT_TARGETS)
+    parser.add_argument('--runs', type=int, default=None, help='Samples per target (default scales with size)')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--frame-budget', type=float, default=FRAME_BUDGET_MS,
+                        help='Frame budget in ms for interactive targets (default 60 Hz)')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    print('Running engine benchmarks...', file=sys.stderr)
+    results = run_benchmarks(args.sizes, args.targets, args.runs, args.warmup)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report(results, [], args.threshold), f, indent=2, sort_keys=True)
+        print(f'Baseline written to {os.path.relpath(args.baseline, ROOT)}', file=sys.stderr)
+        return
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.threshold)
+    missing = unbaselined(results, baseline)
+    violations = check_budgets(results, {key: args.frame_budget for key in BUDGETS})
+    output = json.dumps(report(results, regressions, args.threshold, violations, missing), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+    for r in regressions:
+        print(f"REGRESSION: {r['key']} p50 {r['baseline_p50']}ms -> {r['current_p50']}ms (x{r['ratio']})", file=sys.stderr)
+    for v in violations:
+        print(f"OVER BUDGET: {v['key']} p95 {v['p95']}ms > {v['budget_ms']}ms frame", file=sys.stderr)
+    if missing:
+        # Unchecked, so say so rather than pass silently; not a failure, since a
+        # fresh checkout has no baseline until the reference setup records one
+        print(f"NO BASELINE: {', '.join(missing)} (not checked for regressions)", file=sys.stderr)
+        print(f'Record one on the reference setup with --update-baseline and commit '
+              f'{os.path.relpath(args.baseline, ROOT)}', file=sys.stderr)
+    sys.exit(1 if regressions or violations else 0)
+
+
+if __name__ == '__main__':
+    main()
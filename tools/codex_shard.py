@@ -0,0 +1,243 @@
+import argparse
+import io
+import json
+import os
+import random
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pngio  # noqa: E402
+import scroll_codec  # noqa: E402
+
+# Codex Shard Scanner / Forger
+# Batch counterpart of js/codex.worker.js. A shard is a PNG whose R, G and B
+# low bits (alpha skipped), read row-major and MSB first, carry:
+#
+#   b'MARQ' | version u8 | payload length u32 BE | JSON payload
+#
+# Scanning inflates only the rows the frame occupies: the 9-byte header needs
+# ceil(24 / width) rows, and its length field says how many more. Bits are
+# pulled out with one mask + np.packbits over the RGB planes rather than
+# per-bit loops. Pillow is used for decoding when installed; otherwise
+# pngio's stdlib zlib path stops inflating at the last needed row.
+#
+#   python3 tools/codex_shard.py scan shards/ --workers 8 --out decoded/
+#   python3 tools/codex_shard.py forge scroll.json shard.png [--carrier photo.png]
+#   python3 tools/codex_shard.py fixtures fixtures/ --count 500
+
+MAGIC = b'MARQ'
+VERSION = 1
+HEADER_SIZE = 9
+MAX_PAYLOAD = 5000000  # scanShard's limit
+MIN_SIDE = 200         # forgeShard's minimum generated carrier size
+
+
+class ShardError(ValueError):
+    pass
+
+
+def _rows_for(byte_count, width):
+    pixels = -(-(byte_count * 8) // 3)
+    return -(-pixels // width)
+
+
+def _lsb_bytes(pixels, byte_count):
+    """First byte_count bytes of the RGB LSB stream of an (h, w, c) array."""
+    rgb = pixels[..., :3].reshape(-1)
+    bits = rgb[:byte_count * 8] & 1
+    if len(bits) < byte_count * 8:
+        raise ShardError('Image too small for the declared payload')
+    return np.packbits(bits).tobytes()
+
+
+def _read_rows(data, rows):
+    if pngio.Image is not None:
+        with pngio.Image.open(io.BytesIO(data)) as img:
+            width = img.width
+            region = img.crop((0, 0, width, min(rows, img.height))).convert('RGB')
+            return np.asarray(region)
+    return pngio.decode(data, max_rows=rows)
+
+
+def scan_bytes(data):
+    """Decodes the JSON payload of a shard from PNG bytes."""
+    if data[:8] != pngio.PNG_SIGNATURE or data[12:16] != b'IHDR':
+        raise ShardError('Not a PNG file')
+    width = struct.unpack('>I', data[16:20])[0]
+
+    header = _lsb_bytes(_read_rows(data, _rows_for(HEADER_SIZE, width)), HEADER_SIZE)
+    if header[:4] != MAGIC:
+        raise ShardError('Invalid Codex Shard: Magic header mismatch.')
+    if header[4] != VERSION:
+        raise ShardError(f'Unsupported Codex version: {header[4]}')
+    length = struct.unpack('>I', header[5:9])[0]
+    if length <= 0 or length > MAX_PAYLOAD:
+        raise ShardError(f'Invalid data length: {length}')
+
+    total = HEADER_SIZE + length
+    frame = _lsb_bytes(_read_rows(data, _rows_for(total, width)), total)
+    try:
+        return json.loads(frame[HEADER_SIZE:].decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ShardError('Corrupted Shard: Invalid JSON payload.') from None
+
+
+def scan(path):
+    with open(path, 'rb') as f:
+        return scan_bytes(f.read())
+
+
+def camouflage(width, height, rng):
+    """Dark 4x4 block noise with a few faint lines, like _generateCamouflage."""
+    greys = np.array([0x1a, 0x22, 0x0f, 0x2a], dtype=np.uint8)
+    bw, bh = -(-width // 4), -(-height // 4)
+    cells = np.where(rng.random((bh, bw)) > 0.5, greys[rng.integers(0, 4, (bh, bw))], 0).astype(np.uint8)
+    grey = np.kron(cells, np.ones((4, 4), dtype=np.uint8))[:height, :width]
+    for _ in range(10):
+        y0, y1 = rng.uniform(0, height, 2)
+        xs = np.arange(width)
+        ys = np.clip(np.round(y0 + (y1 - y0) * xs / max(width - 1, 1)).astype(int), 0, height - 1)
+        grey[ys, xs] = 0x33
+    return np.dstack([grey, grey, grey, np.full_like(grey, 255)])
+
+
+def forge(data, carrier=None, seed=None):
+    """Embeds a JSON payload; returns an (h, w, 4) uint8 array ready for pngio.save."""
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    frame = MAGIC + struct.pack('>BI', VERSION, len(payload)) + payload
+    required = -(-(len(frame) * 8) // 3)
+
+    if carrier is None:
+        side = max(int(np.ceil(np.sqrt(required))) + 20, MIN_SIDE)
+        pixels = camouflage(side, side, np.random.default_rng(seed))
+    else:
+        pixels = np.array(carrier, dtype=np.uint8)
+        if pixels.shape[2] == 3:
+            pixels = np.dstack([pixels, np.full(pixels.shape[:2], 255, dtype=np.uint8)])
+        elif pixels.shape[2] != 4:
+            raise ShardError('Carrier must be RGB or RGBA')
+
+    height, width = pixels.shape[:2]
+    if width * height < required:
+        raise ShardError(f'Carrier image too small. Need {required} pixels, got {width * height}.')
+
+    bits = np.unpackbits(np.frombuffer(frame, dtype=np.uint8))
+    rgb = pixels[..., :3].reshape(-1)  # Copy: RGB planes of an RGBA array are not contiguous
+    rgb[:len(bits)] = (rgb[:len(bits)] & 0xFE) | bits
+    pixels[..., :3] = rgb.reshape(height, width, 3)
+    return pixels
+
+
+# --- Batch ---
+
+def _scan_task(args):
+    path, out_dir = args
+    try:
+        data = scan(path)
+    except Exception as e:
+        return {'file': path, 'ok': False, 'error': str(e)}
+
+    result = {'file': path, 'ok': True, 'threads': len(data) if isinstance(data, list) else None}
+    if out_dir:
+        result['output'] = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + '.json')
+        with open(result['output'], 'w') as f:
+            json.dump(data, f, indent=2)
+    return result
+
+
+def collect_pngs(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith('.png'))
+        else:
+            files.append(path)
+    return files
+
+
+def scan_many(paths, out_dir=None, workers=None):
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = [(path, out_dir) for path in collect_pngs(paths)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_scan_task, tasks, chunksize=16))
+
+
+def _fixture_task(args):
+    path, size, seed = args
+    threads = scroll_codec.synthetic_ledger(size, random.Random(seed))
+    pngio.save(path, forge(threads, seed=seed))
+    with open(path[:-4] + '.json', 'w') as f:
+        json.dump(threads, f)
+    return path
+
+
+def build_fixtures(out_dir, count, max_threads=50, seed=0, workers=None):
+    """Writes count shard PNGs (with their expected JSON alongside) into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    tasks = [
+        (os.path.join(out_dir, f'shard_{i:05d}.png'), rng.randint(1, max_threads), seed * 100003 + i)
+        for i in range(count)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_fixture_task, tasks, chunksize=8))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan and forge Codex steganographic shards.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    scan_cmd = sub.add_parser('scan', help='Decode PNG files and/or directories of PNGs')
+    scan_cmd.add_argument('paths', nargs='+')
+    scan_cmd.add_argument('--out', help='Write each decoded payload as JSON into this directory')
+    scan_cmd.add_argument('--workers', type=int, default=None)
+    scan_cmd.add_argument('--json', action='store_true', help='Emit results as JSON')
+
+    forge_cmd = sub.add_parser('forge', help='Embed a JSON payload into a shard PNG')
+    forge_cmd.add_argument('input')
+    forge_cmd.add_argument('output')
+    forge_cmd.add_argument('--carrier', help='PNG to hide the payload in (default: generated camouflage)')
+
+    fixtures = sub.add_parser('fixtures', help='Forge shards from synthetic hash-chained ledgers')
+    fixtures.add_argument('out')
+    fixtures.add_argument('--count', type=int, default=100)
+    fixtures.add_argument('--max-threads', type=int, default=50)
+    fixtures.add_argument('--seed', type=int, default=0)
+    fixtures.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'forge':
+            with open(args.input) as f:
+                data = json.load(f)
+            carrier = pngio.load(args.carrier) if args.carrier else None
+            pixels = forge(data, carrier)
+            pngio.save(args.output, pixels)
+            print(f'Wrote {args.output} ({pixels.shape[1]}x{pixels.shape[0]})')
+            return 0
+        if args.command == 'fixtures':
+            paths = build_fixtures(args.out, args.count, args.max_threads, args.seed, args.workers)
+            print(f'Wrote {len(paths)} shards to {args.out}')
+            return 0
+    except (OSError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+
+    results = scan_many(args.paths, args.out, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            detail = f"{r['threads']} threads" if r['ok'] and r['threads'] is not None else r.get('error', 'ok')
+            print(f"{'OK  ' if r['ok'] else 'FAIL'}: {r['file']} ({detail})")
+        print(f"{sum(r['ok'] for r in results)}/{len(results)} decoded")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,442 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Gemini Relay Hub + Load Generator
+# A stdlib-only asyncio WebSocket hub for js/gemini-transport.js: open the app
+# with ?relay=ws://HOST:PORT/ (same-origin or allowlisted, see README), run
+# `gemini relay`, and every binary frame a peer sends is fanned out unchanged
+# to all other connected peers. Frames are opaque to the hub (peers
+# drop messages addressed to someone else), so fan-out is one write of the same
+# pre-built WebSocket frame per client. Each client has a bounded outbound
+# queue drained by its own writer task; a peer that falls that far behind is
+# disconnected instead of stalling everyone else.
+#
+# The load generator connects dozens of simulated peers, has each send Gemini
+# frames (a HEARTBEAT plus a custom LOAD message stamped with its send time) at
+# a fixed rate, and reports the send-to-delivery latency of every fan-out copy.
+# Without --relay it measures against a hub started in the same process.
+#
+#   python3 tools/gemini_relay.py serve --port 8765
+#   python3 tools/gemini_relay.py load --peers 48 --rate 20 --duration 10
+#   python3 tools/gemini_relay.py load --relay ws://127.0.0.1:8765/ --json
+
+WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC11B85'
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_MESSAGE = 16 * 1024 * 1024  # Larger messages close the connection (1009)
+QUEUE_FRAMES = 1024             # Outbound frames buffered per client
+FRAME_MAGIC = 0x47              # js/gemini-transport.js FRAME_MAGIC / FRAME_VERSION
+FRAME_VERSION = 1
+HEARTBEAT_CODE = 3
+
+
+class RelayError(ValueError):
+    pass
+
+
+# --- WebSocket (RFC 6455) ---
+
+def ws_frame(opcode, payload, mask=False):
+    """One unfragmented frame. Clients must mask, servers must not."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, (0x80 if mask else 0) | n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, (0x80 if mask else 0) | 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, (0x80 if mask else 0) | 127, n)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _xor(payload, key)
+
+
+def _xor(payload, key):
+    n = len(payload)
+    if n == 0:
+        return b''
+    stream = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(n, 'big')
+
+
+async def read_message(reader, writer, max_size=MAX_MESSAGE, mask_replies=False):
+    """Next data message as (opcode, bytes), answering pings; None once closed."""
+    parts = []
+    size = 0
+    opcode = None
+    while True:
+        head = await reader.readexactly(2)
+        fin, op = head[0] & 0x80, head[0] & 0x0F
+        masked, n = head[1] & 0x80, head[1] & 0x7F
+        if n == 126:
+            n = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack('!Q', await reader.readexactly(8))[0]
+        if size + n > max_size:
+            writer.write(ws_frame(OP_CLOSE, struct.pack('!H', 1009), mask_replies))
+            return None
+        key = await reader.readexactly(4) if masked else None
+        payload = await reader.readexactly(n)
+        if key:
+            payload = _xor(payload, key)
+
+        if op == OP_CLOSE:
+            writer.write(ws_frame(OP_CLOSE, payload[:2], mask_replies))
+            return None
+        if op == OP_PING:
+            writer.write(ws_frame(OP_PONG, payload, mask_replies))
+            continue
+        if op == OP_PONG:
+            continue
+
+        if op != OP_CONT:
+            opcode = op
+        parts.append(payload)
+        size += n
+        if fin:
+            return opcode, b''.join(parts)
+
+
+async def _read_headers(reader):
+    data = await reader.readuntil(b'\r\n\r\n')
+    lines = data.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+def _accept_key(key):
+    return base64.b64encode(hashlib.sha1(key.encode('ascii') + WS_GUID).digest()).decode('ascii')
+
+
+async def ws_accept(reader, writer):
+    """Server side of the opening handshake."""
+    _, headers = await _read_headers(reader)
+    key = headers.get('sec-websocket-key')
+    if headers.get('upgrade', '').lower() != 'websocket' or not key:
+        writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+        raise RelayError('Not a WebSocket upgrade')
+    writer.write(
+        b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+        b'Sec-WebSocket-Accept: ' + _accept_key(key).encode('ascii') + b'\r\n\r\n'
+    )
+    await writer.drain()
+
+
+async def ws_connect(url):
+    """Client side: (reader, writer) of an open WebSocket."""
+    parts = urlsplit(url)
+    if parts.scheme != 'ws':
+        raise RelayError(f'Only ws:// URLs are supported: {url}')
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    writer.write(
+        (
+            f'GET {parts.path or "/"} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n'
+            f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'
+        ).encode('ascii')
+    )
+    status, headers = await _read_headers(reader)
+    if status.split(' ')[1:2] != ['101'] or headers.get('sec-websocket-accept') != _accept_key(key):
+        writer.close()
+        raise RelayError(f'Handshake rejected: {status}')
+    return reader, writer
+
+
+# --- Hub ---
+
+class Relay:
+    def __init__(self, queue_frames=QUEUE_FRAMES):
+        self.queue_frames = queue_frames
+        self.clients = {}  # writer -> outbound asyncio.Queue
+        self.stats = {'connected': 0, 'frames_in': 0, 'frames_out': 0, 'bytes_in': 0, 'dropped_clients': 0}
+
+    async def handle(self, reader, writer):
+        try:
+            await ws_accept(reader, writer)
+        except (RelayError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+
+        queue = asyncio.Queue(self.queue_frames)
+        self.clients[writer] = queue
+        self.stats['connected'] += 1
+        sender = asyncio.create_task(self._drain(writer, queue))
+        try:
+            while True:
+                message = await read_message(reader, writer)
+                if message is None:
+                    break
+                self._fan_out(writer, message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            sender.cancel()
+            writer.close()
+
+    def _fan_out(self, source, message):
+        opcode, payload = message
+        frame = ws_frame(opcode, payload)  # Built once, written to every peer
+        self.stats['frames_in'] += 1
+        self.stats['bytes_in'] += len(payload)
+        for writer, queue in list(self.clients.items()):
+            if writer is source:
+                continue
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Too slow to keep up: cut it loose rather than buffer without bound
+                self.clients.pop(writer, None)
+                self.stats['dropped_clients'] += 1
+                writer.close()
+                continue
+            self.stats['frames_out'] += 1
+
+    async def _drain(self, writer, queue):
+        try:
+            while True:
+                frames = [await queue.get()]
+                while not queue.empty():
+                    frames.append(queue.get_nowait())
+                writer.write(b''.join(frames))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def serve(host, port, stats_every=0):
+    relay = Relay()
+    server = await asyncio.start_server(relay.handle, host, port)
+    print(f'Gemini relay listening on ws://{host}:{port}/')
+    async with server:
+        while True:
+            await asyncio.sleep(stats_every or 3600)
+            if stats_every:
+                print(json.dumps({'clients': len(relay.clients), **relay.stats}))
+
+
+# --- Gemini frames (subset of js/gemini-transport.js) ---
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _string(value):
+    data = value.encode('utf-8')
+    return _varint(len(data)) + data
+
+
+def encode_frame(sender, messages):
+    """messages: (type, payload) pairs. HEARTBEAT is binary, anything else JSON."""
+    out = bytearray([FRAME_MAGIC, FRAME_VERSION])
+    out += _string(sender)
+    out += _varint(len(messages))
+    for type_, payload in messages:
+        if type_ == 'HEARTBEAT':
+            body = _varint(payload['ts']) + _string(payload['mode'])
+            out += bytes([HEARTBEAT_CODE]) + _varint(len(body)) + body
+        else:
+            body = _string(json.dumps(payload, separators=(',', ':')))
+            out += b'\x00' + _string(type_) + _varint(len(body)) + body
+    return bytes(out)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def decode_load_stamps(data):
+    """Sender and the LOAD message payloads carried by a frame."""
+    if len(data) < 2 or data[0] != FRAME_MAGIC or data[1] != FRAME_VERSION:
+        raise RelayError('Invalid Gemini frame')
+    length, pos = _read_varint(data, 2)
+    sender = data[pos:pos + length].decode('utf-8')
+    count, pos = _read_varint(data, pos + length)
+    stamps = []
+    for _ in range(count):
+        code = data[pos]
+        pos += 1
+        name = None
+        if code == 0:
+            length, pos = _read_varint(data, pos)
+            name = data[pos:pos + length].decode('utf-8')
+            pos += length
+        length, pos = _read_varint(data, pos)
+        if name == 'LOAD':
+            text_length, start = _read_varint(data, pos)
+            stamps.append(json.loads(data[start:start + text_length]))
+        pos += length
+    return sender, stamps
+
+
+# --- Load generator ---
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+async def _peer(url, name, rate, duration, pad, latencies, counts, ready, start):
+    reader, writer = await ws_connect(url)
+    ready.set_result(None)
+
+    async def receive():
+        try:
+            while True:
+                message = await read_message(reader, writer, mask_replies=True)
+                if message is None:
+                    return
+                now = time.perf_counter()
+                _, stamps = decode_load_stamps(message[1])
+                for stamp in stamps:
+                    latencies.append(now - stamp['t'])
+                counts['received'] += len(stamps)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    receiver = asyncio.create_task(receive())
+    await start.wait()
+    interval = 1 / rate
+    deadline = time.perf_counter() + duration
+    seq = 0
+    next_at = time.perf_counter()
+    while next_at < deadline:
+        frame = encode_frame(name, [
+            ('HEARTBEAT', {'ts': int(time.time() * 1000), 'mode': 'load'}),
+            ('LOAD', {'seq': seq, 't': time.perf_counter(), 'pad': 'x' * pad}),
+        ])
+        writer.write(ws_frame(OP_BINARY, frame, mask=True))
+        await writer.drain()
+        counts['sent'] += 1
+        seq += 1
+        next_at += interval
+        await asyncio.sleep(max(0, next_at - time.perf_counter()))
+    return writer, receiver
+
+
+async def run_load(url=None, peers=32, rate=20, duration=5.0, pad=64, settle=1.0):
+    """Connects peers, has each send rate frames/s for duration s, returns a report."""
+    server = None
+    if url is None:
+        relay = Relay()
+        server = await asyncio.start_server(relay.handle, '127.0.0.1', 0)
+        url = f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/'
+
+    latencies = []
+    counts = {'sent': 0, 'received': 0}
+    start = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    readies = [loop.create_future() for _ in range(peers)]
+    tasks = [
+        asyncio.create_task(_peer(url, f'load{i:03d}', rate, duration, pad, latencies, counts, readies[i], start))
+        for i in range(peers)
+    ]
+    await asyncio.gather(*readies)
+    await asyncio.sleep(0.1)  # Let the hub register every client before traffic starts
+    began = time.perf_counter()
+    start.set()
+    finished = await asyncio.gather(*tasks)
+    await asyncio.sleep(settle)  # Drain in-flight fan-out
+    elapsed = time.perf_counter() - began
+
+    for writer, receiver in finished:
+        receiver.cancel()
+        writer.close()
+    await asyncio.gather(*(writer.wait_closed() for writer, _ in finished), return_exceptions=True)
+    if server:
+        await asyncio.sleep(0.1)  # Hub handlers see EOF and exit
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    expected = counts['sent'] * (peers - 1)
+    ms = lambda v: None if v is None else round(v * 1000, 3)  # noqa: E731
+    return {
+        'relay': url,
+        'peers': peers,
+        'rate': rate,
+        'frames_sent': counts['sent'],
+        'deliveries': counts['received'],
+        'expected_deliveries': expected,
+        'delivery_ratio': round(counts['received'] / expected, 4) if expected else None,
+        'deliveries_per_sec': round(counts['received'] / elapsed, 1),
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gemini relay hub and fan-out load generator.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_cmd = sub.add_parser('serve', help='Run the WebSocket relay hub')
+    serve_cmd.add_argument('--host', default='127.0.0.1')
+    serve_cmd.add_argument('--port', type=int, default=8765)
+    serve_cmd.add_argument('--stats', type=float, default=0, help='Print counters every N seconds')
+
+    load_cmd = sub.add_parser('load', help='Simulate peers and measure fan-out latency')
+    load_cmd.add_argument('--relay', help='ws:// URL of a running hub (default: an in-process hub)')
+    load_cmd.add_argument('--peers', type=int, default=32)
+    load_cmd.add_argument('--rate', type=float, default=20, help='Frames per second per peer')
+    load_cmd.add_argument('--duration', type=float, default=5.0)
+    load_cmd.add_argument('--pad', type=int, default=64, help='Padding bytes per LOAD message')
+    load_cmd.add_argument('--json', action='store_true', help='Emit the report as JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'serve':
+            asyncio.run(serve(args.host, args.port, args.stats))
+            return 0
+        if args.peers < 2 or args.rate <= 0:
+            raise RelayError('Need at least 2 peers and a positive rate')
+        report = asyncio.run(run_load(args.relay, args.peers, args.rate, args.duration, args.pad))
+    except KeyboardInterrupt:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        lat = report['latency_ms']
+        print(f"{report['peers']} peers x {report['rate']:g} frames/s via {report['relay']}")
+        print(
+            f"  {report['deliveries']}/{report['expected_deliveries']} deliveries "
+            f"({report['deliveries_per_sec']:.0f}/s)"
+        )
+        print(f"  fan-out latency ms: p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    return 0 if report['delivery_ratio'] == 1 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchmark  # noqa: E402
+
+# Map Rendering FPS Benchmark
+# Drives a MapRenderer headless with a synthetic ledger and a swarm of moving
+# Vanguard units, letting its own requestAnimationFrame loop run. Each render()
+# is timed in-page. The "uncached" mode drops every offscreen layer before each
+# frame, which reproduces the old full-redraw path, so the report shows what
+# the layer cache gains.
+#
+#   python3 tools/map_fps.py                         # 10k threads, 50 units
+#   python3 tools/map_fps.py --threads 100000 --seconds 10
+
+FPS_HARNESS_JS = """
+async () => {
+    if (window.__mapBench) return;
+    const { MapRenderer } = await import('./js/cartographer.js');
+    const { locations } = await import('./js/data.js');
+
+    const canvas = document.createElement('canvas');
+    canvas.style.cssText = 'position:fixed;left:0;top:0;width:1280px;height:800px;z-index:99999';
+    document.body.appendChild(canvas);
+
+    window.__mapBench = {
+        run(threadCount, unitCount, seconds, cached) {
+            const threads = window.__bench.ledger(threadCount);
+            const units = Array.from({ length: unitCount }, (_, i) => ({
+                id: `B-${i}`,
+                type: i % 5 === 0 ? 'INTERCEPTOR' : 'SCOUT',
+                status: i % 7 === 0 ? 'SCANNING' : 'MOVING',
+                x: (i * 37) % 100,
+                y: (i * 53) % 100,
+                heading: 0,
+                scanPulse: 0
+            }));
+            const zones = [
+                { x: 75, y: 75, r: 20, level: 'HIGH' },
+                { x: 25, y: 55, r: 15, level: 'LOW' }
+            ];
+
+            const renderer = new MapRenderer(canvas);
+            const render = renderer.render.bind(renderer);
+            const samples = [];
+            let frames = 0;
+            let stop = false;
+
+            return new Promise((resolve) => {
+                // Wrap render() so the renderer's own RAF loop is what we measure
+                renderer.render = (...args) => {
+                    if (stop) return;
+                    frames++;
+                    units.forEach((u, i) => {
+                        u.heading += 0.05;
+                        u.x = (u.x + 0.2 + (i % 3) * 0.1) % 100;
+                        u.scanPulse = (u.scanPulse + 0.05) % 4;
+                    });
+                    if (!cached) renderer.invalidate();
+                    const t0 = performance.now();
+                    render(...args);
+                    samples.push(performance.now() - t0);
+                };
+
+                const start = performance.now();
+                renderer.render(threads, locations, [], zones, units);
+                setTimeout(() => {
+                    stop = true;
+                    const elapsed = (performance.now() - start) / 1000;
+                    canvas.remove();
+                    resolve({ samples, fps: frames / elapsed, redraws: renderer.layerRedraws });
+                }, seconds * 1000);
+            });
+        }
+    };
+}
+"""
+
+
+def run(thread_count, unit_count, seconds):
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    with benchmark._Server(), sync_playwright() as p:
+        browser, page = benchmark.open_app(p, FPS_HARNESS_JS)
+        try:
+            for mode in ('uncached', 'cached'):
+                print(f'  map.render[{mode}] {thread_count:,} threads, {unit_count} units, {seconds}s...', file=sys.stderr)
+                out = page.evaluate(
+                    '([t, u, s, c]) => window.__mapBench.run(t, u, s, c)',
+                    [thread_count, unit_count, seconds, mode == 'cached']
+                )
+                summary = benchmark.summarize(out['samples'])
+                summary['fps'] = round(out['fps'], 1)
+                summary['layer_redraws'] = out['redraws']
+                results[f'map.render.{mode}@{thread_count}'] = summary
+        finally:
+            browser.close()
+
+    cached = results[f'map.render.cached@{thread_count}']
+    uncached = results[f'map.render.uncached@{thread_count}']
+    if cached['p50'] > 0:
+        results['speedup_p50'] = round(uncached['p50'] / cached['p50'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MapRenderer frame-rate benchmark.')
+    parser.add_argument('--threads', type=int, default=10000)
+    parser.add_argument('--units', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    print('Running map FPS benchmark...', file=sys.stderr)
+    results = run(args.threads, args.units, args.seconds)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
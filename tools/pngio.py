@@ -0,0 +1,186 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Minimal PNG codec for the verification toolchain.
+# Decodes 8-bit non-interlaced PNGs (grey, RGB, palette, +alpha) into RGB/RGBA
+# NumPy arrays and writes RGB/RGBA arrays back out. Uses Pillow when it is installed since its
+# C unfilter is much faster; the stdlib zlib path keeps the tools dependency-light.
+
+try:
+    from PIL import Image
+except ImportError:  # Optional dependency
+    Image = None
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PNGError(ValueError):
+    pass
+
+
+def read_chunks(data):
+    if data[:8] != PNG_SIGNATURE:
+        raise PNGError('Not a PNG file')
+    pos = 8
+    while pos < len(data):
+        length, ctype = struct.unpack('>I4s', data[pos:pos + 8])
+        yield ctype, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if ctype == b'IEND':
+            break
+
+
+def read_header(path):
+    """Returns (width, height, bit_depth, color_type) without decoding pixels."""
+    with open(path, 'rb') as f:
+        head = f.read(33)
+    if head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+        raise PNGError(f'{path}: not a PNG file')
+    width, height, depth, ctype = struct.unpack('>IIBB', head[16:26])
+    return width, height, depth, ctype
+
+
+def _unfilter(raw, height, stride, bpp, max_rows=None):
+    rows = height if max_rows is None else min(height, max_rows)
+    out = np.zeros((rows, stride), dtype=np.uint8)
+    view = np.frombuffer(raw, dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.int32)
+
+    for y in range(rows):
+        start = y * (stride + 1)
+        ftype = view[start]
+        line = view[start + 1:start + 1 + stride].astype(np.int32)
+
+        if ftype == 0:
+            cur = line
+        elif ftype == 1:
+            # Sub: running sum per channel interleave
+            cur = line.reshape(-1, bpp).cumsum(axis=0).reshape(-1) & 0xff
+        elif ftype == 2:
+            cur = (line + prev) & 0xff
+        elif ftype == 3:
+            cur = line.copy()
+            for x in range(stride):
+                left = cur[x - bpp] if x >= bpp else 0
+                cur[x] = (cur[x] + ((left + prev[x]) >> 1)) & 0xff
+        elif ftype == 4:
+            cur = line.copy()
+            for x in range(stride):
+                a = cur[x - bpp] if x >= bpp else 0
+                b = prev[x]
+                c = prev[x - bpp] if x >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                pred = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                cur[x] = (cur[x] + pred) & 0xff
+        else:
+            raise PNGError(f'Unknown filter type {ftype}')
+
+        out[y] = cur
+        prev = cur
+    return out
+
+
+def decode(data, max_rows=None):
+    """Decodes PNG bytes into a (rows, width, 3|4) uint8 array.
+
+    Grey and grey+alpha images are expanded to RGB and RGBA, matching what
+    Pillow's convert() gives callers when it is installed. max_rows stops
+    inflating and unfiltering after that many rows, which lets callers read a
+    header region without touching the rest of the image.
+    """
+    header = None
+    palette = None
+    transparency = None
+    idat = []
+    for ctype, body in read_chunks(data):
+        if ctype == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif ctype == b'PLTE':
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif ctype == b'tRNS':
+            transparency = np.frombuffer(body, dtype=np.uint8)
+        elif ctype == b'IDAT':
+            idat.append(body)
+    if header is None:
+        raise PNGError('Missing IHDR')
+
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or interlace != 0 or color_type not in CHANNELS:
+        raise PNGError(f'Unsupported PNG (depth={depth}, color={color_type}, interlace={interlace})')
+
+    channels = CHANNELS[color_type]
+    stride = width * channels
+    rows = height if max_rows is None else min(height, max_rows)
+
+    inflater = zlib.decompressobj()
+    needed = rows * (stride + 1)
+    raw = bytearray()
+    for chunk in idat:
+        raw += inflater.decompress(chunk, needed - len(raw))
+        while inflater.unconsumed_tail and len(raw) < needed:
+            raw += inflater.decompress(inflater.unconsumed_tail, needed - len(raw))
+        if len(raw) >= needed:
+            break
+
+    pixels = _unfilter(bytes(raw), rows, stride, channels, max_rows).reshape(rows, width, channels)
+
+    if color_type == 3:
+        if palette is None:
+            raise PNGError('Palette image without PLTE')
+        rgb = palette[pixels[..., 0]]
+        if transparency is not None:
+            alpha = np.full(len(palette), 255, dtype=np.uint8)
+            alpha[:len(transparency)] = transparency
+            return np.dstack([rgb, alpha[pixels[..., 0]]])
+        return rgb
+    if color_type == 0:
+        return np.repeat(pixels, 3, axis=2)
+    if color_type == 4:
+        return np.dstack([np.repeat(pixels[..., :1], 3, axis=2), pixels[..., 1:]])
+    return pixels
+
+
+def load(path, max_rows=None):
+    if Image is not None and max_rows is None:
+        with Image.open(path) as img:
+            mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB'
+            return np.asarray(img.convert(mode))
+    with open(path, 'rb') as f:
+        return decode(f.read(), max_rows)
+
+
+def _chunk(ctype, body):
+    crc = zlib.crc32(ctype + body) & 0xffffffff
+    return struct.pack('>I', len(body)) + ctype + body + struct.pack('>I', crc)
+
+
+def encode(pixels, level=6):
+    """Encodes an (h, w, 3|4) uint8 array as PNG bytes (filter type 0)."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    if pixels.ndim != 3 or pixels.shape[2] not in (3, 4):
+        raise PNGError('Expected an (h, w, 3|4) array')
+    height, width, channels = pixels.shape
+    color_type = 6 if channels == 4 else 2
+
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, -1)
+
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + _chunk(b'IHDR', ihdr)
+        + _chunk(b'IDAT', zlib.compress(rows.tobytes(), level))
+        + _chunk(b'IEND', b'')
+    )
+
+
+def save(path, pixels):
+    if Image is not None:
+        Image.fromarray(np.ascontiguousarray(pixels, dtype=np.uint8)).save(path)
+        return
+    with open(path, 'wb') as f:
+        f.write(encode(pixels))
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchmark  # noqa: E402
+
+# Encrypted Save Latency Benchmark
+# Times CryptoGuard.encrypt() on synthetic ledgers of increasing size, the
+# work an encrypted save does before hitting storage:
+#
+#   legacy   fresh PBKDF2 derivation on every save (the old behaviour)
+#   session  cached session key, AES-GCM on the main thread
+#   worker   cached session key, serialization + AES-GCM in crypto.worker.js
+#
+# Alongside latency it reports the longest main-thread stall seen by a
+# timer heartbeat during the saves, which is what the worker mode buys.
+#
+#   python3 tools/save_latency.py
+#   python3 tools/save_latency.py --sizes 1000 100000 --runs 10
+
+MODES = ['legacy', 'session', 'worker']
+
+SAVE_HARNESS_JS = """
+async () => {
+    if (window.__saveBench) return;
+    const { CryptoGuard } = await import('./js/crypto-guard.js');
+
+    // Longest gap between timer ticks while fn runs
+    const withHeartbeat = async (fn) => {
+        let last = performance.now();
+        let stall = 0;
+        let running = true;
+        const tick = () => {
+            const now = performance.now();
+            stall = Math.max(stall, now - last);
+            last = now;
+            if (running) setTimeout(tick, 0);
+        };
+        setTimeout(tick, 0);
+        const t0 = performance.now();
+        await fn();
+        const elapsed = performance.now() - t0;
+        running = false;
+        stall = Math.max(stall, performance.now() - last);
+        return { elapsed, stall };
+    };
+
+    window.__saveBench = {
+        async run(mode, size, runs) {
+            const threads = window.__bench.ledger(size);
+            const guard = new CryptoGuard(
+                mode === 'worker' ? { workerThreshold: 1 } : { worker: false }
+            );
+            if (mode !== 'legacy') {
+                guard.setSessionPassword('benchmark');
+                await guard.encrypt(threads.slice(0, 1), 'benchmark'); // Derive once, spin up the worker
+            }
+            const password = mode === 'legacy' ? 'one-off' : 'benchmark';
+
+            const samples = [];
+            const stalls = [];
+            for (let i = 0; i < runs; i++) {
+                const { elapsed, stall } = await withHeartbeat(() => guard.encrypt(threads, password));
+                samples.push(elapsed);
+                stalls.push(stall);
+            }
+            if (guard.worker) guard.worker.terminate();
+            return { samples, stalls, derivations: guard.derivations };
+        }
+    };
+}
+"""
+
+
+def run(sizes, runs):
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    with benchmark._Server(), sync_playwright() as p:
+        browser, page = benchmark.open_app(p, SAVE_HARNESS_JS)
+        try:
+            for size in sizes:
+                for mode in MODES:
+                    print(f'  save.{mode} @ {size:,} threads x{runs}...', file=sys.stderr)
+                    out = page.evaluate(
+                        '([mode, size, runs]) => window.__saveBench.run(mode, size, runs)',
+                        [mode, size, runs]
+                    )
+                    summary = benchmark.summarize(out['samples'])
+                    summary['max_stall_ms'] = round(max(out['stalls']), 2)
+                    summary['derivations'] = out['derivations']
+                    results[f'save.{mode}@{size}'] = summary
+        finally:
+            browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Encrypted save latency vs ledger size.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    print('Running save latency benchmark...', file=sys.stderr)
+    results = run(args.sizes, args.runs)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
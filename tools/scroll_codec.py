@@ -0,0 +1,339 @@
+import argparse
+import hashlib
+import json
+import math
+import struct
+import sys
+import zlib
+
+# Binary Scroll Codec (MQSC v1)
+# Python reader/writer for the compact scroll format in js/scroll-codec.js, for
+# archiving, converting and checking exported ledgers outside the browser.
+#
+#   header  b'MQSC' | version u8 | flags u8 (bit 0: body is a zlib stream)
+#   body    count | strings: n, (len, utf8)* | thread*
+#   thread  tflags u8 | intention | time | region   (string table indices)
+#           timestamp   zigzag delta from the previous thread, or f64 LE
+#           title       len, utf8
+#           id          prefix length of the hash, or len, utf8
+#           hash        32 bytes
+#
+# Integers are unsigned LEB128 varints unless noted.
+#
+#   python3 tools/scroll_codec.py scroll.json scroll.mqs      # JSON -> binary
+#   python3 tools/scroll_codec.py scroll.mqs scroll.json      # binary -> JSON
+#   python3 tools/scroll_codec.py scroll.mqs --verify         # check the hash chain
+
+MAGIC = b'MQSC'
+VERSION = 1
+FLAG_ZLIB = 1
+
+T_ID_PREFIX = 1
+T_FLOAT_TIME = 2
+T_LINKED = 4
+
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+MAX_DELTA = 2 ** 51
+GENESIS_HASH = 'GENESIS_HASH'
+
+
+class ScrollError(ValueError):
+    pass
+
+
+def _varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _string(out, value):
+    raw = value.encode('utf-8')
+    _varint(out, len(raw))
+    out += raw
+
+
+def _safe_int(value):
+    """Returns value as an int if JS would treat it as a safe integer, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if abs(value) <= MAX_SAFE_INTEGER else None
+    if isinstance(value, float) and value.is_integer() and abs(value) <= MAX_SAFE_INTEGER:
+        return int(value)
+    return None
+
+
+def is_binary(data):
+    return data[:4] == MAGIC
+
+
+def encode(threads, compress=True, level=9):
+    """Encodes a list of thread dicts as binary scroll bytes."""
+    strings = {}
+    for thread in threads:
+        for key in ('intention', 'time', 'region'):
+            strings.setdefault(thread[key], len(strings))
+
+    body = bytearray()
+    _varint(body, len(threads))
+    _varint(body, len(strings))
+    for value in strings:
+        _string(body, value)
+
+    previous_hash = GENESIS_HASH
+    previous_time = 0
+    for i, thread in enumerate(threads):
+        digest = thread['hash']
+        if not isinstance(digest, str) or len(digest) != 64 or digest != digest.lower():
+            raise ScrollError(f'Binary scrolls need lowercase hex hashes (thread {i})')
+        try:
+            raw_hash = bytes.fromhex(digest)
+        except ValueError:
+            raise ScrollError(f'Binary scrolls need lowercase hex hashes (thread {i})') from None
+
+        has_link = 'previousHash' in thread
+        if has_link and thread['previousHash'] != previous_hash:
+            raise ScrollError(f'Broken chain link at thread {i}')
+
+        ts = thread['timestamp']
+        ts_int = _safe_int(ts)
+        int_time = ts_int is not None and previous_time is not None and abs(ts_int - previous_time) <= MAX_DELTA
+        id_prefix = len(thread['id']) <= 64 and digest.startswith(thread['id'])
+
+        body.append(
+            (T_ID_PREFIX if id_prefix else 0) | (0 if int_time else T_FLOAT_TIME) | (T_LINKED if has_link else 0)
+        )
+        _varint(body, strings[thread['intention']])
+        _varint(body, strings[thread['time']])
+        _varint(body, strings[thread['region']])
+        if int_time:
+            delta = ts_int - previous_time
+            _varint(body, delta * 2 if delta >= 0 else -delta * 2 - 1)
+        else:
+            body += struct.pack('<d', ts)
+        _string(body, thread['title'])
+        if id_prefix:
+            _varint(body, len(thread['id']))
+        else:
+            _string(body, thread['id'])
+        body += raw_hash
+
+        previous_hash = digest
+        previous_time = ts_int
+
+    payload = zlib.compress(bytes(body), level) if compress else bytes(body)
+    return MAGIC + bytes([VERSION, FLAG_ZLIB if compress else 0]) + payload
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _take(self, n):
+        if self.pos + n > len(self.data):
+            raise ScrollError('Truncated scroll')
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def u8(self):
+        return self._take(1)[0]
+
+    def varint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.u8()
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+            if shift > 56:
+                raise ScrollError('Varint overflow')
+
+    def string(self):
+        try:
+            return self._take(self.varint()).decode('utf-8')
+        except UnicodeDecodeError:
+            raise ScrollError('Invalid UTF-8 in scroll') from None
+
+
+def decode(data):
+    """Decodes binary scroll bytes into a list of thread dicts."""
+    if not is_binary(data):
+        raise ScrollError('Not a binary scroll')
+    if len(data) < 6:
+        raise ScrollError('Truncated scroll')
+    if data[4] != VERSION:
+        raise ScrollError(f'Unsupported scroll version {data[4]}')
+
+    body = data[6:]
+    if data[5] & FLAG_ZLIB:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            raise ScrollError('Corrupt zlib frame') from None
+
+    reader = _Reader(body)
+    count = reader.varint()
+    strings = [reader.string() for _ in range(reader.varint())]
+
+    def lookup(index):
+        if index >= len(strings):
+            raise ScrollError('Bad string index')
+        return strings[index]
+
+    threads = []
+    previous_hash = GENESIS_HASH
+    previous_time = 0
+    for _ in range(count):
+        flags = reader.u8()
+        intention = lookup(reader.varint())
+        time = lookup(reader.varint())
+        region = lookup(reader.varint())
+        if flags & T_FLOAT_TIME:
+            timestamp = struct.unpack('<d', reader._take(8))[0]
+            # JS numbers have no int/float split; keep whole values as ints
+            if _safe_int(timestamp) is not None:
+                timestamp = int(timestamp)
+        else:
+            zig = reader.varint()
+            timestamp = previous_time + (zig // 2 if zig % 2 == 0 else -(zig + 1) // 2)
+        title = reader.string()
+        id_length = reader.varint() if flags & T_ID_PREFIX else None
+        explicit_id = reader.string() if id_length is None else None
+        digest = reader._take(32).hex()
+
+        thread = {
+            'id': digest[:id_length] if explicit_id is None else explicit_id,
+            'intention': intention,
+            'time': time,
+            'region': region,
+            'title': title,
+            'timestamp': timestamp,
+        }
+        if flags & T_LINKED:
+            thread['previousHash'] = previous_hash
+        thread['hash'] = digest
+        threads.append(thread)
+
+        previous_hash = digest
+        previous_time = timestamp
+    if reader.pos != len(body):
+        raise ScrollError('Trailing data in scroll')
+    return threads
+
+
+def _js_number(value):
+    """Formats a timestamp the way JSON.stringify does."""
+    as_int = _safe_int(value)
+    if as_int is not None:
+        return str(as_int)
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'null'
+    return json.dumps(value)
+
+
+def link_payload(thread, previous_hash):
+    """Mirrors linkPayload() in js/ledger-chain.js."""
+    parts = [
+        '"intention":' + json.dumps(thread['intention'], ensure_ascii=False),
+        '"time":' + json.dumps(thread['time'], ensure_ascii=False),
+        '"region":' + json.dumps(thread['region'], ensure_ascii=False),
+        '"title":' + json.dumps(thread['title'], ensure_ascii=False),
+        '"timestamp":' + _js_number(thread['timestamp']),
+        '"previousHash":' + json.dumps(previous_hash, ensure_ascii=False),
+    ]
+    return '{' + ','.join(parts) + '}'
+
+
+def verify_chain(threads):
+    """Returns the index of the first broken link, or None if the chain holds."""
+    previous_hash = GENESIS_HASH
+    for i, thread in enumerate(threads):
+        digest = hashlib.sha256(link_payload(thread, previous_hash).encode('utf-8')).hexdigest()
+        if digest != thread['hash']:
+            return i
+        previous_hash = thread['hash']
+    return None
+
+
+INTENTIONS = ['serenity', 'vibrancy', 'awe', 'legacy']
+TIMES = ['dawn', 'midday', 'dusk', 'night']
+REGIONS = ['sahara', 'kyoto', 'patagonia', 'iceland', 'amazon']
+
+
+def synthetic_ledger(size, rng):
+    """A correctly hash-chained synthetic ledger for test fixtures (rng: random.Random)."""
+    threads = []
+    previous_hash = GENESIS_HASH
+    timestamp = 1700000000000 + rng.randrange(10 ** 9)
+    for i in range(size):
+        timestamp += rng.randrange(1000, 10 ** 7)
+        thread = {
+            'intention': rng.choice(INTENTIONS),
+            'time': rng.choice(TIMES),
+            'region': rng.choice(REGIONS),
+            'title': f'Thread {i}',
+            'timestamp': timestamp,
+        }
+        digest = hashlib.sha256(link_payload(thread, previous_hash).encode('utf-8')).hexdigest()
+        threads.append({'id': digest[:12], **thread, 'previousHash': previous_hash, 'hash': digest})
+        previous_hash = digest
+    return threads
+
+
+def load(path):
+    """Reads a scroll file in either format."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if is_binary(data):
+        return decode(data)
+    threads = json.loads(data.decode('utf-8'))
+    if not isinstance(threads, list):
+        raise ScrollError(f'{path}: root must be an array')
+    return threads
+
+
+def save(path, threads, compress=True):
+    """Writes binary for .mqs paths and pretty JSON (as exportScroll does) otherwise."""
+    if path.endswith('.mqs'):
+        data = encode(threads, compress=compress)
+    else:
+        data = json.dumps(threads, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert and check MARQ scrolls (JSON <-> MQSC binary).')
+    parser.add_argument('input')
+    parser.add_argument('output', nargs='?', help='.mqs for binary, anything else for JSON')
+    parser.add_argument('--raw', action='store_true', help='skip the zlib frame when writing binary')
+    parser.add_argument('--verify', action='store_true', help='re-hash the chain')
+    args = parser.parse_args()
+
+    try:
+        threads = load(args.input)
+        print(f'{args.input}: {len(threads)} threads')
+        if args.verify:
+            broken = verify_chain(threads)
+            if broken is not None:
+                print(f'Integrity check failed at thread {broken}')
+                return 1
+            print('Chain verified')
+        if args.output:
+            size = save(args.output, threads, compress=not args.raw)
+            print(f'Wrote {args.output} ({size} bytes)')
+    except (OSError, ScrollError, ValueError, KeyError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
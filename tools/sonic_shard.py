@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scroll_codec  # noqa: E402
+
+# Sonic Shard Codec
+# Offline encoder/decoder for the SPCT FSK framing used by js/spectra.js
+# (forgeSignal / scanSignal), for bulk ingest of archived broadcasts and for
+# generating test corpora without a browser.
+#
+#   frame   b'SPCT' | version u8 | payload length u32 BE | JSON payload
+#   tones   mark (1) 18 kHz, space (0) 16 kHz, MSB first, BAUD_RATE bits/s
+#
+# Decoding correlates the whole recording against both tones at once: prefix
+# sums of the quadrature products give the correlation of any bit window in
+# O(1), so every bit at every trial phase is a vectorized lookup. The SPCT
+# header is searched on several bit phases and the centre of the matching
+# phases is used to read the frame.
+#
+#   python3 tools/sonic_shard.py decode signals/ --workers 8 --out decoded/
+#   python3 tools/sonic_shard.py encode scroll.json shard.wav
+#   python3 tools/sonic_shard.py corpus corpus/ --count 200
+
+SAMPLE_RATE = 44100
+BAUD_RATE = 200        # SpectraEngine.BAUD_RATE (files)
+LIVE_BAUD_RATE = 40    # SpectraEngine.LIVE_BAUD_RATE (air-gap broadcasts)
+MARK_FREQ = 18000
+SPACE_FREQ = 16000
+VERSION = 1
+HEADER = b'SPCT'
+MAX_PAYLOAD = 50000
+MIN_DURATION = 10      # forgeSignal pads shards to at least 10 s
+PHASES = 8             # Trial bit phases per bit period
+
+HEADER_BITS = np.unpackbits(np.frombuffer(HEADER, dtype=np.uint8))
+
+
+class ShardError(ValueError):
+    pass
+
+
+# --- Framing ---
+
+def frame(data):
+    """SPCT frame bytes for a JSON-serializable payload (JSON.stringify layout)."""
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(payload) > MAX_PAYLOAD:
+        raise ShardError(f'Payload too large ({len(payload)} bytes, limit {MAX_PAYLOAD})')
+    return HEADER + struct.pack('>BI', VERSION, len(payload)) + payload
+
+
+def encode(data, sample_rate=SAMPLE_RATE, baud_rate=BAUD_RATE, drone=True, seed=None):
+    """Renders a payload as float32 PCM the way forgeSignal does.
+
+    Frequency steps are phase-continuous, like an OscillatorNode's
+    setValueAtTime. The optional drone (110/165 Hz plus low-passed noise) is
+    kept below clipping.
+    """
+    bits = np.unpackbits(np.frombuffer(frame(data), dtype=np.uint8))
+    duration = max(int(np.ceil(len(bits) / baud_rate)), MIN_DURATION)
+    n = duration * sample_rate
+
+    bit_index = np.floor(np.arange(n) * baud_rate / sample_rate).astype(np.int64)
+    freq = np.full(n, float(SPACE_FREQ))
+    active = bit_index < len(bits)
+    freq[active] = np.where(bits[bit_index[active]] == 1, MARK_FREQ, SPACE_FREQ)
+    phase = np.cumsum(2 * np.pi * freq / sample_rate)
+
+    # Carrier gain 0.05, cut 0.1 s after the last bit
+    envelope = np.zeros(n)
+    envelope[: int(np.ceil(len(bits) * sample_rate / baud_rate + 0.1 * sample_rate))] = 0.05
+    signal = envelope * np.sin(phase)
+
+    if drone:
+        t = np.arange(n) / sample_rate
+        rng = np.random.default_rng(seed)
+        noise = rng.uniform(-1, 1, n)
+        kernel = np.ones(64) / 64  # ~200 Hz moving-average low-pass
+        noise = np.convolve(noise, kernel, mode='same')
+        bed = 0.2 * (np.sin(2 * np.pi * 110 * t) + np.sin(2 * np.pi * 165 * t)) + 0.5 * noise
+        fade = np.clip(duration - t, 0, 1)  # Last second fades out
+        signal += bed * fade
+
+    return np.clip(signal, -1, 1).astype(np.float32)
+
+
+# --- WAV I/O ---
+
+def write_wav(path, pcm, sample_rate=SAMPLE_RATE):
+    """16-bit mono PCM, the layout _bufferToWav produces."""
+    samples = np.clip(pcm, -1, 1)
+    ints = np.where(samples < 0, samples * 32768, samples * 32767).astype('<i2')
+    data = ints.tobytes()
+    header = b'RIFF' + struct.pack('<I', 36 + len(data)) + b'WAVE'
+    fmt = struct.pack('<HHIIHH', 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    with open(path, 'wb') as f:
+        f.write(header + b'fmt ' + struct.pack('<I', 16) + fmt + b'data' + struct.pack('<I', len(data)) + data)
+
+
+def read_wav(path):
+    """Returns (first channel as float64 in [-1, 1], sample_rate).
+
+    Handles 8/16/24/32-bit integer PCM and 32/64-bit float, plain or
+    WAVE_FORMAT_EXTENSIBLE.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw[:4] != b'RIFF' or raw[8:12] != b'WAVE':
+        raise ShardError('Not a WAV file')
+
+    fmt = None
+    data = None
+    pos = 12
+    while pos + 8 <= len(raw):
+        cid, size = struct.unpack('<4sI', raw[pos:pos + 8])
+        body = raw[pos + 8:pos + 8 + size]
+        if cid == b'fmt ':
+            fmt = body
+        elif cid == b'data':
+            data = body
+        pos += 8 + size + (size & 1)
+    if fmt is None or data is None:
+        raise ShardError('WAV missing fmt or data chunk')
+
+    tag, channels, rate, _, align, depth = struct.unpack('<HHIIHH', fmt[:16])
+    if tag == 0xFFFE and len(fmt) >= 26:
+        tag = struct.unpack('<H', fmt[24:26])[0]  # Sub-format GUID starts with the real tag
+
+    usable = len(data) - len(data) % align
+    if tag == 3 and depth in (32, 64):
+        samples = np.frombuffer(data[:usable], dtype=f'<f{depth // 8}').astype(np.float64)
+    elif tag == 1 and depth == 8:
+        samples = (np.frombuffer(data[:usable], dtype=np.uint8).astype(np.float64) - 128) / 128
+    elif tag == 1 and depth in (16, 32):
+        samples = np.frombuffer(data[:usable], dtype=f'<i{depth // 8}') / float(2 ** (depth - 1))
+    elif tag == 1 and depth == 24:
+        b = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(ints >= 1 << 23, ints - (1 << 24), ints) / float(1 << 23)
+    else:
+        raise ShardError(f'Unsupported WAV encoding (format {tag}, {depth}-bit)')
+    return samples[::channels], rate
+
+
+# --- Demodulation ---
+
+def _prefix(pcm, freq, sample_rate):
+    n = np.arange(len(pcm))
+    products = pcm * np.exp(-2j * np.pi * freq * n / sample_rate)
+    out = np.zeros(len(pcm) + 1, dtype=np.complex128)
+    np.cumsum(products, out=out[1:])
+    return out
+
+
+def _bits_at(mark, space, starts, width):
+    """Bit decisions for windows [start, start + width) from the prefix sums."""
+    m = np.abs(mark[starts + width] - mark[starts])
+    s = np.abs(space[starts + width] - space[starts])
+    return (m > s).astype(np.uint8)
+
+
+def _header_hits(bits):
+    """Bit indices where the SPCT header starts in a bit stream."""
+    if len(bits) < 32:
+        return np.empty(0, dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(bits, 32)
+    return np.flatnonzero((windows == HEADER_BITS).all(axis=1))
+
+
+def _read_frame(bits):
+    """Parses a frame from bits starting at the header; None if it does not hold."""
+    if len(bits) < 72:
+        return None
+    head = np.packbits(bits[:72]).tobytes()
+    version, length = struct.unpack('>BI', head[4:9])
+    if version != VERSION or length == 0 or length > MAX_PAYLOAD:
+        return None
+    total = (9 + length) * 8
+    if len(bits) < total:
+        return None
+    payload = np.packbits(bits[72:total]).tobytes()
+    try:
+        return json.loads(payload.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
+
+def decode(pcm, sample_rate=SAMPLE_RATE, baud_rate=BAUD_RATE, phases=PHASES):
+    """Decodes the first SPCT frame in a recording, or returns None."""
+    pcm = np.asarray(pcm, dtype=np.float64)
+    spb = sample_rate / baud_rate
+    width = int(spb)
+    if len(pcm) <= width:
+        return None
+
+    mark = _prefix(pcm, MARK_FREQ, sample_rate)
+    space = _prefix(pcm, SPACE_FREQ, sample_rate)
+
+    # One bit stream per trial phase; a float bit clock avoids drift
+    streams = []
+    hits = []
+    for p in range(phases):
+        offset = p * spb / phases
+        count = int((len(pcm) - width - offset) // spb) + 1
+        starts = np.floor(offset + np.arange(count) * spb).astype(np.int64)
+        bits = _bits_at(mark, space, starts, width)
+        streams.append(bits)
+        for index in _header_hits(bits):
+            hits.append((offset + index * spb, p, int(index)))
+    hits.sort()
+
+    tried = set()
+    for position, _, _ in hits:
+        # Phases that see this header within one bit period: read at their centre
+        group = [h for h in hits if position <= h[0] < position + spb]
+        _, phase, index = group[(len(group) - 1) // 2]
+        if (phase, index) in tried:
+            continue
+        tried.add((phase, index))
+        data = _read_frame(streams[phase][index:])
+        if data is not None:
+            return data
+    return None
+
+
+def decode_file(path, baud_rate=BAUD_RATE):
+    pcm, rate = read_wav(path)
+    return decode(pcm, rate, baud_rate)
+
+
+# --- Batch ---
+
+def _decode_task(args):
+    path, baud_rate, out_dir = args
+    try:
+        data = decode_file(path, baud_rate)
+    except Exception as e:
+        return {'file': path, 'ok': False, 'error': str(e)}
+    if data is None:
+        return {'file': path, 'ok': False, 'error': 'No SPCT frame found'}
+
+    result = {'file': path, 'ok': True, 'threads': len(data) if isinstance(data, list) else None}
+    if out_dir:
+        name = os.path.splitext(os.path.basename(path))[0] + '.json'
+        result['output'] = os.path.join(out_dir, name)
+        with open(result['output'], 'w') as f:
+            json.dump(data, f, indent=2)
+    return result
+
+
+def collect_wavs(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith('.wav')
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def decode_many(paths, baud_rate=BAUD_RATE, out_dir=None, workers=None):
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = [(path, baud_rate, out_dir) for path in collect_wavs(paths)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_decode_task, tasks, chunksize=4))
+
+
+# --- Corpus ---
+
+def _corpus_task(args):
+    path, size, seed, baud_rate = args
+    rng = random.Random(seed)
+    threads = scroll_codec.synthetic_ledger(size, rng)
+    write_wav(path, encode(threads, baud_rate=baud_rate, seed=seed))
+    with open(path[:-4] + '.json', 'w') as f:
+        json.dump(threads, f)
+    return path
+
+
+def build_corpus(out_dir, count, max_threads=8, seed=0, baud_rate=BAUD_RATE, workers=None):
+    """Writes count shard WAVs (with their expected JSON alongside) into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    tasks = [
+        (os.path.join(out_dir, f'shard_{i:05d}.wav'), rng.randint(1, max_threads), seed * 100003 + i, baud_rate)
+        for i in range(count)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_corpus_task, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Encode and decode SPCT Sonic Shards offline.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    dec = sub.add_parser('decode', help='Decode WAV files and/or directories of WAVs')
+    dec.add_argument('paths', nargs='+')
+    dec.add_argument('--out', help='Write each decoded payload as JSON into this directory')
+    dec.add_argument('--workers', type=int, default=None)
+    dec.add_argument('--json', action='store_true', help='Emit results as JSON')
+
+    enc = sub.add_parser('encode', help='Render a JSON payload as a shard WAV')
+    enc.add_argument('input')
+    enc.add_argument('output')
+    enc.add_argument('--no-drone', action='store_true')
+
+    corpus = sub.add_parser('corpus', help='Generate shard WAVs from synthetic hash-chained ledgers')
+    corpus.add_argument('out')
+    corpus.add_argument('--count', type=int, default=100)
+    corpus.add_argument('--max-threads', type=int, default=8)
+    corpus.add_argument('--seed', type=int, default=0)
+    corpus.add_argument('--workers', type=int, default=None)
+
+    for p in (dec, enc, corpus):
+        p.add_argument('--baud', type=int, default=BAUD_RATE, help=f'Bit rate (live broadcasts use {LIVE_BAUD_RATE})')
+    args = parser.parse_args()
+
+    if args.command == 'encode':
+        with open(args.input) as f:
+            data = json.load(f)
+        pcm = encode(data, baud_rate=args.baud, drone=not args.no_drone)
+        write_wav(args.output, pcm)
+        print(f'Wrote {args.output} ({len(pcm) / SAMPLE_RATE:.1f}s)')
+        return 0
+
+    if args.command == 'corpus':
+        paths = build_corpus(args.out, args.count, args.max_threads, args.seed, args.baud, args.workers)
+        print(f'Wrote {len(paths)} shards to {args.out}')
+        return 0
+
+    results = decode_many(args.paths, args.baud, args.out, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            detail = f"{r['threads']} threads" if r['ok'] and r['threads'] is not None else r.get('error', 'ok')
+            print(f"{'OK  ' if r['ok'] else 'FAIL'}: {r['file']} ({detail})")
+        print(f"{sum(r['ok'] for r in results)}/{len(results)} decoded")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
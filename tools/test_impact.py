@@ -0,0 +1,535 @@
+import argparse
+import functools
+import http.server
+import json
+import os
+import re
+import runpy
+import socketserver
+import subprocess
+import sys
+import threading
+
+# Test-Impact Selection
+# Maps every verifier (node unit suites + Playwright scripts) to the JS modules
+# it exercises, then picks only the verifiers touched by a git diff. Playwright
+# scripts load the whole app, so they are narrowed by a recorded coverage map
+# when one exists, else by the engines behind the window handles, element ids
+# and terminal commands the script uses.
+#
+#   python3 tools/test_impact.py graph              # dump the dependency map
+#   python3 tools/test_impact.py record             # refresh the coverage map
+#   python3 tools/test_impact.py select --base main # list affected verifiers
+#   python3 tools/test_impact.py run --base main    # run affected verifiers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JS_DIR = 'js'
+VERIFIER_DIRS = ['.', 'tests', 'verification']
+IMPACT_MAP = os.path.join('tests', 'impact_map.json')
+APP_MODULE = 'js/app.js'
+
+# Modules every screen depends on. Touching one of these invalidates the whole map.
+SHARED_MODULES = {
+    'js/app.js',
+    'js/data.js',
+    'js/ui-system.js',
+    'js/error-guard.js',
+    'index.html',
+    'sw.js',
+    'css/styles.css',
+    'css/terminal.css'
+}
+
+# Modules every page-driven script exercises just by loading the app and
+# clicking through it: the thread ledger and the interaction sounds.
+PAGE_MODULES = {'js/tapestry.js', 'js/audio-engine.js'}
+
+# Controls app.js owns itself, mapped to the engines behind them. An empty set
+# marks app chrome (splash, guide, modals) that reaches only PAGE_MODULES.
+APP_ANCHORS = {
+    '#splash-screen': set(),
+    '#astrolabe-screen': set(),
+    '#ring-intention': set(),
+    '#help-trigger': set(),
+    '#ghost-guide-overlay': set(),
+    '#guide-next-btn': set(),
+    '#guide-skip-btn': set(),
+    '#loading-overlay': set(),
+    '#confirm-modal': set(),
+    '#notification-container': set(),
+    '#terminal-input': set(),
+    '#tapestry-icon': set(),
+    '#tapestry-screen': set(),
+    '#tapestry-canvas': set(),
+    '#clear-tapestry': set(),
+    '#riad-screen': set(),
+    '#simulate-button': {'js/chronos.js'},
+    '#map-toggle': {'js/cartographer.js'},
+    '#map-canvas': {'js/cartographer.js'},
+    '#synapse-toggle': {'js/synapse.js'},
+    '#alchemy-fuse-btn': {'js/alchemy.js'},
+    '#aegis-toggle': {'js/aegis.js'},
+    '#horizon-toggle': {'js/horizon.js'},
+    '#forge-shard': {'js/codex.js'},
+    '#export-scroll': {'js/codex.js'}
+}
+
+IMPORT_RE = re.compile(r'''(?:import|export)\s[^'"]*?from\s*['"]([^'"]+)['"]|import\s*\(?\s*['"]([^'"]+)['"]''')
+WORKER_RE = re.compile(r'''new\s+Worker\(\s*['"]([^'"]+)['"]''')
+WORKLET_RE = re.compile(r'''addModule\(\s*['"]([^'"]+)['"]''')
+SCRIPT_RE = re.compile(r'''<script[^>]*\ssrc=["']([^"']+)["']''')
+GOTO_RE = re.compile(r'''goto\(\s*f?["']http://localhost:(\{PORT\}|\d+)(/[^"'?#]*)?''')
+PAGE_RE = re.compile(r'''localhost:[^/"'\s]+/([\w./-]+\.html)''')
+PORT_RE = re.compile(r'^PORT\s*=\s*(\d+)', re.MULTILINE)
+
+# app.js wiring: which class each engine variable holds, and what the page exposes
+NAMED_IMPORT_RE = re.compile(r'''import\s*\{([^}]*)\}\s*from\s*['"]([^'"]+)['"]''')
+NEW_RE = re.compile(r'''\b(\w+)\s*=\s*new\s+(\w+)\(''')
+EXPOSE_RE = re.compile(r'''window\.(\w+)\s*=\s*(\w+)\s*;|defineProperty\(window,\s*['"](\w+)['"],\s*\{\s*get:\s*\(\)\s*=>\s*(\w+)''')
+ENGINE_KEY_RE = re.compile(r'''get\s+(\w+)\(\)\s*\{\s*return\s+(\w+)|(\w+)\s*:\s*(\w+)|^\s*(\w+),?\s*$''', re.MULTILINE)
+COMMAND_RE = re.compile(r'''registerCommand\(\s*['"](\w+)['"]''')
+ENGINE_REF_RE = re.compile(r'engines\.(\w+)')
+DOM_ID_RE = re.compile(r'''getElementById\(\s*['"]([\w-]+)['"]|querySelector(?:All)?\(\s*['"]#([\w-]+)''')
+WINDOW_REF_RE = re.compile(r'window\.(\w+)')
+ID_REF_RE = re.compile(r'#([a-z][\w-]*)')
+TYPED_RE = re.compile(r'''keyboard\.type\(\s*['"](\w+)|fill\(\s*['"]#terminal-input['"]\s*,\s*['"](\w+)|commandRegistry\[\s*['"](\w+)''')
+
+
+def _rel(path):
+    return os.path.relpath(path, ROOT).replace(os.sep, '/')
+
+
+def _read(rel_path):
+    with open(os.path.join(ROOT, rel_path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _resolve(spec, importer):
+    # Browser-relative worker URLs ('js/codex.worker.js') resolve from the page root,
+    # module specifiers ('./data.js') resolve from the importing file.
+    if spec.startswith('.'):
+        base = os.path.dirname(os.path.join(ROOT, importer))
+        target = os.path.normpath(os.path.join(base, spec))
+    else:
+        target = os.path.normpath(os.path.join(ROOT, spec.lstrip('/')))
+    rel = _rel(target)
+    return rel if os.path.exists(target) else None
+
+
+def _edges(rel_path):
+    content = _read(rel_path)
+    specs = []
+    for match in IMPORT_RE.finditer(content):
+        specs.append(match.group(1) or match.group(2))
+    specs += WORKER_RE.findall(content)
+    specs += WORKLET_RE.findall(content)
+    if rel_path.endswith('.html'):
+        specs += SCRIPT_RE.findall(content)
+
+    deps = set()
+    for spec in specs:
+        resolved = _resolve(spec, rel_path)
+        if resolved and resolved.endswith('.js'):
+            deps.add(resolved)
+    return deps
+
+
+def build_import_graph():
+    graph = {}
+    entries = [os.path.join(JS_DIR, f) for f in sorted(os.listdir(os.path.join(ROOT, JS_DIR))) if f.endswith('.js')]
+    entries.append('index.html')
+    for entry in entries:
+        graph[entry.replace(os.sep, '/')] = _edges(entry)
+    return graph
+
+
+def closure(graph, roots):
+    seen = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        if node not in graph and os.path.exists(os.path.join(ROOT, node)):
+            graph[node] = _edges(node)
+        stack.extend(graph.get(node, ()))
+    return seen
+
+
+def discover_verifiers():
+    verifiers = []
+    for directory in VERIFIER_DIRS:
+        for name in sorted(os.listdir(os.path.join(ROOT, directory))):
+            if name.endswith('.mjs') or (name.endswith('.py') and name.startswith(('verify', 'visual'))):
+                verifiers.append(name if directory == '.' else f'{directory}/{name}')
+    return verifiers
+
+
+def _page_entry(rel_path):
+    # Playwright scripts drive a page; the page decides which modules load.
+    content = _read(rel_path)
+    if 'playwright' not in content:
+        return None
+    match = PAGE_RE.search(content)
+    if match:
+        return match.group(1)
+    return 'index.html'
+
+
+def static_dependencies(graph, verifier):
+    if verifier.endswith('.mjs'):
+        roots = _edges(verifier)
+    else:
+        entry = _page_entry(verifier)
+        roots = {entry} if entry else set()
+    return {m for m in closure(graph, roots) if m.endswith('.js')}
+
+
+def _balanced(content, start, pair='()'):
+    # Text between the bracket at start and its partner
+    depth = 0
+    for i in range(start, len(content)):
+        if content[i] == pair[0]:
+            depth += 1
+        elif content[i] == pair[1]:
+            depth -= 1
+            if depth == 0:
+                return content[start + 1:i]
+    return content[start + 1:]
+
+
+def feature_anchors(graph):
+    """Maps what a page-driven script can reach to the modules behind it.
+
+    Anchors are window.* debug handles, element ids and terminal command names,
+    resolved through the way app.js constructs and exposes its engines. Returns
+    (anchors, wiring): anchor -> modules, and module -> modules of the engines
+    app.js passes into its constructor.
+    """
+    content = _read(APP_MODULE)
+
+    classes = {}
+    for names, spec in NAMED_IMPORT_RE.findall(content):
+        module = _resolve(spec, APP_MODULE)
+        for name in names.split(','):
+            name = name.split(' as ')[-1].strip()
+            if name and module:
+                classes[name] = module
+
+    variables = {}
+    calls = []
+    for match in NEW_RE.finditer(content):
+        var, cls = match.groups()
+        if cls in classes:
+            variables.setdefault(var, set()).add(classes[cls])
+            calls.append((classes[cls], _balanced(content, match.end() - 1)))
+
+    wiring = {}
+    for module, args in calls:
+        targets = wiring.setdefault(module, set())
+        for name in re.findall(r'\w+', args):
+            targets.update(variables.get(name, ()))
+            if name in classes:
+                targets.add(classes[name])
+
+    anchors = {anchor: set(modules) for anchor, modules in APP_ANCHORS.items()}
+    for match in EXPOSE_RE.finditer(content):
+        var = match.group(2) or match.group(4)
+        if var in variables:
+            anchors[f'window.{match.group(1) or match.group(3)}'] = set(variables[var])
+
+    for module in graph:
+        if module in SHARED_MODULES or not module.startswith(JS_DIR + '/'):
+            continue
+        for a, b in DOM_ID_RE.findall(_read(module)):
+            anchors.setdefault('#' + (a or b), set()).add(module)
+
+    # Terminal commands reach engines through the registerCommands() context
+    engines = {}
+    block = content.find('engines: {')
+    if block != -1:
+        for match in ENGINE_KEY_RE.finditer(_balanced(content, block + len('engines: '), '{}')):
+            key = match.group(1) or match.group(3) or match.group(5)
+            var = match.group(2) or match.group(4) or match.group(5)
+            engines[key] = variables.get(var, set())
+    commands = _read(os.path.join(JS_DIR, 'terminal-commands.js'))
+    starts = list(COMMAND_RE.finditer(commands))
+    for i, match in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(commands)
+        modules = set()
+        for key in ENGINE_REF_RE.findall(commands[match.start():end]):
+            modules |= engines.get(key, set())
+        anchors[f'cmd:{match.group(1)}'] = modules
+    return anchors, wiring
+
+
+def anchored_roots(verifier, anchors, wiring):
+    """Modules behind the handles, element ids and commands a Playwright script
+    uses, plus every engine wired into them. None when it names no anchor."""
+    content = _read(verifier)
+    refs = {f'window.{name}' for name in WINDOW_REF_RE.findall(content)}
+    refs |= {f'#{name}' for name in ID_REF_RE.findall(content)}
+    refs |= {'#' + (a or b) for a, b in DOM_ID_RE.findall(content)}
+    refs |= {'cmd:' + ''.join(groups) for groups in TYPED_RE.findall(content)}
+    refs &= set(anchors)
+    if not refs:
+        return None
+
+    roots = set(PAGE_MODULES)
+    stack = [m for ref in refs for m in anchors[ref]]
+    while stack:
+        module = stack.pop()
+        if module not in roots:
+            roots.add(module)
+            stack.extend(wiring.get(module, ()))
+    return roots
+
+
+def load_coverage_map():
+    path = os.path.join(ROOT, IMPACT_MAP)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('verifiers', {})
+
+
+def dependency_map():
+    graph = build_import_graph()
+    coverage = load_coverage_map()
+    anchors, wiring = feature_anchors(graph)
+    result = {}
+    for verifier in discover_verifiers():
+        static = static_dependencies(graph, verifier)
+        if verifier.endswith('.mjs'):
+            deps = static
+        elif coverage.get(verifier) is not None:
+            # Page-driven scripts load the whole app statically; the coverage run
+            # narrows that down to the modules whose functions actually executed.
+            deps = (set(coverage[verifier]) & static) | (static & SHARED_MODULES)
+        else:
+            # Without a recording, narrow to the engines the script reaches through
+            # window handles, element ids and commands. Scripts naming none keep the page.
+            roots = anchored_roots(verifier, anchors, wiring)
+            if roots is not None:
+                deps = (closure(graph, roots) & static) | (static & SHARED_MODULES)
+            else:
+                deps = static
+        result[verifier] = sorted(deps)
+    return result
+
+
+def changed_files(base, head=None):
+    cmd = ['git', 'diff', '--name-only', base]
+    if head:
+        cmd.append(head)
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return [line.strip() for line in out.splitlines() if line.strip()]
+
+
+def select(changed, deps=None):
+    """Returns (verifiers, reason). Shared or unmapped modules select the full suite."""
+    deps = deps if deps is not None else dependency_map()
+    all_verifiers = sorted(deps)
+    known_modules = set().union(*deps.values()) if deps else set()
+
+    shared = [f for f in changed if f in SHARED_MODULES]
+    if shared:
+        return all_verifiers, f'shared module changed: {", ".join(shared)}'
+
+    unmapped = [f for f in changed if f.startswith(JS_DIR + '/') and f.endswith('.js') and f not in known_modules]
+    if unmapped:
+        return all_verifiers, f'no verifier maps to: {", ".join(unmapped)}'
+
+    changed_set = set(changed)
+    selected = [v for v in all_verifiers if v in changed_set or changed_set & set(deps[v])]
+    return selected, f'{len(selected)}/{len(all_verifiers)} verifiers affected'
+
+
+# --- Coverage Recording ---
+
+def _trace(verifier, out_path):
+    # Runs one verifier in this process with Chromium precise coverage attached to
+    # every page it opens. Executed in a fresh subprocess per verifier (see record).
+    from playwright.sync_api import Browser, BrowserContext
+
+    covered = set()
+    sessions = []
+
+    def attach(page):
+        session = page.context.new_cdp_session(page)
+        session.send('Profiler.enable')
+        session.send('Profiler.startPreciseCoverage', {'callCount': True, 'detailed': False})
+        sessions.append(session)
+        return page
+
+    def collect():
+        for session in sessions:
+            try:
+                result = session.send('Profiler.takePreciseCoverage')
+            except Exception:
+                continue
+            for script in result.get('result', []):
+                url = script.get('url', '')
+                if '/js/' not in url:
+                    continue
+                # Module top-level always runs on import; only count real calls.
+                if any(fn['functionName'] and fn['ranges'][0]['count'] > 0 for fn in script['functions']):
+                    covered.add('js/' + url.split('/js/', 1)[1].split('?')[0])
+        sessions.clear()
+
+    original_new_page = Browser.new_page
+    original_ctx_new_page = BrowserContext.new_page
+    original_close = Browser.close
+
+    Browser.new_page = lambda self, *a, **kw: attach(original_new_page(self, *a, **kw))
+    BrowserContext.new_page = lambda self, *a, **kw: attach(original_ctx_new_page(self, *a, **kw))
+
+    def close(self, *a, **kw):
+        collect()
+        return original_close(self, *a, **kw)
+
+    Browser.close = close
+
+    sys.argv = [verifier]
+    try:
+        runpy.run_path(os.path.join(ROOT, verifier), run_name='__main__')
+    except SystemExit:
+        pass
+    finally:
+        collect()
+        with open(out_path, 'w') as f:
+            json.dump(sorted(covered), f)
+
+
+def record(verifiers=None):
+    coverage = load_coverage_map()
+    targets = [v for v in (verifiers or discover_verifiers()) if v.endswith('.py')]
+    tmp = os.path.join(ROOT, 'tests', '.impact_trace.json')
+
+    with static_servers(targets):
+        for verifier in targets:
+            print(f'Recording {verifier}...')
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '_trace', verifier, tmp],
+                cwd=ROOT,
+                timeout=600
+            )
+            if os.path.exists(tmp):
+                with open(tmp, 'r') as f:
+                    coverage[verifier] = json.load(f)
+                os.remove(tmp)
+
+    with open(os.path.join(ROOT, IMPACT_MAP), 'w') as f:
+        json.dump({'version': 1, 'verifiers': coverage}, f, indent=2, sort_keys=True)
+    print(f'Coverage map written to {IMPACT_MAP}')
+
+
+# --- Execution ---
+
+class _StaticServers:
+    # Several scripts expect an already-running server (8080, 8000, 8081...).
+    def __init__(self, ports):
+        self.ports = ports
+        self.servers = []
+
+    def __enter__(self):
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=ROOT)
+        handler.log_message = lambda *args: None
+        socketserver.TCPServer.allow_reuse_address = True
+        for port in sorted(self.ports):
+            try:
+                server = socketserver.ThreadingTCPServer(('', port), handler)
+            except OSError:
+                print(f'Port {port} in use, assuming server running.')
+                continue
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+        return self
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def static_servers(verifiers):
+    ports = set()
+    for verifier in verifiers:
+        if not verifier.endswith('.py'):
+            continue
+        content = _read(verifier)
+        if 'serve_forever' in content or 'TestServer' in content:
+            continue  # Script hosts its own server
+        match = GOTO_RE.search(content)
+        if match:
+            port = match.group(1)
+            if port == '{PORT}':
+                port_match = PORT_RE.search(content)
+                port = port_match.group(1) if port_match else None
+            if port:
+                ports.add(int(port))
+    return _StaticServers(ports)
+
+
+def run(verifiers):
+    failures = []
+    with static_servers(verifiers):
+        for verifier in verifiers:
+            print(f'\n=== {verifier} ===')
+            if verifier.endswith('.mjs'):
+                cmd = ['node', '--test', verifier]
+            else:
+                cmd = [sys.executable, verifier]
+            if subprocess.run(cmd, cwd=ROOT).returncode != 0:
+                failures.append(verifier)
+
+    print(f'\n{len(verifiers) - len(failures)}/{len(verifiers)} verifiers passed.')
+    for verifier in failures:
+        print(f'  FAIL: {verifier}')
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test-impact selection for MARQ verifiers.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('graph', help='Print the verifier -> module dependency map')
+
+    rec = sub.add_parser('record', help='Record Playwright coverage into the impact map')
+    rec.add_argument('verifiers', nargs='*')
+
+    for name in ('select', 'run'):
+        p = sub.add_parser(name)
+        p.add_argument('--base', default='HEAD', help='Git revision to diff against')
+        p.add_argument('--head', default=None, help='Optional second revision')
+        p.add_argument('--all', action='store_true', help='Ignore the diff and use the full suite')
+
+    trace = sub.add_parser('_trace')
+    trace.add_argument('verifier')
+    trace.add_argument('out')
+
+    args = parser.parse_args()
+
+    if args.command == 'graph':
+        print(json.dumps(dependency_map(), indent=2))
+    elif args.command == 'record':
+        record(args.verifiers or None)
+    elif args.command == '_trace':
+        _trace(args.verifier, args.out)
+    else:
+        deps = dependency_map()
+        if args.all:
+            selected, reason = sorted(deps), 'full suite requested'
+        else:
+            selected, reason = select(changed_files(args.base, args.head), deps)
+        print(f'Impact: {reason}')
+        if args.command == 'select':
+            for verifier in selected:
+                print(verifier)
+        else:
+            sys.exit(run(selected))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pngio  # noqa: E402
+
+# Visual Regression Diffing
+# Compares the screenshots written into verification/ by the Playwright scripts
+# against a committed baseline store, using a perceptual (YIQ) colour distance
+# with per-region tolerance masks. Failing diffs write a heat overlay into
+# verification/diffs/ so heatmap and map regressions are visible at a glance.
+#
+#   python3 tools/visual_diff.py                       # diff every baselined or masked screenshot
+#   python3 tools/visual_diff.py prometheus_heatmap    # diff one
+#   python3 tools/visual_diff.py --update prometheus_heatmap
+#
+# Bootstrap (fresh checkout, no baselines yet): on the reference setup run every
+# verifier once with MARQ_UPDATE_BASELINES=1, check the captures by eye, then
+# commit verification/baselines/*.png. See README.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAPTURE_DIR = os.path.join(ROOT, 'verification')
+BASELINE_DIR = os.path.join(CAPTURE_DIR, 'baselines')
+DIFF_DIR = os.path.join(CAPTURE_DIR, 'diffs')
+MASKS_FILE = os.path.join(BASELINE_DIR, 'masks.json')
+
+# Defaults, overridable per screenshot in masks.json
+DEFAULT_THRESHOLD = 0.1      # Perceptual distance (0-1) before a pixel counts as changed
+DEFAULT_MAX_RATIO = 0.002    # Fraction of changed pixels tolerated before failing
+
+# Max YIQ delta between black and white, used to normalise into 0-1
+MAX_YIQ_DELTA = 35215.0
+
+
+def load_masks():
+    if not os.path.exists(MASKS_FILE):
+        return {}
+    with open(MASKS_FILE, 'r') as f:
+        return json.load(f)
+
+
+def _flatten(pixels):
+    # Composite RGBA over black so transparent regions compare consistently
+    rgb = pixels[..., :3].astype(np.float32)
+    if pixels.shape[2] == 4:
+        alpha = pixels[..., 3:4].astype(np.float32) / 255.0
+        rgb *= alpha
+    return rgb
+
+
+def perceptual_delta(a, b):
+    """Per-pixel YIQ distance between two RGB(A) arrays, normalised to 0-1."""
+    a = _flatten(a)
+    b = _flatten(b)
+    d = a - b
+    dr, dg, db = d[..., 0], d[..., 1], d[..., 2]
+    y = dr * 0.29889531 + dg * 0.58662247 + db * 0.11448223
+    i = dr * 0.59597799 - dg * 0.27417610 - db * 0.32180189
+    q = dr * 0.21147017 - dg * 0.52261711 + db * 0.31114694
+    delta = 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+    return np.sqrt(delta / MAX_YIQ_DELTA)
+
+
+def tolerance_map(shape, spec):
+    """Builds the per-pixel threshold array from the region list of a mask spec.
+
+    Regions are {x, y, w, h, tolerance} in CSS pixels of the screenshot, or as
+    fractions (0-1) of the image size when "relative" is true. A tolerance of 1
+    ignores the region entirely (animated pulses, clocks, random camouflage).
+    """
+    height, width = shape
+    tolerance = np.full(shape, spec.get('threshold', DEFAULT_THRESHOLD), dtype=np.float32)
+    for region in spec.get('regions', []):
+        x, y, w, h = region['x'], region['y'], region['w'], region['h']
+        if region.get('relative'):
+            x, w = x * width, w * width
+            y, h = y * height, h * height
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(width, int(x + w)), min(height, int(y + h))
+        tolerance[y0:y1, x0:x1] = region.get('tolerance', 1.0)
+    return tolerance
+
+
+def heat_overlay(baseline, delta, changed):
+    """Greyed-out baseline with changed pixels painted on a yellow-to-red ramp."""
+    grey = _flatten(baseline).mean(axis=2, keepdims=True) * 0.35
+    out = np.repeat(grey, 3, axis=2)
+    heat = np.clip(delta, 0, 1)
+    out[..., 0] = np.where(changed, 255, out[..., 0])
+    out[..., 1] = np.where(changed, 255 * (1 - heat), out[..., 1])
+    out[..., 2] = np.where(changed, 0, out[..., 2])
+    return out.astype(np.uint8)
+
+
+def compare(name, capture_path=None, spec=None):
+    """Compares one screenshot against its baseline. Returns a result dict."""
+    capture_path = capture_path or os.path.join(CAPTURE_DIR, f'{name}.png')
+    baseline_path = os.path.join(BASELINE_DIR, f'{name}.png')
+    spec = spec if spec is not None else load_masks().get(name, {})
+
+    result = {'name': name, 'passed': False, 'ratio': None, 'diff': None, 'reason': ''}
+
+    if not os.path.exists(baseline_path):
+        result['reason'] = 'no baseline'
+        return result
+    if not os.path.exists(capture_path):
+        result['reason'] = 'no capture'
+        return result
+
+    baseline = pngio.load(baseline_path)
+    capture = pngio.load(capture_path)
+
+    if baseline.shape[:2] != capture.shape[:2]:
+        result['reason'] = f'size mismatch {baseline.shape[1]}x{baseline.shape[0]} vs {capture.shape[1]}x{capture.shape[0]}'
+        return result
+
+    delta = perceptual_delta(baseline, capture)
+    changed = delta > tolerance_map(delta.shape, spec)
+    ratio = float(changed.mean())
+    result['ratio'] = ratio
+
+    if ratio <= spec.get('max_ratio', DEFAULT_MAX_RATIO):
+        result['passed'] = True
+        return result
+
+    os.makedirs(DIFF_DIR, exist_ok=True)
+    diff_path = os.path.join(DIFF_DIR, f'{name}.diff.png')
+    pngio.save(diff_path, heat_overlay(baseline, delta, changed))
+    result['diff'] = os.path.relpath(diff_path, ROOT)
+    result['reason'] = f'{ratio:.2%} of pixels changed'
+    return result
+
+
+def assert_matches(name, capture_path=None):
+    """Helper for the Playwright scripts. Raises AssertionError on regression or
+    when no baseline is committed; MARQ_UPDATE_BASELINES=1 records the capture
+    as the new baseline instead."""
+    capture_path = capture_path or os.path.join(CAPTURE_DIR, f'{name}.png')
+    if os.environ.get('MARQ_UPDATE_BASELINES') == '1':
+        update(name, capture_path)
+        print(f'Baseline recorded for {name}.')
+        return {'name': name, 'passed': True, 'ratio': 0.0, 'diff': None, 'reason': 'baseline recorded'}
+
+    result = compare(name, capture_path)
+    if result['reason'] == 'no baseline':
+        raise AssertionError(
+            f'No baseline for {name}. Record one on the reference setup with '
+            f'MARQ_UPDATE_BASELINES=1 (or tools/visual_diff.py --update {name}) '
+            f'and commit verification/baselines/{name}.png'
+        )
+    if not result['passed']:
+        raise AssertionError(f"Visual regression in {name}: {result['reason']} (see {result['diff']})")
+    return result
+
+
+def update(name, capture_path=None):
+    capture_path = capture_path or os.path.join(CAPTURE_DIR, f'{name}.png')
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    shutil.copyfile(capture_path, os.path.join(BASELINE_DIR, f'{name}.png'))
+
+
+def baselined_names():
+    if not os.path.isdir(BASELINE_DIR):
+        return []
+    return sorted(f[:-4] for f in os.listdir(BASELINE_DIR) if f.endswith('.png'))
+
+
+def expected_names(masks):
+    """Every committed baseline plus every screenshot declared in masks.json,
+    so a declared screenshot with no baseline fails instead of being skipped."""
+    return sorted(set(baselined_names()) | set(masks))
+
+
+def _compare_task(args):
+    name, spec = args
+    try:
+        return compare(name, spec=spec)
+    except Exception as e:
+        return {'name': name, 'passed': False, 'ratio': None, 'diff': None, 'reason': str(e)}
+
+
+def compare_all(names=None, workers=None):
+    masks = load_masks()
+    names = names or expected_names(masks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compare_task, [(n, masks.get(n, {})) for n in names]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Visual regression diff for verification screenshots.')
+    parser.add_argument('names', nargs='*', help='Screenshot names (without .png). Default: all baselines and masks.json entries')
+    parser.add_argument('--update', action='store_true', help='Promote current captures to baselines')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help='Emit results as JSON')
+    args = parser.parse_args()
+
+    if args.update:
+        names = args.names or sorted(f[:-4] for f in os.listdir(CAPTURE_DIR) if f.endswith('.png'))
+        for name in names:
+            update(name)
+            print(f'Updated baseline: {name}')
+        return
+
+    results = compare_all(args.names, args.workers)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = 'PASS' if r['passed'] else 'FAIL'
+            detail = f" ({r['reason']})" if r['reason'] else ''
+            print(f"{status}: {r['name']}{detail}")
+            if r['diff']:
+                print(f"      heat overlay: {r['diff']}")
+
+    if not results:
+        print('No baselines found. Bootstrap them on the reference setup (see README).')
+    sys.exit(0 if all(r['passed'] for r in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,10 @@ import http.server
 import socketserver
 import threading
 import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+from visual_diff import assert_matches
 
 # Port for verification
 PORT = 8085
@@ -45,7 +49,8 @@ class TestPrometheus(unittest.TestCase):
     def setUp(self):
         self.p = sync_playwright().start()
         self.browser = self.p.chromium.launch(headless=True)
-        self.page = self.browser.new_page()
+        # Fixed viewport + DPR so captures are comparable with the stored baselines
+        self.page = self.browser.new_page(viewport={'width': 1280, 'height': 720}, device_scale_factor=1)
         self.page.goto(f"http://localhost:{PORT}")
         # Bypass splash
         self.page.click("#splash-screen")
@@ -101,7 +106,9 @@ class TestPrometheus(unittest.TestCase):
 
         # 5. Take Screenshot
         print("Capturing Thermal Signature...")
-        self.page.screenshot(path="verification/prometheus_heatmap.png")
+        self.page.screenshot(path="verification/prometheus_heatmap.png", animations="disabled")
+        result = assert_matches("prometheus_heatmap")
+        print(f"Visual diff (full page): {result['ratio']:.4%} pixels changed")
 
         # 6. Analyze Canvas Pixels
         # Since I can't easily access the instance, I'll analyze the DOM canvas #map-canvas
@@ -138,5 +145,12 @@ class TestPrometheus(unittest.TestCase):
 
         self.assertTrue(pixel_data['w'] > 0)
 
+        # 7. Visual Regression (Map + Heatmap Layer)
+        # Pulsing nodes are masked in verification/baselines/masks.json
+        print("Comparing thermal signature against baseline...")
+        self.page.locator("#map-canvas").screenshot(path="verification/prometheus_map.png")
+        result = assert_matches("prometheus_map")
+        print(f"Visual diff: {result['ratio']:.4%} pixels changed")
+
 if __name__ == '__main__':
     unittest.main()
@@ -6,6 +6,9 @@ import os
 import sys
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+from visual_diff import assert_matches
+
 PORT = 8087
 
 def run_server():
@@ -22,7 +25,8 @@ def verify_visuals():
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
+            # Fixed viewport + DPR so captures are comparable with the stored baselines
+            context = browser.new_context(viewport={'width': 1280, 'height': 720}, device_scale_factor=1)
 
             # Disable Ghost Guide by pre-setting localStorage
             page = context.new_page()
@@ -37,8 +41,10 @@ def verify_visuals():
             # 1. Capture Pulse Animation
             # Wait for it to start
             time.sleep(1)
-            page.screenshot(path="verification/astrolabe_pulse.png")
+            # Infinite animations (help pulse) are frozen at their first frame
+            page.screenshot(path="verification/astrolabe_pulse.png", animations="disabled")
             print("Captured pulse screenshot.")
+            assert_matches("astrolabe_pulse")
 
             # 2. Capture Dragging State
             # Simulate mousedown on ring
@@ -64,15 +70,17 @@ def verify_visuals():
             is_dragging = page.evaluate("document.querySelector('#ring-intention').classList.contains('dragging')")
             print(f"Ring has 'dragging' class: {is_dragging}")
 
-            page.screenshot(path="verification/dragging_ring.png")
+            page.screenshot(path="verification/dragging_ring.png", animations="disabled")
             print("Captured dragging screenshot.")
+            assert_matches("dragging_ring")
             page.mouse.up()
 
             # 3. Capture Offline Toast
             context.set_offline(True)
             page.wait_for_selector(".toast-offline", state="visible")
-            page.screenshot(path="verification/offline_toast.png")
+            page.screenshot(path="verification/offline_toast.png", animations="disabled")
             print("Captured offline toast screenshot.")
+            assert_matches("offline_toast")
 
             context.set_offline(False)
 
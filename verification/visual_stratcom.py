@@ -6,6 +6,9 @@ import os
 import sys
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+from visual_diff import assert_matches
+
 PORT = 8090
 
 def run_server():
@@ -21,7 +24,8 @@ def verify_stratcom():
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True, args=['--disable-web-security'])
-        page = browser.new_page()
+        # Fixed viewport + DPR so captures are comparable with the stored baselines
+        page = browser.new_page(viewport={'width': 1280, 'height': 720}, device_scale_factor=1)
 
         try:
             page.goto(f"http://localhost:{PORT}")
@@ -45,8 +49,14 @@ def verify_stratcom():
                 os.makedirs("verification")
 
             screenshot_path = "verification/stratcom_visual.png"
-            page.screenshot(path=screenshot_path)
+            # The ticker carries wall-clock times and the log mirrors live terminal output
+            page.screenshot(
+                path=screenshot_path,
+                animations="disabled",
+                mask=[page.locator("#widget-ticker"), page.locator("#widget-log-content")],
+            )
             print(f"Screenshot saved to {screenshot_path}")
+            assert_matches("stratcom_visual")
 
         except Exception as e:
             print(f"Error: {e}")